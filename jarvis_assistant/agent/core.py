@@ -137,10 +137,10 @@ class JarvisAgent:
         Yields:
             str: Response chunks in real-time
         """
-        # Import LLM client
-        from .llm_client import DoubaoLLMClient
+        # Shared provider router (warm pools, routes by TTFT, fails over before the first token)
+        from .llm_router import get_llm_router
         
-        llm = DoubaoLLMClient()
+        llm = get_llm_router()
         
         # Fast-path for simple queries
         if self._is_simple_query(text):
@@ -148,7 +148,8 @@ class JarvisAgent:
             async for chunk in llm.generate_stream(
                 user_message=text,
                 system_prompt="You are Jarvis, a helpful voice assistant. Be concise and natural.",
-                temperature=0.7
+                temperature=0.7,
+                short=True
             ):
                 yield chunk
         
@@ -158,7 +159,8 @@ class JarvisAgent:
             async for chunk in llm.generate_stream(
                 user_message=text,
                 system_prompt="You are Jarvis, a helpful voice assistant.",
-                temperature=0.7
+                temperature=0.7,
+                short=False
             ):
                 yield chunk
     
@@ -2,13 +2,37 @@
 Doubao LLM streaming client.
 Extracted from legacy agent.py for clean architecture.
 Optimized for <1s first token latency.
+
+One long-lived client (get_llm_client) reuses its HTTP connection pool
+across turns, enforces a per-request deadline and can hedge slow requests.
 """
 
 import os
 import json
+import time
 import asyncio
+from collections import deque
 from typing import List, Dict, Optional, AsyncIterator
 import aiohttp
+from jarvis_assistant.utils.sse import stream_events, TextDelta, Usage
+
+DEFAULT_DEADLINE = float(os.getenv("JARVIS_LLM_DEADLINE", "30"))
+HEDGE_ENABLED = os.getenv("JARVIS_LLM_HEDGE", "false").lower() == "true"
+# Hedge when the first token is later than this percentile of recent TTFTs
+HEDGE_PERCENTILE = float(os.getenv("JARVIS_LLM_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY = float(os.getenv("JARVIS_LLM_HEDGE_MIN_DELAY", "0.3"))
+HEDGE_DEFAULT_DELAY = 1.0  # Until enough TTFT samples exist
+TTFT_WINDOW = 100
+_END = object()
+
+
+def percentile(values, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a sample (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
 
 
 class DoubaoLLMClient:
@@ -19,12 +43,19 @@ class DoubaoLLMClient:
     - Streaming by default (first token <700ms)
     - Thinking disabled for speed
     - Minimal reasoning effort
+    - Keep-alive connection pool shared by all requests
+    - Optional hedging: if no first token arrives within the recent p95
+      TTFT, a second identical request is sent and the slower one cancelled
+    - Telemetry: TTFT percentiles, tokens/sec, hedge win rate (get_stats)
     """
     
     def __init__(
         self,
         endpoint_id: Optional[str] = None,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        hedge: bool = HEDGE_ENABLED,
+        hedge_delay: Optional[float] = None,
+        deadline: float = DEFAULT_DEADLINE
     ):
         """
         Initialize Doubao LLM client.
@@ -32,11 +63,30 @@ class DoubaoLLMClient:
         Args:
             endpoint_id: Doubao endpoint (defaults to env DOUBAO_ENDPOINT_ID)
             api_key: API key (defaults to env DOUBAO_ARK_API_KEY or DOUBAO_ACCESS_TOKEN)
+            hedge: Send a backup request when the first token is late
+            hedge_delay: Fixed hedge delay in seconds (default: p95 of recent TTFTs)
+            deadline: Default per-request deadline in seconds
         """
         self.endpoint_id = endpoint_id or os.getenv("DOUBAO_ENDPOINT_ID", "ep-20241228191825-f94fk")
         # Try multiple env variable names for API key
         self.api_key = api_key or os.getenv("DOUBAO_ARK_API_KEY") or os.getenv("DOUBAO_ACCESS_TOKEN")
-        self.url = "https://ark.cn-beijing.volces.com/api/v3/responses"
+        self.url = os.getenv("DOUBAO_ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3").rstrip("/") + "/responses"
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.deadline = deadline
+        
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+        self._ttfts = deque(maxlen=TTFT_WINDOW)
+        self._rates = deque(maxlen=TTFT_WINDOW)
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "sessions_opened": 0,
+        }
     
     def _format_messages(
         self,
@@ -94,12 +144,31 @@ class DoubaoLLMClient:
         
         return messages
     
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive session (recreated if closed or on a new event loop)."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=8, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+            self.stats["sessions_opened"] += 1
+        return self._session
+    
+    def current_hedge_delay(self) -> float:
+        """Seconds to wait for a first token before sending the backup request."""
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        if len(self._ttfts) < 10:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, percentile(self._ttfts, HEDGE_PERCENTILE))
+    
     async def generate_stream(
         self,
         user_message: str,
         system_prompt: Optional[str] = None,
         history: Optional[List[Dict]] = None,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        deadline: Optional[float] = None
     ) -> AsyncIterator[str]:
         """
         🚀 Generate streaming LLM response.
@@ -111,10 +180,14 @@ class DoubaoLLMClient:
             system_prompt: System prompt (optional)
             history: Conversation history (optional)
             temperature: LLM temperature (default: 0.7)
+            deadline: Seconds for the whole request (default: client deadline)
             
         Yields:
             str: Response chunks as they arrive
             
+        Raises:
+            asyncio.TimeoutError: deadline exceeded
+            
         Example:
             async for chunk in llm.generate_stream("你好"):
                 print(chunk, end="", flush=True)
@@ -137,59 +210,121 @@ class DoubaoLLMClient:
         if "lite" in self.endpoint_id or "251228" in self.endpoint_id:
             payload["reasoning"] = {"effort": "minimal"}
         
+        expires = time.monotonic() + (deadline or self.deadline)
+        self.stats["requests"] += 1
+        t0 = time.monotonic()
+        
+        attempts = [self._start_attempt(payload, expires)]
+        try:
+            winner, item = await self._first_token(attempts, expires)
+            ttft = time.monotonic() - t0
+            if isinstance(item, str):
+                self._ttfts.append(ttft)
+            
+            count = 0
+            usage = winner["usage"]
+            while item is not _END:
+                if isinstance(item, BaseException):
+                    raise item
+                count += 1
+                yield item
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                item = await asyncio.wait_for(winner["queue"].get(), timeout=remaining)
+            
+            elapsed = time.monotonic() - t0 - ttft
+            tokens = usage.get("output_tokens") or count
+            if elapsed > 0 and tokens > 1:
+                self._rates.append(tokens / elapsed)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            for attempt in attempts:
+                if not attempt["task"].done():
+                    attempt["task"].cancel()
+    
+    async def _first_token(self, attempts: List[Dict], expires: float):
+        """
+        Wait for the first token, hedging if it is late.
+        
+        Returns:
+            (winning attempt, its first item)
+        """
+        hedge_at = time.monotonic() + self.current_hedge_delay() if self.hedge else None
+        pending = {asyncio.ensure_future(attempts[0]["queue"].get()): attempts[0]}
+        errors = []
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= expires:
+                    raise asyncio.TimeoutError()
+                wake = min(expires, hedge_at) if hedge_at else expires
+                done, _ = await asyncio.wait(pending, timeout=wake - now, return_when=asyncio.FIRST_COMPLETED)
+                
+                for fut in done:
+                    attempt = pending.pop(fut)
+                    item = fut.result()
+                    if isinstance(item, BaseException) and pending:
+                        errors.append(item)  # The other request may still succeed
+                        continue
+                    if attempt is not attempts[0]:
+                        self.stats["hedge_wins"] += 1
+                    return attempt, item
+                
+                if hedge_at and time.monotonic() >= hedge_at:
+                    # 🛡️ First token is late: fire the backup request
+                    hedge_at = None
+                    self.stats["hedged"] += 1
+                    backup = self._start_attempt(attempts[0]["payload"], expires)
+                    attempts.append(backup)
+                    pending[asyncio.ensure_future(backup["queue"].get())] = backup
+            raise errors[-1] if errors else RuntimeError("LLM request produced no output")
+        finally:
+            for fut in pending:
+                fut.cancel()
+    
+    def _start_attempt(self, payload: Dict, expires: float) -> Dict:
+        """Run one streaming request in the background, feeding a queue."""
+        attempt = {"payload": payload, "queue": asyncio.Queue(), "usage": {}}
+        
+        async def run():
+            try:
+                async for chunk in self._stream_once(payload, expires, attempt["usage"]):
+                    attempt["queue"].put_nowait(chunk)
+                attempt["queue"].put_nowait(_END)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                attempt["queue"].put_nowait(e)
+        
+        attempt["task"] = asyncio.create_task(run())
+        return attempt
+    
+    async def _stream_once(self, payload: Dict, expires: float, usage: Dict) -> AsyncIterator[str]:
+        """One HTTP request: parse the SSE stream into text deltas."""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        session = await self._get_session()
+        timeout = aiohttp.ClientTimeout(total=max(0.001, expires - time.monotonic()))
         
         # Stream response
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.url, json=payload, headers=headers, timeout=30) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise RuntimeError(f"Doubao API error ({response.status}): {error_text}")
-                
-                # Parse SSE stream
-                async for line in response.content:
-                    line = line.decode('utf-8').strip()
-                    
-                    if not line or line == "data: [DONE]":
-                        continue
-                    
-                    if line.startswith("data:"):
-                        data = line[5:].strip()  # Remove "data:" prefix
-                        if data == "[DONE]":
-                            continue
-                        
-                        try:
-                            event = json.loads(data)
-                            event_type = event.get("type", "")
-                            
-                            # Handle different event types from Doubao Responses API
-                            # Main text delta events
-                            if event_type == "response.output_text.delta":
-                                chunk = event.get("delta", "")
-                                if chunk:
-                                    yield chunk
-                            
-                            # Legacy format (fallback)
-                            elif "output" in event:
-                                for output_item in event["output"]:
-                                    if output_item.get("type") == "output_text":
-                                        chunk = output_item.get("text", "")
-                                        if chunk:
-                                            yield chunk
-                            
-                            # ChatCompletion format (fallback)
-                            elif "choices" in event:
-                                for choice in event.get("choices", []):
-                                    delta = choice.get("delta", {})
-                                    chunk = delta.get("content", "")
-                                    if chunk:
-                                        yield chunk
-                                        
-                        except json.JSONDecodeError:
-                            continue
+        async with session.post(self.url, json=payload, headers=headers, timeout=timeout) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise RuntimeError(f"Doubao API error ({response.status}): {error_text}")
+            
+            async for item in stream_events(response.content):
+                if isinstance(item, TextDelta):
+                    yield item.text
+                elif isinstance(item, Usage):
+                    usage.update(item.data)
     
     async def generate(
         self,
@@ -212,3 +347,40 @@ class DoubaoLLMClient:
         ):
             full_response += chunk
         return full_response
+    
+    def get_stats(self) -> Dict:
+        """TTFT percentiles (ms), tokens/sec and hedge win rate."""
+        ttfts = list(self._ttfts)
+        rates = list(self._rates)
+        return {
+            **self.stats,
+            "ttft_p50_ms": round(percentile(ttfts, 50) * 1000) if ttfts else None,
+            "ttft_p95_ms": round(percentile(ttfts, 95) * 1000) if ttfts else None,
+            "ttft_p99_ms": round(percentile(ttfts, 99) * 1000) if ttfts else None,
+            "tokens_per_sec": round(sum(rates) / len(rates), 1) if rates else None,
+            "hedge_win_rate": round(self.stats["hedge_wins"] / self.stats["hedged"], 3) if self.stats["hedged"] else 0.0,
+            "hedge_delay_ms": round(self.current_hedge_delay() * 1000),
+        }
+    
+    async def close(self):
+        """Close the pooled HTTP session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# Singleton instance (one warm connection pool for every turn)
+_llm_client_instance: Optional[DoubaoLLMClient] = None
+
+
+def get_llm_client() -> DoubaoLLMClient:
+    """
+    Get singleton LLM client instance.
+    
+    Returns:
+        Shared DoubaoLLMClient instance
+    """
+    global _llm_client_instance
+    if _llm_client_instance is None:
+        _llm_client_instance = DoubaoLLMClient()
+    return _llm_client_instance
@@ -0,0 +1,333 @@
+"""
+Latency-aware LLM provider router.
+
+Puts Doubao (Ark Responses API) and OpenAI-compatible backends (local
+Ollama, Groq, Grok - the providers configured in config/settings.py) behind
+one streaming interface:
+
+    async for chunk in get_llm_router().generate_stream("你好"):
+        ...
+
+Per provider it keeps rolling TTFT and error-rate statistics. Short
+conversational turns go to the fastest healthy backend; other turns prefer
+the primary. If the chosen backend errors or has not produced a first token
+within its failover timeout, the turn moves to the next backend before
+anything has been spoken. Once the first token is out, the turn stays put.
+
+A provider is put in cooldown after consecutive failures, or when most of
+its recent requests failed (with enough samples to tell). While cooling
+down it is only tried as a last resort; afterwards it takes its normal
+place again, and that first request is the probe: one more failure
+restarts the cooldown at once.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+from jarvis_assistant.agent.llm_client import DEFAULT_DEADLINE, TTFT_WINDOW, DoubaoLLMClient, percentile
+from jarvis_assistant.utils.sse import stream_events, TextDelta
+from jarvis_assistant.utils.tracing import mark
+
+# Turns up to this many characters count as short/conversational
+SHORT_TURN_CHARS = int(os.getenv("JARVIS_ROUTER_SHORT_CHARS", "40"))
+# First-token wait before failing over: p95 TTFT x factor, clamped
+FAILOVER_FACTOR = float(os.getenv("JARVIS_ROUTER_FAILOVER_FACTOR", "2.0"))
+FAILOVER_MIN = float(os.getenv("JARVIS_ROUTER_FAILOVER_MIN", "0.8"))
+FAILOVER_MAX = float(os.getenv("JARVIS_ROUTER_FAILOVER_MAX", "4.0"))
+# Assumed TTFT of a provider without samples yet
+TTFT_PRIOR = 1.0
+# Cooldown when more than this share of recent requests failed
+MAX_ERROR_RATE = 0.5
+OUTCOME_WINDOW = 20
+MIN_OUTCOMES = 5  # Requests in the window before the error rate counts
+# Skip a provider for this long after consecutive failures
+COOLDOWN = float(os.getenv("JARVIS_ROUTER_COOLDOWN", "30"))
+COOLDOWN_AFTER = 2
+
+
+class OpenAICompatibleClient:
+    """
+    Streaming client for OpenAI-compatible chat/completions servers
+    (Ollama, Groq, Grok, vLLM...). Same interface as DoubaoLLMClient.
+    """
+
+    def __init__(self, name: str, base_url: str, model: str, api_key: str = "", deadline: float = DEFAULT_DEADLINE):
+        self.name = name
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.api_key = api_key
+        self.deadline = deadline
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=8, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+        return self._session
+
+    async def generate_stream(
+        self,
+        user_message: str,
+        system_prompt: Optional[str] = None,
+        history: Optional[List[Dict]] = None,
+        temperature: float = 0.7,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+        messages += [{"role": m.get("role", "user"), "content": m.get("content", "")} for m in history or []]
+        messages.append({"role": "user", "content": user_message})
+        payload = {"model": self.model, "messages": messages, "stream": True, "temperature": temperature}
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        session = await self._get_session()
+        timeout = aiohttp.ClientTimeout(total=deadline or self.deadline)
+        async with session.post(self.url, json=payload, headers=headers, timeout=timeout) as response:
+            if response.status != 200:
+                raise RuntimeError(f"{self.name} API error ({response.status}): {(await response.text())[:200]}")
+            async for item in stream_events(response.content):
+                if isinstance(item, TextDelta):
+                    yield item.text
+
+    async def generate(self, user_message: str, system_prompt: Optional[str] = None,
+                       history: Optional[List[Dict]] = None, temperature: float = 0.7) -> str:
+        return "".join([chunk async for chunk in self.generate_stream(user_message, system_prompt, history, temperature)])
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class ProviderHealth:
+    """Rolling TTFT and outcome window for one provider."""
+
+    def __init__(self):
+        self.ttfts = deque(maxlen=TTFT_WINDOW)
+        self.outcomes = deque(maxlen=OUTCOME_WINDOW)  # True = first token arrived
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.stats = {"requests": 0, "errors": 0, "slow": 0, "stream_errors": 0}
+
+    def record_success(self, ttft: float):
+        self.ttfts.append(ttft)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+
+    def record_failure(self, kind: str, waited: Optional[float] = None):
+        self.stats[kind] += 1
+        self.outcomes.append(False)
+        if waited is not None:
+            # A timed-out first token is at least this slow
+            self.ttfts.append(waited)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= COOLDOWN_AFTER or self.failing():
+            self.down_until = time.monotonic() + COOLDOWN
+
+    def failing(self) -> bool:
+        """Most of a large enough window failed"""
+        return len(self.outcomes) >= MIN_OUTCOMES and self.error_rate > MAX_ERROR_RATE
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def healthy(self) -> bool:
+        """Not cooling down (after a cooldown the next request probes the provider)"""
+        return time.monotonic() >= self.down_until
+
+    def expected_ttft(self) -> float:
+        return percentile(self.ttfts, 50) if self.ttfts else TTFT_PRIOR
+
+    def failover_timeout(self) -> float:
+        if len(self.ttfts) < 5:
+            return FAILOVER_MAX
+        return max(FAILOVER_MIN, min(FAILOVER_MAX, percentile(self.ttfts, 95) * FAILOVER_FACTOR))
+
+
+class LLMRouter:
+    """
+    Routes streaming requests across providers by health and latency.
+
+    Usage:
+        router = LLMRouter({"doubao": DoubaoLLMClient(), "local": OpenAICompatibleClient(...)})
+        async for chunk in router.generate_stream("你好"):
+            ...
+    """
+
+    def __init__(self, providers: Dict[str, object], primary: Optional[str] = None):
+        self.providers = providers
+        self.primary = primary if primary in providers else next(iter(providers), None)
+        self.health = {name: ProviderHealth() for name in providers}
+        self.last_provider: Optional[str] = None
+        self.stats = {"turns": 0, "failovers": 0, "routed": {name: 0 for name in providers}}
+
+    def is_short(self, user_message: str) -> bool:
+        return len(user_message.strip()) <= SHORT_TURN_CHARS
+
+    def order(self, short: bool) -> List[str]:
+        """Providers to try, best first; unhealthy ones only as a last resort."""
+        def latency(name):
+            # Primary wins ties (e.g. before any samples exist)
+            return (self.health[name].expected_ttft(), name != self.primary)
+
+        healthy = [n for n in self.providers if self.health[n].healthy]
+        unhealthy = sorted((n for n in self.providers if n not in healthy), key=latency)
+        if short:
+            healthy.sort(key=latency)
+        else:
+            healthy.sort(key=lambda n: (n != self.primary, latency(n)))
+        return healthy + unhealthy
+
+    async def generate_stream(
+        self,
+        user_message: str,
+        system_prompt: Optional[str] = None,
+        history: Optional[List[Dict]] = None,
+        temperature: float = 0.7,
+        deadline: Optional[float] = None,
+        short: Optional[bool] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream from the best provider, failing over before the first token.
+
+        Raises:
+            The last provider error, or asyncio.TimeoutError if the deadline
+            passed before any provider produced a token.
+        """
+        if not self.providers:
+            raise RuntimeError("No LLM providers configured")
+        order = self.order(self.is_short(user_message) if short is None else short)
+        expires = time.monotonic() + (deadline or DEFAULT_DEADLINE)
+        self.stats["turns"] += 1
+        last_error: Optional[BaseException] = None
+
+        for i, name in enumerate(order):
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                break
+            client, health = self.providers[name], self.health[name]
+            is_last = i == len(order) - 1
+            wait = remaining if is_last else min(remaining, health.failover_timeout())
+
+            health.stats["requests"] += 1
+            stream = client.generate_stream(user_message, system_prompt, history, temperature, deadline=remaining)
+            t0 = time.monotonic()
+            try:
+                first = await asyncio.wait_for(stream.__anext__(), timeout=wait)
+            except asyncio.TimeoutError as e:
+                health.record_failure("slow", waited=wait)
+                last_error = e
+                await stream.aclose()
+                if not is_last:
+                    self.stats["failovers"] += 1
+                    print(f"🔀 [Router] {name} gave no first token in {wait * 1000:.0f}ms, failing over to {order[i + 1]}")
+                continue
+            except StopAsyncIteration:
+                health.record_failure("errors")
+                last_error = RuntimeError(f"{name} returned an empty response")
+                await stream.aclose()
+                continue
+            except Exception as e:
+                health.record_failure("errors")
+                last_error = e
+                await stream.aclose()
+                if not is_last:
+                    self.stats["failovers"] += 1
+                    print(f"🔀 [Router] {name} failed ({e}), failing over to {order[i + 1]}")
+                continue
+
+            health.record_success(time.monotonic() - t0)
+            self.last_provider = name
+            self.stats["routed"][name] += 1
+            mark("llm_ttft", provider=name, failovers=i)
+            try:
+                yield first
+                async for chunk in stream:
+                    yield chunk
+                mark("llm_done", provider=name)
+            except Exception:
+                # Too late to fail over: part of the answer is already out
+                health.stats["stream_errors"] += 1
+                raise
+            finally:
+                await stream.aclose()
+            return
+
+        raise last_error or asyncio.TimeoutError()
+
+    async def generate(self, user_message: str, system_prompt: Optional[str] = None,
+                       history: Optional[List[Dict]] = None, temperature: float = 0.7) -> str:
+        return "".join([chunk async for chunk in self.generate_stream(user_message, system_prompt, history, temperature)])
+
+    def get_stats(self) -> Dict:
+        providers = {}
+        for name, health in self.health.items():
+            ttfts = list(health.ttfts)
+            providers[name] = {
+                **health.stats,
+                "healthy": health.healthy,
+                "error_rate": round(health.error_rate, 3),
+                "ttft_p50_ms": round(percentile(ttfts, 50) * 1000) if ttfts else None,
+                "ttft_p95_ms": round(percentile(ttfts, 95) * 1000) if ttfts else None,
+                "failover_timeout_ms": round(health.failover_timeout() * 1000),
+            }
+        return {**self.stats, "primary": self.primary, "last_provider": self.last_provider, "providers": providers}
+
+    async def close(self):
+        for client in self.providers.values():
+            await client.close()
+
+
+def build_providers() -> Dict[str, object]:
+    """
+    Providers from the environment (same variables as config/settings.py).
+
+    JARVIS_LLM_PROVIDERS lists them in order (default: doubao plus
+    LLM_PROVIDER); doubao/groq/grok are skipped when their key is missing.
+    """
+    names = os.getenv("JARVIS_LLM_PROVIDERS") or f"doubao,{os.getenv('LLM_PROVIDER', 'groq')}"
+    providers = {}
+    for name in dict.fromkeys(n.strip().lower() for n in names.split(",") if n.strip()):
+        if name == "doubao" and (os.getenv("DOUBAO_ARK_API_KEY") or os.getenv("DOUBAO_ACCESS_TOKEN")):
+            from jarvis_assistant.agent.llm_client import get_llm_client
+            providers[name] = get_llm_client()
+        elif name in ("ollama", "local"):
+            providers[name] = OpenAICompatibleClient(
+                name, os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1"), os.getenv("OLLAMA_MODEL", "llama3.2:1b")
+            )
+        elif name == "groq" and os.getenv("GROQ_API_KEY"):
+            providers[name] = OpenAICompatibleClient(
+                name, os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1"),
+                os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"), os.getenv("GROQ_API_KEY")
+            )
+        elif name == "grok" and os.getenv("GROK_API_KEY"):
+            providers[name] = OpenAICompatibleClient(
+                name, os.getenv("GROK_API_BASE", "https://api.x.ai/v1"),
+                os.getenv("GROK_MODEL", "grok-4.1-fast"), os.getenv("GROK_API_KEY")
+            )
+    return providers
+
+
+# Singleton instance
+_llm_router_instance: Optional[LLMRouter] = None
+
+
+def get_llm_router() -> LLMRouter:
+    """Get the shared router (built once from the environment)."""
+    global _llm_router_instance
+    if _llm_router_instance is None:
+        providers = build_providers()
+        _llm_router_instance = LLMRouter(providers, primary=os.getenv("JARVIS_LLM_PRIMARY", "doubao"))
+        print(f"🔀 [Router] Providers: {', '.join(providers) or 'none'} (primary: {_llm_router_instance.primary})")
+    return _llm_router_instance
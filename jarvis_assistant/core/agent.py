@@ -6,6 +6,7 @@ Autonomous agent with planning, execution, and verification loop.
 import asyncio
 import json
 import os
+import time
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from dataclasses import dataclass, field
@@ -17,8 +18,54 @@ from datetime import datetime
 load_dotenv()
 
 from jarvis_assistant.core.memory import get_memory
+from jarvis_assistant.core.session import SessionContext, current_session, get_session_manager
 from jarvis_assistant.core.intent_matcher import IntentMatcher
+from jarvis_assistant.core.keyword_matcher import Hits, get_keyword_matcher
+from jarvis_assistant.core.synthesis import (
+    ACKNOWLEDGED, ALL_FAILED, NOTHING_TO_SAY, REMEMBERED, TIMED_OUT, ProgressiveSynthesis, failure_fragment,
+    stock_fragment
+)
 from jarvis_assistant.services.tools import get_all_tools
+from jarvis_assistant.services.tools.cache import get_tool_cache
+from jarvis_assistant.utils.deadline import (
+    BudgetStats, TurnDeadline, budget_exhausted, budget_stage, budget_timeout, current_deadline, detached
+)
+from jarvis_assistant.utils.tracing import begin_turn, current_span, end_turn, span
+
+
+# Keyword cues for heuristic intent inference (scanned by the shared keyword automaton)
+INTENT_CUES = {
+    "question": ["?", "？", "吗", "么", "几", "多少", "要不要", "会不会"],
+    "math": ["加", "减", "乘", "除"],
+    "time": ["几点", "几时", "几点钟", "几点了", "现在几点", "时间", "现在是什么时候", "星期几", "日期"],
+    "reminder": ["提醒"],
+    "weather": ["天气", "气温", "温度", "冷", "热", "下雨", "雨", "雪", "刮风", "风大", "雾", "霾", "潮湿", "湿度",
+                "外面", "出门", "带伞", "体感", "空气质量", "穿什么"],
+    "thermostat": ["空调", "暖气", "制冷", "制热", "调到", "调温", "升温", "降温", "风速", "热一点", "冷一点"],
+    "light": ["开灯", "打开灯", "关灯", "关掉灯", "把灯打开", "把灯关上", "亮一点", "暗一点"],
+    "music": ["音乐", "歌曲", "歌", "播放", "来首", "来点", "听点", "放点", "想听", "点一首"],
+    "news": ["新闻", "头条", "热点", "要闻", "最新消息", "发生了什么", "有什么大事", "快讯", "简报"],
+    "company": ["英伟达", "英伟", "特斯拉", "特斯", "苹果", "微软", "阿里", "腾讯", "茅台", "比特币", "以太坊", "百度",
+                "京东", "拼多多", "美团", "小米"],
+    "stock": ["股价", "股票", "股市", "大盘", "涨跌", "行情", "走势", "币价", "数字货币", "币", "市值"],
+    "search": ["搜索", "搜一下", "查一下", "帮我查", "帮我找", "资料", "百科", "是谁", "是什么", "怎么", "为什么", "教程",
+               "官网", "地址"],
+    "followup_time": ["明天", "后天", "昨天", "下周", "这周", "周末"],
+    "followup_music": ["换一首", "下一首", "上一首", "继续播放", "停"],
+    "news_finance": ["财经", "金融", "股市", "商业", "finance", "business"],
+    "conversational": ["记住", "记得", "我喜欢", "我想", "解释", "什么是", "为什么", "怎么样", "如何", "告诉我", "你觉得",
+                       "你认为", "聊聊"],
+}
+# Speak step results as they finish when the caller streams (stream_callback)
+STREAM_SYNTHESIS = os.getenv("JARVIS_STREAM_SYNTHESIS", "true").lower() == "true"
+
+# Words dropped when a stock query names the company without a ticker
+STOCK_STOPWORDS = ["股价", "币价", "行情", "走势", "价格", "查询", "查看", "现在", "最新", "多少", "怎么样", "如何", "咋样",
+                   "情况", "的"]
+
+for _name, _words in INTENT_CUES.items():
+    get_keyword_matcher().register(f"cue:{_name}", _words)
+get_keyword_matcher().register("stock_filler", STOCK_STOPWORDS)
 
 
 class StepStatus(Enum):
@@ -39,6 +86,7 @@ class PlanStep:
     result: Optional[str] = None
     error: Optional[str] = None
     retry_count: int = 0
+    depends_on: List[int] = field(default_factory=list)  # Indices of steps whose output this step needs
 
 
 @dataclass
@@ -48,6 +96,7 @@ class ExecutionPlan:
     steps: List[PlanStep] = field(default_factory=list)
     final_result: Optional[str] = None
     success: bool = False
+    tool_calling: bool = False  # Answer via a single tool-calling request instead of planner steps
 
 
 class JarvisAgent:
@@ -63,23 +112,42 @@ class JarvisAgent:
     
     def __init__(self):
         print("🤖 Initializing Jarvis Agent...")
-        self.memory = get_memory()
         
-        # Add semantic memory capabilities
-        from jarvis_assistant.core.semantic_memory import enhance_memory
-        self.semantic_memory = enhance_memory(self.memory)
+        # Memory, feedback, summary and semantic memory are per conversation (see core/session.py);
+        # outside a session the agent uses the process-wide stores
+        from jarvis_assistant.core.feedback_manager import get_feedback_manager
+        self.default_session = SessionContext("default", get_memory(), get_feedback_manager())
         
         # Use plugin manager for dynamic tool loading
         from jarvis_assistant.utils import get_plugin_manager
         plugin_mgr = get_plugin_manager()
         self.tools = plugin_mgr.loaded_plugins
-
-        # Add feedback manager (Phase 5)
-        from jarvis_assistant.core.feedback_manager import get_feedback_manager # Wait, where is feedback_manager?
-        self.feedback = get_feedback_manager()
         
         print(f"🔧 Loaded {len(self.tools)} tools via plugin manager")
         
+        # Planner prompt: precomputed static prefix + Ark context caching
+        from jarvis_assistant.core.prompt_builder import PlannerPromptBuilder, ArkContextCache
+        self.prompt_builder = PlannerPromptBuilder(self.tools)
+        self.context_cache = ArkContextCache(
+            os.getenv("DOUBAO_ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3")
+        )
+        
+        # Planner decision cache (repeat questions skip the planner)
+        from jarvis_assistant.core.plan_cache import get_plan_cache
+        self.plan_cache = get_plan_cache()
+        
+        # "plan" (JSON planner -> tools -> respond) or "tool_calling" (single streaming round trip)
+        from jarvis_assistant.core.tool_calling import PLANNER_MODE
+        self.planner_mode = PLANNER_MODE
+        
+        # Plan steps run as a DAG: independent steps concurrently, results in plan order
+        from jarvis_assistant.core.step_executor import StepExecutor
+        self.executor = StepExecutor(max_retries=self.MAX_RETRIES)
+        self.synthesis_stats = {"turns": 0, "multi_tool_turns": 0, "first_fragment_ms": []}
+        
+        # One latency budget per turn (JARVIS_TURN_BUDGET), consumption per stage
+        self.budget_stats = BudgetStats()
+        
         # Intent to tool mapping for quick routing
         self.intent_keywords = {
             "天气": "get_weather",
@@ -120,6 +188,9 @@ class JarvisAgent:
             "不是": "feedback_negative",
             "很好": "feedback_positive",
         }
+        # One automaton for every routing vocabulary (intent keywords, cues, stop words, entities)
+        self.keywords = get_keyword_matcher()
+        self.keywords.register("intent", self.intent_keywords)
         
         # Initialize Scheduler
         from jarvis_assistant.core.scheduler import get_scheduler
@@ -133,12 +204,34 @@ class JarvisAgent:
         except RuntimeError:
             pass 
     
+    @property
+    def session(self) -> SessionContext:
+        """The conversation being served (the default one outside a session)."""
+        return current_session() or self.default_session
+
+    @property
+    def memory(self):
+        return self.session.memory
+
+    @property
+    def feedback(self):
+        return self.session.feedback
+
+    @property
+    def summarizer(self):
+        """Token-budgeted history: rolling summary + last K raw turns"""
+        return self.session.summarizer
+
+    @property
+    def semantic_memory(self):
+        return self.session.semantic_memory
+
     def _log_daily(self, event_type: str, content: str):
-        """Append to today's daily log (OpenClaw pattern)"""
+        """Append to today's daily log (OpenClaw pattern), in JARVIS_DAILY_LOG_DIR (default ./logs)"""
         try:
             today = datetime.now().strftime("%Y-%m-%d")
-            log_dir = Path("logs")
-            log_dir.mkdir(exist_ok=True)
+            log_dir = Path(os.getenv("JARVIS_DAILY_LOG_DIR", "logs"))
+            log_dir.mkdir(parents=True, exist_ok=True)
             
             log_path = log_dir / f"{today}.md"
             
@@ -151,10 +244,14 @@ class JarvisAgent:
             # Silent fail - logging shouldn't break the agent
             print(f"⚠️  Daily log write failed: {e}")
 
-    async def handle_trigger(self, prompt: str):
-        # ... existing code ...
+    async def handle_trigger(self, prompt: str, session_id: Optional[str] = None):
         print(f"⚡ Proactive Trigger: {prompt}")
-        await self.run(prompt)
+        if session_id:
+            # Reminders fire in the conversation that set them
+            async with get_session_manager().get(session_id).turn():
+                await self.run(prompt)
+        else:
+            await self.run(prompt)
     
     async def run(self, user_input: str, stream_callback: Optional[callable] = None) -> str:
         """
@@ -162,7 +259,8 @@ class JarvisAgent:
         """
         # 🔥 Refactor Phase 7: Sync memory from Markdown (Simulate "Human Edit")
         # This allows the user to edit MEMORY.md and have Jarvis pick it up instantly.
-        self.memory.load_from_markdown()
+        # Only external edits are read and parsed (file watch + content hash), off the event loop.
+        await self.memory.refresh_from_markdown()
 
         # 🎵 Auto-pause music when user speaks (to prevent overlap with Jarvis response)
         music_tool = self.tools.get("play_music")
@@ -184,9 +282,30 @@ class JarvisAgent:
         # Store user input
         self.memory.add_conversation("user", user_input)
         
+        # ⏱️ Turn budget: planning, tools, LLM and TTS take their timeouts from it
+        deadline = TurnDeadline()
+        deadline_token = deadline.activate()
+        # 📈 Span timeline of this turn (joins the voice loop's trace if one is running)
+        trace_token = begin_turn(text=user_input[:80])
+        plan = None
         try:
             # 1. Plan (with learning)
-            plan = await self.plan(user_input)
+            direct_answer = None
+            try:
+                with span("plan"):
+                    plan = await deadline.run("plan", self.plan(user_input))
+                if plan.tool_calling:
+                    with deadline.stage("tool_calling"), span("tool_calling"):
+                        direct_answer = await self._run_with_tool_calls(user_input, plan, stream_callback)
+                    if direct_answer is None:
+                        # Tool-calling request failed - fall back to plan-then-respond
+                        with span("plan", retry=True):
+                            plan = await deadline.run("plan", self.plan(user_input, allow_tool_calling=False))
+            except asyncio.TimeoutError:
+                plan = ExecutionPlan(task=user_input)
+            if direct_answer is None and (deadline.expired or deadline.timed_out):
+                # Nothing left to run it with: say so now instead of going silent
+                direct_answer = await self._degraded_answer(plan, stream_callback)
             
             # Check advice from feedback manager
             advice = self.feedback.get_advice(user_input)
@@ -196,27 +315,33 @@ class JarvisAgent:
             
             print(f"📋 Plan created: {len(plan.steps)} steps")
             
-            # ... execution loop ...
-            for i, step in enumerate(plan.steps):
-                print(f"🔄 Step {i+1}/{len(plan.steps)}: {step.description}")
-                step.status = StepStatus.RUNNING
-                
-                result = await self.execute_step(step, stream_callback)
-                
-                if step.status == StepStatus.FAILED and step.retry_count < self.MAX_RETRIES:
-                     # ... retry logic ...
-                     print(f"⚠️ Step failed, retrying... ({step.retry_count + 1}/{self.MAX_RETRIES})")
-                     step.retry_count += 1
-                     step.status = StepStatus.RETRYING
-                     result = await self.execute_step(step)
-            
-            # 3. Synthesize result
-            final_result = self.synthesize(plan)
+            if direct_answer is None:
+                # 2. Execute independent steps concurrently (results stay in plan order);
+                #    each step is cut off when the turn budget runs out
+                execute = lambda step: self.execute_step(step, stream_callback)
+                if stream_callback and STREAM_SYNTHESIS:
+                    # 3. Speak each result as soon as it is next in line
+                    synthesis = ProgressiveSynthesis(plan.steps, stream_callback)
+                    with deadline.stage("execute"), span("execute", steps=len(plan.steps)):
+                        await self.executor.run(plan.steps, execute, on_done=synthesis.step_done)
+                    with span("synthesize"):
+                        final_result = await synthesis.finish()
+                    self._record_first_fragment(plan, synthesis.first_fragment_ms)
+                else:
+                    with deadline.stage("execute"), span("execute", steps=len(plan.steps)):
+                        await self.executor.run(plan.steps, execute)
+                    # 3. Synthesize result
+                    with span("synthesize"):
+                        final_result = self.synthesize(plan)
+                deadline.degraded = deadline.degraded or bool(deadline.timed_out)
+            else:
+                final_result = direct_answer
             plan.final_result = final_result
             plan.success = all(s.status == StepStatus.SUCCESS for s in plan.steps)
             
             # 6. Store assistant response
             self.memory.add_conversation("assistant", final_result)
+            self.summarizer.schedule_refresh()  # Fold old turns off the hot path
             
             # 📝 Daily log: Agent response & tools used (OpenClaw pattern)
             tools_used = [step.tool_name for step in plan.steps if step.tool_name]
@@ -231,8 +356,8 @@ class JarvisAgent:
                 success=plan.success
             )
             
-            # 🔥 Active Memory Extraction (非阻塞)
-            asyncio.create_task(self._extract_memories(user_input, final_result))
+            # 🔥 Active Memory Extraction (非阻塞, not bound by this turn's budget)
+            asyncio.create_task(detached(self._extract_memories(user_input, final_result)))
             
             return final_result
             
@@ -245,6 +370,29 @@ class JarvisAgent:
             
             self.memory.add_conversation("assistant", error_msg, {"error": True})
             return error_msg
+        finally:
+            deadline.release(deadline_token)
+            self.budget_stats.record(deadline)
+            end_turn(
+                trace_token,
+                tools=[s.tool_name for s in plan.steps if s.tool_name] if plan else [],
+                success=bool(plan and plan.success),
+                degraded=deadline.degraded
+            )
+            if deadline.timed_out:
+                print(f"⏱️ Turn budget exceeded: {deadline.summary()}")
+    
+    async def _degraded_answer(self, plan: ExecutionPlan, stream_callback: Optional[callable] = None) -> str:
+        """Fast answer for a turn whose budget ran out before any step could run."""
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.degraded = True
+        for step in plan.steps:
+            step.status = StepStatus.FAILED
+            step.error = step.error or "turn budget exhausted"
+        from jarvis_assistant.core.tool_calling import emit
+        await emit(stream_callback, TIMED_OUT)
+        return TIMED_OUT
     
     async def handle_user_feedback(self, type: str, comment: str) -> str:
         """Handle explicit user feedback"""
@@ -276,81 +424,21 @@ class JarvisAgent:
     
 
 
-    async def plan(self, user_input: str) -> ExecutionPlan:
+    async def plan(self, user_input: str, allow_tool_calling: bool = True) -> ExecutionPlan:
         """
         Decompose user input into executable steps using LLM.
         Upgraded from keyword matching to intelligent planning.
+        
+        In tool_calling mode a query that would reach the LLM planner returns
+        an empty plan flagged `tool_calling`; run() then answers it with a
+        single streaming request (_run_with_tool_calls).
         """
         plan = ExecutionPlan(task=user_input)
         
-        # Build planning prompt with available tools and context
-        history = self.get_history(limit=5)
-        
-        # 🔥 Get User Context (Hierarchical)
-        context = self.memory.get_context_for_response()
-        context_lines = []
-        if context:
-            if "project" in context:
-                context_lines.append(f"**Current Project**: {context['project']}")
-            if "learning" in context:
-                context_lines.append(f"**Learning Focus**: {context['learning']}")
-            if "research_area" in context:
-                context_lines.append(f"**Research Area**: {context['research_area']}")
-            if "location" in context:
-                context_lines.append(f"**Location**: {context['location']}")
-            if "name" in context:
-                context_lines.append(f"**Name**: {context['name']}")
-        
-        context_str = "\n".join(context_lines) if context_lines else "暂无用户背景信息"
-        
-        tool_descriptions = "\n".join([
-            f"- {name}: {tool.description}" 
-            for name, tool in list(self.tools.items())[:20]
-        ])
-        
-        # Detect language
-        def is_chinese(text):
-            return any('\u4e00' <= char <= '\u9fff' for char in text)
-        
-        lang_req = ""
-        if is_chinese(user_input):
-            lang_req = "\n\n**CRITICAL REQUIREMENT**: User input is in Chinese (中文). You MUST respond in Chinese (中文) ONLY. Do NOT use English."
-        else:
-            lang_req = "\n\n**CRITICAL REQUIREMENT**: User input is in English. You MUST respond in English ONLY. Do NOT use Chinese."
-        
-        planning_prompt = f"""You are Jarvis, a warm and intelligent assistant who truly knows the user.
-{lang_req}
-
-[USER CONTEXT] (Use this background to personalize your responses)
-{context_str}
-
-**Personalization Guidelines**:
-1. When answering questions, naturally use the user's background as examples when relevant
-2. If the topic relates to their project/research, acknowledge the connection
-3. Use a friendly, conversational tone (像朋友一样，不要用"您")
-4. Don't mechanically repeat user info - weave it naturally into responses
-5. Occasionally (not every time) show care about their ongoing projects
-
-[CONVERSATION HISTORY]
-{history}
-
-[AVAILABLE TOOLS]
-{tool_descriptions}
-
-[USER REQUEST]
-"{user_input}"
-
-[INSTRUCTIONS]
-1. Analyze if the user request requires tool usage based on history and intent.
-2. If the user mentions updating their info (location, name, etc), use 'update_user_info'.
-3. If user mentions a project/research/learning focus, it will be automatically saved.
-4. For weather/location queries, prioritize the user's location from [USER CONTEXT] if no city is specified.
-5. If tools are needed, respond with a JSON object containing the steps.
-6. If it's a simple conversational response, return: {{"steps": []}}.
-
-Response (JSON only):"""
-        
         try:
+            # Single pass over the input; every keyword check below reads these hits
+            hits = self.keywords.scan(user_input)
+            
             # Use simple keyword fallback first (fast path)
             matched_tools = []
             
@@ -365,8 +453,9 @@ Response (JSON only):"""
                  print(f"🚀 Fast Path: User Location Update -> {city}")
                  matched_tools.append(("update_user_info", {"key": "location", "value": city}))
 
+            intent_hits = hits.keywords("intent")
             for keyword, tool_name in self.intent_keywords.items():
-                if keyword in user_input:
+                if keyword in intent_hits:
                     # Special handling for weather without city
                     if tool_name == "get_weather":
                          # Check if city in input
@@ -381,8 +470,9 @@ Response (JSON only):"""
             
             if matched_tools:
                 # Fast keyword-based path
+                current_span().set(path="keyword")
                 for tool_name, forced_args in matched_tools:
-                    tool_args = self._extract_args(user_input, tool_name)
+                    tool_args = self._extract_args(user_input, tool_name, hits)
                     tool_args.update(forced_args)  # 🔥 Apply profile args if any
                     
                     # 🔴 FIX #2: Handle multi-symbol stock queries
@@ -405,8 +495,9 @@ Response (JSON only):"""
                         plan.steps.append(step)
             else:
                 # No keyword match - try heuristic intent inference
-                inferred = self._infer_intent(user_input)
+                inferred = self._infer_intent(user_input, hits)
                 if inferred:
+                    current_span().set(path="heuristic")
                     tool_name, tool_args = inferred
                     plan.steps.append(PlanStep(
                         description=f"Execute {tool_name}",
@@ -415,10 +506,11 @@ Response (JSON only):"""
                     ))
                 else:
                     # 🔴 FAST PATH: Context continuation detection (skip Doubao for lower latency)
-                    context_inferred = self._infer_from_context(user_input)
+                    context_inferred = self._infer_from_context(user_input, hits)
                     if context_inferred:
                         tool_name, tool_args = context_inferred
                         print(f"🚀 Context shortcut: {tool_name}")
+                        current_span().set(path="context")
                         plan.steps.append(PlanStep(
                             description=f"Execute {tool_name} (context)",
                             tool_name=tool_name,
@@ -426,30 +518,56 @@ Response (JSON only):"""
                         ))
                     else:
                         # 🚀 FAST PATH: Detect pure conversational queries (no tools needed)
-                        conversational_patterns = [
-                            "记住", "记得", "我喜欢", "我想", "解释", "什么是", "为什么", 
-                            "怎么样", "如何", "告诉我", "你觉得", "你认为", "聊聊"
-                        ]
-                        is_conversational = any(p in user_input for p in conversational_patterns)
+                        is_conversational = hits.has("cue:conversational")
+                        llm_plan = None
                         
                         if is_conversational and len(user_input) < 50:
                             # Skip expensive Planner for obvious conversational queries
                             print("💬 Conversational query detected - skipping Planner")
+                            current_span().set(path="conversational")
                             plan.steps.append(PlanStep(
                                 description="Respond conversationally",
                                 tool_name=None
                             ))
                         else:
-                            # Complex query - engage Doubao Planner
-                            print("🧠 No keyword match. Engaging Cognitive Brain (Doubao)...")
-                            llm_plan = await self._plan_with_doubao(user_input, planning_prompt)
+                            # Complex query - reuse a cached decision or engage Doubao Planner
+                            profile_context = self.memory.get_context_for_response()
+                            llm_plan = self.plan_cache.get(user_input, profile_context)
+                            if llm_plan and any(
+                                s.get("tool") and s["tool"] not in self.tools for s in llm_plan.get("steps", [])
+                            ):
+                                llm_plan = None  # Cached plan refers to a tool that is no longer loaded
+                            current_span().set(path="plan_cache" if llm_plan else "llm")
+                            
+                            if llm_plan is None and allow_tool_calling and self.planner_mode == "tool_calling":
+                                print("🧠 No keyword match. Single round trip with tool calling...")
+                                current_span().set(path="tool_calling")
+                                plan.tool_calling = True
+                                return plan
+                            
+                            if llm_plan is None:
+                                print("🧠 No keyword match. Engaging Cognitive Brain (Doubao)...")
+                                # Built only when the planner is actually called
+                                with span("recall"):
+                                    recalled = self.semantic_memory.recall_context(user_input)
+                                planner_prompt = self.prompt_builder.build(
+                                    user_input,
+                                    self.get_history(limit=5),
+                                    profile_context,
+                                    recalled
+                                )
+                                t0 = time.time()
+                                llm_plan = await self._plan_with_doubao(user_input, planner_prompt)
+                                if llm_plan is not None:
+                                    self.plan_cache.put(user_input, profile_context, llm_plan, (time.time() - t0) * 1000)
                         
                         if llm_plan and llm_plan.get("steps"):
                             for s in llm_plan["steps"]:
                                 plan.steps.append(PlanStep(
                                     description=s.get("description", "LLM Task"),
                                     tool_name=s.get("tool"),
-                                    tool_args=s.get("args", {})
+                                    tool_args=s.get("args", {}),
+                                    depends_on=s.get("depends_on") or []
                                 ))
                         else:
                             # Fallback
@@ -467,13 +585,19 @@ Response (JSON only):"""
         
         return plan
 
-    async def _plan_with_doubao(self, user_input: str, system_prompt: str) -> dict:
+    async def _plan_with_doubao(self, user_input: str, prompt) -> dict:
         """
         Call Doubao (Volcengine) HTTP API for planning using aiohttp for non-blocking IO.
+        
+        The stable prompt prefix is served from an Ark context when context
+        caching is available; otherwise the full message list is sent (still
+        prefix-stable, so automatic prefix caching can apply).
         """
         import aiohttp
         import json
         import os
+        import time
+        from jarvis_assistant.core.prompt_builder import TurnUsage
         
         api_key = os.getenv("DOUBAO_ARK_API_KEY")
         endpoint_id = os.getenv("DOUBAO_ENDPOINT_ID")
@@ -482,52 +606,208 @@ Response (JSON only):"""
             print("⚠️ Missing Doubao API Key or Endpoint ID for HTTP Planner.")
             return None
             
-        url = "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
+        base_url = os.getenv("DOUBAO_ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3").rstrip("/")
         
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}"
         }
         
-        payload = {
-            "model": endpoint_id,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input}
-            ],
-            "response_format": {"type": "json_object"}
-        }
-        
         try:
             async with aiohttp.ClientSession() as session:
-                # 🚀 Flash model needs more time for complex planning (increased from 30s)
-                async with session.post(url, headers=headers, json=payload, timeout=45) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        print("✅ Doubao Planner Respond Success")
-                        content = data['choices'][0]['message']['content']
-                        if isinstance(content, str):
-                            return json.loads(content)
-                        return content
+                t0 = time.time()
+                context_id = await self.context_cache.get_context_id(session, headers, endpoint_id, prompt)
+                for attempt in range(2):
+                    if context_id:
+                        url = f"{base_url}/context/chat/completions"
+                        payload = {
+                            "model": endpoint_id,
+                            "context_id": context_id,
+                            "messages": [{"role": "user", "content": prompt.volatile}],
+                            "response_format": {"type": "json_object"}
+                        }
                     else:
+                        url = f"{base_url}/chat/completions"
+                        payload = {
+                            "model": endpoint_id,
+                            "messages": prompt.messages(),
+                            "response_format": {"type": "json_object"}
+                        }
+                    
+                    # 🚀 Flash model needs more time for complex planning (up to 45s, within the turn budget)
+                    async with session.post(url, headers=headers, json=payload, timeout=budget_timeout(45)) as resp:
+                        if resp.status == 200:
+                            data = await resp.json()
+                            break
                         text = await resp.text()
+                        if context_id and attempt == 0:
+                            # Context expired or rejected: send the full prompt instead
+                            print(f"⚠️ Context {context_id} rejected, retrying without it: {text[:200]}")
+                            self.context_cache.invalidate(context_id)
+                            context_id = None
+                            continue
                         print(f"❌ Doubao HTTP Error: {text}")
                         return None
+                
+                usage = data.get("usage") or {}
+                self.prompt_builder.record(TurnUsage(
+                    prompt_tokens=usage.get("prompt_tokens", 0),
+                    cached_tokens=(usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+                    completion_tokens=usage.get("completion_tokens", 0),
+                    context_cache=bool(context_id),
+                    latency_ms=(time.time() - t0) * 1000,
+                    prefix_fingerprint=prompt.prefix_fingerprint
+                ))
+                print("✅ Doubao Planner Respond Success")
+                content = data['choices'][0]['message']['content']
+                if isinstance(content, str):
+                    return json.loads(content)
+                return content
         except Exception as e:
             print(f"❌ Doubao Connection Error: {e}")
             return None
 
-    def _infer_from_context(self, user_input: str) -> Optional[tuple]:
+    async def _run_with_tool_calls(
+        self,
+        user_input: str,
+        plan: ExecutionPlan,
+        stream_callback: Optional[callable] = None
+    ) -> Optional[str]:
+        """
+        Answer in one streaming chat/completions request that carries all tool
+        schemas. Text deltas go straight to stream_callback (TTS); each tool
+        call is dispatched to execute_step as soon as its arguments are
+        complete, while the rest of the response is still streaming. Tool
+        results are spoken through ProgressiveSynthesis as they finish, like
+        planner-driven steps.
+        
+        Returns the final answer, or None if the request failed.
+        """
+        import aiohttp
+        from jarvis_assistant.core.tool_calling import ToolCallAssembler, tool_schemas, emit
+        from jarvis_assistant.utils.sse import stream_events, TextDelta, ToolCallDelta, Finish
+        
+        api_key = os.getenv("DOUBAO_ARK_API_KEY")
+        endpoint_id = os.getenv("DOUBAO_ENDPOINT_ID")
+        if not api_key or not endpoint_id:
+            print("⚠️ Missing Doubao API Key or Endpoint ID for tool calling.")
+            return None
+        
+        url = os.getenv("DOUBAO_ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3").rstrip("/") + "/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        summary, recent = self.summarizer.window(limit=6)
+        system_prompt = self._get_personalized_system_prompt()
+        if summary:
+            system_prompt += f"\n\n=== EARLIER CONVERSATION (summary) ===\n{summary}"
+        with span("recall"):
+            recalled = self.semantic_memory.recall_context(user_input)
+        if recalled:
+            system_prompt += f"\n\n=== RELEVANT MEMORY ===\n{recalled}"
+        messages = [{"role": "system", "content": system_prompt}]
+        role_map = {"user": "user", "assistant": "assistant", "bot": "assistant"}
+        for entry in recent:
+            if entry['role'] == "user" and entry['content'] == user_input:
+                continue
+            messages.append({"role": role_map.get(entry['role'], "user"), "content": entry['content']})
+        messages.append({"role": "user", "content": user_input})
+        
+        payload = {
+            "model": endpoint_id,
+            "messages": messages,
+            "tools": tool_schemas(self.tools),
+            "tool_choice": "auto",
+            "stream": True,
+            "thinking": {"type": "disabled"}
+        }
+        
+        assembler = ToolCallAssembler()
+        pending = []
+        content = ""
+        
+        def dispatch(call):
+            step = PlanStep(description=f"Execute {call.name}", tool_name=call.name, tool_args=call.args())
+            step.status = StepStatus.RUNNING
+            plan.steps.append(step)
+            print(f"🔧 Tool call ready: {call.name}({call.arguments})")
+            pending.append(asyncio.create_task(self.executor.run_step(step, self.execute_step, label=call.name)))
+        
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, headers=headers, json=payload, timeout=budget_timeout(30)) as resp:
+                    if resp.status != 200:
+                        print(f"❌ Tool-calling API Error ({resp.status}): {await resp.text()}")
+                        return None
+                    
+                    async for item in stream_events(resp.content):
+                        if isinstance(item, ToolCallDelta):
+                            for call in assembler.feed(item.calls):
+                                dispatch(call)
+                        elif isinstance(item, TextDelta):
+                            content += item.text
+                            await emit(stream_callback, item.text)
+                        elif isinstance(item, Finish):
+                            for call in assembler.finish():
+                                dispatch(call)
+            
+            for call in assembler.finish():
+                dispatch(call)
+        except Exception as e:
+            print(f"❌ Tool-calling connection error: {e}")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for step in plan.steps:
+                if step.status not in (StepStatus.SUCCESS, StepStatus.FAILED):
+                    step.status = StepStatus.FAILED
+                    step.error = f"cancelled: {e}"
+            if not plan.steps and not content:
+                return None
+        
+        if plan.steps and stream_callback and STREAM_SYNTHESIS:
+            # Speak each tool result as soon as it is next in line (the step list is complete now)
+            synthesis = ProgressiveSynthesis(plan.steps, stream_callback)
+            
+            async def speak_when_done(index: int, task: asyncio.Task):
+                await asyncio.gather(task, return_exceptions=True)  # Each step retries on its own inside the executor
+                await synthesis.step_done(index, plan.steps[index])
+            
+            with span("synthesize"):
+                await asyncio.gather(*(speak_when_done(i, task) for i, task in enumerate(pending)))
+                answer = await synthesis.finish()
+            self._record_first_fragment(plan, synthesis.first_fragment_ms)
+            return f"{content.strip()}\n{answer}" if content.strip() else answer
+        
+        if pending:
+            # Each step retries on its own inside the executor
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        if not plan.steps:
+            plan.steps.append(PlanStep(
+                description="Respond conversationally",
+                tool_name=None,
+                status=StepStatus.SUCCESS,
+                result=content.strip()
+            ))
+            return content.strip()
+        
+        # Tool results are phrased the same way as planner-driven steps
+        answer = self.synthesize(plan)
+        return f"{content.strip()}\n{answer}" if content.strip() else answer
+
+    def _infer_from_context(self, user_input: str, hits: Optional[Hits] = None) -> Optional[tuple]:
         """
         🚀 FAST PATH: Infer intent from conversation context without calling LLM.
         Used for follow-up queries like "那明天呢？" or "换一首"
         """
-        import re
         text = user_input.strip()
+        hits = hits or self.keywords.scan(user_input)
         
         # Pattern 1: Time-based follow-up (明天、后天、昨天)
-        time_patterns = ["明天", "后天", "昨天", "下周", "这周", "周末"]
-        if any(t in text for t in time_patterns) or text in ["那明天呢", "那后天呢", "那呢"]:
+        if hits.has("cue:followup_time") or text in ["那明天呢", "那后天呢", "那呢"]:
             # Check last conversation topic
             last_topic = self._get_last_topic()
             if last_topic == "weather":
@@ -544,13 +824,11 @@ Response (JSON only):"""
                 return ("get_stock_price", {"symbol": self._get_last_symbol() or "AAPL"})
         
         # Pattern 2: Music follow-up (换一首、下一首、上一首)
-        music_patterns = ["换一首", "下一首", "上一首", "继续播放", "停"]
-        for p in music_patterns:
-            if p in text:
-                if "停" in text:
-                    return ("play_music", {"action": "stop"})
-                else:
-                    return ("play_music", {"action": "play"})  # Random next
+        if hits.has("cue:followup_music"):
+            if "停" in hits.keywords("cue:followup_music"):
+                return ("play_music", {"action": "stop"})
+            else:
+                return ("play_music", {"action": "play"})  # Random next
         
         # Pattern 3: Generic "呢" follow-up
         if text.endswith("呢") or text.endswith("呢？"):
@@ -615,78 +893,64 @@ Response (JSON only):"""
         # Simple extraction - could be improved
         return None
     
-    def _infer_intent(self, user_input: str) -> Optional[tuple]:
+    def _infer_intent(self, user_input: str, hits: Optional[Hits] = None) -> Optional[tuple]:
         """Heuristic intent inference when no explicit keyword match exists."""
         import re
         text = user_input.strip()
-        t = text.lower()
+        hits = hits or self.keywords.scan(user_input)
         scores = {}
 
         def add(tool: str, pts: int):
             if tool in self.tools:
                 scores[tool] = scores.get(tool, 0) + pts
 
-        is_question = any(x in text for x in ["?", "？", "吗", "么", "几", "多少", "要不要", "会不会"])
+        is_question = hits.has("cue:question")
 
         # Math
-        if re.search(r'[\d\.]+\s*[\+\-\*\/]\s*[\d\.]+', text) or any(op in text for op in ["加", "减", "乘", "除"]):
+        if hits.has("cue:math") or re.search(r'[\d\.]+\s*[\+\-\*\/]\s*[\d\.]+', text):
             add("calculate", 3)
 
         # Time
-        if any(x in text for x in ["几点", "几时", "几点钟", "几点了", "现在几点", "时间", "现在是什么时候", "星期几", "日期"]):
+        if hits.has("cue:time"):
             add("get_current_time", 3)
 
         # Reminders
-        if "提醒" in text or re.search(r'\d+\s*(秒|分钟|分|小时|时)后', text):
+        if hits.has("cue:reminder") or re.search(r'\d+\s*(秒|分钟|分|小时|时)后', text):
             add("schedule_reminder", 3)
 
         # Weather
-        weather_cues = ["天气", "气温", "温度", "冷", "热", "下雨", "雨", "雪", "刮风", "风大", "雾", "霾", "潮湿", "湿度", "外面", "出门", "带伞", "体感", "空气质量", "穿什么"]
-        if any(c in text for c in weather_cues):
+        if hits.has("cue:weather"):
             add("get_weather", 2 if is_question else 1)
-        if re.search(r'(几度|多少度|\d+\s*度|\d+\s*°)', text):
-            add("get_weather", 2)
+        if "度" in text or "°" in text:
+            if re.search(r'(几度|多少度|\d+\s*度|\d+\s*°)', text):
+                add("get_weather", 2)
 
         # Thermostat
-        thermo_cues = ["空调", "暖气", "制冷", "制热", "调到", "调温", "升温", "降温", "风速", "热一点", "冷一点"]
-        if any(c in text for c in thermo_cues):
+        if hits.has("cue:thermostat"):
             add("control_thermostat", 3)
 
         # Lights (explicit on/off)
-        if any(c in text for c in ["开灯", "打开灯", "关灯", "关掉灯", "把灯打开", "把灯关上", "亮一点", "暗一点"]):
+        if hits.has("cue:light"):
             add("control_xiaomi_light", 3)
 
         # Music
-        music_cues = ["音乐", "歌曲", "歌", "播放", "来首", "来点", "听点", "放点", "想听", "点一首"]
-        if any(c in text for c in music_cues):
+        if hits.has("cue:music"):
             add("play_music", 2)
 
         # News
-        news_cues = ["新闻", "头条", "热点", "要闻", "最新消息", "发生了什么", "有什么大事", "快讯", "简报"]
-        if any(c in text for c in news_cues):
+        if hits.has("cue:news"):
             add("get_news", 2)
 
         # Stock/Crypto
-        ticker_whitelist = {
-            "nvda", "nvidia", "tsla", "tesla", "aapl", "apple", "msft", "microsoft",
-            "baba", "alibaba", "tencent", "0700", "qqq", "spy", "btc", "eth", "amzn",
-            "amazon", "meta", "goog", "googl", "google"
-        }
-        tokens = re.findall(r'\b[a-zA-Z0-9]{2,6}(?:-[a-zA-Z]{1,3})?\b', text)
-        for tok in tokens:
-            if tok.lower() in ticker_whitelist:
-                add("get_stock_price", 3)
-                break
-        company_cues = ["英伟达", "英伟", "特斯拉", "特斯", "苹果", "微软", "阿里", "腾讯", "茅台", "比特币", "以太坊", "百度", "京东", "拼多多", "美团", "小米"]
-        if any(c in text for c in company_cues):
+        if hits.has("ticker"):
+            add("get_stock_price", 3)
+        if hits.has("cue:company"):
             add("get_stock_price", 2)
-        stock_cues = ["股价", "股票", "股市", "大盘", "涨跌", "行情", "走势", "币价", "数字货币", "币", "市值"]
-        if any(c in text for c in stock_cues):
+        if hits.has("cue:stock"):
             add("get_stock_price", 2)
 
         # Web search (lowest priority)
-        search_cues = ["搜索", "搜一下", "查一下", "帮我查", "帮我找", "资料", "百科", "是谁", "是什么", "怎么", "为什么", "教程", "官网", "地址"]
-        if any(c in text for c in search_cues):
+        if hits.has("cue:search"):
             add("web_search", 1)
 
         if not scores:
@@ -696,11 +960,12 @@ Response (JSON only):"""
         if scores[tool_name] < 2 and tool_name != "web_search":
             return None
 
-        return tool_name, self._extract_args(user_input, tool_name)
+        return tool_name, self._extract_args(user_input, tool_name, hits)
     
-    def _extract_args(self, user_input: str, tool_name: str) -> Dict[str, Any]:
+    def _extract_args(self, user_input: str, tool_name: str, hits: Optional[Hits] = None) -> Dict[str, Any]:
         """Extract tool arguments from user input"""
         args = {}
+        hits = hits or self.keywords.scan(user_input)
         
         if tool_name == "get_weather":
             # flexible extraction: "查询[city]的天气"
@@ -724,7 +989,7 @@ Response (JSON only):"""
             
             if not city:
                 # Heuristic fallback (handles "外面冷吗", "上海多少度" etc.)
-                city = IntentMatcher.match_weather(user_input)
+                city = IntentMatcher.match_weather(user_input, hits)
                 if city in time_words:
                     city = None
             
@@ -783,10 +1048,7 @@ Response (JSON only):"""
                     symbols = [m.group(0).upper()]
                 else:
                     # Pattern 3: Company name extraction
-                    q = user_input
-                    for w in ["股价", "币价", "行情", "走势", "价格", "查询", "查看", "现在", "最新", "多少", "怎么样", "如何", "咋样", "情况", "的"]:
-                        q = q.replace(w, "")
-                    q = q.strip()
+                    q = hits.remove("stock_filler", STOCK_STOPWORDS).strip()
                     
                     # Check if it's a known company
                     symbol = company_map.get(q, q.upper() if q else user_input.strip())
@@ -798,16 +1060,16 @@ Response (JSON only):"""
         elif tool_name == "get_news":
             # Determine category
             category = "world"
-            if any(k in user_input for k in ["财经", "金融", "股市", "商业", "finance", "business"]):
+            if hits.has("cue:news_finance"):
                 category = "finance"
             args["category"] = category
 
         elif tool_name == "web_search":
-            args["query"] = IntentMatcher.match_web_search(user_input)
+            args["query"] = IntentMatcher.match_web_search(user_input, hits)
             args["num_results"] = 3
         
         elif tool_name == "play_music":
-            action, query = IntentMatcher.match_music(user_input)
+            action, query = IntentMatcher.match_music(user_input, hits)
             if action == "stop":
                 args["action"] = "stop"
             elif action == "list":
@@ -902,9 +1164,15 @@ Response (JSON only):"""
             step.error = f"Unknown tool: {step.tool_name}"
             return None
         
+        if budget_exhausted():
+            step.status = StepStatus.FAILED
+            step.error = "turn budget exhausted"
+            return None
+        
         try:
             tool = self.tools[step.tool_name]
-            result = await tool.execute(**step.tool_args)
+            with budget_stage(f"tool:{step.tool_name}"), span(f"tool:{step.tool_name}", attempt=step.retry_count):
+                result = await asyncio.wait_for(tool.execute(**step.tool_args), budget_timeout())
             
             # 🔴 CRITICAL: Validate tool result to prevent hallucination
             if result is None or str(result).startswith("❌") or "Error" in str(result) or "error" in str(result):
@@ -916,6 +1184,13 @@ Response (JSON only):"""
             step.status = StepStatus.SUCCESS
             step.result = str(result)
             return step.result
+        except asyncio.TimeoutError:
+            deadline = current_deadline()
+            if deadline is not None:
+                deadline.note_timeout(f"tool:{step.tool_name}")
+            step.status = StepStatus.FAILED
+            step.error = "超时"
+            return None
         except Exception as e:
             step.status = StepStatus.FAILED
             step.error = str(e)
@@ -963,29 +1238,33 @@ Response (JSON only):"""
         stream_callback: Optional[callable] = None
     ) -> str:
         """
-        Generate a conversational response using Doubao Realtime API.
-        Falls back to local response if API unavailable.
+        Generate a conversational response through the LLM provider router.
+        Falls back to local response if API unavailable. Whatever is returned
+        has been streamed to stream_callback (ProgressiveSynthesis does not
+        speak conversational steps again), fallbacks included.
         """
-        import aiohttp
-        import os
-        import json
-        import time
+        from jarvis_assistant.agent.llm_router import get_llm_router
+        from jarvis_assistant.core.tool_calling import emit
         
-        api_key = os.getenv("DOUBAO_ARK_API_KEY")
-        endpoint_id = os.getenv("DOUBAO_ENDPOINT_ID")
+        router = get_llm_router()
         
-        if not api_key or not endpoint_id:
+        if not router.providers:
             # Fallback for demo
             context = self.memory.get_context_for_response()
             if "深度学习" in user_query and context.get("learning") == "深度学习":
-                return "好的，深度学习是一个非常有挑战但也非常有成就感的领域，我会陪你一起攻克它！"
-            return "收到，先生。我会记在心里。"
+                reply = "好的，深度学习是一个非常有挑战但也非常有成就感的领域，我会陪你一起攻克它！"
+            else:
+                reply = REMEMBERED
+            await emit(stream_callback, reply)
+            return reply
 
-        # Build input with conversation history (Responses API format)
-        raw_history = self.memory.get_context(limit=6)
+        # Summary of older turns + recent raw turns
+        summary, raw_history = self.summarizer.window(limit=6)
         
         # Get system context from SOUL.md + Memory
         system_prompt = self._get_personalized_system_prompt()
+        if summary:
+            system_prompt += f"\n\n=== EARLIER CONVERSATION (summary) ===\n{summary}"
         
         # Detect query language and add explicit instruction
         def is_chinese(text):
@@ -1000,121 +1279,42 @@ Response (JSON only):"""
         # Prepend language instruction to query
         enhanced_query = lang_instruction + user_query
         
-        # Convert to Responses API input format
-        input_messages = []
-        
-        # ADD SYSTEM PROMPT AS FIRST MESSAGE (though API may ignore it)
-        input_messages.append({
-            "type": "message",
-            "role": "system",
-            "content": [{"type": "input_text", "text": system_prompt}]
-        })
-        
-        # Add conversation history
+        # Conversation history (the current query is sent separately)
         role_map = {"user": "user", "assistant": "assistant", "bot": "assistant"}
-        for entry in raw_history:
-            role = role_map.get(entry['role'], "user")
-            content = entry['content']
-            if role == "user" and content == user_query:
-                continue
-            
-            msg = {
-                "type": "message", # 🔥 REQUIRED FOR RESPONSES API
-                "role": role,
-                "content": [{"type": "input_text" if role == "user" else "output_text", "text": content}]
-            }
-            if role == "assistant":
-                msg["status"] = "completed"
-            
-            input_messages.append(msg)
-        
-        # Add current query WITH LANGUAGE INSTRUCTION
-        input_messages.append({
-            "type": "message", # 🔥 REQUIRED FOR RESPONSES API
-            "role": "user",
-            "content": [{"type": "input_text", "text": enhanced_query}]
-        })
-
-        # 🚀 Use Responses API with THINKING DISABLED for ultra-low latency
-        url = "https://ark.cn-beijing.volces.com/api/v3/responses"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Optimization payload based on provided documentation
-        payload = {
-            "model": endpoint_id,
-            "input": input_messages,
-            "stream": True,
-            "temperature": 0.7,
-            "thinking": {
-                "type": "disabled" # 🔥 TURN OFF REASONING FOR SPEED
-            }
-        }
-        
-        # Only add reasoning.effort for supported models
-        if "lite" in endpoint_id or "251228" in endpoint_id or "251015" in endpoint_id:
-            payload["reasoning"] = {"effort": "minimal"}
+        history = [
+            {"role": role_map.get(entry['role'], "user"), "content": entry['content']}
+            for entry in raw_history
+            if not (entry['role'] == "user" and entry['content'] == user_query)
+        ]
         
         full_content = ""
-        first_token_received = False
-        start_time = time.time()
-        
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=payload, timeout=30) as resp:
-                    if resp.status == 200:
-                        print("🧠 [Brain] Streaming...", end="", flush=True)
-                        
-                        async for line in resp.content:
-                            line_str = line.decode('utf-8').strip()
-                            
-                            if not line_str or not line_str.startswith('data:'):
-                                continue
-                            
-                            data_str = line_str[5:].strip()
-                            if data_str == '[DONE]':
-                                break
-                            
-                            try:
-                                data = json.loads(data_str)
-                                event_type = data.get('type', '')
-                                
-                                # ✅ Only process output_text delta events
-                                if event_type == 'response.output_text.delta':
-                                    chunk = data.get('delta', '')
-                                    if chunk:
-                                        if not first_token_received:
-                                            first_token_received = True
-                                            # print("", flush=True)  # Still need newline for first token
-                                        full_content += chunk
-                                        print(chunk, end="", flush=True)
-                                        
-                                        # 🚀 Invoke callback for streaming TTS
-                                        if stream_callback:
-                                            try:
-                                                import inspect
-                                                if inspect.iscoroutinefunction(stream_callback):
-                                                    await stream_callback(chunk)
-                                                else:
-                                                    stream_callback(chunk)
-                                            except Exception as cb_e:
-                                                print(f"⚠️ Callback error: {cb_e}")
-                                            
-                            except json.JSONDecodeError:
-                                pass
-                        
-                        print(" ✅")
-                        return full_content.strip()
-                    else:
-                        error_text = await resp.text()
-                        print(f"❌ Realtime API Error ({resp.status}): {error_text}")
-                        
+            # 🔀 Router picks the fastest healthy provider and fails over before the first token
+            print("🧠 [Brain] Streaming...", end="", flush=True)
+            with budget_stage("llm"), span("llm") as llm_span:
+                stream = router.generate_stream(
+                    enhanced_query, system_prompt, history, temperature=0.7, deadline=budget_timeout()
+                )
+                async for chunk in stream:
+                    full_content += chunk
+                    print(chunk, end="", flush=True)
+                    
+                    # 🚀 Invoke callback for streaming TTS
+                    await emit(stream_callback, chunk)
+                llm_span.set(provider=router.last_provider, chars=len(full_content))
+            print(f" ✅ ({router.last_provider})")
         except Exception as e:
-            print(f"❌ Realtime API connection error: {e}")
+            print(f"\n❌ LLM providers unavailable: {e}")
+            if budget_exhausted():
+                current_deadline().note_timeout("llm")
+                if not full_content:
+                    await emit(stream_callback, TIMED_OUT)
+                    return TIMED_OUT
             
-        return full_content.strip() if full_content else "收到，先生。我会继续关注您的需求。"
+        if not full_content:
+            await emit(stream_callback, ACKNOWLEDGED)
+            return ACKNOWLEDGED
+        return full_content.strip()
     
     def synthesize(self, plan: ExecutionPlan) -> str:
         """Combine step results into final response"""
@@ -1129,17 +1329,8 @@ Response (JSON only):"""
         
         if len(stock_steps) > 1:
             # 🎯 Smart merging for multiple stock queries
-            stock_data = []
-            for step in stock_steps:
-                result = step.result
-                # Extract the actual price data (remove redundant comments)
-                # Format: "评论。 公司（代码）现价 X USD，今日上涨/下跌了 Y%。"
-                import re
-                match = re.search(r'([^\。]+（[^\)]+）现价[^。]+。)', result)
-                if match:
-                    stock_data.append(match.group(1))
-                else:
-                    stock_data.append(result)
+            # Extract the actual price data (remove redundant comments)
+            stock_data = [stock_fragment(step.result) for step in stock_steps]
             
             # Combine all stocks in one sentence
             combined = " ".join(stock_data)
@@ -1152,11 +1343,7 @@ Response (JSON only):"""
                         results.append(step.result)
                     elif step.status == StepStatus.FAILED:
                         failed_count += 1
-                        if step.tool_name:
-                            error_msg = step.error or "unknown error"
-                            results.append(f"抱歉，{step.tool_name}执行失败: {error_msg}")
-                        else:
-                            results.append(f"⚠️ {step.description} failed")
+                        results.append(failure_fragment(step))
         else:
             # Normal synthesis for single-step or non-stock queries
             for step in plan.steps:
@@ -1165,17 +1352,13 @@ Response (JSON only):"""
                 elif step.status == StepStatus.FAILED:
                     failed_count += 1
                     # 🔴 CRITICAL: Be honest about failures - don't hallucinate success
-                    if step.tool_name:
-                        error_msg = step.error or "unknown error"
-                        results.append(f"抱歉，{step.tool_name}执行失败: {error_msg}")
-                    else:
-                        results.append(f"⚠️ {step.description} failed")
+                    results.append(failure_fragment(step))
         
         # If ALL steps failed, give a clearer error message
         if failed_count == len(plan.steps):
-            return "抱歉，我无法完成这个请求。" + ("\n".join(results) if results else "")
+            return ALL_FAILED + ("\n".join(results) if results else "")
         
-        base_response = "\n".join(results) if results else "Task completed."
+        base_response = "\n".join(results) if results else NOTHING_TO_SAY
         
         # Return directly - let LLM naturally handle follow-ups via system prompt
         # (removed hardcoded caring phrases per user feedback)
@@ -1185,15 +1368,22 @@ Response (JSON only):"""
         """
         偶尔在回复中加入关心语句（基础20%概率，随提及次数增加）
         """
+        return response + self._personal_touch_phrase(response)
+    
+    def _personal_touch_phrase(self, response: str) -> str:
+        """
+        The caring phrase to append to response, or "" (usable after the
+        response has already been streamed)
+        """
         import random
         
         # Skip if response is too short (likely a simple acknowledgment)
         if len(response) < 10:
-            return response
+            return ""
         
         # Skip if it's an error message
         if "抱歉" in response or "失败" in response or "错误" in response:
-            return response
+            return ""
         
         # Get context (with counts)
         context = self.memory.get_context_for_response()
@@ -1215,7 +1405,7 @@ Response (JSON only):"""
         
         # Random check
         if random.random() > trigger_prob:
-            return response
+            return ""
         
         # Generate caring phrase based on context
         caring_phrases = []
@@ -1233,16 +1423,35 @@ Response (JSON only):"""
                 ""
             ]
         
-        if caring_phrases:
-            phrase = random.choice(caring_phrases)
-            if phrase:  # Only add if not empty
-                response = response + phrase
-        
-        return response
+        # Empty = no addition
+        return random.choice(caring_phrases) if caring_phrases else ""
+    
+    def _record_first_fragment(self, plan: ExecutionPlan, first_fragment_ms: Optional[float]):
+        """Time-to-first-audio of progressive synthesis (tool steps only)"""
+        tool_steps = sum(1 for step in plan.steps if step.tool_name)
+        if first_fragment_ms is None or not tool_steps:
+            return
+        stats = self.synthesis_stats
+        stats["turns"] += 1
+        if tool_steps > 1:
+            stats["multi_tool_turns"] += 1
+            stats["first_fragment_ms"] = (stats["first_fragment_ms"] + [round(first_fragment_ms)])[-50:]
+        print(f"⚡ First result spoken after {first_fragment_ms:.0f}ms ({tool_steps} tool steps)")
     
     def get_history(self, limit: int = 5) -> str:
-        """Get conversation history"""
-        return self.memory.get_context_string(limit)
+        """Get conversation history (rolling summary + recent turns, token-budgeted)"""
+        return self.summarizer.history_string(limit)
+
+    def get_planner_stats(self) -> Dict[str, Any]:
+        """Planner prompt caching, decision cache, step executor, synthesis, tool cache and turn budget counters"""
+        return {
+            "prompt": self.prompt_builder.get_stats(),
+            "plan_cache": self.plan_cache.get_stats(),
+            "executor": self.executor.get_stats(),
+            "synthesis": self.synthesis_stats,
+            "tool_cache": get_tool_cache().get_stats(),
+            "budget": self.budget_stats.get_stats()
+        }
 
 
 # Singleton instance
@@ -8,6 +8,9 @@ from typing import Dict, Optional, List, Any
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from jarvis_assistant.core.keyword_matcher import get_keyword_matcher
+from jarvis_assistant.core.session import current_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,6 +53,14 @@ class ContextResolver:
         "music": ["歌", "音乐", "歌曲"],
     }
     
+    # Known entity values (simple keyword extraction)
+    # TODO: Use NER model for better extraction
+    ENTITY_PATTERNS = {
+        "stock": ["特斯拉", "苹果", "谷歌", "微软", "亚马逊", "阿里巴巴", "腾讯"],
+        "location": ["北京", "上海", "深圳", "广州", "杭州", "成都", "重庆"],
+        "device": ["客厅的灯", "卧室的灯", "空调", "窗帘", "灯"],
+    }
+    
     def __init__(self, max_history: int = 10):
         """
         Initialize context resolver.
@@ -59,6 +70,9 @@ class ContextResolver:
         """
         self.entities: List[Entity] = []
         self.max_history = max_history
+        
+        # Pronouns, entity keywords and entity values are in the shared keyword automaton
+        self.keywords = get_keyword_matcher()
         self.conversation_state = {
             "last_topic": None,
             "last_intent": None,
@@ -79,8 +93,9 @@ class ContextResolver:
         resolved = text
         
         # Check for pronouns
+        found = self.keywords.scan(text).keywords("pronoun")
         for pronoun, entity_type in self.PRONOUNS.items():
-            if pronoun in text:
+            if pronoun in found:
                 # Find last mentioned entity of this type
                 entity = self.get_last_entity(entity_type)
                 if entity:
@@ -100,39 +115,17 @@ class ContextResolver:
             List of extracted entities
         """
         entities = []
-        
-        # Simple keyword-based extraction
-        # TODO: Use NER model for better extraction
-        
-        # Extract stock names (common patterns)
-        stock_patterns = ["特斯拉", "苹果", "谷歌", "微软", "亚马逊", "阿里巴巴", "腾讯"]
-        for stock in stock_patterns:
-            if stock in text:
-                entities.append(Entity(
-                    type="stock",
-                    value=stock,
-                    context=text
-                ))
-        
-        # Extract locations (common cities)
-        location_patterns = ["北京", "上海", "深圳", "广州", "杭州", "成都", "重庆"]
-        for location in location_patterns:
-            if location in text:
-                entities.append(Entity(
-                    type="location",
-                    value=location,
-                    context=text
-                ))
-        
-        # Extract devices (smart home)
-        device_patterns = ["客厅的灯", "卧室的灯", "空调", "窗帘", "灯"]
-        for device in device_patterns:
-            if device in text:
-                entities.append(Entity(
-                    type="device",
-                    value=device,
-                    context=text
-                ))
+        hits = self.keywords.scan(text)
+        
+        for entity_type, values in self.ENTITY_PATTERNS.items():
+            found = hits.keywords(f"entity:{entity_type}")
+            for value in values:
+                if value in found:
+                    entities.append(Entity(
+                        type=entity_type,
+                        value=value,
+                        context=text
+                    ))
         
         return entities
     
@@ -156,7 +149,10 @@ class ContextResolver:
         if len(self.entities) > self.max_history:
             self.entities = self.entities[-self.max_history:]
         
-        # Update conversation state
+        # Update conversation state (topic from entity keywords: 股价 → stock, 天气 → location...)
+        topic_hits = [h for h in self.keywords.scan(text) if h.category.startswith("entity_keyword:")]
+        if topic_hits:
+            self.conversation_state["last_topic"] = topic_hits[0].category.split(":", 1)[1]
         if intent:
             self.conversation_state["last_intent"] = intent
         
@@ -193,12 +189,24 @@ class ContextResolver:
         logger.info("🗑️ Context cleared")
 
 
+# Registered once at import: resolvers (one per session) only read the automaton
+_matcher = get_keyword_matcher()
+_matcher.register("pronoun", ContextResolver.PRONOUNS)
+for _entity_type, _words in ContextResolver.ENTITY_KEYWORDS.items():
+    _matcher.register(f"entity_keyword:{_entity_type}", _words)
+for _entity_type, _values in ContextResolver.ENTITY_PATTERNS.items():
+    _matcher.register(f"entity:{_entity_type}", _values)
+
+
 # Singleton instance
 _context_resolver: Optional[ContextResolver] = None
 
 
 def get_context_resolver() -> ContextResolver:
-    """Get the global context resolver instance."""
+    """Get the context resolver of the current session, else the global instance."""
+    session = current_session()
+    if session is not None:
+        return session.context_resolver
     global _context_resolver
     
     if _context_resolver is None:
@@ -0,0 +1,200 @@
+"""
+Rolling Conversation Summary
+Keeps the history that goes into prompts inside a fixed token budget:
+
+    [summary of older turns]  +  last K raw turns (long ones clipped)
+
+The summary lives in MemoryStore (conversation_summary) and is refreshed in
+the background after a turn, folding in the turns that just slid out of the
+raw window. A backlog (first run over an old history, or an LLM outage) is
+folded FOLD_BATCH turns per LLM call, oldest first, and the summary is
+stored after every batch, so an interrupted refresh resumes where it stopped.
+Prompt building only reads the cached summary, so prompt size and TTFT stay
+flat however long the session gets.
+"""
+
+import asyncio
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("JARVIS_HISTORY_TOKEN_BUDGET", "1200"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("JARVIS_SUMMARY_TOKEN_BUDGET", "300"))
+TURN_TOKEN_CAP = int(os.getenv("JARVIS_TURN_TOKEN_CAP", "200"))
+KEEP_TURNS = int(os.getenv("JARVIS_HISTORY_KEEP_TURNS", "6"))
+# Fold older turns once at least this many are waiting
+REFRESH_EVERY = 4
+# Most turns folded into the summary by one LLM call
+FOLD_BATCH = int(os.getenv("JARVIS_SUMMARY_FOLD_BATCH", "8"))
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and the assistant Jarvis.
+Merge the new turns into the existing summary. Keep facts, decisions, open requests and the user's
+stated preferences; drop greetings, filler and raw tool output details. Write in the user's language.
+Stay under {budget} tokens. Reply with the summary text only."""
+
+_CJK = re.compile(r"[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: one per CJK character, one per 4 other characters."""
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def clip(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, keeping the beginning."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    used, end = 0, 0
+    for end, char in enumerate(text):
+        used += 4 if _CJK.match(char) else 1
+        if used > max_tokens * 4:
+            break
+    return text[:end].rstrip() + "…"
+
+
+class RollingSummarizer:
+    """
+    Token-budgeted history window over a MemoryStore.
+
+    Usage:
+        summarizer = RollingSummarizer(memory)
+        summary, turns = summarizer.window()   # hot path, no I/O
+        ...
+        summarizer.schedule_refresh()          # after the turn, in background
+    """
+
+    def __init__(
+        self,
+        memory,
+        llm: Optional[Callable[[str, str], Awaitable[str]]] = None,
+        keep_turns: int = KEEP_TURNS,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        summary_budget: int = SUMMARY_TOKEN_BUDGET,
+        turn_cap: int = TURN_TOKEN_CAP
+    ):
+        self.memory = memory
+        self.llm = llm
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.turn_cap = turn_cap
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"refreshes": 0, "folded_turns": 0, "llm_failures": 0}
+
+    # ------------------------------------------------------------------
+    # Hot path
+    # ------------------------------------------------------------------
+
+    def window(self, limit: Optional[int] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """Cached summary and the most recent raw turns, within the token budget."""
+        summary = clip(self.memory.get_conversation_summary().get("text", ""), self.summary_budget)
+        turns = [
+            {**entry, "content": clip(entry.get("content", ""), self.turn_cap)}
+            for entry in self.memory.get_context(limit or self.keep_turns)
+        ]
+        budget = self.token_budget - estimate_tokens(summary)
+        sizes = [estimate_tokens(t["content"]) for t in turns]
+        while turns and sum(sizes) > budget:
+            turns.pop(0)
+            sizes.pop(0)
+        return summary, turns
+
+    def history_string(self, limit: Optional[int] = None) -> str:
+        """Window formatted like MemoryStore.get_context_string"""
+        summary, turns = self.window(limit)
+        lines = [f"[SUMMARY]: {summary}"] if summary else []
+        lines += [f"[{t['role'].upper()}]: {t['content']}" for t in turns]
+        return "\n".join(lines)
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+
+    def pending_turns(self) -> List[Dict[str, Any]]:
+        """Turns that left the raw window but are not in the summary yet."""
+        covered = self.memory.get_conversation_summary().get("covered_until", "")
+        older = self.memory.conversations[:-self.keep_turns] if self.keep_turns else self.memory.conversations
+        return [entry for entry in older if entry.get("timestamp", "") > covered]
+
+    def schedule_refresh(self) -> Optional[asyncio.Task]:
+        """Start a background refresh if enough turns are waiting (never blocks)."""
+        if self._task and not self._task.done():
+            return self._task
+        if len(self.pending_turns()) < REFRESH_EVERY:
+            return None
+        try:
+            self._task = asyncio.get_running_loop().create_task(self.refresh())
+        except RuntimeError:
+            return None
+        return self._task
+
+    async def refresh(self) -> str:
+        """Fold pending turns into the summary, FOLD_BATCH at a time, and store it in MemoryStore."""
+        pending = self.pending_turns()
+        text = self.memory.get_conversation_summary().get("text", "")
+        if not pending:
+            return text
+
+        llm = self.llm or self._default_llm()
+        for start in range(0, len(pending), FOLD_BATCH):
+            batch = pending[start:start + FOLD_BATCH]
+            text, llm_ok = await self._fold(text, batch, llm)
+            if not llm_ok:
+                llm = None  # Don't retry a failing LLM for every batch of this refresh
+            current = self.memory.get_conversation_summary()
+            # Watermark per batch: a cancelled refresh keeps what it already folded
+            self.memory.set_conversation_summary(
+                text,
+                covered_until=batch[-1].get("timestamp", ""),
+                turns=current.get("turns", 0) + len(batch)
+            )
+            self.stats["folded_turns"] += len(batch)
+        self.stats["refreshes"] += 1
+        print(f"📝 [Summary] Folded {len(pending)} turns ({estimate_tokens(text)} tokens)")
+        return text
+
+    async def _fold(self, previous: str, batch: List[Dict[str, Any]], llm) -> Tuple[str, bool]:
+        """One summary update: returns the new text and whether the LLM call (if any) worked."""
+        new_turns = "\n".join(
+            f"[{entry['role'].upper()}]: {clip(entry.get('content', ''), self.turn_cap)}" for entry in batch
+        )
+        text = None
+        if llm:
+            try:
+                text = await llm(
+                    SUMMARY_PROMPT.format(budget=self.summary_budget),
+                    f"[EXISTING SUMMARY]\n{previous or '(none)'}\n\n[NEW TURNS]\n{new_turns}"
+                )
+            except Exception as e:
+                self.stats["llm_failures"] += 1
+                print(f"⚠️ [Summary] LLM refresh failed, using extractive summary: {e}")
+                llm = None
+        if not text or not text.strip():
+            text = self._extractive(previous, batch)
+        return clip(text.strip(), self.summary_budget), llm is not None
+
+    def _extractive(self, previous: str, pending: List[Dict[str, Any]]) -> str:
+        """No-LLM fallback: keep user requests and the first line of each reply, newest last."""
+        parts = [previous] if previous else []
+        for entry in pending:
+            first_line = entry.get("content", "").strip().split("\n")[0]
+            prefix = "用户" if entry.get("role") == "user" else "Jarvis"
+            parts.append(f"{prefix}: {clip(first_line, 40)}")
+        text = "；".join(parts)
+        # Over budget: drop the oldest fragments rather than the newest
+        while estimate_tokens(text) > self.summary_budget and len(parts) > 1:
+            parts.pop(0)
+            text = "；".join(parts)
+        return text
+
+    def _default_llm(self) -> Optional[Callable[[str, str], Awaitable[str]]]:
+        if not (os.getenv("DOUBAO_ARK_API_KEY") or os.getenv("DOUBAO_ACCESS_TOKEN")):
+            return None
+        from jarvis_assistant.agent.llm_client import get_llm_client
+
+        async def summarize(system_prompt: str, content: str) -> str:
+            return await get_llm_client().generate(content, system_prompt=system_prompt, temperature=0.2)
+        return summarize
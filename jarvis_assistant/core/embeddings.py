@@ -0,0 +1,116 @@
+"""
+Sentence Embeddings
+CPU text encoders for vector recall (core/vector_memory.py):
+
+    onnx    a small local sentence encoder exported to ONNX (e.g.
+            paraphrase-multilingual-MiniLM-L12-v2), run with onnxruntime;
+            JARVIS_EMBED_MODEL is a directory with model.onnx and
+            tokenizer.json (HuggingFace tokenizers format); mean pooling
+    hash    feature hashing of words and CJK bigrams (core/search_index
+            tokens) into JARVIS_EMBED_DIM signed buckets; no model, no
+            extra dependency, lexical rather than semantic
+
+JARVIS_EMBED_ENCODER=auto uses the ONNX model when it is installed and
+loads, else hashing. Both return L2-normalised float32 rows, so a dot
+product is the cosine similarity.
+
+Usage:
+    encoder = get_encoder()
+    vectors = encoder.encode(["北京天气怎么样", "明天会下雨吗"])   # (2, encoder.dim)
+"""
+
+import os
+import zlib
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from jarvis_assistant.core.search_index import tokenize
+
+EMBED_ENCODER = os.getenv("JARVIS_EMBED_ENCODER", "auto").lower()         # auto | onnx | hash
+EMBED_MODEL = os.getenv("JARVIS_EMBED_MODEL", "~/.jarvis/models/embedding")
+EMBED_DIM = int(os.getenv("JARVIS_EMBED_DIM", "256"))                      # Hashing encoder width
+EMBED_THREADS = int(os.getenv("JARVIS_EMBED_THREADS", "2"))                # onnxruntime intra-op threads
+MAX_TOKENS = 128
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class HashingEncoder:
+    """Signed feature hashing of words / CJK bigrams (stable across processes: crc32)"""
+
+    def __init__(self, dim: int = EMBED_DIM):
+        self.dim = dim
+        self.name = f"hash-{dim}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                h = zlib.crc32(token.encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return normalize(out)
+
+
+class OnnxEncoder:
+    """Transformer sentence encoder on onnxruntime (CPU), mean-pooled over the attention mask"""
+
+    def __init__(self, model_dir: str = EMBED_MODEL, threads: int = EMBED_THREADS):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir).expanduser()
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_TOKENS)
+        self.tokenizer.enable_padding()
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_dir / "model.onnx"), options,
+                                            providers=["CPUExecutionProvider"])
+        self.inputs = {i.name for i in self.session.get_inputs()}
+        self.dim = int(self.encode(["dim"]).shape[1])
+        if self.dim < 8:
+            raise RuntimeError(f"{model_dir} does not look like a sentence encoder (dim {self.dim})")
+        self.name = f"onnx-{model_dir.name}-{self.dim}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        batch = self.tokenizer.encode_batch(texts)
+        ids = np.array([e.ids for e in batch], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in batch], dtype=np.int64)
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self.inputs:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+        hidden = np.asarray(self.session.run(None, feeds)[0], dtype=np.float32)
+        if hidden.ndim == 3:  # Token states: mean over real tokens
+            weights = mask[..., None].astype(np.float32)
+            hidden = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return normalize(hidden)
+
+
+_encoder = None
+
+
+def get_encoder():
+    """The process-wide encoder (the ONNX model is loaded once and shared by every session)"""
+    global _encoder
+    if _encoder is None:
+        _encoder = _load_encoder()
+    return _encoder
+
+
+def _load_encoder():
+    model_dir = Path(EMBED_MODEL).expanduser()
+    if EMBED_ENCODER in ("auto", "onnx") and (model_dir / "model.onnx").exists():
+        try:
+            encoder = OnnxEncoder(str(model_dir))
+            print(f"🧬 Embeddings: {encoder.name}")
+            return encoder
+        except Exception as e:
+            print(f"⚠️ ONNX encoder unavailable ({e}), using hashing embeddings")
+    elif EMBED_ENCODER == "onnx":
+        print(f"⚠️ No ONNX model in {model_dir}, using hashing embeddings")
+    return HashingEncoder()
@@ -8,6 +8,8 @@ from typing import Dict, Any, List, Optional
 from pathlib import Path
 from datetime import datetime
 
+from jarvis_assistant.core.session import current_session
+
 class FeedbackManager:
     """
     Manages user feedback and learns from it.
@@ -115,6 +117,10 @@ class FeedbackManager:
 _feedback_instance = None
 
 def get_feedback_manager() -> FeedbackManager:
+    """Feedback of the current session (core/session.py), else the global store"""
+    session = current_session()
+    if session is not None:
+        return session.feedback
     global _feedback_instance
     if _feedback_instance is None:
         _feedback_instance = FeedbackManager()
@@ -0,0 +1,241 @@
+"""
+Keyword Automaton
+One Aho-Corasick automaton over every routing vocabulary (intent keywords,
+intent cues, stop words, company names, tickers, cities, entity and memory
+keywords). A single pass over the input returns every hit with its
+category and position, instead of hundreds of separate `in` checks and
+regex calls per turn.
+
+Vocabularies are registered by the modules that own them, usually at
+import time; the automaton is rebuilt lazily on the first scan after a
+registration, so in practice it is built once at startup.
+
+Usage:
+    matcher = get_keyword_matcher()
+    matcher.register("stock_name", {"特斯拉": "TSLA", "苹果": "AAPL"})
+    hits = matcher.scan("特斯拉和苹果的股价")
+    hits.keywords("stock_name")   # {"特斯拉", "苹果"}
+    hits.first("stock_name")      # Hit(category="stock_name", keyword="特斯拉", start=0, end=3, value="TSLA")
+    hits.remove("filler", FILLERS)  # text after removing each filler word in turn
+"""
+
+import os
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# Recent scan results kept so several call sites in one turn share one pass
+SCAN_CACHE_SIZE = int(os.getenv("JARVIS_KEYWORD_CACHE", "64"))
+
+
+@dataclass(frozen=True)
+class Hit:
+    """One keyword occurrence."""
+    category: str
+    keyword: str
+    start: int
+    end: int
+    value: Any = None
+
+
+class Hits:
+    """All hits of one scan, ordered by position (longest first at a tie)."""
+
+    def __init__(self, text: str, hits: List[Hit]):
+        self.text = text
+        self.hits = hits
+        self._by_category: Dict[str, List[Hit]] = {}
+        for hit in hits:
+            self._by_category.setdefault(hit.category, []).append(hit)
+
+    def __iter__(self):
+        return iter(self.hits)
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+    def of(self, category: str) -> List[Hit]:
+        return self._by_category.get(category, [])
+
+    def has(self, category: str) -> bool:
+        return category in self._by_category
+
+    def keywords(self, category: str) -> Set[str]:
+        return {hit.keyword for hit in self.of(category)}
+
+    def first(self, category: str) -> Optional[Hit]:
+        """Leftmost hit of a category."""
+        found = self.of(category)
+        return found[0] if found else None
+
+    def categories(self) -> Set[str]:
+        return set(self._by_category)
+
+    def remove(self, category: str, words: Iterable[str]) -> str:
+        """
+        The text after text.replace(word, "") for each word in order, i.e.
+        the stop-word removal the routing code has always done (removing one
+        word can join its neighbours into a later one, so order matters).
+        Skipped when the scan found none of the category's words.
+        """
+        if category not in self._by_category:
+            return self.text
+        text = self.text
+        for word in words:
+            text = text.replace(word, "")
+        return text
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over categorized keywords.
+
+    Matching is case-insensitive unless a category is registered with
+    case_sensitive=True. word_boundary=True categories (tickers) only match
+    where the neighbouring characters are not ASCII letters or digits.
+    """
+
+    def __init__(self):
+        # category -> (keyword -> value, word_boundary, case_sensitive)
+        self._vocab: Dict[str, Tuple[Dict[str, Any], bool, bool]] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[Tuple[int, ...]] = [()]
+        # entry id -> (category, keyword, length, value, word_boundary, case_sensitive)
+        self._entries: List[Tuple[str, str, int, Any, bool, bool]] = []
+        self._dirty = False
+        self._cache: "OrderedDict[str, Hits]" = OrderedDict()
+        self.stats = {"builds": 0, "scans": 0, "cache_hits": 0, "keywords": 0}
+
+    def register(
+        self,
+        category: str,
+        keywords: Union[Dict[str, Any], Iterable[str]],
+        word_boundary: bool = False,
+        case_sensitive: bool = False
+    ) -> None:
+        """
+        Add (or replace) a category's vocabulary. A dict maps keyword -> value.
+        Registering the same vocabulary again is a no-op (no rebuild).
+        """
+        if not isinstance(keywords, dict):
+            keywords = {keyword: None for keyword in keywords}
+        vocab = ({k: v for k, v in keywords.items() if k}, word_boundary, case_sensitive)
+        if self._vocab.get(category) == vocab:
+            return
+        self._vocab[category] = vocab
+        self._dirty = True
+
+    def build(self) -> None:
+        """Compile all registered vocabularies into one automaton."""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        entries = []
+        for category, (keywords, word_boundary, case_sensitive) in self._vocab.items():
+            for keyword, value in keywords.items():
+                state = 0
+                for char in keyword.lower():
+                    nxt = goto[state].get(char)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][char] = nxt
+                        goto.append({})
+                        outputs.append([])
+                    state = nxt
+                outputs[state].append(len(entries))
+                entries.append((category, keyword, len(keyword), value, word_boundary, case_sensitive))
+
+        # Breadth-first failure links; outputs of suffix states are merged in
+        order = breadth_first(goto)
+        fail = [0] * len(goto)
+        for state in order:
+            for char, nxt in goto[state].items():
+                f = fail[state]
+                while f and char not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(char, 0) if state else 0
+                outputs[nxt].extend(outputs[fail[nxt]])
+
+        # Inherit the failure state's transitions so scanning never walks
+        # failure links; transitions out of the root stay in the root
+        # (scan falls back to it) to keep the table small
+        for state in order:
+            if fail[state]:
+                for char, nxt in goto[fail[state]].items():
+                    goto[state].setdefault(char, nxt)
+
+        self._goto = goto
+        self._outputs = [tuple(out) for out in outputs]
+        self._entries = entries
+        self._cache.clear()
+        self._dirty = False
+        self.stats["builds"] += 1
+        self.stats["keywords"] = len(entries)
+
+    def scan(self, text: str, use_cache: bool = True) -> Hits:
+        """Every keyword occurrence in text, in one pass."""
+        if self._dirty:
+            self.build()
+        cached = self._cache.get(text) if use_cache else None
+        if cached is not None:
+            self._cache.move_to_end(text)
+            self.stats["cache_hits"] += 1
+            return cached
+        self.stats["scans"] += 1
+
+        folded = text.lower()
+        if len(folded) != len(text):
+            folded = text  # Rare characters whose lowercase changes length
+        goto, outputs, entries = self._goto, self._outputs, self._entries
+        root = goto[0]
+        found = []
+        state = 0
+        for i, char in enumerate(folded):
+            state = goto[state].get(char) or root.get(char, 0)
+            if outputs[state]:
+                end = i + 1
+                for entry in outputs[state]:
+                    category, keyword, length, value, word_boundary, case_sensitive = entries[entry]
+                    start = end - length
+                    if case_sensitive and text[start:end] != keyword:
+                        continue
+                    if word_boundary and (
+                        (start > 0 and _is_word_char(text[start - 1])) or (end < len(text) and _is_word_char(text[end]))
+                    ):
+                        continue
+                    found.append(Hit(category, keyword, start, end, value))
+        found.sort(key=lambda h: (h.start, -h.end))
+
+        hits = Hits(text, found)
+        self._cache[text] = hits
+        if len(self._cache) > SCAN_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return hits
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "states": len(self._goto), "categories": len(self._vocab)}
+
+
+def breadth_first(goto: List[Dict[str, int]]) -> List[int]:
+    """Trie states in breadth-first order (parents before children)."""
+    order, queue = [], deque([0])
+    while queue:
+        state = queue.popleft()
+        order.append(state)
+        queue.extend(goto[state].values())
+    return order
+
+
+# Singleton instance
+_keyword_matcher_instance: Optional[KeywordMatcher] = None
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Get the shared keyword automaton"""
+    global _keyword_matcher_instance
+    if _keyword_matcher_instance is None:
+        _keyword_matcher_instance = KeywordMatcher()
+    return _keyword_matcher_instance
@@ -1,34 +1,170 @@
 """
 Jarvis Memory Store
 Persistent storage for conversation history, task logs, and user preferences.
+
+memory.json is a snapshot; every mutation after it is one compact JSONL
+record in memory.json.wal (write-ahead journal), so persisting a turn
+costs O(1) instead of re-serialising the whole history. Records reach the
+OS at once and are fsynced in groups (one fsync per COMMIT_INTERVAL,
+JARVIS_MEMORY_FSYNC=always|off to change that). Every COMPACT_RECORDS
+records a new snapshot is written on a background thread (temp file +
+rename) and the journal starts over. Loading replays the journal records
+newer than the snapshot, stopping at a torn last line.
+
+MEMORY.md is a human-editable mirror. Jarvis rewrites it only when its
+content changes, and the writes go to a background thread. Each turn asks
+a FileWatcher whether the file changed (inotify, else a throttled stat).
+A change is read off the event loop, and it is parsed only if its hash is
+not one of Jarvis's own recent writes.
+
+conversations are indexed for ranked search as they are added
+(core/search_index.py, BM25 over words and CJK bigrams); the index is
+saved in the snapshot.
+
+Turns and profile facts are also embedded for recall by meaning
+(core/vector_memory.py: float16 matrix in memory.vectors/, encoded on a
+background worker); JARVIS_EMBED_RECALL=off disables it.
+
+JARVIS_MEMORY_BACKEND=sqlite keeps the full conversation / task history in
+SQLite instead (core/memory_sqlite.py: WAL, FTS5 trigram search, batched
+writes on its own thread). conversations / task_history are then the
+recent window, loaded from the database, and search_history() and
+SemanticMemory query the index. The profile, preferences and summary stay
+in the snapshot + journal.
 """
 
+import asyncio
+import copy
+import hashlib
 import json
 import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+from jarvis_assistant.core.search_index import BM25Index
+from jarvis_assistant.core.session import current_session
+
+JOURNAL_FSYNC = os.getenv("JARVIS_MEMORY_FSYNC", "group").lower()          # group | always | off
+COMMIT_INTERVAL = float(os.getenv("JARVIS_MEMORY_COMMIT_INTERVAL", "1.0"))  # Group commit window (s)
+COMPACT_RECORDS = int(os.getenv("JARVIS_MEMORY_COMPACT_RECORDS", "500"))    # Journal records per snapshot
+MEMORY_BACKEND = os.getenv("JARVIS_MEMORY_BACKEND", "json").lower()          # json | sqlite
+EMBED_RECALL = os.getenv("JARVIS_EMBED_RECALL", "on").lower() == "on"
+MAX_CONVERSATIONS = 1000
+MAX_TASKS = 500
+
+# One writer thread each: MEMORY.md writes land in order; snapshots and fsyncs in order
+_markdown_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-md")
+_journal_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-wal")
+MARKDOWN_STAMP = "*Last Updated:"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Write via rename, so a reader (or the watcher) never sees half a file."""
+    try:
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"⚠️ Failed to sync memory to markdown: {e}")
+
+
+def _markdown_file(md_path: str) -> Path:
+    return Path(os.getcwd()) / md_path
+
+
+_recall_warned = False
+
+
+def _open_vectors(directory: Path):
+    """VectorMemory for a store, or None when numpy (a requirement) is missing"""
+    global _recall_warned
+    try:
+        from jarvis_assistant.core.vector_memory import VectorMemory
+    except ImportError as e:
+        if not _recall_warned:
+            print(f"⚠️ Embedding recall disabled: {e}")
+            _recall_warned = True
+        return None
+    return VectorMemory(directory)
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
 
 class MemoryStore:
     """Persistent memory for Jarvis Agent"""
     
-    def __init__(self, path: str = "~/.jarvis/memory.json"):
+    def __init__(self, path: str = "~/.jarvis/memory.json", markdown_path: Optional[str] = "MEMORY.md",
+                 backend: str = MEMORY_BACKEND, recall: bool = EMBED_RECALL):
         self.path = Path(path).expanduser()
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.markdown_path = markdown_path  # Human-editable mirror (None = no mirror)
         
         # Core memory structures
         self.conversations: List[Dict[str, Any]] = []
         self.task_history: List[Dict[str, Any]] = []
         self.preferences: Dict[str, Any] = {}
         self.user_profile: Dict[str, Any] = {}  # 🔥 Init profile
+        self.conversation_summary: Dict[str, Any] = {}  # Rolling summary of older turns
         self.session_id: str = datetime.now().strftime("%Y%m%d_%H%M%S")
         
+        # Write-ahead journal: memory.json is a snapshot, memory.json.wal the mutations since
+        self.journal_path = self.path.with_name(self.path.name + ".wal")
+        self._rotated_path = self.path.with_name(self.path.name + ".wal.1")
+        self._journal = None
+        self._seq = 0                 # Last journal record written
+        self._snapshot_seq = 0        # Last record contained in memory.json
+        self._compacting: Optional[Future] = None
+        self._commit_handle = None
+        self._last_commit = time.monotonic()
+        self.compact_every = COMPACT_RECORDS
+        self.journal_stats = {"records": 0, "replayed": 0, "fsyncs": 0, "snapshots": 0}
+        
+        # MEMORY.md mirror state: own writes are recognised by hash
+        self._md_body: Optional[str] = None         # Last written content, minus the timestamp
+        self._md_own: deque = deque(maxlen=8)       # Hashes of recent own writes
+        self._md_seen: Optional[str] = None         # Hash of the last external version applied
+        self._md_watcher = None
+        self._md_pending: Optional[Future] = None
+        self.md_stats = {"writes": 0, "writes_skipped": 0, "reads": 0, "reloads": 0, "own_writes_ignored": 0}
+        
+        # BM25 over self.conversations, doc id = list position (the SQLite backend has FTS instead)
+        self.search_index: Optional[BM25Index] = None
+        
+        # Full history in SQLite (None = the lists above are the whole history)
+        self.history = None
+        if backend == "sqlite":
+            from jarvis_assistant.core.memory_sqlite import SQLiteHistory
+            self.history = SQLiteHistory(self.path.with_suffix(".db"))
+        
+        # Embedded turns and profile facts (None = no embedding recall)
+        self.vectors = None
+        
         # Load existing memory
         self.load()
+        
+        if recall:
+            self.vectors = _open_vectors(self.path.with_name(self.path.stem + ".vectors"))
+            if self.vectors is not None:
+                self.vectors.catch_up(self.conversations)
+                self.vectors.set_facts(self.profile_facts())
     
     def load(self) -> None:
-        """Load memory from disk"""
+        """Load memory from disk: the snapshot, then the journal records after it"""
         if self.path.exists():
             try:
                 with open(self.path, 'r', encoding='utf-8') as f:
@@ -37,97 +173,377 @@ class MemoryStore:
                     self.task_history = data.get('task_history', [])
                     self.preferences = data.get('preferences', {})
                     self.user_profile = data.get('user_profile', {})  # 🔥 Load profile
-                
-                # 🔥 Migrate to hierarchical structure if needed
-                self._migrate_profile_if_needed()
-                
-                print(f"📚 Memory loaded: {len(self.conversations)} convs, {len(self.user_profile)} profile items")
+                    self.conversation_summary = data.get('conversation_summary', {})
+                    self._snapshot_seq = self._seq = data.get('journal_seq', 0)
+                    index = data.get('search_index')
+                    if self.history is None and index and index.get('docs') == len(self.conversations):
+                        self.search_index = BM25Index.from_dict(index)
             except Exception as e:
                 print(f"⚠️ Failed to load memory: {e}")
+        if self.history is None and self.search_index is None:
+            self.reindex()  # No snapshot, or one written before the index existed
+        
+        # A compaction interrupted by a crash leaves the rotated journal behind
+        for journal in (self._rotated_path, self.journal_path):
+            self._replay(journal)
+        
+        # 🔥 Migrate to hierarchical structure if needed
+        self._migrate_profile_if_needed()
+        
+        if self.history is not None:
+            if self.history.count() == (0, 0) and (self.conversations or self.task_history):
+                self.history.import_history(self.conversations, self.task_history)  # First start on SQLite
+            else:
+                self.conversations = self.history.recent_conversations(MAX_CONVERSATIONS)
+                self.task_history = self.history.recent_tasks(MAX_TASKS)
+        
+        replayed = self.journal_stats["replayed"]
+        if self.path.exists() or replayed:
+            print(f"📚 Memory loaded: {len(self.conversations)} convs, {len(self.user_profile)} profile items"
+                  + (f", {replayed} journal records" if replayed else ""))
     
-    def save(self) -> None:
-        """Save memory to disk"""
+    def _replay(self, journal: Path) -> None:
+        if not journal.exists():
+            return
         try:
-            data = {
-                'last_updated': datetime.now().isoformat(),
-                'conversations': self.conversations[-1000:],
-                'task_history': self.task_history[-500:],
-                'preferences': self.preferences,
-                'user_profile': self.user_profile,  # 🔥 Save profile
-            }
-            with open(self.path, 'w', encoding='utf-8') as f:
+            with open(journal, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn tail of a crashed write: everything before it is intact
+                    if record.get('seq', 0) <= self._seq:
+                        continue  # Already in the snapshot (or replayed from the rotated journal)
+                    self._apply(record['op'], record.get('v'))
+                    self._seq = record['seq']
+                    self.journal_stats["replayed"] += 1
+        except Exception as e:
+            print(f"⚠️ Failed to replay memory journal: {e}")
+    
+    def _apply(self, op: str, value: Any) -> None:
+        """Redo one journal record"""
+        if op == 'conv':
+            self.conversations.append(value)
+            if self.search_index is not None:
+                self.search_index.add(value.get('content', ''))
+        elif op == 'task':
+            self.task_history.append(value)
+        elif op == 'profile':
+            self.user_profile = value
+        elif op == 'pref':
+            self.preferences[value['k']] = value['v']
+        elif op == 'summary':
+            self.conversation_summary = value
+        elif op == 'clear':
+            self.conversations = [c for c in self.conversations if c.get('session_id') != value]
+            if self.search_index is not None:
+                self.reindex()
+        elif op == 'state':
+            self.user_profile = value.get('user_profile', self.user_profile)
+            self.preferences = value.get('preferences', self.preferences)
+            self.conversation_summary = value.get('conversation_summary', self.conversation_summary)
+    
+    def _log(self, op: str, value: Any) -> None:
+        """Append one compact record to the journal (O(1), whatever the history size)"""
+        try:
+            if self._journal is None:
+                if not self.path.exists() and not self._compaction_running():
+                    # New store: memory.json exists from its first write on, like before the journal
+                    self._write_snapshot(self._snapshot_data(), None)
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            self._seq += 1
+            self._journal.write(json.dumps({'seq': self._seq, 'op': op, 'v': value},
+                                           ensure_ascii=False, separators=(',', ':')) + "\n")
+            self._journal.flush()  # In the OS page cache: survives a process crash
+            self.journal_stats["records"] += 1
+        except Exception as e:
+            print(f"⚠️ Failed to save memory: {e}")
+            return
+        self._commit_soon()
+        if self._seq - self._snapshot_seq >= self.compact_every and not self._compaction_running():
+            self.compact()
+    
+    def _commit_soon(self) -> None:
+        """Group commit: one fsync covers every record of the last COMMIT_INTERVAL"""
+        if JOURNAL_FSYNC == "off":
+            return
+        if JOURNAL_FSYNC == "always":
+            self._commit()
+            return
+        if self._commit_handle is not None:
+            return  # This window already has its fsync scheduled
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if time.monotonic() - self._last_commit >= COMMIT_INTERVAL:
+                self._commit()
+            return
+        self._commit_handle = loop.call_later(COMMIT_INTERVAL, self._commit_in_background)
+    
+    def _commit_in_background(self) -> None:
+        self._commit_handle = None
+        self._last_commit = time.monotonic()
+        if self._journal is not None:
+            _journal_writer.submit(self._fsync, self._journal)
+    
+    def _commit(self) -> None:
+        self._last_commit = time.monotonic()
+        if self._journal is not None:
+            self._fsync(self._journal)
+    
+    def _fsync(self, journal) -> None:
+        try:
+            os.fsync(journal.fileno())
+            self.journal_stats["fsyncs"] += 1
+        except (OSError, ValueError):
+            pass  # Closed by a rotation: its own close already synced it
+    
+    def reindex(self) -> None:
+        """Rebuild the search index from self.conversations (doc ids are list positions)"""
+        self.search_index = BM25Index.build(c.get('content', '') for c in self.conversations)
+    
+    def compact(self) -> Optional[Future]:
+        """
+        Write a snapshot (temp file + rename) and start a new journal.
+        Runs on the journal thread when an event loop is running.
+        """
+        if self._compaction_running():
+            return self._compacting
+        data = self._snapshot_data()
+        old = self._journal
+        self._journal = None
+        if self.journal_path.exists() and not self._rotated_path.exists():
+            os.replace(self.journal_path, self._rotated_path)  # New records go to a fresh journal
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_snapshot(data, old)
+            return None
+        self._compacting = _journal_writer.submit(self._write_snapshot, data, old)
+        return self._compacting
+    
+    def _compaction_running(self) -> bool:
+        return self._compacting is not None and not self._compacting.done()
+    
+    def _snapshot_data(self) -> Dict[str, Any]:
+        """A consistent copy of the state (serialised later, off the event loop)"""
+        window = self.conversations[-MAX_CONVERSATIONS:]
+        data = {
+            'last_updated': datetime.now().isoformat(),
+            'journal_seq': self._seq,
+            'conversations': window,
+            'task_history': self.task_history[-MAX_TASKS:],
+            'preferences': copy.deepcopy(self.preferences),
+            'user_profile': copy.deepcopy(self.user_profile),  # 🔥 Save profile
+            'conversation_summary': dict(self.conversation_summary),
+        }
+        if self.search_index is not None:
+            # Index of the snapshot's conversations, serialised on the snapshot thread too
+            data['search_index'] = self.search_index.export(len(self.conversations) - len(window))
+        return data
+    
+    def _write_snapshot(self, data: Dict[str, Any], old_journal) -> None:
+        try:
+            if old_journal is not None:
+                old_journal.close()
+            if callable(data.get('search_index')):
+                data['search_index'] = data['search_index']()
+            tmp = self.path.with_name(f".{self.path.name}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._snapshot_seq = data['journal_seq']
+            self.journal_stats["snapshots"] += 1
+            # Everything in the rotated journal is in the snapshot now
+            if self._rotated_path.exists():
+                os.remove(self._rotated_path)
         except Exception as e:
             print(f"⚠️ Failed to save memory: {e}")
+    
+    async def flush(self) -> None:
+        """Wait until every record so far is durable (fsync) and any compaction finished"""
+        if self.vectors is not None:
+            await asyncio.wrap_future(self.vectors.flush_async())
+        if self.history is not None:
+            await asyncio.to_thread(self.history.flush)
+        if self._compacting is not None:
+            await asyncio.wrap_future(self._compacting)
+        if self._journal is not None:
+            await asyncio.wrap_future(_journal_writer.submit(self._fsync, self._journal))
+        await self.flush_markdown()
+    
+    def close(self) -> None:
+        """Commit the journal and release it (the store reopens it on the next write)"""
+        if self.history is not None:
+            self.history.close()  # Commits the queued rows; reopened if the store is used again
+        if self.vectors is not None:
+            self.vectors.flush()
+        if self._commit_handle is not None:
+            self._commit_handle.cancel()
+            self._commit_handle = None
+        journal, self._journal = self._journal, None
+        if journal is not None:
+            try:
+                journal.flush()
+                os.fsync(journal.fileno())
+                journal.close()
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Failed to save memory: {e}")
+    
+    def save(self) -> None:
+        """
+        Persist the profile, preferences and summary (callers that edit them
+        directly, e.g. user_tools, call this afterwards). Conversations and
+        tasks are journaled as they are added.
+        """
+        self._log('state', {
+            'user_profile': self.user_profile,
+            'preferences': self.preferences,
+            'conversation_summary': self.conversation_summary,
+        })
+        
+        if self.vectors is not None:
+            self.vectors.set_facts(self.profile_facts())
         
         # 🔥 Sync to Markdown for visibility
         self.sync_to_markdown()
 
-    def sync_to_markdown(self, md_path: str = "MEMORY.md") -> None:
+    def sync_to_markdown(self, md_path: Optional[str] = None) -> None:
         """Distill complex JSON memory into a clean, user-readable MEMORY.md file"""
+        md_path = md_path or self.markdown_path
+        if not md_path:
+            return
         try:
-            full_path = Path(".").resolve() / md_path # Default to project root
-            
-            # 1. Extract context
-            ctx = self.get_context_for_response()
-            profile = self.user_profile
-            
-            # 2. Build Markdown content
-            lines = [
-                "# JARVIS MEMORY.md",
-                "",
-                "这是一个可见的、可编辑的长期记忆库。Jarvis 会自动更新此文件，你也可以手动修改它来纠正他的认知。",
-                "",
-                "## 👤 User Profile (用户信息)",
-                f"- **Name**: {ctx.get('name', '先生 (Sir)')}",
-                f"- **Location**: {ctx.get('location', '未知')}",
-                ""
-            ]
-            
-            # 3. Add Project Context
-            lines.append("## 🛠️ Project Context (项目上下文)")
-            focus = profile.get("current_focus", {})
-            if focus:
-                for k, v in focus.items():
-                    val = v["value"] if isinstance(v, dict) else v
-                    lines.append(f"- **{k.capitalize()}**: {val}")
-            else:
-                lines.append("- (尚未记录项目信息)")
-            lines.append("")
+            full_path = _markdown_file(md_path)  # Relative paths: the project root (cwd)
+            if md_path != self.markdown_path:
+                full_path.write_text(self._render_markdown(), encoding="utf-8")  # Explicit export
+                return
             
-            # 4. Add Significant Learnings
-            lines.append("## 💡 Significant Learnings (重要学习笔记)")
-            interests = profile.get("interests", {})
-            if interests:
-                for k, v in interests.items():
-                    lines.append(f"- **{k}**: {v}")
+            body = self._render_markdown()
+            if body == self._md_body:
+                self.md_stats["writes_skipped"] += 1
+                return  # Nothing a reader would see changed
+            self._md_body = body
+            text = f"{body}\n{MARKDOWN_STAMP} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*"
+            self._md_own.append(_digest(text))
+            self.md_stats["writes"] += 1
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                _write_atomic(full_path, text)  # No event loop to keep free
             else:
-                lines.append("- (尚未记录重要发现)")
-            lines.append("")
-            
-            lines.append(f"---")
-            lines.append(f"*Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
-            
-            # Write to file
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write("\n".join(lines))
+                self._md_pending = _markdown_writer.submit(_write_atomic, full_path, text)
                 
         except Exception as e:
             print(f"⚠️ Failed to sync memory to markdown: {e}")
 
-    def load_from_markdown(self, md_path: str = "MEMORY.md") -> None:
+    def _render_markdown(self) -> str:
+        """MEMORY.md content, without the Last Updated line"""
+        # 1. Extract context
+        ctx = self.get_context_for_response()
+        profile = self.user_profile
+        
+        # 2. Build Markdown content
+        lines = [
+            "# JARVIS MEMORY.md",
+            "",
+            "这是一个可见的、可编辑的长期记忆库。Jarvis 会自动更新此文件，你也可以手动修改它来纠正他的认知。",
+            "",
+            "## 👤 User Profile (用户信息)",
+            f"- **Name**: {ctx.get('name', '先生 (Sir)')}",
+            f"- **Location**: {ctx.get('location', '未知')}",
+            ""
+        ]
+        
+        # 3. Add Project Context
+        lines.append("## 🛠️ Project Context (项目上下文)")
+        focus = profile.get("current_focus", {})
+        if focus:
+            for k, v in focus.items():
+                val = v["value"] if isinstance(v, dict) else v
+                lines.append(f"- **{k.capitalize()}**: {val}")
+        else:
+            lines.append("- (尚未记录项目信息)")
+        lines.append("")
+        
+        # 4. Add Significant Learnings
+        lines.append("## 💡 Significant Learnings (重要学习笔记)")
+        interests = profile.get("interests", {})
+        if interests:
+            for k, v in interests.items():
+                lines.append(f"- **{k}**: {v}")
+        else:
+            lines.append("- (尚未记录重要发现)")
+        lines.append("")
+        
+        lines.append(f"---")
+        return "\n".join(lines)
+
+    async def flush_markdown(self) -> None:
+        """Wait for the pending MEMORY.md write, if any"""
+        if self._md_pending is not None:
+            await asyncio.wrap_future(self._md_pending)
+
+    async def refresh_from_markdown(self) -> bool:
+        """
+        Reload MEMORY.md if it was edited outside Jarvis since the last check.
+        Cheap when nothing changed: no read, no parse, no blocking I/O.
+        
+        Returns:
+            True if an external edit was applied
+        """
+        if not self.markdown_path:
+            return False
+        from jarvis_assistant.utils.file_watch import FileWatcher
+        
+        full_path = _markdown_file(self.markdown_path)
+        if self._md_watcher is None or self._md_watcher.path != full_path:
+            if self._md_watcher is not None:
+                self._md_watcher.close()
+            self._md_watcher = FileWatcher(full_path)
+        if not await self._md_watcher.check():
+            return False
+        
+        content = await asyncio.to_thread(_read_text, full_path)
+        self.md_stats["reads"] += 1
+        if content is None:
+            return False
+        digest = _digest(content)
+        if digest in self._md_own or digest == self._md_seen:
+            self.md_stats["own_writes_ignored"] += 1
+            return False
+        self._md_seen = digest
+        self._apply_markdown(content)
+        self._log('profile', self.user_profile)  # The edit survives a restart
+        if self.vectors is not None:
+            self.vectors.set_facts(self.profile_facts())
+        self.md_stats["reloads"] += 1
+        return True
+
+    def load_from_markdown(self, md_path: Optional[str] = None) -> None:
         """
         Reverse sync: Read user-edited MEMORY.md back into JSON
         Allows user to manually 'correct' Jarvis's memory by editing the file.
         """
+        md_path = md_path or self.markdown_path
+        if not md_path:
+            return
         try:
-            full_path = Path(".").resolve() / md_path
+            full_path = _markdown_file(md_path)
             if not full_path.exists():
                 return
                 
             with open(full_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-            
+            self._apply_markdown(content)
+        except Exception as e:
+            print(f"⚠️ Failed to load memory from markdown: {e}")
+
+    def _apply_markdown(self, content: str) -> None:
+        """Apply the editable fields of MEMORY.md to the profile"""
+        try:
             import re
             # Parse Profile
             name_match = re.search(r'\- \*\*Name\*\*: (.*)', content)
@@ -153,7 +569,15 @@ class MemoryStore:
         if metadata:
             entry['metadata'] = metadata
         self.conversations.append(entry)
-        self.save()
+        if self.vectors is not None:
+            self.vectors.add_conversation(entry)
+        if self.history is not None:
+            self.history.add_conversation(entry)
+            self._trim_window()
+        else:
+            if self.search_index is not None:
+                self.search_index.add(content)
+            self._log('conv', entry)
     
     def add_task(self, task: str, steps: List[str], result: str, success: bool) -> None:
         """Log a completed task"""
@@ -166,7 +590,18 @@ class MemoryStore:
             'success': success,
         }
         self.task_history.append(entry)
-        self.save()
+        if self.history is not None:
+            self.history.add_task(entry)
+            self._trim_window()
+        else:
+            self._log('task', entry)
+    
+    def _trim_window(self) -> None:
+        """With SQLite the lists are a recent window; trimmed in chunks, not per turn"""
+        if len(self.conversations) > 2 * MAX_CONVERSATIONS:
+            del self.conversations[:-MAX_CONVERSATIONS]
+        if len(self.task_history) > 2 * MAX_TASKS:
+            del self.task_history[:-MAX_TASKS]
     
     def get_context(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent conversation context"""
@@ -182,8 +617,24 @@ class MemoryStore:
             lines.append(f"[{role}]: {content}")
         return "\n".join(lines)
     
+    def get_conversation_summary(self) -> Dict[str, Any]:
+        """Rolling summary of turns older than the raw history window"""
+        return self.conversation_summary
+    
+    def set_conversation_summary(self, text: str, covered_until: str, turns: int) -> None:
+        """Store the rolling summary (covered_until = timestamp of the last folded turn)"""
+        self.conversation_summary = {
+            'text': text,
+            'covered_until': covered_until,
+            'turns': turns,
+            'updated': datetime.now().isoformat(),
+        }
+        self._log('summary', self.conversation_summary)
+    
     def search_history(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-        """Search conversation history"""
+        """Search conversation history (most recent first)"""
+        if self.history is not None:
+            return self.history.search(query, limit)
         results = []
         for entry in reversed(self.conversations):
             if query.lower() in entry['content'].lower():
@@ -195,7 +646,7 @@ class MemoryStore:
     def set_preference(self, key: str, value: Any) -> None:
         """Set a user preference (system config like volume, etc)"""
         self.preferences[key] = value
-        self.save()
+        self._log('pref', {'k': key, 'v': value})
     
     def get_preference(self, key: str, default: Any = None) -> Any:
         return self.preferences.get(key, default)
@@ -231,13 +682,36 @@ class MemoryStore:
         for key, val in old_profile.items():
             self.user_profile["interests"][key] = val
         
-        self.save()
+        self._profile_changed()
+    
+    def _profile_changed(self) -> None:
+        """Journal the profile (small and bounded), re-embed changed facts and refresh MEMORY.md"""
+        self._log('profile', self.user_profile)
+        if self.vectors is not None:
+            self.vectors.set_facts(self.profile_facts())
+        self.sync_to_markdown()
+    
+    def profile_facts(self) -> Dict[str, str]:
+        """The profile as one short sentence per fact, keyed by where it lives (for recall)"""
+        profile = self.user_profile if isinstance(self.user_profile, dict) else {}
+        facts = {}
+        for key, value in profile.get("basics", {}).items():
+            facts[f"basics.{key}"] = f"{key}: {value}"
+        for key, item in profile.get("current_focus", {}).items():
+            value = item.get("value") if isinstance(item, dict) else item
+            facts[f"current_focus.{key}"] = f"{key}: {value}"
+        for key, value in profile.get("interests", {}).items():
+            facts[f"interests.{key}"] = f"{key}: {value}"
+        for topic in profile.get("recent_topics", []):
+            if isinstance(topic, dict) and topic.get("topic"):
+                facts[f"recent_topics.{topic['topic']}"] = f"recent topic: {topic['topic']}"
+        return facts
     
     def set_profile(self, key: str, value: Any) -> None:
         """Set a basic user profile fact (location, name, etc) - legacy compat"""
         print(f"📝 Updating Profile: {key} = {value}")
         self.user_profile.setdefault("basics", {})[key] = value
-        self.save()
+        self._profile_changed()
     
     def get_profile(self, key: str, default: Any = None) -> Any:
         """Get basic profile value - legacy compat"""
@@ -289,7 +763,7 @@ class MemoryStore:
             marker = "🤖 (自动识别)" if auto else "👤 (用户告知)"
             print(f"💡 记住了: {key} = {value} {marker}")
         
-        self.save()
+        self._profile_changed()
     
     def set_interest(self, key: str, value: str) -> None:
         """Set user interest/preference"""
@@ -298,7 +772,7 @@ class MemoryStore:
         
         self.user_profile["interests"][key] = value
         print(f"❤️ 记住兴趣: {key} = {value}")
-        self.save()
+        self._profile_changed()
     
     def add_recent_topic(self, topic: str) -> None:
         """Add a recently discussed topic"""
@@ -319,7 +793,7 @@ class MemoryStore:
         
         # Keep only last 5 topics
         self.user_profile["recent_topics"] = topics[:5]
-        self.save()
+        self._profile_changed()
     
     def get_context_for_response(self) -> Dict[str, Any]:
         """
@@ -415,7 +889,14 @@ class MemoryStore:
     def clear_session(self) -> None:
         """Clear current session conversations"""
         self.conversations = [c for c in self.conversations if c.get('session_id') != self.session_id]
-        self.save()
+        if self.vectors is not None:
+            self.vectors.drop_session(self.session_id)
+        if self.history is not None:
+            self.history.clear_session(self.session_id)
+        else:
+            if self.search_index is not None:
+                self.reindex()
+            self._log('clear', self.session_id)
 
 
 # Singleton instance
@@ -423,7 +904,10 @@ _memory_instance: Optional[MemoryStore] = None
 
 
 def get_memory() -> MemoryStore:
-    """Get the global memory store instance"""
+    """Get the memory of the current session (core/session.py), else the global store"""
+    session = current_session()
+    if session is not None:
+        return session.memory
     global _memory_instance
     if _memory_instance is None:
         _memory_instance = MemoryStore()
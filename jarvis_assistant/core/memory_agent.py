@@ -6,6 +6,30 @@ import re
 import json
 from typing import Optional, Dict, Any
 from jarvis_assistant.core.memory import get_memory
+from jarvis_assistant.core.keyword_matcher import get_keyword_matcher
+
+# Keywords every pattern group needs; the regexes only run when one is present
+PATTERN_TRIGGERS = {
+    "project": ["论文", "研究", "项目"],
+    "learning": ["学"],
+    "interest": ["喜欢", "爱好"],
+}
+# Simple tool queries are not conversation topics
+TOOL_QUERY_KEYWORDS = ["天气", "股价", "音乐", "时间", "计算"]
+TECH_KEYWORDS = [
+    "深度学习", "机器学习", "强化学习", "神经网络",
+    "控制理论", "PID", "算法", "数据结构",
+    "Python", "编程", "代码", "优化"
+]
+INTEREST_CATEGORIES = {"喝": "beverage", "咖啡": "beverage", "茶": "beverage",
+                       "音乐": "music", "歌": "music", "听": "music"}
+
+_matcher = get_keyword_matcher()
+for _group, _words in PATTERN_TRIGGERS.items():
+    _matcher.register(f"memory_trigger:{_group}", _words)
+_matcher.register("memory_tool_query", TOOL_QUERY_KEYWORDS)
+_matcher.register("tech_topic", TECH_KEYWORDS, case_sensitive=True)
+_matcher.register("interest_category", INTEREST_CATEGORIES)
 
 
 class MemoryAgent:
@@ -15,7 +39,7 @@ class MemoryAgent:
     """
     
     def __init__(self):
-        self.memory = get_memory()
+        self.keywords = get_keyword_matcher()
         
         # Pattern definitions
         self.project_patterns = [
@@ -35,6 +59,11 @@ class MemoryAgent:
             r"我爱好是(.+)"
         ]
     
+    @property
+    def memory(self):
+        """The memory of the conversation being analyzed (session-aware)"""
+        return get_memory()
+    
     async def analyze_and_extract(self, user_input: str, assistant_response: str = "") -> None:
         """
         分析对话，提取重要信息
@@ -43,15 +72,19 @@ class MemoryAgent:
             user_input: 用户输入
             assistant_response: Jarvis 回复（可选，用于话题识别）
         """
+        hits = self.keywords.scan(user_input)
         
         # 1. Extract Project/Research
-        await self._extract_project(user_input)
+        if hits.has("memory_trigger:project"):
+            await self._extract_project(user_input)
         
         # 2. Extract Learning Focus
-        await self._extract_learning(user_input)
+        if hits.has("memory_trigger:learning"):
+            await self._extract_learning(user_input)
         
         # 3. Extract Interests
-        await self._extract_interests(user_input)
+        if hits.has("memory_trigger:interest"):
+            await self._extract_interests(user_input)
         
         # 4. Identify and record topic
         await self._record_topic(user_input, assistant_response)
@@ -109,10 +142,11 @@ class MemoryAgent:
             if match:
                 interest = match.group(1).strip()
                 
-                # Categorize by keyword
-                if any(k in interest for k in ["喝", "咖啡", "茶"]):
+                # Categorize by keyword (beverage wins over music, as before)
+                categories = {hit.value for hit in self.keywords.scan(interest).of("interest_category")}
+                if "beverage" in categories:
                     self.memory.set_interest("beverage", interest)
-                elif any(k in interest for k in ["音乐", "歌", "听"]):
+                elif "music" in categories:
                     self.memory.set_interest("music", interest)
                 else:
                     self.memory.set_interest("general", interest)
@@ -123,21 +157,18 @@ class MemoryAgent:
         识别并记录讨论的话题
         只记录技术/学术相关的话题，忽略天气、音乐等工具查询
         """
+        hits = self.keywords.scan(user_input)
         # Skip if it's a simple tool query
-        if any(kw in user_input for kw in ["天气", "股价", "音乐", "时间", "计算"]):
+        if hits.has("memory_tool_query"):
             return
         
-        # Identify technical topics from keywords
-        tech_keywords = {
-            "深度学习", "机器学习", "强化学习", "神经网络",
-            "控制理论", "PID", "算法", "数据结构",
-            "Python", "编程", "代码", "优化"
-        }
-        
-        for keyword in tech_keywords:
-            if keyword in user_input or keyword in assistant_response:
-                self.memory.add_recent_topic(keyword)
-                return
+        # Identify technical topics from keywords (user input first, then the reply)
+        topic = hits.first("tech_topic") or (
+            self.keywords.scan(assistant_response).first("tech_topic") if assistant_response else None
+        )
+        if topic:
+            self.memory.add_recent_topic(topic.keyword)
+            return
         
         # If response is long and technical (>100 chars), try to extract topic
         if len(assistant_response) > 100:
@@ -0,0 +1,356 @@
+"""
+SQLite History Backend
+Full conversation and task history for MemoryStore in one SQLite file
+(memory.db next to memory.json), enabled with JARVIS_MEMORY_BACKEND=sqlite:
+
+    conversations, tasks     indexed by (session_id, timestamp) and timestamp
+    conversations_fts        FTS5, trigram tokenizer: substring search that
+                             works for Chinese (no word segmentation needed)
+    counters                 per-topic / per-tool counts kept at insert time,
+                             so find_patterns() reads a few rows
+
+The database runs in WAL mode, so readers on the event loop never wait for
+the writer. Inserts are queued and written by one dedicated thread in
+batches (one transaction per JARVIS_SQLITE_BATCH rows or
+JARVIS_SQLITE_FLUSH seconds). Queued rows that are not committed yet are
+still visible to search().
+
+MemoryStore keeps its API: conversations / task_history stay in memory as
+the recent window (the agent reads them directly), the full history lives
+here.
+
+Usage:
+    history = SQLiteHistory("~/.jarvis/memory.db")
+    history.add_conversation(entry)
+    history.search("天气", limit=5)      # most recent first
+    history.flush(); history.close()
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from jarvis_assistant.core.semantic_memory import TOPIC_CUES
+
+BATCH_SIZE = int(os.getenv("JARVIS_SQLITE_BATCH", "512"))        # Rows per transaction
+FLUSH_INTERVAL = float(os.getenv("JARVIS_SQLITE_FLUSH", "0.2"))  # Max seconds a row waits
+CANDIDATES = 2000   # Rows per term handed to semantic scoring (most recent first)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT,
+    session_id TEXT,
+    role TEXT,
+    content TEXT,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS conversations_session_ts ON conversations(session_id, timestamp);
+CREATE INDEX IF NOT EXISTS conversations_ts ON conversations(timestamp);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT,
+    session_id TEXT,
+    task TEXT,
+    steps TEXT,
+    result TEXT,
+    success INTEGER
+);
+CREATE INDEX IF NOT EXISTS tasks_session_ts ON tasks(session_id, timestamp);
+CREATE INDEX IF NOT EXISTS tasks_ts ON tasks(timestamp);
+CREATE TABLE IF NOT EXISTS counters (
+    kind TEXT,
+    key TEXT,
+    count INTEGER,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+"""
+
+# External-content FTS table kept in step with conversations by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts
+    USING fts5(content, content='conversations', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS conversations_ai AFTER INSERT ON conversations BEGIN
+    INSERT INTO conversations_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS conversations_ad AFTER DELETE ON conversations BEGIN
+    INSERT INTO conversations_fts(conversations_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+"""
+
+
+def _topics(entry: Dict[str, Any]) -> List[str]:
+    """Topics an assistant reply counts toward (same rule as find_patterns)"""
+    if entry.get('role') != 'assistant':
+        return []
+    content = entry.get('content', '')
+    return [topic for topic, cues in TOPIC_CUES.items() if any(cue in content for cue in cues)]
+
+
+def _like(text: str) -> str:
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class SQLiteHistory:
+    """Conversation / task history in SQLite, written in batches by one thread"""
+
+    def __init__(self, path, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._read: Optional[sqlite3.Connection] = self._connect()
+        self._read_lock = threading.Lock()
+        self._read.executescript(SCHEMA)
+        try:
+            self._read.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False  # SQLite < 3.34 (no trigram): LIKE scans instead
+            print("⚠️ SQLite has no FTS5 trigram tokenizer, history search falls back to LIKE")
+        self._read.commit()
+
+        # Ids are assigned here, so rows still queued can be told apart from committed ones
+        self._next_id = {
+            'conv': (self._read.execute("SELECT MAX(id) FROM conversations").fetchone()[0] or 0) + 1,
+            'task': (self._read.execute("SELECT MAX(id) FROM tasks").fetchone()[0] or 0) + 1,
+        }
+        self._pending: Dict[int, Dict[str, Any]] = {}   # Conversation id -> entry, not committed yet
+        self._pending_lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None  # Started by the first write, stopped by close()
+        self.stats = {"rows": 0, "batches": 0, "searches": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL: durable at checkpoints, never corrupt
+        return conn
+
+    # ------------------------------------------------------------
+    # Writes (queued; the writer thread commits them in batches)
+    # ------------------------------------------------------------
+
+    def add_conversation(self, entry: Dict[str, Any]) -> None:
+        row_id = self._next_id['conv']
+        self._next_id['conv'] += 1
+        with self._pending_lock:
+            self._pending[row_id] = entry
+        self._put('conv', (row_id, entry))
+
+    def add_task(self, entry: Dict[str, Any]) -> None:
+        row_id = self._next_id['task']
+        self._next_id['task'] += 1
+        self._put('task', (row_id, entry))
+
+    def import_history(self, conversations: Iterable[Dict[str, Any]], tasks: Iterable[Dict[str, Any]]) -> None:
+        """Queue existing entries (first start on this backend)"""
+        for entry in conversations:
+            self.add_conversation(entry)
+        for entry in tasks:
+            self.add_task(entry)
+
+    def clear_session(self, session_id: str) -> None:
+        self._put('clear', session_id)
+
+    def _put(self, op: str, value: Any) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run, name="memory-sqlite", daemon=True)
+            self._writer.start()
+        self._queue.put((op, value))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is committed"""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """
+        Commit what is queued, stop the writer and close the connections
+        (an evicted session's store must not keep a thread). Using the
+        history again reopens it.
+        """
+        if self._writer is not None:
+            self._queue.put(('close', None))
+            self._writer.join()
+            self._writer = None
+        with self._read_lock:
+            if self._read is not None:
+                self._read.close()
+                self._read = None
+
+    def _run(self) -> None:
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1][0] not in ('flush', 'close'):
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(conn, batch)
+            except Exception as e:
+                print(f"⚠️ Failed to save memory history: {e}")
+            for op, value in batch:
+                if op == 'flush':
+                    value.set()
+                elif op == 'close':
+                    conn.close()
+                    return
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[str, Any]]) -> None:
+        convs, tasks, committed = [], [], []
+        topics, tools = Counter(), Counter()
+
+        def write_rows():
+            if convs:
+                conn.executemany("INSERT OR IGNORE INTO conversations VALUES (?, ?, ?, ?, ?, ?)", convs)
+            if tasks:
+                conn.executemany("INSERT OR IGNORE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)", tasks)
+            for kind, counts in (('topic', topics), ('tool', tools)):
+                conn.executemany(
+                    "INSERT INTO counters VALUES (?, ?, ?) "
+                    "ON CONFLICT(kind, key) DO UPDATE SET count = count + excluded.count",
+                    [(kind, key, n) for key, n in counts.items()])
+            convs.clear(); tasks.clear(); topics.clear(); tools.clear()
+
+        with conn:  # One transaction for the whole batch
+            for op, value in batch:
+                if op == 'conv':
+                    row_id, e = value
+                    metadata = json.dumps(e['metadata'], ensure_ascii=False) if e.get('metadata') else None
+                    convs.append((row_id, e.get('timestamp'), e.get('session_id'), e.get('role'),
+                                  e.get('content', ''), metadata))
+                    topics.update(_topics(e))
+                    committed.append(row_id)
+                elif op == 'task':
+                    row_id, e = value
+                    steps = e.get('steps') or []
+                    tasks.append((row_id, e.get('timestamp'), e.get('session_id'), e.get('task'),
+                                  json.dumps(steps, ensure_ascii=False), e.get('result'), int(bool(e.get('success')))))
+                    tools.update(step for step in steps if step)
+                elif op == 'clear':
+                    write_rows()  # Rows queued before the clear belong to it
+                    conn.execute("DELETE FROM conversations WHERE session_id = ?", (value,))
+                    self._recount_topics(conn)
+            write_rows()
+        self.stats["batches"] += 1
+        self.stats["rows"] += len(committed)
+        with self._pending_lock:
+            for row_id in committed:
+                self._pending.pop(row_id, None)
+
+    def _recount_topics(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM counters WHERE kind = 'topic'")
+        for topic, cues in TOPIC_CUES.items():
+            where = " OR ".join("content LIKE ?" for _ in cues)
+            count = conn.execute(f"SELECT COUNT(*) FROM conversations WHERE role = 'assistant' AND ({where})",
+                                 [_like(cue) for cue in cues]).fetchone()[0]
+            if count:
+                conn.execute("INSERT INTO counters VALUES ('topic', ?, ?)", (topic, count))
+
+    # ------------------------------------------------------------
+    # Reads (event loop thread; WAL readers never block on the writer)
+    # ------------------------------------------------------------
+
+    def _query(self, sql: str, params=()) -> List[tuple]:
+        with self._read_lock:
+            if self._read is None:
+                self._read = self._connect()
+            return self._read.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _conversation(row: tuple) -> Dict[str, Any]:
+        entry = {'timestamp': row[1], 'session_id': row[2], 'role': row[3], 'content': row[4]}
+        if row[5]:
+            entry['metadata'] = json.loads(row[5])
+        return entry
+
+    @staticmethod
+    def _task(row: tuple) -> Dict[str, Any]:
+        return {'timestamp': row[1], 'session_id': row[2], 'task': row[3],
+                'steps': json.loads(row[4]), 'result': row[5], 'success': bool(row[6])}
+
+    def _matching_ids(self, text: str, limit: int) -> List[int]:
+        """Ids of conversations containing text (case-insensitive), newest first"""
+        if self.fts and len(text) >= 3:
+            rows = self._query("SELECT rowid FROM conversations_fts WHERE conversations_fts MATCH ? "
+                               "ORDER BY rowid DESC LIMIT ?", ('"' + text.replace('"', '""') + '"', limit))
+        else:
+            # Trigrams need 3 characters: shorter terms (二字词 like 天气) scan, newest first
+            rows = self._query("SELECT id FROM conversations WHERE content LIKE ? ESCAPE '\\' "
+                               "ORDER BY id DESC LIMIT ?", (_like(text), limit))
+        return [row[0] for row in rows]
+
+    def _fetch(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        found = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self._query(f"SELECT * FROM conversations WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            found.update((row[0], self._conversation(row)) for row in rows)
+        return found
+
+    def _pending_matches(self, terms: List[str]) -> Dict[int, Dict[str, Any]]:
+        with self._pending_lock:
+            pending = list(self._pending.items())
+        return {row_id: entry for row_id, entry in pending
+                if any(term in entry.get('content', '').lower() for term in terms)}
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Conversations containing query, most recent first (search_history semantics)"""
+        text = query.lower()
+        self.stats["searches"] += 1
+        hits = self._pending_matches([text])
+        hits.update(self._fetch(self._matching_ids(text, limit)))
+        return [hits[row_id] for row_id in sorted(hits, reverse=True)[:limit]]
+
+    def candidates(self, terms: Iterable[str], per_term: int = CANDIDATES) -> List[Dict[str, Any]]:
+        """
+        Conversations containing any of terms (the most recent per_term for
+        each), oldest first, for SemanticMemory to score.
+        """
+        terms = [t for t in dict.fromkeys(terms) if t]
+        self.stats["searches"] += 1
+        ids = set()
+        for term in terms:
+            ids.update(self._matching_ids(term, per_term))
+        hits = self._pending_matches(terms)
+        hits.update(self._fetch(sorted(ids)))
+        return [hits[row_id] for row_id in sorted(hits)]
+
+    def recent_conversations(self, limit: int) -> List[Dict[str, Any]]:
+        rows = self._query("SELECT * FROM conversations ORDER BY id DESC LIMIT ?", (limit,))
+        return [self._conversation(row) for row in reversed(rows)]
+
+    def recent_tasks(self, limit: int) -> List[Dict[str, Any]]:
+        rows = self._query("SELECT * FROM tasks ORDER BY id DESC LIMIT ?", (limit,))
+        return [self._task(row) for row in reversed(rows)]
+
+    def session_conversations(self, session_id: str, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """One session's turns in order (optionally after a timestamp)"""
+        rows = self._query("SELECT * FROM conversations WHERE session_id = ? AND timestamp > ? "
+                           "ORDER BY timestamp, id", (session_id, since or ""))
+        return [self._conversation(row) for row in rows]
+
+    def counters(self, kind: str) -> Dict[str, int]:
+        """'topic' or 'tool' counts over the whole history (committed rows)"""
+        rows = self._query("SELECT key, count FROM counters WHERE kind = ? ORDER BY count DESC, key", (kind,))
+        return dict(rows)
+
+    def count(self) -> Tuple[int, int]:
+        """(conversations, tasks) committed"""
+        convs = self._query("SELECT COUNT(*) FROM conversations")[0][0]
+        tasks = self._query("SELECT COUNT(*) FROM tasks")[0][0]
+        return convs, tasks
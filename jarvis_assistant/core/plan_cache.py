@@ -0,0 +1,270 @@
+"""
+Planner Decision Cache
+Remembers what the LLM planner decided for a query so that repeating the
+same (or a near-identical) question skips the planner round trip.
+
+Key   = normalised user text + fingerprint of the profile fields that steer
+        planning (location, name)
+TTL   = per intent, the shortest over all tools of the plan ("chat" for no
+        tools); a plan that uses any intent whose arguments depend on the
+        moment (timers, reminders, profile updates, sending things) is
+        never cached
+Store = ~/.jarvis/plan_cache.json, so hits survive restarts; writes are
+        batched (one per SAVE_DELAY) and done on a background thread
+
+Only consulted after the keyword/heuristic fast paths missed, i.e. right
+where the planner would otherwise be called. Queries that refer back to the
+conversation ("它", "那上海呢", "刚才那首") are planned from the history
+the planner sees, so they are neither looked up nor stored.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PLAN_CACHE_ENABLED = os.getenv("JARVIS_PLAN_CACHE", "true").lower() == "true"
+
+# Profile fields the planner actually uses to fill in arguments
+PROFILE_KEYS = ("location", "name")
+
+# Seconds; 0 = never cache
+INTENT_TTLS = {
+    "chat": 24 * 3600,
+    "get_weather": 6 * 3600,
+    "get_forecast": 6 * 3600,
+    "play_music": 24 * 3600,
+    "play_netease_music": 24 * 3600,
+    "play_music_cloud": 24 * 3600,
+    "translate": 24 * 3600,
+    "calculate": 24 * 3600,
+    "convert_unit": 24 * 3600,
+    "get_news": 3600,
+    "get_stock_price": 3600,
+    "web_search": 3600,
+    "update_user_info": 0,
+    "forget_info": 0,
+    "schedule_reminder": 0,
+    "cancel_reminder": 0,
+    "set_timer": 0,
+    "add_calendar_event": 0,
+    "send_email": 0,
+    "write_file": 0,
+    "run_command": 0,
+}
+DEFAULT_TTL = 3600
+MAX_ENTRIES = 500
+SAVE_DELAY = float(os.getenv("JARVIS_PLAN_CACHE_SAVE_DELAY", "2.0"))  # Seconds between writes of the store
+
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plan-cache")
+
+# Leading politeness/wake words and trailing particles that don't change the intent
+_PREFIXES = ("jarvis", "贾维斯", "麻烦你", "麻烦", "请你", "请", "帮我", "给我")
+_PARTICLES = "吧呢啊呀嘛哦啦了"
+_PUNCT = re.compile(r"[\s\W_]+", re.UNICODE)
+# Pronouns (as in ContextResolver), back-references and elliptical follow-ups
+_HISTORY_REFS = re.compile(r"它|他|她|这个|那个|那里|这里|刚才|刚刚|上次|上一|前面|之前|同样|^那|^换|^还有|呢$")
+
+
+def normalize_query(text: str) -> str:
+    """Fold width/case, drop punctuation, wake words and trailing particles."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _PUNCT.sub("", text)
+    stripped = True
+    while stripped:
+        stripped = False
+        for prefix in _PREFIXES:
+            if text.startswith(prefix) and len(text) > len(prefix):
+                text = text[len(prefix):]
+                stripped = True
+    return text.rstrip(_PARTICLES) or text
+
+
+def profile_fingerprint(context: Optional[Dict[str, Any]]) -> str:
+    values = [f"{key}={(context or {}).get(key, '')}" for key in PROFILE_KEYS]
+    return hashlib.sha1("|".join(values).encode("utf-8")).hexdigest()[:10]
+
+
+def plan_intent(plan: Dict[str, Any]) -> str:
+    """Intent label of a plan (stats/logs): first tool of the plan or 'chat'."""
+    for step in plan.get("steps") or []:
+        if step.get("tool"):
+            return step["tool"]
+    return "chat"
+
+
+def plan_intents(plan: Dict[str, Any]) -> List[str]:
+    """Every tool the plan uses, or ['chat'] for a plan without tools."""
+    return [step["tool"] for step in plan.get("steps") or [] if step.get("tool")] or ["chat"]
+
+
+def leans_on_history(user_input: str) -> bool:
+    """True if the query only makes sense with the conversation before it."""
+    text = unicodedata.normalize("NFKC", user_input).strip().rstrip("？?！!。.，, ")
+    return bool(_HISTORY_REFS.search(text))
+
+
+class PlanCache:
+    """
+    Persistent cache of planner decisions.
+
+    Usage:
+        cache = get_plan_cache()
+        plan = cache.get(user_input, context)
+        if plan is None:
+            plan = await planner(...)
+            cache.put(user_input, context, plan, latency_ms)
+    """
+
+    def __init__(self, path: str = "~/.jarvis/plan_cache.json", ttls: Optional[Dict[str, int]] = None,
+                 enabled: bool = PLAN_CACHE_ENABLED, max_entries: int = MAX_ENTRIES):
+        self.path = Path(path).expanduser()
+        self.ttls = {**INTENT_TTLS, **(ttls or {})}
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Running average of real planner latency, used to estimate savings
+        self.planner_ms = {"avg": 0.0, "samples": 0}
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "expired": 0, "stores": 0,
+                      "context_skips": 0, "saves": 0, "saved_ms": 0.0}
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            now = time.time()
+            self.entries = {k: v for k, v in data.get("entries", {}).items() if v.get("expires_at", 0) > now}
+            self.planner_ms = data.get("planner_ms", self.planner_ms)
+            print(f"🗂️ [PlanCache] Loaded {len(self.entries)} cached plans")
+        except Exception as e:
+            print(f"⚠️ [PlanCache] Load error: {e}")
+
+    def save(self):
+        """Write the store now (blocking); put() batches its writes through save_soon()."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self._write(self._snapshot())
+
+    def save_soon(self):
+        """Write the store within SAVE_DELAY, on the writer thread; at once without a running loop."""
+        if self._save_handle is not None:
+            return  # A write is already scheduled and will include this change
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        self._save_handle = loop.call_later(SAVE_DELAY, self._save_in_background)
+
+    def _save_in_background(self):
+        self._save_handle = None
+        _writer.submit(self._write, self._snapshot())
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """A copy of the state the writer thread can serialise while the loop keeps updating hits."""
+        return {"entries": {k: dict(v) for k, v in self.entries.items()}, "planner_ms": dict(self.planner_ms)}
+
+    def _write(self, data: Dict[str, Any]):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self.stats["saves"] += 1
+        except Exception as e:
+            print(f"⚠️ [PlanCache] Save error: {e}")
+
+    def key(self, user_input: str, context: Optional[Dict[str, Any]]) -> str:
+        return f"{normalize_query(user_input)}#{profile_fingerprint(context)}"
+
+    def ttl_for(self, intent: str) -> int:
+        return self.ttls.get(intent, DEFAULT_TTL)
+
+    def plan_ttl(self, plan: Dict[str, Any]) -> int:
+        """Shortest TTL over the plan's intents (0 if any of them must not be cached)."""
+        return min(self.ttl_for(intent) for intent in plan_intents(plan))
+
+    def get(self, user_input: str, context: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        if leans_on_history(user_input):
+            self.stats["context_skips"] += 1
+            return None
+        self.stats["lookups"] += 1
+        key = self.key(user_input, context)
+        entry = self.entries.get(key)
+        if entry and entry["expires_at"] <= time.time():
+            del self.entries[key]
+            self.stats["expired"] += 1
+            entry = None
+        if not entry:
+            self.stats["misses"] += 1
+            return None
+
+        entry["hits"] = entry.get("hits", 0) + 1
+        entry["last_hit"] = time.time()
+        self.stats["hits"] += 1
+        self.stats["saved_ms"] += self.planner_ms["avg"]
+        print(f"⚡ [PlanCache] Hit ({entry['intent']}), skipped planner (~{self.planner_ms['avg']:.0f}ms saved)")
+        return entry["plan"]
+
+    def put(self, user_input: str, context: Optional[Dict[str, Any]], plan: Dict[str, Any], latency_ms: float = 0.0):
+        """Store a planner decision; latency_ms is the planner call it came from."""
+        if latency_ms > 0:
+            n = self.planner_ms["samples"] + 1
+            self.planner_ms = {"avg": self.planner_ms["avg"] + (latency_ms - self.planner_ms["avg"]) / n, "samples": n}
+        if not self.enabled or not isinstance(plan, dict) or leans_on_history(user_input):
+            return
+
+        ttl = self.plan_ttl(plan)
+        if ttl <= 0:
+            return
+        now = time.time()
+        self.entries[self.key(user_input, context)] = {
+            "plan": plan,
+            "intent": plan_intent(plan),
+            "created_at": now,
+            "expires_at": now + ttl,
+            "hits": 0,
+        }
+        self.stats["stores"] += 1
+        if len(self.entries) > self.max_entries:
+            # Evict the least recently useful entries
+            ranked = sorted(self.entries.items(), key=lambda kv: kv[1].get("last_hit", kv[1]["created_at"]))
+            self.entries = dict(ranked[len(self.entries) - self.max_entries:])
+        self.save_soon()
+
+    def clear(self):
+        self.entries.clear()
+        self.save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["lookups"]
+        return {
+            **self.stats,
+            "entries": len(self.entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "avg_planner_ms": round(self.planner_ms["avg"], 1),
+        }
+
+
+# Singleton
+_plan_cache_instance = None
+
+def get_plan_cache() -> PlanCache:
+    global _plan_cache_instance
+    if _plan_cache_instance is None:
+        _plan_cache_instance = PlanCache()
+    return _plan_cache_instance
@@ -3,6 +3,7 @@ Semantic Classifier Preloader
 Background task to preload semantic classifier for zero perceived latency.
 """
 import asyncio
+import importlib
 import logging
 import time
 
@@ -45,3 +46,189 @@ def start_preloading():
     """
     asyncio.create_task(preload_semantic_classifier())
     logger.info("🚀 [PRELOAD] Background preloading task started")
+
+
+# ============================================================
+# Speech cache warm-up
+# ============================================================
+
+# Modules whose FIXED_REPLIES are spoken verbatim by tools
+FIXED_REPLY_MODULES = (
+    "jarvis_assistant.services.tools.info_tools",
+    "jarvis_assistant.services.tools.web_tools",
+)
+
+
+def fixed_replies() -> list:
+    """Replies spoken verbatim by the agent and tools, read from the modules that speak them."""
+    from jarvis_assistant.core.synthesis import ACKNOWLEDGED, ALL_FAILED, REMEMBERED, TIMED_OUT
+    replies = [REMEMBERED, ACKNOWLEDGED, ALL_FAILED, TIMED_OUT]
+    try:
+        from jarvis_assistant.services.doubao.client import HELLO
+        replies.insert(0, HELLO)
+    except ImportError as e:
+        logger.warning(f"⚠️ [PRELOAD] Greeting unavailable: {e}")
+    for module in FIXED_REPLY_MODULES:
+        try:
+            replies.extend(importlib.import_module(module).FIXED_REPLIES)
+        except ImportError as e:
+            # Tool not installed (optional dependency missing): it can't speak its replies either
+            logger.warning(f"⚠️ [PRELOAD] {module} unavailable: {e}")
+    return replies
+
+
+def collect_phrase_bank() -> dict:
+    """Gather every phrase known ahead of time, grouped by category."""
+    bank = {"fixed": fixed_replies()}
+
+    from jarvis_assistant.services.audio.filler import FillerPhraseManager
+    for category, phrases in FillerPhraseManager.PHRASES.items():
+        bank[f"filler_{category}"] = list(phrases)
+
+    try:
+        from jarvis_assistant.utils.comment_cache import get_cache
+        bank.update(get_cache().get_all_comments())
+    except Exception as e:
+        # Fall back to filler/fixed phrases only
+        logger.warning(f"⚠️ [PRELOAD] Comment cache unavailable: {e}")
+
+    return bank
+
+
+class SpeechCacheWarmer:
+    """
+    Pre-synthesizes a phrase bank into the speech cache in the background.
+
+    Low priority: phrases are synthesized one at a time, with a pause in
+    between, and never while the TTS client is busy with a live request.
+    New phrases can be queued at any time (e.g. freshly generated comments).
+    """
+
+    def __init__(self, tts=None, pause: float = 0.3):
+        if tts is None:
+            from jarvis_assistant.services.doubao.tts_v3 import DoubaoTTSV1
+            tts = DoubaoTTSV1()
+        self.tts = tts
+        self.pause = pause
+        self.phrases = {}  # category -> [phrase]
+        self.failed = set()
+        self.last_coverage = {}
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def add_phrases(self, category: str, phrases) -> int:
+        """Queue phrases for synthesis; returns how many were new."""
+        bucket = self.phrases.setdefault(category, [])
+        added = 0
+        for phrase in phrases:
+            if phrase and phrase not in bucket:
+                bucket.append(phrase)
+                self._queue.put_nowait(phrase)
+                added += 1
+        return added
+
+    def on_comments_added(self, added: dict) -> None:
+        """CommentCache listener: refresh newly generated comments."""
+        count = sum(self.add_phrases(category, comments) for category, comments in added.items())
+        if count:
+            logger.info(f"🔄 [PRELOAD] Queued {count} new comments for speech cache")
+
+    def coverage(self) -> dict:
+        """Cached/total phrase counts per category plus overall ratio."""
+        report = {}
+        cached_total = total = 0
+        for category, phrases in self.phrases.items():
+            cached = sum(1 for p in phrases if self.tts.is_cached(p))
+            report[category] = {"cached": cached, "total": len(phrases)}
+            cached_total += cached
+            total += len(phrases)
+        report["overall"] = {
+            "cached": cached_total,
+            "total": total,
+            "ratio": round(cached_total / total, 3) if total else 0.0,
+        }
+        self.last_coverage = report
+        return report
+
+    def start(self, delay: float = 5.0):
+        """Start the warm-up loop in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(delay))
+        return self._task
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _wait_until_idle(self):
+        lock = getattr(self.tts, "lock", None)
+        while lock is not None and lock.locked():
+            await asyncio.sleep(self.pause)
+
+    async def _warm(self, phrase: str) -> bool:
+        if self.tts.is_cached(phrase):
+            return True
+        await self._wait_until_idle()
+        try:
+            async for _ in self.tts.synthesize(phrase):
+                pass
+        except Exception as e:
+            logger.warning(f"⚠️ [PRELOAD] Failed to synthesize '{phrase}': {e}")
+        ok = self.tts.is_cached(phrase)
+        if not ok:
+            self.failed.add(phrase)
+        return ok
+
+    async def _run(self, delay: float):
+        # Wait for system to stabilize
+        await asyncio.sleep(delay)
+        try:
+            while True:
+                phrase = await self._queue.get()
+                start = time.time()
+                warmed = 0
+                while True:
+                    if await self._warm(phrase):
+                        warmed += 1
+                    await asyncio.sleep(self.pause)
+                    if self._queue.empty():
+                        break
+                    phrase = self._queue.get_nowait()
+
+                overall = self.coverage()["overall"]
+                elapsed = time.time() - start
+                msg = (f"Speech cache coverage {overall['cached']}/{overall['total']} "
+                       f"({overall['ratio']:.0%}), warmed {warmed} in {elapsed:.1f}s")
+                logger.info(f"✅ [PRELOAD] {msg}")
+                print(f"✅ [PRELOAD] {msg}")
+        except asyncio.CancelledError:
+            pass
+
+
+_speech_warmer = None
+
+
+def get_speech_warmer():
+    """Get the active speech cache warmer (None before start)"""
+    return _speech_warmer
+
+
+def start_speech_cache_warmup(tts=None, delay: float = 5.0) -> SpeechCacheWarmer:
+    """
+    Pre-synthesize comment, filler and fixed-reply phrases into the speech
+    cache after boot, and keep it fresh as new comments are generated.
+    """
+    global _speech_warmer
+    if _speech_warmer is None:
+        _speech_warmer = SpeechCacheWarmer(tts)
+        for category, phrases in collect_phrase_bank().items():
+            _speech_warmer.add_phrases(category, phrases)
+        try:
+            from jarvis_assistant.utils.comment_cache import get_cache
+            get_cache().add_listener(_speech_warmer.on_comments_added)
+        except Exception as e:
+            logger.warning(f"⚠️ [PRELOAD] Comment refresh hook unavailable: {e}")
+    _speech_warmer.start(delay)
+    logger.info("🚀 [PRELOAD] Speech cache warm-up task started")
+    return _speech_warmer
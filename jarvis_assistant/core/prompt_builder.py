@@ -0,0 +1,242 @@
+"""
+Planner Prompt Builder
+Assembles the planning prompt so that its leading tokens stay identical
+across turns, which is what provider-side prefix/context caching keys on:
+
+1. Static prefix   - persona, guidelines, instructions, tool list (precomputed)
+2. Profile block   - user context; changes rarely
+3. Volatile turn   - language requirement, history, recalled memory, user request
+
+The static prefix and profile block are fingerprinted. When Ark context
+caching is available, the two stable sections are registered once as a
+context and each turn only sends the volatile part.
+"""
+
+import hashlib
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from jarvis_assistant.utils.deadline import budget_timeout
+
+CONTEXT_CACHE_ENABLED = os.getenv("JARVIS_ARK_CONTEXT_CACHE", "true").lower() == "true"
+CONTEXT_TTL = int(os.getenv("JARVIS_ARK_CONTEXT_TTL", "3600"))
+# After a failed context create, retry no sooner than this
+CONTEXT_RETRY_AFTER = 600
+
+PLANNER_PERSONA = """You are Jarvis, a warm and intelligent assistant who truly knows the user.
+
+**Personalization Guidelines**:
+1. When answering questions, naturally use the user's background as examples when relevant
+2. If the topic relates to their project/research, acknowledge the connection
+3. Use a friendly, conversational tone (像朋友一样，不要用"您")
+4. Don't mechanically repeat user info - weave it naturally into responses
+5. Occasionally (not every time) show care about their ongoing projects"""
+
+PLANNER_INSTRUCTIONS = """[INSTRUCTIONS]
+1. Analyze if the user request requires tool usage based on history and intent.
+2. If the user mentions updating their info (location, name, etc), use 'update_user_info'.
+3. If user mentions a project/research/learning focus, it will be automatically saved.
+4. For weather/location queries, prioritize the user's location from [USER CONTEXT] if no city is specified.
+5. If tools are needed, respond with a JSON object containing the steps. Steps run in parallel; if a step
+   needs the output of an earlier step, add "depends_on": [index of that step, 0-based].
+6. If it's a simple conversational response, return: {"steps": []}.
+
+Response (JSON only)."""
+
+LANG_ZH = "**CRITICAL REQUIREMENT**: User input is in Chinese (中文). You MUST respond in Chinese (中文) ONLY. Do NOT use English."
+LANG_EN = "**CRITICAL REQUIREMENT**: User input is in English. You MUST respond in English ONLY. Do NOT use Chinese."
+
+PROFILE_FIELDS = [
+    ("project", "Current Project"),
+    ("learning", "Learning Focus"),
+    ("research_area", "Research Area"),
+    ("location", "Location"),
+    ("name", "Name"),
+]
+
+
+def fingerprint(text: str) -> str:
+    """Short stable hash of a prompt section."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def is_chinese(text: str) -> bool:
+    return any('\u4e00' <= char <= '\u9fff' for char in text)
+
+
+@dataclass
+class PlannerPrompt:
+    """One turn's planning prompt, split by stability."""
+    static_prefix: str
+    profile_block: str
+    volatile: str
+    prefix_fingerprint: str
+    profile_fingerprint: str
+
+    @property
+    def stable_fingerprint(self) -> str:
+        return f"{self.prefix_fingerprint}-{self.profile_fingerprint}"
+
+    def stable_messages(self) -> List[Dict[str, str]]:
+        """The cacheable leading messages (identical across turns)."""
+        return [
+            {"role": "system", "content": self.static_prefix},
+            {"role": "system", "content": self.profile_block},
+        ]
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Full message list for a plain chat/completions call."""
+        return self.stable_messages() + [{"role": "user", "content": self.volatile}]
+
+
+@dataclass
+class TurnUsage:
+    """Token accounting for one planner call."""
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    context_cache: bool = False
+    latency_ms: float = 0.0
+    prefix_fingerprint: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def cache_hit(self) -> bool:
+        return self.context_cache or self.cached_tokens > 0
+
+
+class PlannerPromptBuilder:
+    """
+    Builds planner prompts with a precomputed static prefix.
+
+    Usage:
+        builder = PlannerPromptBuilder(agent.tools)
+        prompt = builder.build(user_input, history, memory.get_context_for_response())
+        messages = prompt.messages()
+    """
+
+    def __init__(self, tools: Dict[str, Any], max_tools: int = 20):
+        self.tools = tools
+        self.max_tools = max_tools
+        self._tool_signature = None
+        self.static_prefix = ""
+        self.prefix_fingerprint = ""
+        self._profile_cache = (None, "", "")  # (context items, block, fingerprint)
+        self._refresh_static()
+
+        self.turns: deque = deque(maxlen=200)
+        self.stats = {"turns": 0, "cache_hits": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+
+    def _refresh_static(self):
+        """Recompute the static prefix only when the tool set changed."""
+        names = tuple(list(self.tools)[:self.max_tools])
+        if names == self._tool_signature:
+            return
+        self._tool_signature = names
+        tool_descriptions = "\n".join(
+            f"- {name}: {self.tools[name].description}" for name in names
+        )
+        self.static_prefix = f"{PLANNER_PERSONA}\n\n[AVAILABLE TOOLS]\n{tool_descriptions}\n\n{PLANNER_INSTRUCTIONS}"
+        self.prefix_fingerprint = fingerprint(self.static_prefix)
+
+    def profile_block(self, context: Optional[Dict[str, Any]]) -> tuple:
+        """User context block and its fingerprint (memoized on the field values)."""
+        items = tuple((key, str(context[key])) for key, _ in PROFILE_FIELDS if context and key in context)
+        if items == self._profile_cache[0]:
+            return self._profile_cache[1], self._profile_cache[2]
+        labels = dict(PROFILE_FIELDS)
+        lines = [f"**{labels[key]}**: {value}" for key, value in items]
+        body = "\n".join(lines) if lines else "暂无用户背景信息"
+        block = f"[USER CONTEXT] (Use this background to personalize your responses)\n{body}"
+        self._profile_cache = (items, block, fingerprint(block))
+        return block, self._profile_cache[2]
+
+    def build(self, user_input: str, history: str, context: Optional[Dict[str, Any]],
+              recalled: str = "") -> PlannerPrompt:
+        self._refresh_static()
+        block, block_fp = self.profile_block(context)
+        lang_req = LANG_ZH if is_chinese(user_input) else LANG_EN
+        # Recalled memory changes every turn, so it stays in the volatile part
+        memory = f"[RELEVANT MEMORY] (earlier turns / facts related to this request)\n{recalled}\n\n" if recalled else ""
+        volatile = (
+            f"{lang_req}\n\n"
+            f"[CONVERSATION HISTORY]\n{history}\n\n"
+            f"{memory}"
+            f"[USER REQUEST]\n\"{user_input}\""
+        )
+        return PlannerPrompt(self.static_prefix, block, volatile, self.prefix_fingerprint, block_fp)
+
+    def record(self, usage: TurnUsage):
+        """Add one turn's token/caching numbers to the running totals."""
+        self.turns.append(usage)
+        self.stats["turns"] += 1
+        self.stats["cache_hits"] += int(usage.cache_hit)
+        self.stats["prompt_tokens"] += usage.prompt_tokens
+        self.stats["cached_tokens"] += usage.cached_tokens
+        self.stats["completion_tokens"] += usage.completion_tokens
+        print(f"📊 [Planner] prompt {usage.prompt_tokens} tok (cached {usage.cached_tokens}), "
+              f"completion {usage.completion_tokens}, context cache {'hit' if usage.context_cache else 'off'}, "
+              f"{usage.latency_ms:.0f}ms")
+
+    def get_stats(self) -> Dict[str, Any]:
+        turns = self.stats["turns"]
+        return {
+            **self.stats,
+            "cache_hit_rate": round(self.stats["cache_hits"] / turns, 3) if turns else 0.0,
+            "cached_token_ratio": round(self.stats["cached_tokens"] / self.stats["prompt_tokens"], 3)
+            if self.stats["prompt_tokens"] else 0.0,
+            "prefix_fingerprint": self.prefix_fingerprint,
+        }
+
+
+class ArkContextCache:
+    """
+    Ark context caching (common-prefix mode).
+
+    Registers the stable messages once per fingerprint via /context/create and
+    reuses the returned context id until shortly before its TTL. If the
+    endpoint is unavailable (model without context caching, other providers)
+    it backs off and callers fall back to plain chat/completions.
+    """
+
+    def __init__(self, base_url: str, ttl: int = CONTEXT_TTL, enabled: bool = CONTEXT_CACHE_ENABLED):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.enabled = enabled
+        self._contexts: Dict[str, tuple] = {}  # fingerprint -> (context_id, expires_at)
+        self._unavailable_until = 0.0
+
+    async def get_context_id(self, session, headers: Dict, model: str, prompt: PlannerPrompt) -> Optional[str]:
+        if not self.enabled or time.time() < self._unavailable_until:
+            return None
+        key = f"{model}:{prompt.stable_fingerprint}"
+        cached = self._contexts.get(key)
+        if cached and cached[1] > time.time():
+            return cached[0]
+
+        payload = {
+            "model": model,
+            "messages": prompt.stable_messages(),
+            "mode": "common_prefix",
+            "ttl": self.ttl,
+        }
+        try:
+            async with session.post(f"{self.base_url}/context/create", headers=headers, json=payload, timeout=budget_timeout(10)) as resp:
+                if resp.status != 200:
+                    raise RuntimeError(f"HTTP {resp.status}: {(await resp.text())[:200]}")
+                data = await resp.json()
+            context_id = data["id"]
+        except Exception as e:
+            print(f"⚠️ [Planner] Context cache unavailable, sending full prompt: {e}")
+            self._unavailable_until = time.time() + CONTEXT_RETRY_AFTER
+            return None
+
+        # Refresh a minute before the server forgets it
+        self._contexts[key] = (context_id, time.time() + max(60, self.ttl - 60))
+        return context_id
+
+    def invalidate(self, context_id: str):
+        self._contexts = {k: v for k, v in self._contexts.items() if v[0] != context_id}
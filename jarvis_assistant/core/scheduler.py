@@ -12,14 +12,18 @@ from datetime import datetime
 from typing import List, Dict, Callable, Any, Optional
 from pathlib import Path
 
+from jarvis_assistant.core.session import current_session
+
 
 class ScheduledTask:
-    def __init__(self, task_id: str, description: str, interval: int = 0, next_run: float = 0, task_type: str = "interval"):
+    def __init__(self, task_id: str, description: str, interval: int = 0, next_run: float = 0, task_type: str = "interval",
+                 session_id: Optional[str] = None):
         self.task_id = task_id
         self.description = description  # Natural language description
         self.interval = interval        # In seconds
         self.next_run = next_run        # Unix timestamp
         self.task_type = task_type      # 'interval', 'one_off', 'cron'
+        self.session_id = session_id    # Conversation that asked for it (None = default)
         self.enabled = True
 
     def to_dict(self) -> Dict[str, Any]:
@@ -29,6 +33,7 @@ class ScheduledTask:
             "interval": self.interval,
             "next_run": self.next_run,
             "task_type": self.task_type,
+            "session_id": self.session_id,
             "enabled": self.enabled
         }
 
@@ -39,7 +44,8 @@ class ScheduledTask:
             description=data["description"],
             interval=data["interval"],
             next_run=data["next_run"],
-            task_type=data.get("task_type", "interval")
+            task_type=data.get("task_type", "interval"),
+            session_id=data.get("session_id")
         )
         task.enabled = data.get("enabled", True)
         return task
@@ -94,16 +100,20 @@ class Scheduler:
             description: What to do (e.g., "Check weather", "Stretch posture")
             interval_seconds: Repeat interval (0 for one-off)
             delay_seconds: How many seconds from now to start
+        
+        A task added during a session's turn triggers in that session.
         """
         task_id = str(uuid.uuid4())[:8]
         next_run = time.time() + delay_seconds
+        session = current_session()
         
         task = ScheduledTask(
             task_id=task_id,
             description=description,
             interval=interval_seconds,
             next_run=next_run,
-            task_type="interval" if interval_seconds > 0 else "one_off"
+            task_type="interval" if interval_seconds > 0 else "one_off",
+            session_id=session.session_id if session else None
         )
         
         self.tasks[task_id] = task
@@ -119,8 +129,11 @@ class Scheduler:
             return True
         return False
 
-    def set_callback(self, callback: Callable[[str], Any]):
-        """Set the function to call when a task triggers (usually Agent.run)"""
+    def set_callback(self, callback: Callable[..., Any]):
+        """
+        Set the function to call when a task triggers (usually Agent.handle_trigger).
+        Session tasks call it as callback(prompt, session_id=...).
+        """
         self.agent_callback = callback
 
     async def start(self):
@@ -157,7 +170,11 @@ class Scheduler:
                         print(f"⏰ [Real-Time Event] Executing: {task.description}")
                         
                         # We run this as a background task
-                        asyncio.create_task(self.agent_callback(f"System Trigger: {task.description}"))
+                        prompt = f"System Trigger: {task.description}"
+                        if task.session_id:
+                            asyncio.create_task(self.agent_callback(prompt, session_id=task.session_id))
+                        else:
+                            asyncio.create_task(self.agent_callback(prompt))
                     except Exception as e:
                         print(f"❌ Task execution error: {e}")
             
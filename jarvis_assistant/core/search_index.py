@@ -0,0 +1,186 @@
+"""
+Search Index
+In-memory BM25 inverted index over conversation turns, for
+SemanticMemory.semantic_search:
+
+    tokens      Latin / digits: lowercase words; CJK: character bigrams
+                ("北京天气" -> 北京 京天 天气), so Chinese matches without
+                a segmenter
+    postings    term -> doc ids (ascending) + term frequencies, in arrays;
+                add() appends, so indexing a turn is O(its tokens)
+    scoring     BM25 (k1, b), times a recency boost that halves every
+                JARVIS_BM25_HALF_LIFE turns
+
+Queries process terms rarest first and stop admitting new candidates
+after JARVIS_BM25_ACCUMULATORS documents (later, commoner terms only add
+to the candidates found so far; a term's newest postings are admitted
+first). The cost of a query depends on that limit, not on the history.
+
+Doc ids are positions in MemoryStore.conversations. The index is saved
+inside the memory snapshot (to_dict / from_dict, posting lists packed as
+strings) and rebuilt when the snapshot has none.
+
+Usage:
+    index = BM25Index()
+    index.add("北京天气怎么样")           # doc 0
+    index.search("北京天气", limit=5)     # [(doc id, score), ...]
+"""
+
+import heapq
+import math
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+K1 = 1.2
+B = 0.75
+ACCUMULATORS = int(os.getenv("JARVIS_BM25_ACCUMULATORS", "300"))   # Candidate documents per query
+RECENCY_WEIGHT = float(os.getenv("JARVIS_BM25_RECENCY", "0.5"))     # Boost for the newest turn (+50%)
+HALF_LIFE = float(os.getenv("JARVIS_BM25_HALF_LIFE", "200"))        # Turns until the boost halves
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"   # Kana, CJK ideographs, Hangul
+_TOKEN = re.compile(f"([{_CJK}]+)|([^\\W{_CJK}]+)")
+
+
+def tokenize(text: str) -> List[str]:
+    """Words for Latin text, character bigrams for CJK runs (a lone character stays a unigram)"""
+    tokens = []
+    for cjk, word in _TOKEN.findall(text.lower()):
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def _pack(numbers: Iterable[int]) -> str:
+    """Space-separated ints: compact in the (indented) snapshot JSON"""
+    return " ".join(map(str, numbers))
+
+
+def _unpack(text: str) -> array:
+    return array("I", map(int, text.split()))
+
+
+class BM25Index:
+    """Incremental BM25 index; documents are numbered in the order they are added"""
+
+    def __init__(self):
+        self.postings: Dict[str, Tuple[array, array]] = {}   # term -> (doc ids, tfs)
+        self.lengths = array("I")                            # Tokens per doc
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, text: str) -> int:
+        """Index one document, returns its id"""
+        doc = len(self.lengths)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array("I"), array("I"))
+            entry[0].append(doc)
+            entry[1].append(tf)
+        length = sum(counts.values())
+        self.lengths.append(length)
+        self.total_length += length
+        return doc
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "BM25Index":
+        index = cls()
+        for text in texts:
+            index.add(text)
+        return index
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[int, float]]:
+        """Top documents for query as (doc id, score), best first"""
+        n = len(self.lengths)
+        if not n:
+            return []
+        avgdl = self.total_length / n or 1.0
+        lengths = self.lengths
+
+        terms = []
+        for term in set(tokenize(query)):
+            entry = self.postings.get(term)
+            if entry is not None:
+                df = len(entry[0])
+                terms.append((math.log(1 + (n - df + 0.5) / (df + 0.5)), entry))
+        terms.sort(key=lambda t: t[0], reverse=True)  # Rarest first
+
+        # BM25 term weight: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avgdl))
+        norm_base, norm_len = K1 * (1 - B), K1 * B / avgdl
+        scores: Dict[int, float] = {}
+        get = scores.get
+        for idf, (docs, tfs) in terms:
+            if len(scores) < ACCUMULATORS:
+                start = max(0, len(docs) - ACCUMULATORS)  # Newest postings of a common term
+                pairs = zip(docs[start:], tfs[start:])
+            elif len(docs) <= len(scores) * 4:
+                pairs = [(d, tf) for d, tf in zip(docs, tfs) if d in scores]
+            else:
+                pairs = self._lookup(docs, tfs, scores)
+            weight = idf * (K1 + 1)
+            for d, tf in pairs:
+                scores[d] = get(d, 0.0) + weight * tf / (tf + norm_base + norm_len * lengths[d])
+
+        # Recency boost: x(1 + RECENCY_WEIGHT) for the newest turn, halving every HALF_LIFE turns
+        decay, exp, newest = math.log(2) / HALF_LIFE, math.exp, n - 1
+        boosted = [(d, s + s * RECENCY_WEIGHT * exp(decay * (d - newest))) for d, s in scores.items()]
+        return heapq.nlargest(limit, boosted, key=lambda item: item[1])
+
+    @staticmethod
+    def _lookup(docs: array, tfs: array, scores: Dict[int, float]) -> List[Tuple[int, int]]:
+        """tf of a long posting list for the current candidates only (binary search)"""
+        pairs = []
+        size = len(docs)
+        for d in scores:
+            i = bisect_left(docs, d)
+            if i < size and docs[i] == d:
+                pairs.append((d, tfs[i]))
+        return pairs
+
+    # ------------------------------------------------------------
+    # Persistence (inside the memory snapshot)
+    # ------------------------------------------------------------
+
+    def to_dict(self, start: int = 0) -> Dict[str, Any]:
+        """Docs from start on, renumbered from 0"""
+        return self.export(start)()
+
+    def export(self, start: int = 0) -> Callable[[], Dict[str, Any]]:
+        """
+        to_dict() of the docs indexed so far, as a function safe to run on the
+        snapshot thread while add() carries on: the arrays are append-only and
+        only their first docs are read; the term list is taken here.
+        """
+        postings, lengths, end = self.postings, self.lengths, len(self.lengths)
+        terms = list(postings)
+
+        def serialize() -> Dict[str, Any]:
+            out = {}
+            for term in terms:
+                docs, tfs = postings[term]
+                lo, hi = bisect_left(docs, start), bisect_left(docs, end)
+                if lo < hi:
+                    out[term] = [_pack(d - start for d in docs[lo:hi]), _pack(tfs[lo:hi])]
+            return {'docs': end - start, 'lengths': _pack(lengths[start:end]), 'postings': out}
+
+        return serialize
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25Index":
+        index = cls()
+        index.lengths = _unpack(data['lengths'])
+        index.total_length = sum(index.lengths)
+        index.postings = {term: (_unpack(docs), _unpack(tfs))
+                          for term, (docs, tfs) in data['postings'].items()}
+        return index
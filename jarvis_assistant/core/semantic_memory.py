@@ -1,6 +1,13 @@
 """
 Semantic Memory Enhancement
 Adds semantic search capability to memory store
+
+semantic_search ranks with the store's BM25 index (core/search_index.py);
+recall() finds turns and profile facts by embedding similarity
+(core/vector_memory.py), for the planner prompt.
+With the SQLite backend (JARVIS_MEMORY_BACKEND=sqlite) candidates come
+from its full-text index and the pattern counts from its counters, over
+the whole history instead of the in-memory window.
 """
 
 import json
@@ -8,6 +15,13 @@ from typing import List, Dict, Any
 from datetime import datetime
 import re
 
+# Assistant replies mentioning any cue count toward the topic (find_patterns)
+TOPIC_CUES = {
+    "weather": ("天气",),
+    "time": ("时间", "几点"),
+    "calculator": ("计算",),
+}
+
 
 class SemanticMemory:
     """Enhanced memory with semantic search and pattern recognition"""
@@ -19,14 +33,30 @@ class SemanticMemory:
         """
         Search conversations using semantic similarity
         
-        Currently uses keyword matching with smart scoring.
-        Future: Can be upgraded to use embeddings for true semantic search.
+        Ranked by BM25 over words and CJK bigrams with a recency boost
+        (MemoryStore.search_index); the SQLite backend scores its full-text
+        candidates by keyword overlap. For similarity by meaning see recall().
         """
+        index = getattr(self.memory, 'search_index', None)
+        if index is not None:
+            if len(index) != len(self.memory.conversations):
+                self.memory.reindex()  # The list was replaced outside add_conversation
+                index = self.memory.search_index
+            conversations = self.memory.conversations
+            return [conversations[doc] for doc, _ in index.search(query, limit)]
+        
         query_lower = query.lower()
         query_words = set(re.findall(r'\w+', query_lower))
         
+        history = getattr(self.memory, 'history', None)
+        if history is not None:
+            # Only rows containing a query word (or the query) can score above 0
+            conversations = history.candidates([query_lower, *query_words])
+        else:
+            conversations = self.memory.conversations
+        
         scored_convs = []
-        for conv in self.memory.conversations:
+        for conv in conversations:
             content = conv.get('content', '').lower()
             
             # Score based on word overlap
@@ -45,6 +75,29 @@ class SemanticMemory:
         
         return [conv for score, conv in scored_convs[:limit]]
     
+    def recall(self, query: str, limit: int = 3, skip_recent: int = 6) -> List[Dict[str, Any]]:
+        """
+        Past turns and profile facts closest to query by embedding (cosine),
+        best first; the last skip_recent turns are left out (the prompt
+        already has them). Empty when embedding recall is off.
+        """
+        vectors = getattr(self.memory, 'vectors', None)
+        if vectors is None:
+            return []
+        recent = [c.get('timestamp') for c in self.memory.conversations[-skip_recent:]] if skip_recent else []
+        return vectors.search(query, limit, exclude=recent)
+    
+    def recall_context(self, query: str, limit: int = 3) -> str:
+        """recall() as prompt lines ("" when nothing is relevant enough)"""
+        lines = []
+        for item in self.recall(query, limit):
+            if item['kind'] == 'fact':
+                lines.append(f"- (profile) {item['text']}")
+            else:
+                day = (item.get('timestamp') or '')[:10]
+                lines.append(f"- [{day} {item.get('role', '')}] {item['text'][:200]}")
+        return "\n".join(lines)
+    
     def find_patterns(self) -> Dict[str, Any]:
         """
         Recognize patterns in user behavior
@@ -59,6 +112,12 @@ class SemanticMemory:
             "user_preferences": {}
         }
         
+        history = getattr(self.memory, 'history', None)
+        if history is not None:
+            patterns["common_topics"] = history.counters('topic')
+            patterns["frequent_tools"] = history.counters('tool')
+            return patterns
+        
         # Analyze conversations
         for conv in self.memory.conversations:
             content = conv.get('content', '')
@@ -67,12 +126,9 @@ class SemanticMemory:
             # Count tool usage from assistant responses
             if role == 'assistant':
                 # Simple tool detection
-                if '天气' in content:
-                    patterns["common_topics"]["weather"] = patterns["common_topics"].get("weather", 0) + 1
-                if '时间' in content or '几点' in content:
-                    patterns["common_topics"]["time"] = patterns["common_topics"].get("time", 0) + 1
-                if '计算' in content:
-                    patterns["common_topics"]["calculator"] = patterns["common_topics"].get("calculator", 0) + 1
+                for topic, cues in TOPIC_CUES.items():
+                    if any(cue in content for cue in cues):
+                        patterns["common_topics"][topic] = patterns["common_topics"].get(topic, 0) + 1
         
         # Analyze task history for tool usage
         for task in self.memory.task_history:
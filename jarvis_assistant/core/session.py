@@ -0,0 +1,238 @@
+"""
+Conversation Sessions
+One process, many concurrent conversations. A SessionContext holds what
+belongs to one conversation:
+
+    memory (conversations, task history, profile, rolling summary)
+    feedback (mistakes to avoid, preferred tools)
+    context resolver state
+    a turn lock (turns of one conversation run in order)
+
+while JarvisAgent keeps what every session shares: tools and the plugin
+manager, the LLM router and its HTTP sessions, the keyword automaton, the
+plan and tool caches, the step executor and TTS.
+
+The session of the running turn is a contextvar, so get_memory() and
+get_feedback_manager() (used by tools like update_user_info and by the
+memory agent) resolve to the session's own stores without a session
+argument on every call. Outside a session they return the process-wide
+stores, so single-user mode is unchanged.
+
+Usage:
+    sessions = get_session_manager()
+    reply = await sessions.run("alice", "我在青岛市，天气怎么样")
+
+    # or, around any agent call:
+    async with sessions.get("alice").turn():
+        await agent.run(text)
+"""
+
+import asyncio
+import contextvars
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+SESSION_ROOT = os.getenv("JARVIS_SESSION_DIR", "~/.jarvis/sessions")
+MAX_SESSIONS = int(os.getenv("JARVIS_MAX_SESSIONS", "256"))
+# Idle sessions beyond MAX_SESSIONS are closed oldest first; their stores stay on disk
+IDLE_TTL = float(os.getenv("JARVIS_SESSION_IDLE_TTL", "1800"))
+
+_current: contextvars.ContextVar = contextvars.ContextVar("jarvis_session", default=None)
+
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def current_session() -> Optional["SessionContext"]:
+    """The session of the turn being processed, if any."""
+    return _current.get()
+
+
+class SessionContext:
+    """Per-conversation state; everything expensive lives on the shared agent."""
+
+    def __init__(self, session_id: str, memory, feedback):
+        self.session_id = session_id
+        self.memory = memory
+        self.feedback = feedback
+        self._summarizer = None
+        self._semantic_memory = None
+        self._context_resolver = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.created = time.time()
+        self.last_active = self.created
+        self.turns = 0
+        self.active_turns = 0
+
+    @classmethod
+    def open(cls, session_id: str, root: str = SESSION_ROOT) -> "SessionContext":
+        """Session with its own stores under root/<session_id>/ (reloaded if they exist)."""
+        from jarvis_assistant.core.memory import MemoryStore
+        from jarvis_assistant.core.feedback_manager import FeedbackManager
+
+        directory = Path(root).expanduser() / (_SAFE_ID.sub("_", session_id) or "_")
+        directory.mkdir(parents=True, exist_ok=True)
+        memory = MemoryStore(str(directory / "memory.json"), markdown_path=str(directory / "MEMORY.md"))
+        memory.session_id = session_id
+        return cls(session_id, memory, FeedbackManager(str(directory / "feedback.json")))
+
+    @property
+    def summarizer(self):
+        if self._summarizer is None:
+            from jarvis_assistant.core.conversation_summary import RollingSummarizer
+            self._summarizer = RollingSummarizer(self.memory)
+        return self._summarizer
+
+    @property
+    def semantic_memory(self):
+        if self._semantic_memory is None:
+            from jarvis_assistant.core.semantic_memory import enhance_memory
+            self._semantic_memory = enhance_memory(self.memory)
+        return self._semantic_memory
+
+    @property
+    def context_resolver(self):
+        if self._context_resolver is None:
+            from jarvis_assistant.core.context_resolver import ContextResolver
+            self._context_resolver = ContextResolver()
+        return self._context_resolver
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def activate(self) -> contextvars.Token:
+        """Make this the current session (release() with the returned token)."""
+        return _current.set(self)
+
+    def release(self, token: contextvars.Token):
+        _current.reset(token)
+
+    @asynccontextmanager
+    async def turn(self):
+        """One turn of this conversation: serialized with its other turns, session current."""
+        async with self.lock:
+            token = self.activate()
+            self.active_turns += 1
+            self.last_active = time.time()
+            try:
+                yield self
+            finally:
+                self.active_turns -= 1
+                self.turns += 1
+                self.last_active = time.time()
+                self.release(token)
+
+    @property
+    def busy(self) -> bool:
+        return self.active_turns > 0 or (self._lock is not None and self._lock.locked())
+
+    def close(self):
+        """Flush the session's stores (it can be reopened from disk later)."""
+        self.memory.close()
+        self.feedback.save()
+
+
+class SessionManager:
+    """
+    Open sessions by id, with LRU eviction of idle ones.
+
+    Usage:
+        manager = SessionManager()
+        reply = await manager.run("alice", "今天天气怎么样")
+    """
+
+    def __init__(
+        self,
+        agent_factory: Optional[Callable[[], Any]] = None,
+        root: str = SESSION_ROOT,
+        max_sessions: int = MAX_SESSIONS,
+        idle_ttl: float = IDLE_TTL
+    ):
+        self.agent_factory = agent_factory
+        self.root = root
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, SessionContext]" = OrderedDict()
+        self.stats = {"opened": 0, "evicted": 0, "turns": 0}
+
+    @property
+    def agent(self):
+        if self.agent_factory is None:
+            from jarvis_assistant.core.agent import get_agent
+            self.agent_factory = get_agent
+        return self.agent_factory()
+
+    def get(self, session_id: str) -> SessionContext:
+        """The open session with this id, opening (or reopening) it if needed."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = SessionContext.open(session_id, self.root)
+            self._sessions[session_id] = session
+            self.stats["opened"] += 1
+            self._evict()
+        else:
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def _evict(self):
+        now = time.time()
+        for session_id, session in list(self._sessions.items()):
+            if len(self._sessions) <= self.max_sessions:
+                break
+            if not session.busy:
+                session.close()
+                del self._sessions[session_id]
+                self.stats["evicted"] += 1
+        # Long-idle sessions go even below the limit
+        for session_id, session in list(self._sessions.items()):
+            if now - session.last_active > self.idle_ttl and not session.busy:
+                session.close()
+                del self._sessions[session_id]
+                self.stats["evicted"] += 1
+
+    async def run(self, session_id: str, user_input: str, stream_callback: Optional[Callable] = None) -> str:
+        """Answer one turn of a conversation."""
+        agent = self.agent  # Built outside the session: its default stores are the process-wide ones
+        session = self.get(session_id)
+        async with session.turn():
+            self.stats["turns"] += 1
+            return await agent.run(user_input, stream_callback)
+
+    def close(self, session_id: Optional[str] = None):
+        """Close one session (or all)."""
+        for sid in [session_id] if session_id else list(self._sessions):
+            session = self._sessions.pop(sid, None)
+            if session is not None:
+                session.close()
+
+    def release(self, session_id: str):
+        """Close a session its client has left, unless a turn still runs on it (idle eviction closes it then)."""
+        session = self._sessions.get(session_id)
+        if session is not None and not session.busy:
+            self.close(session_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "open": len(self._sessions),
+            "busy": sum(1 for s in self._sessions.values() if s.busy),
+        }
+
+
+# Singleton instance
+_session_manager_instance: Optional[SessionManager] = None
+
+
+def get_session_manager() -> SessionManager:
+    """Get the shared session manager"""
+    global _session_manager_instance
+    if _session_manager_instance is None:
+        _session_manager_instance = SessionManager()
+    return _session_manager_instance
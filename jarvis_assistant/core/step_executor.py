@@ -0,0 +1,209 @@
+"""
+Dependency-Aware Step Executor
+Runs the steps of an ExecutionPlan as a DAG instead of one after another:
+
+    "特斯拉和苹果的股价"  ->  get_stock_price(TSLA) ┐
+                            get_stock_price(AAPL) ┘ concurrently
+
+A step starts as soon as the steps it depends on have finished, under a
+global and a per-tool concurrency limit, and retries on its own. Results
+stay in plan order, so synthesize() reads them exactly as before and turn
+latency becomes the slowest step instead of the sum of all steps.
+
+Dependencies come from the planner ("depends_on": [indices]) plus two
+implicit rules: steps of a SERIAL_TOOLS tool keep their relative order
+(music, lights, files...), and a PROFILE_WRITERS step finishes before any
+later step (e.g. "我在青岛市，天气怎么样").
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from jarvis_assistant.utils.deadline import budget_exhausted
+
+MAX_CONCURRENCY = int(os.getenv("JARVIS_STEP_CONCURRENCY", "4"))
+TOOL_CONCURRENCY = int(os.getenv("JARVIS_TOOL_CONCURRENCY", "2"))
+MAX_RETRIES = 2
+
+# Tools with side effects: one at a time, in plan order
+SERIAL_TOOLS = {
+    "play_music", "play_music_cloud", "play_netease_music",
+    "control_light", "control_thermostat", "activate_scene", "control_xiaomi_light",
+    "write_file", "send_email", "run_command",
+    "update_user_info", "forget_info",
+}
+# Tools whose result later steps may read (through the user profile)
+PROFILE_WRITERS = {"update_user_info", "forget_info"}
+# Per-tool limits that differ from TOOL_CONCURRENCY
+TOOL_LIMITS = {"get_stock_price": 4, **{name: 1 for name in SERIAL_TOOLS}}
+
+
+def status_value(step) -> str:
+    """A step status as its plain string value ("success", "failed", ...)."""
+    return getattr(step.status, "value", step.status)
+
+
+def _set_status(step, value: str):
+    # PlanStep.status is a StepStatus enum; build the member from its value
+    step.status = type(step.status)(value)
+
+
+def dependencies(steps: List[Any]) -> List[List[int]]:
+    """Indices each step waits for (explicit depends_on plus implicit rules)."""
+    deps = []
+    last_of_tool: Dict[str, int] = {}
+    writers: List[int] = []
+    for i, step in enumerate(steps):
+        needs = {d for d in getattr(step, "depends_on", None) or [] if isinstance(d, int) and 0 <= d < i}
+        needs.update(writers)
+        tool = step.tool_name
+        if tool in SERIAL_TOOLS and tool in last_of_tool:
+            needs.add(last_of_tool[tool])
+        if tool:
+            last_of_tool[tool] = i
+        if tool in PROFILE_WRITERS:
+            writers.append(i)
+        deps.append(sorted(needs))
+    return deps
+
+
+class StepExecutor:
+    """
+    Concurrent plan executor with global/per-tool limits and per-step retries.
+
+    Usage:
+        executor = StepExecutor()
+        results = await executor.run(plan.steps, lambda step: agent.execute_step(step, stream_callback))
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        tool_limits: Optional[Dict[str, int]] = None,
+        default_tool_limit: int = TOOL_CONCURRENCY,
+        max_retries: int = MAX_RETRIES
+    ):
+        self.max_concurrency = max_concurrency
+        self.tool_limits = TOOL_LIMITS if tool_limits is None else tool_limits
+        self.default_tool_limit = default_tool_limit
+        self.max_retries = max_retries
+        self._global: Optional[asyncio.Semaphore] = None
+        self._per_tool: Dict[str, asyncio.Semaphore] = {}
+        self._loop = None
+        self._running = 0
+        self.stats = {"plans": 0, "steps": 0, "retries": 0, "skipped": 0,
+                      "max_parallel": 0, "step_ms": 0.0, "wall_ms": 0.0}
+
+    def _semaphores(self, tool: Optional[str]):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Semaphores belong to the loop they were first used on
+            self._global = asyncio.Semaphore(self.max_concurrency)
+            self._per_tool = {}
+            self._loop = loop
+        key = tool or ""
+        if key not in self._per_tool:
+            limit = self.tool_limits.get(tool, self.default_tool_limit) if tool else self.max_concurrency
+            self._per_tool[key] = asyncio.Semaphore(max(1, limit))
+        return self._global, self._per_tool[key]
+
+    async def run_step(self, step, execute: Callable[[Any], Awaitable[Optional[str]]], label: str = "") -> Optional[str]:
+        """Run one step under the concurrency limits, retrying while it fails."""
+        result, _ = await self._run_step(step, execute, label)
+        return result
+
+    async def _run_step(self, step, execute, label: str):
+        global_limit, tool_limit = self._semaphores(step.tool_name)
+        async with global_limit, tool_limit:
+            self._running += 1
+            self.stats["max_parallel"] = max(self.stats["max_parallel"], self._running)
+            t0 = time.time()
+            try:
+                print(f"🔄 Step {label}: {step.description}")
+                _set_status(step, "running")
+                result = await execute(step)
+                # No retries once the turn budget is spent
+                while status_value(step) == "failed" and step.retry_count < self.max_retries and not budget_exhausted():
+                    step.retry_count += 1
+                    self.stats["retries"] += 1
+                    print(f"⚠️ Step {label} failed, retrying... ({step.retry_count}/{self.max_retries})")
+                    _set_status(step, "retrying")
+                    result = await execute(step)
+                return result, (time.time() - t0) * 1000
+            finally:
+                self._running -= 1
+                self.stats["steps"] += 1
+
+    async def run(
+        self,
+        steps: List[Any],
+        execute: Callable[[Any], Awaitable[Optional[str]]],
+        on_done: Optional[Callable[[int, Any], Awaitable[None]]] = None
+    ) -> List[Optional[str]]:
+        """
+        Execute all steps as a DAG.
+        
+        on_done(index, step) is awaited as each step finishes (or is skipped),
+        e.g. to speak its result before the slower steps are done.
+
+        Returns:
+            Step results in plan order (None for failed or skipped steps)
+        """
+        if not steps:
+            return []
+        deps = dependencies(steps)
+        tasks: List[asyncio.Task] = []
+        t0 = time.time()
+
+        async def run_after(i: int) -> Optional[str]:
+            result = await run_step_after_deps(i)
+            if on_done is not None:
+                await on_done(i, steps[i])
+            return result
+
+        async def run_step_after_deps(i: int) -> Optional[str]:
+            if deps[i]:
+                await asyncio.gather(*(tasks[d] for d in deps[i]), return_exceptions=True)
+                failed = [d + 1 for d in deps[i] if status_value(steps[d]) != "success"]
+                if failed:
+                    _set_status(steps[i], "failed")
+                    steps[i].error = f"skipped: step {', '.join(map(str, failed))} failed"
+                    self.stats["skipped"] += 1
+                    return None
+            result, elapsed_ms = await self._run_step(steps[i], execute, f"{i + 1}/{len(steps)}")
+            self.stats["step_ms"] += elapsed_ms
+            return result
+
+        # Dependencies always point backwards, so creating tasks in order is enough
+        for i in range(len(steps)):
+            tasks.append(asyncio.create_task(run_after(i)))
+        try:
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        results = []
+        for step, outcome in zip(steps, outcomes):
+            if isinstance(outcome, BaseException):
+                _set_status(step, "failed")
+                step.error = step.error or str(outcome)
+                outcome = None
+            results.append(outcome)
+
+        self.stats["plans"] += 1
+        self.stats["wall_ms"] += (time.time() - t0) * 1000
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus how much step time concurrency hid from the user."""
+        step_ms, wall_ms = self.stats["step_ms"], self.stats["wall_ms"]
+        return {
+            **self.stats,
+            "step_ms": round(step_ms, 1),
+            "wall_ms": round(wall_ms, 1),
+            "saved_ms": round(max(0.0, step_ms - wall_ms), 1),
+        }
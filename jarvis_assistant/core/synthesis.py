@@ -0,0 +1,156 @@
+"""
+Progressive Synthesis
+Speaks each step's result as soon as it can be said in order, instead of
+formatting everything after the slowest tool returns:
+
+    weather (120ms) ┐           "北京今天晴…"           spoken at ~120ms
+    news    (900ms) ┘  ──────►  "今日要闻…"             spoken at ~900ms
+
+The wording is the same as JarvisAgent.synthesize(): results in plan order,
+several stock quotes merged into one sentence (spoken first), honest
+failure messages. Conversational steps stream their own reply, so they are
+part of the final text but not re-emitted.
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Callable, List, Optional, Set
+
+from jarvis_assistant.core.step_executor import status_value
+from jarvis_assistant.core.tool_calling import emit
+
+STOCK_TOOL = "get_stock_price"
+ALL_FAILED = "抱歉，我无法完成这个请求。"
+NOTHING_TO_SAY = "Task completed."
+# Spoken when the turn budget ran out before anything could be said
+TIMED_OUT = "抱歉，这次处理超时了，请稍后再试一次。"
+# Conversational replies when no LLM answer is available
+REMEMBERED = "收到，先生。我会记在心里。"
+ACKNOWLEDGED = "收到，先生。我会继续关注您的需求。"
+
+_STOCK_QUOTE = re.compile(r'([^\。]+（[^\)]+）现价[^。]+。)')
+
+
+def stock_fragment(result: str) -> str:
+    """
+    The price sentence of a stock result, without the comment around it.
+    Format: "评论。 公司（代码）现价 X USD，今日上涨/下跌了 Y%。"
+    """
+    match = _STOCK_QUOTE.search(result)
+    return match.group(1).strip() if match else result
+
+
+def failure_fragment(step) -> str:
+    """Be honest about failures - don't hallucinate success."""
+    if step.tool_name:
+        return f"抱歉，{step.tool_name}执行失败: {step.error or 'unknown error'}"
+    return f"⚠️ {step.description} failed"
+
+
+def speaking_order(steps: List[Any]) -> List[int]:
+    """Several stock steps are merged and spoken first, the rest in plan order."""
+    stocks = [i for i, step in enumerate(steps) if step.tool_name == STOCK_TOOL]
+    if len(stocks) > 1:
+        return stocks + [i for i, step in enumerate(steps) if step.tool_name != STOCK_TOOL]
+    return list(range(len(steps)))
+
+
+class ProgressiveSynthesis:
+    """
+    Emits step fragments through stream_callback as they become speakable.
+
+    Usage:
+        synthesis = ProgressiveSynthesis(plan.steps, stream_callback)
+        await executor.run(plan.steps, execute, on_done=synthesis.step_done)
+        final_text = await synthesis.finish()
+
+    Failures are held back until something succeeded, so an all-failed turn
+    is still spoken as one clear apology. `touch(text)` may return a phrase
+    to append once everything else has been said (personal touch).
+    """
+
+    def __init__(self, steps: List[Any], stream_callback: Optional[Callable],
+                 touch: Optional[Callable[[str], str]] = None):
+        self.steps = steps
+        self.stream_callback = stream_callback
+        self.touch = touch
+        self.order = speaking_order(steps)
+        self.merge_stocks = sum(step.tool_name == STOCK_TOOL for step in steps) > 1
+        self._done: Set[int] = set()
+        self._cursor = 0
+        self._held: List[str] = []
+        self._parts: List[str] = []       # Fragments said so far (with their separators)
+        self._last_stock = False
+        self._succeeded = False
+        self._failed = 0
+        self._lock = asyncio.Lock()
+        self.started = time.time()
+        self.first_fragment_ms: Optional[float] = None
+
+    async def step_done(self, index: int, step: Any) -> None:
+        """Executor callback: speak everything that is now next in line."""
+        self._done.add(index)
+        async with self._lock:
+            while self._cursor < len(self.order) and self.order[self._cursor] in self._done:
+                await self._speak_step(self.steps[self.order[self._cursor]])
+                self._cursor += 1
+
+    async def finish(self) -> str:
+        """Flush whatever is left and return the full text that was said."""
+        async with self._lock:
+            while self._cursor < len(self.order):
+                await self._speak_step(self.steps[self.order[self._cursor]])
+                self._cursor += 1
+
+            if not self._succeeded:
+                if self.steps and self._failed == len(self.steps):
+                    await self._say(ALL_FAILED + "\n".join(self._held), "")
+                    return "".join(self._parts)
+                for fragment in self._held:
+                    await self._say(fragment)
+                self._held = []
+            if not self._parts:
+                await self._say(NOTHING_TO_SAY)
+
+            if self.touch:
+                phrase = self.touch("".join(self._parts))
+                if phrase:
+                    await self._say(phrase, "")
+        return "".join(self._parts)
+
+    async def _speak_step(self, step) -> None:
+        status = status_value(step)
+        is_stock = self.merge_stocks and step.tool_name == STOCK_TOOL
+        if status == "success" and step.result:
+            self._succeeded = True
+            for fragment in self._held:
+                await self._say(fragment)
+            self._held = []
+            if step.tool_name is None:
+                # Conversational reply was streamed by the step itself
+                self._record(step.result, "\n")
+            elif is_stock:
+                await self._say(stock_fragment(step.result), " " if self._last_stock else "\n")
+            else:
+                await self._say(step.result)
+            self._last_stock = is_stock
+        elif status == "failed":
+            self._failed += 1
+            if is_stock:
+                return  # Merged stock quotes skip failed symbols, like synthesize()
+            if self._succeeded:
+                await self._say(failure_fragment(step))
+            else:
+                self._held.append(failure_fragment(step))
+
+    async def _say(self, fragment: str, separator: str = "\n") -> None:
+        text = self._record(fragment, separator)
+        if self.first_fragment_ms is None:
+            self.first_fragment_ms = (time.time() - self.started) * 1000
+        await emit(self.stream_callback, text)
+
+    def _record(self, fragment: str, separator: str) -> str:
+        text = (separator if self._parts else "") + fragment
+        self._parts.append(text)
+        return text
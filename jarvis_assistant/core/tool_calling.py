@@ -0,0 +1,115 @@
+"""
+Single-Round-Trip Tool Calling
+Helpers for the "tool_calling" planner mode: one streaming chat/completions
+request carries every tool's get_schema(), and the model either answers
+directly (text deltas go straight to TTS) or emits tool calls, which are
+dispatched as soon as their arguments are complete instead of after the
+whole response has arrived.
+
+Enable with JARVIS_PLANNER_MODE=tool_calling (default "plan": JSON planner,
+then execute, then respond).
+"""
+
+import inspect
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+PLANNER_MODE = os.getenv("JARVIS_PLANNER_MODE", "plan").lower()
+
+
+@dataclass
+class ToolCall:
+    """One streamed tool call being assembled."""
+    index: int
+    id: str = ""
+    name: str = ""
+    arguments: str = ""
+
+    def args(self) -> Dict[str, Any]:
+        try:
+            parsed = json.loads(self.arguments) if self.arguments.strip() else {}
+        except json.JSONDecodeError:
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
+
+    def is_complete(self) -> bool:
+        """Arguments form a full JSON object (checked cheaply before parsing)."""
+        text = self.arguments.strip()
+        if not self.name or not text.endswith("}"):
+            return False
+        try:
+            json.loads(text)
+            return True
+        except json.JSONDecodeError:
+            return False
+
+
+class ToolCallAssembler:
+    """
+    Accumulates `delta.tool_calls` fragments from a chat/completions stream.
+
+    feed() returns the calls that just became complete - either their
+    arguments parse as a JSON object, or the model moved on to a later call
+    index - so each call is handed out exactly once. finish() flushes the rest
+    when the stream ends.
+    """
+
+    def __init__(self):
+        self.calls: Dict[int, ToolCall] = {}
+        self._dispatched = set()
+
+    def feed(self, deltas: List[Dict[str, Any]]) -> List[ToolCall]:
+        for delta in deltas:
+            index = delta.get("index", len(self.calls))
+            call = self.calls.setdefault(index, ToolCall(index=index))
+            call.id = delta.get("id") or call.id
+            function = delta.get("function") or {}
+            call.name = function.get("name") or call.name
+            call.arguments += function.get("arguments") or ""
+
+        latest = max(self.calls) if self.calls else -1
+        return self._take(lambda call: call.index < latest or call.is_complete())
+
+    def finish(self) -> List[ToolCall]:
+        return self._take(lambda call: bool(call.name))
+
+    def _take(self, ready) -> List[ToolCall]:
+        done = []
+        for index in sorted(self.calls):
+            call = self.calls[index]
+            if index not in self._dispatched and ready(call):
+                self._dispatched.add(index)
+                done.append(call)
+        return done
+
+
+def tool_schemas(tools: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """OpenAI function-format schemas for every loaded tool."""
+    schemas = []
+    for name, tool in tools.items():
+        try:
+            schema = tool.get_schema()
+        except Exception as e:
+            print(f"⚠️ [ToolCalling] Schema error for {name}: {e}")
+            continue
+        if not schema:
+            continue
+        if "function" not in schema:
+            schema = {"type": "function", "function": schema}
+        schemas.append(schema)
+    return schemas
+
+
+async def emit(callback: Optional[callable], chunk: str):
+    """Invoke a sync or async stream callback, never letting it break the stream."""
+    if not callback:
+        return
+    try:
+        if inspect.iscoroutinefunction(callback):
+            await callback(chunk)
+        else:
+            callback(chunk)
+    except Exception as e:
+        print(f"⚠️ Callback error: {e}")
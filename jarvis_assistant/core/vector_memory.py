@@ -0,0 +1,388 @@
+"""
+Vector Memory
+Embedding recall over conversation turns and profile facts, so the
+planner can be given the past turns that are actually relevant:
+
+    memory.vectors/matrix.f16     float16 rows, memory-mapped (capacity doubles)
+    memory.vectors/items.jsonl    one line per row (kind, text, timestamp...) and
+                                  drop records (cleared session, replaced fact)
+    memory.vectors/manifest.json  encoder name + dim; another encoder re-embeds
+
+Texts are queued and batch-encoded (core/embeddings.py) on the
+"memory-embed" worker thread, which also writes the rows; a row's line
+is appended only after its vector is on disk. Queries run on the caller's
+thread: encode the query, then a brute-force matrix product over the
+float16 rows (converted to float32 a chunk at a time into one reused
+buffer) and an argpartition top-k. The conversion, not the product,
+is most of the cost: about 1 µs per row on a slow core.
+
+Large histories can be partitioned (JARVIS_EMBED_IVF=on, or auto from
+JARVIS_EMBED_IVF_MIN rows): spherical k-means centroids are trained on a
+sample on the worker, each row goes to the list of its nearest centroid,
+and a query scans only the JARVIS_EMBED_IVF_PROBES nearest lists. The
+partition is retrained whenever the history doubles.
+
+Usage:
+    vectors = VectorMemory("~/.jarvis/memory.vectors")
+    vectors.add_conversation(entry)
+    vectors.set_facts({"basics.location": "location: 青岛"})
+    vectors.search("上次说的那个项目", limit=3)   # [{"kind", "text", "score", ...}]
+"""
+
+import json
+import math
+import os
+import threading
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from jarvis_assistant.core.embeddings import get_encoder, normalize
+
+BATCH_SIZE = int(os.getenv("JARVIS_EMBED_BATCH", "64"))              # Texts per encoder call
+IVF_MODE = os.getenv("JARVIS_EMBED_IVF", "auto").lower()             # auto | on | off
+IVF_MIN_ROWS = int(os.getenv("JARVIS_EMBED_IVF_MIN", "20000"))      # auto: partition from this size
+IVF_PROBES = int(os.getenv("JARVIS_EMBED_IVF_PROBES", "8"))          # Lists scanned per query
+MIN_SCORE = float(os.getenv("JARVIS_EMBED_MIN_SCORE", "0.35"))       # Cosine below this is not recalled
+MAX_TEXT = 500        # Characters of a turn kept (and embedded)
+SCAN_CHUNK = 4096     # Rows converted to float32 at a time (the buffer stays in cache)
+
+# One worker for every store: encoding and row writes happen in submission order
+_embed_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-embed")
+
+
+class IVFIndex:
+    """Inverted file: rows bucketed by nearest centroid"""
+
+    def __init__(self, centroids: np.ndarray):
+        self.centroids = centroids
+        self.lists = [array("I") for _ in range(len(centroids))]
+        self.rows = 0
+
+    @classmethod
+    def train(cls, matrix: np.ndarray, count: int, iterations: int = 10, seed: int = 0) -> "IVFIndex":
+        """Spherical k-means on a sample (about 64 rows per list), then assign every row"""
+        nlist = int(min(1024, max(16, math.sqrt(count))))
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(count, size=min(count, nlist * 64), replace=False))
+        points = matrix[sample].astype(np.float32)
+        centroids = points[rng.choice(len(points), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(points @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, points)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]  # Keep a centroid that lost all its points
+            centroids = normalize(sums)
+        index = cls(centroids)
+        for start in range(0, count, SCAN_CHUNK):
+            end = min(count, start + SCAN_CHUNK)
+            index.add(matrix[start:end].astype(np.float32), start)
+        return index
+
+    def add(self, vectors: np.ndarray, first_row: int) -> None:
+        for offset, label in enumerate(np.argmax(vectors @ self.centroids.T, axis=1).tolist()):
+            self.lists[label].append(first_row + offset)
+        self.rows = first_row + len(vectors)
+
+    def candidates(self, query: np.ndarray, probes: int = IVF_PROBES) -> np.ndarray:
+        """Rows in the lists whose centroids are closest to query"""
+        nearest = np.argsort(-(self.centroids @ query))[:probes]
+        # np.array copies under the GIL: the worker may append to a list right after
+        parts = [np.array(self.lists[i], dtype=np.uint32) for i in nearest.tolist()]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint32)
+
+
+class VectorMemory:
+    """Embedded turns and facts for one memory store, float16 on disk, searched by dot product"""
+
+    def __init__(self, directory, encoder=None, ivf: str = IVF_MODE):
+        self.dir = Path(directory).expanduser()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.encoder = encoder or get_encoder()
+        self.dim = self.encoder.dim
+        self.ivf_mode = ivf
+        self._matrix_path = self.dir / "matrix.f16"
+        self._items_path = self.dir / "items.jsonl"
+        self._manifest_path = self.dir / "manifest.json"
+
+        self.items: List[Dict[str, Any]] = []     # Row -> what it embeds
+        self.count = 0                            # Rows searchable (published after the write)
+        self.capacity = 0
+        self._matrix: Optional[np.memmap] = None
+        self._deleted = set()
+        self._deleted_rows = np.empty(0, dtype=np.int64)
+        self._facts: Dict[str, int] = {}          # Fact key -> its live row
+        self._fact_text: Dict[str, str] = {}      # Fact key -> text stored or queued
+        self._ivf: Optional[IVFIndex] = None
+        self._ops: List[Tuple[str, Any]] = []
+        self._ops_lock = threading.Lock()
+        self._draining = False
+        self.last_timestamp = ""                  # Newest conversation turn embedded or queued
+        self.stats = {"rows": 0, "batches": 0, "searches": 0, "ivf_trainings": 0}
+        self._load()
+
+    # ------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------
+
+    def _load(self) -> None:
+        records = []
+        if self._items_path.exists():
+            with open(self._items_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break  # Torn last line
+        manifest = {}
+        if self._manifest_path.exists():
+            manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        current = {"encoder": self.encoder.name, "dim": self.dim}
+
+        if manifest == current and self._matrix_path.exists():
+            self.capacity = self._matrix_path.stat().st_size // (self.dim * 2)
+            if self.capacity:
+                self._matrix = np.memmap(self._matrix_path, dtype=np.float16, mode="r+",
+                                         shape=(self.capacity, self.dim))
+            for record in records:
+                if "drop" in record:
+                    self._apply_drop(record)
+                elif len(self.items) < self.capacity:
+                    self._apply_item(len(self.items), record)
+                    self.items.append(record)
+            self.count = len(self.items)
+            self._publish_deleted()
+            live = [item for row, item in enumerate(self.items) if row not in self._deleted]
+            reembed = []
+        else:
+            # New store, or another encoder: embed the live texts again
+            for record in records:
+                if "drop" in record:
+                    self._apply_drop(record)
+                else:
+                    self._apply_item(len(self.items), record)
+                    self.items.append(record)
+            live = reembed = [item for row, item in enumerate(self.items) if row not in self._deleted]
+            self.items, self._deleted, self._facts = [], set(), {}
+            for path in (self._matrix_path, self._items_path):
+                if path.exists():
+                    path.unlink()
+            self._manifest_path.write_text(json.dumps(current), encoding="utf-8")
+
+        # The worker only opens these, never creates them: a removed store stays removed
+        self._matrix_path.touch()
+        self._items_path.touch()
+        for item in reembed:
+            self._submit("add", item)
+        for item in live:
+            if item["kind"] == "conv":
+                self.last_timestamp = max(self.last_timestamp, item.get("timestamp") or "")
+            else:
+                self._fact_text[item["key"]] = item["text"]
+        if self._ivf_due():
+            self._submit("train", None)
+
+    def _apply_item(self, row: int, item: Dict[str, Any]) -> None:
+        if item["kind"] == "fact":
+            old = self._facts.get(item["key"])
+            if old is not None:
+                self._deleted.add(old)  # Replaced by the new value
+            self._facts[item["key"]] = row
+
+    def _apply_drop(self, record: Dict[str, Any]) -> None:
+        if record["drop"] == "session":
+            self._deleted.update(row for row, item in enumerate(self.items)
+                                 if item["kind"] == "conv" and item.get("session_id") == record["session_id"])
+        elif record["drop"] == "fact":
+            row = self._facts.pop(record["key"], None)
+            if row is not None:
+                self._deleted.add(row)
+
+    def _publish_deleted(self) -> None:
+        self._deleted_rows = np.fromiter(sorted(self._deleted), dtype=np.int64, count=len(self._deleted))
+
+    # ------------------------------------------------------------
+    # Writes (queued; the worker encodes in batches)
+    # ------------------------------------------------------------
+
+    def add_conversation(self, entry: Dict[str, Any]) -> None:
+        text = (entry.get("content") or "")[:MAX_TEXT]
+        if not text.strip():
+            return
+        self.last_timestamp = max(self.last_timestamp, entry.get("timestamp") or "")
+        self._submit("add", {"kind": "conv", "text": text, "role": entry.get("role"),
+                             "timestamp": entry.get("timestamp"), "session_id": entry.get("session_id")})
+
+    def catch_up(self, conversations: Iterable[Dict[str, Any]]) -> int:
+        """Queue turns newer than anything embedded (first start, or a crash before the worker ran)"""
+        since = self.last_timestamp
+        queued = 0
+        for entry in conversations:
+            if (entry.get("timestamp") or "") > since:
+                self.add_conversation(entry)
+                queued += 1
+        return queued
+
+    def set_facts(self, facts: Dict[str, str]) -> None:
+        """Make the embedded facts match facts (key -> sentence); only changes are queued"""
+        for key, text in facts.items():
+            if self._fact_text.get(key) != text:
+                self._fact_text[key] = text
+                self._submit("add", {"kind": "fact", "key": key, "text": text[:MAX_TEXT]})
+        for key in [k for k in self._fact_text if k not in facts]:
+            del self._fact_text[key]
+            self._submit("drop", {"drop": "fact", "key": key})
+
+    def drop_session(self, session_id: str) -> None:
+        self._submit("drop", {"drop": "session", "session_id": session_id})
+
+    def _submit(self, op: str, value: Any) -> None:
+        with self._ops_lock:
+            self._ops.append((op, value))
+            if self._draining:
+                return  # The running drain picks it up
+            self._draining = True
+        _embed_worker.submit(self._drain)
+
+    def _drain(self) -> None:
+        while True:
+            with self._ops_lock:
+                ops, self._ops = self._ops, []
+                if not ops:
+                    self._draining = False
+                    return
+            try:
+                self._process(ops)
+            except Exception as e:
+                if self.dir.exists():  # Else the store was deleted under us
+                    print(f"⚠️ Failed to embed memory: {e}")
+
+    def _process(self, ops: List[Tuple[str, Any]]) -> None:
+        batch = []
+        for op, value in ops:
+            if op == "add":
+                batch.append(value)
+                if len(batch) >= BATCH_SIZE:
+                    self._write(batch)
+                    batch = []
+                continue
+            if batch:
+                self._write(batch)
+                batch = []
+            if op == "drop":
+                self._append_lines([value])
+                self._apply_drop(value)
+                self._publish_deleted()
+        if batch:
+            self._write(batch)
+        if self._ivf_due():
+            self._train()
+
+    def _write(self, items: List[Dict[str, Any]]) -> None:
+        vectors = self.encoder.encode([item["text"] for item in items])
+        start, end = self.count, self.count + len(items)
+        if end > self.capacity:
+            self._grow(end)
+        self._matrix[start:end] = vectors.astype(np.float16)
+        self._matrix.flush()
+        self._append_lines(items)  # Only after the vectors are on disk
+        for offset, item in enumerate(items):
+            self._apply_item(start + offset, item)
+        self.items.extend(items)
+        if self._ivf is not None:
+            self._ivf.add(vectors, start)
+        self._publish_deleted()
+        self.count = end  # Readers see the rows from here on
+        self.stats["rows"] += len(items)
+        self.stats["batches"] += 1
+
+    def _grow(self, need: int) -> None:
+        capacity = max(need, self.capacity * 2, 1024)
+        with open(self._matrix_path, "r+b") as f:
+            f.truncate(capacity * self.dim * 2)
+        # Readers holding the old mapping stay valid: the file only grows
+        self._matrix = np.memmap(self._matrix_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+        self.capacity = capacity
+
+    def _append_lines(self, records: List[Dict[str, Any]]) -> None:
+        fd = os.open(self._items_path, os.O_WRONLY | os.O_APPEND)  # No O_CREAT
+        with os.fdopen(fd, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def _ivf_due(self) -> bool:
+        if self.ivf_mode == "off" or self._matrix is None:
+            return False
+        minimum = IVF_MIN_ROWS if self.ivf_mode == "auto" else 1024
+        trained = self._ivf.rows if self._ivf is not None else 0
+        return self.count >= minimum and (self._ivf is None or self.count >= 2 * trained)
+
+    def _train(self) -> None:
+        self._ivf = IVFIndex.train(self._matrix, self.count)
+        self.stats["ivf_trainings"] += 1
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until everything queued so far is embedded and written"""
+        _embed_worker.submit(lambda: None).result(timeout)
+
+    def flush_async(self) -> Future:
+        return _embed_worker.submit(lambda: None)
+
+    # ------------------------------------------------------------
+    # Search (caller's thread; reads only published rows)
+    # ------------------------------------------------------------
+
+    def search(self, query: str, limit: int = 3, kinds: Iterable[str] = (), exclude: Iterable[str] = (),
+               min_score: float = MIN_SCORE) -> List[Dict[str, Any]]:
+        """
+        Rows most similar to query, best first, as their item dicts plus
+        "score". exclude: conversation timestamps to skip (e.g. turns the
+        prompt already carries).
+        """
+        count = self.count
+        matrix, ivf, deleted = self._matrix, self._ivf, self._deleted_rows
+        if not count or not query.strip():
+            return []
+        self.stats["searches"] += 1
+        q = self.encoder.encode([query])[0]
+
+        if ivf is not None:
+            rows = ivf.candidates(q)
+            rows = rows[rows < count]
+            scores = matrix[rows].astype(np.float32) @ q if len(rows) else np.empty(0, dtype=np.float32)
+            if len(deleted):
+                scores[np.isin(rows, deleted)] = -np.inf
+        else:
+            rows = None
+            scores = np.empty(count, dtype=np.float32)
+            buffer = np.empty((min(count, SCAN_CHUNK), self.dim), dtype=np.float32)
+            for start in range(0, count, SCAN_CHUNK):
+                end = min(count, start + SCAN_CHUNK)
+                chunk = buffer[:end - start]
+                np.copyto(chunk, matrix[start:end])
+                np.dot(chunk, q, out=scores[start:end])
+            if len(deleted):
+                scores[deleted[deleted < count]] = -np.inf
+        if not len(scores):
+            return []
+
+        want = min(len(scores), limit * 4 + 8)  # Room for rows filtered out below
+        top = np.argpartition(-scores, want - 1)[:want]
+        top = top[np.argsort(-scores[top])]
+        kinds, exclude = set(kinds), set(exclude)
+        results = []
+        for i in top.tolist():
+            score = float(scores[i])
+            if score < min_score:
+                break
+            item = self.items[int(rows[i]) if rows is not None else i]
+            if (kinds and item["kind"] not in kinds) or item.get("timestamp") in exclude:
+                continue
+            results.append({**item, "score": round(score, 3)})
+            if len(results) >= limit:
+                break
+        return results
@@ -17,8 +17,7 @@ class InputInterface(ABC):
     Examples:
         - DoubaoASR: Real-time speech-to-text
         - ConsoleInput: Text input from terminal (testing)
-        - WebSocketInput: Input from web client
-        - APIInput: Input from REST API
+        - ConnectionInput: WebSocket / HTTP client (io/net/gateway.py)
     """
     
     @abstractmethod
@@ -19,8 +19,7 @@ class OutputInterface(ABC):
     Examples:
         - DoubaoTTS: Text-to-speech synthesis
         - ConsoleOutput: Print to terminal (testing)
-        - WebSocketOutput: Send to web client
-        - APIOutput: Return as REST API response
+        - ConnectionOutput: WebSocket / SSE stream (io/net/gateway.py)
     """
     
     @abstractmethod
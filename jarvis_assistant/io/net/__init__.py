@@ -0,0 +1,5 @@
+"""Network I/O: the agent over WebSocket and HTTP/SSE (many concurrent sessions)."""
+
+from .gateway import AdmissionGate, ConnectionInput, ConnectionOutput, Gateway, Overloaded
+
+__all__ = ["AdmissionGate", "ConnectionInput", "ConnectionOutput", "Gateway", "Overloaded"]
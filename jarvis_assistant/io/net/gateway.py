@@ -0,0 +1,484 @@
+"""
+Network Gateway
+Serves the agent to many clients from one asyncio server (aiohttp):
+
+    GET  /ws         WebSocket: {"text": ...} in; ready/token/status/done/error events out
+    POST /v1/chat    HTTP: {"text": ..., "session": ...} in; the same events as Server-Sent Events
+    GET  /health     gateway, admission and session stats
+
+Each connection is one conversation (core/session.py). A WebSocket keeps
+its session while it is open (?session=<id> resumes one); HTTP callers
+pass "session" to continue a conversation across requests. Tokens go out
+as the agent produces them (its stream_callback).
+
+Sending is bounded per connection: events wait in a small buffer, so a
+client that reads slowly slows down its own turn (the backpressure reaches
+the agent) and one that stops reading is dropped after SEND_TIMEOUT
+instead of buffering without limit.
+
+Admission is bounded too: at most MAX_INFLIGHT turns run at once and at
+most MAX_QUEUE wait for a slot, for at most QUEUE_WAIT seconds. Beyond
+that a turn is shed at once (HTTP 503 + Retry-After, WebSocket
+"overloaded" error) rather than queued behind work it cannot overtake.
+
+Usage:
+    python -m jarvis_assistant.io.net.gateway
+    curl -N -d '{"text": "现在几点了"}' http://127.0.0.1:8098/v1/chat
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from aiohttp import WSMsgType, web
+
+from jarvis_assistant.core.session import SessionManager
+from jarvis_assistant.interfaces import InputInterface, OutputInterface
+
+GATEWAY_HOST = os.getenv("JARVIS_GATEWAY_HOST", "127.0.0.1")
+GATEWAY_PORT = int(os.getenv("JARVIS_GATEWAY_PORT", "8098"))
+MAX_INFLIGHT = int(os.getenv("JARVIS_GATEWAY_MAX_INFLIGHT", "64"))     # Turns running at once
+MAX_QUEUE = int(os.getenv("JARVIS_GATEWAY_MAX_QUEUE", "128"))          # Turns waiting for a slot
+QUEUE_WAIT = float(os.getenv("JARVIS_GATEWAY_QUEUE_WAIT", "2.0"))      # Longest wait before shedding
+SEND_BUFFER = int(os.getenv("JARVIS_GATEWAY_SEND_BUFFER", "64"))       # Events buffered per connection
+SEND_TIMEOUT = float(os.getenv("JARVIS_GATEWAY_SEND_TIMEOUT", "10.0")) # Client not reading: drop it
+INPUT_BUFFER = 8      # Messages a WebSocket may send ahead of its turns
+RETRY_AFTER = 1       # Seconds, suggested to shed clients
+
+SSE_HEADERS = {
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+}
+
+
+class Overloaded(Exception):
+    """No turn slot within the admission limits; retry later."""
+
+    def __init__(self, reason: str, retry_after: int = RETRY_AFTER):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class SlowConsumer(ConnectionError):
+    """The client stopped reading its stream."""
+
+
+class AdmissionGate:
+    """Bounded turn concurrency with a bounded, time-limited wait."""
+
+    def __init__(self, max_inflight: int = MAX_INFLIGHT, max_queue: int = MAX_QUEUE,
+                 queue_wait: float = QUEUE_WAIT):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_wait = queue_wait
+        self._slots = asyncio.Semaphore(max_inflight)
+        self.inflight = 0
+        self.waiting = 0
+        self.stats = {"admitted": 0, "shed_queue_full": 0, "shed_wait": 0,
+                      "peak_inflight": 0, "peak_waiting": 0}
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Hold a turn slot for the duration of the block.
+
+        Raises:
+            Overloaded: the wait queue is full, or no slot freed up in time
+        """
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.stats["shed_queue_full"] += 1
+            raise Overloaded("queue full")
+        self.waiting += 1
+        self.stats["peak_waiting"] = max(self.stats["peak_waiting"], self.waiting)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_wait)
+        except asyncio.TimeoutError:
+            self.stats["shed_wait"] += 1
+            raise Overloaded("queue wait exceeded")
+        finally:
+            self.waiting -= 1
+        self.inflight += 1
+        self.stats["admitted"] += 1
+        self.stats["peak_inflight"] = max(self.stats["peak_inflight"], self.inflight)
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            self._slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "inflight": self.inflight, "waiting": self.waiting,
+                "max_inflight": self.max_inflight, "max_queue": self.max_queue}
+
+
+class ConnectionInput(InputInterface):
+    """
+    Input of one network connection: messages in arrival order.
+    The buffer is bounded, so a client sending faster than its turns finish
+    stops being read (TCP backpressure) instead of queueing without limit.
+    """
+
+    def __init__(self, buffer: int = INPUT_BUFFER):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+
+    async def feed(self, text: str):
+        await self.queue.put(text)
+
+    async def listen(self) -> str:
+        """Next message (raises EOFError once the connection is closed)."""
+        text = await self.queue.get()
+        if text is None:
+            raise EOFError("connection closed")
+        return text
+
+    async def close(self):
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass  # The conversation task is cancelled with the connection
+
+
+class ConnectionOutput(OutputInterface):
+    """
+    Output of one network connection: events into a bounded buffer that the
+    connection's writer drains. push() is the agent's stream_callback.
+    """
+
+    def __init__(self, buffer: int = SEND_BUFFER, send_timeout: float = SEND_TIMEOUT):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+        self.send_timeout = send_timeout
+        self.closed = False
+        self.tokens = 0
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+
+    def begin_turn(self):
+        self.tokens = 0
+        self.started = time.perf_counter()
+        self.first_token_at = None
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.started) * 1000
+
+    async def send(self, event: Dict[str, Any]):
+        """
+        Queue an event for the client, waiting while the buffer is full.
+
+        Raises:
+            SlowConsumer: the connection is closed or the client stopped reading
+        """
+        if self.closed:
+            raise SlowConsumer("connection closed")
+        try:
+            await asyncio.wait_for(self.queue.put(event), self.send_timeout)
+        except asyncio.TimeoutError:
+            self.close()
+            raise SlowConsumer(f"client not reading for {self.send_timeout:.0f}s")
+
+    async def push(self, chunk: str):
+        if not chunk:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.tokens += 1
+        await self.send({"type": "token", "text": chunk})
+
+    async def speak(self, text: str):
+        await self.push(text)
+
+    async def speak_stream(self, text_stream: AsyncIterator[str]):
+        async for chunk in text_stream:
+            await self.push(chunk)
+
+    async def show_thinking(self, message: str):
+        await self.send({"type": "status", "message": message})
+
+    async def end_turn(self):
+        """Let the writer finish once the turn's events are out."""
+        if self.closed:
+            return
+        try:
+            await asyncio.wait_for(self.queue.put(None), self.send_timeout)
+        except asyncio.TimeoutError:
+            self.close()
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        """Events of the current turn, until end_turn()."""
+        while True:
+            event = await self.queue.get()
+            if event is None:
+                return
+            yield event
+
+    def close(self):
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)  # Wake the writer
+        except asyncio.QueueFull:
+            pass
+
+
+class Gateway:
+    """
+    The agent behind WebSocket and HTTP/SSE, one session per connection.
+
+    Usage:
+        gateway = Gateway()
+        await gateway.start()
+    """
+
+    def __init__(
+        self,
+        sessions: Optional[SessionManager] = None,
+        gate: Optional[AdmissionGate] = None,
+        send_buffer: int = SEND_BUFFER,
+        send_timeout: float = SEND_TIMEOUT
+    ):
+        self.sessions = sessions or SessionManager()
+        self.gate = gate or AdmissionGate()
+        self.send_buffer = send_buffer
+        self.send_timeout = send_timeout
+        self._runner: Optional[web.AppRunner] = None
+        self.ttft_ms: deque = deque(maxlen=1000)
+        self._connections: Counter = Counter()  # Open WebSockets per session id
+        self.stats = {"connections": 0, "open_connections": 0, "turns": 0,
+                      "shed": 0, "dropped": 0, "errors": 0}
+
+    def new_output(self) -> ConnectionOutput:
+        return ConnectionOutput(self.send_buffer, self.send_timeout)
+
+    # ---- Turns (transport independent) ----
+
+    async def serve_turn(self, session_id: str, text: str, output: ConnectionOutput) -> str:
+        """Run one turn of a session, streaming tokens into output, then its done event."""
+        output.begin_turn()
+        reply = await self.sessions.run(session_id, text, stream_callback=output.push)
+        if not output.tokens and reply:
+            await output.push(reply)  # Fast paths answer without streaming
+        ttft = output.ttft_ms
+        if ttft is not None:
+            self.ttft_ms.append(ttft)
+        self.stats["turns"] += 1
+        await output.send({
+            "type": "done",
+            "session": session_id,
+            "text": reply,
+            "ttft_ms": round(ttft, 1) if ttft is not None else None,
+            "turn_ms": round((time.perf_counter() - output.started) * 1000, 1),
+        })
+        return reply
+
+    async def _turn(self, session_id: str, text: str, output: ConnectionOutput):
+        try:
+            await self.serve_turn(session_id, text, output)
+        except SlowConsumer:
+            pass  # The writer side drops the connection
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"⚠️ [Gateway] Turn failed: {e}")
+            try:
+                await output.send({"type": "error", "error": str(e)})
+            except SlowConsumer:
+                pass
+        finally:
+            await output.end_turn()
+
+    async def stream_turn(
+        self,
+        session_id: str,
+        text: str,
+        output: ConnectionOutput,
+        send: Callable[[Dict[str, Any]], Awaitable[Any]]
+    ) -> bool:
+        """
+        Run a turn while draining its events to the client with send().
+        Returns False if the client went away (the turn is then cancelled).
+        """
+        turn = asyncio.create_task(self._turn(session_id, text, output))
+        try:
+            async for event in output.events():
+                await asyncio.wait_for(send(event), self.send_timeout)
+        except (ConnectionError, asyncio.TimeoutError):
+            self.stats["dropped"] += 1
+            output.close()
+            return False
+        finally:
+            if not turn.done():
+                turn.cancel()
+        await asyncio.gather(turn, return_exceptions=True)
+        if output.closed:
+            self.stats["dropped"] += 1  # Stopped reading: the writer gave up
+            return False
+        return True
+
+    def shed(self, e: Overloaded) -> Dict[str, Any]:
+        self.stats["shed"] += 1
+        return {"type": "error", "error": "overloaded", "reason": e.reason, "retry_after": e.retry_after}
+
+    # ---- Transports ----
+
+    async def handle_chat(self, request: web.Request) -> web.StreamResponse:
+        """POST /v1/chat: one turn, streamed as Server-Sent Events."""
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            body = {}
+        text = str(body.get("text", "")).strip()
+        if not text:
+            return web.json_response({"error": "missing text"}, status=400)
+        session_id = str(body.get("session") or f"http-{uuid.uuid4().hex[:12]}")
+
+        try:
+            async with self.gate.admit():
+                response = web.StreamResponse(headers={**SSE_HEADERS, "X-Jarvis-Session": session_id})
+                await response.prepare(request)
+
+                async def send(event: Dict[str, Any]):
+                    data = json.dumps(event, ensure_ascii=False)
+                    await response.write(f"event: {event['type']}\ndata: {data}\n\n".encode("utf-8"))
+
+                await self.stream_turn(session_id, text, self.new_output(), send)
+                return response
+        except Overloaded as e:
+            return web.json_response(self.shed(e), status=503, headers={"Retry-After": str(e.retry_after)})
+
+    async def handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        """GET /ws: a conversation over one WebSocket."""
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        session_id = request.query.get("session") or f"ws-{uuid.uuid4().hex[:12]}"
+        inbox = ConnectionInput()
+        output = self.new_output()
+        self.stats["connections"] += 1
+        self.stats["open_connections"] += 1
+        self._connections[session_id] += 1
+        await ws.send_json({"type": "ready", "session": session_id})
+
+        conversation = asyncio.create_task(self._converse(ws, session_id, inbox, output))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                text = _message_text(msg.data)
+                if text:
+                    await inbox.feed(text)
+                if conversation.done():
+                    break  # Dropped as a slow consumer
+        finally:
+            await inbox.close()
+            conversation.cancel()
+            await asyncio.gather(conversation, return_exceptions=True)
+            output.close()
+            self._connections[session_id] -= 1
+            if not self._connections[session_id]:
+                del self._connections[session_id]
+                self.sessions.release(session_id)  # Flushed; reopened from disk if it resumes
+            self.stats["open_connections"] -= 1
+            if not ws.closed:
+                await ws.close()
+        return ws
+
+    async def _converse(self, ws: web.WebSocketResponse, session_id: str,
+                        inbox: ConnectionInput, output: ConnectionOutput):
+        while True:
+            try:
+                text = await inbox.listen()
+            except EOFError:
+                return
+            try:
+                async with self.gate.admit():
+                    if not await self.stream_turn(session_id, text, output, ws.send_json):
+                        await ws.close()
+                        return
+            except Overloaded as e:
+                await ws.send_json(self.shed(e))
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.get_stats())
+
+    # ---- Lifecycle ----
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/ws", self.handle_ws)
+        app.router.add_post("/v1/chat", self.handle_chat)
+        app.router.add_get("/health", self.handle_health)
+        return app
+
+    async def start(self, host: str = GATEWAY_HOST, port: int = GATEWAY_PORT) -> str:
+        """Start serving; returns the base URL (port 0 picks a free port)."""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        url = f"http://{bound_host}:{bound_port}"
+        print(f"✅ Gateway running: {url} (WebSocket /ws, SSE /v1/chat)")
+        return url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        self.sessions.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.ttft_ms)
+        return {
+            "gateway": {
+                **self.stats,
+                "p50_ttft_ms": round(_percentile(ordered, 0.50), 1),
+                "p95_ttft_ms": round(_percentile(ordered, 0.95), 1),
+            },
+            "admission": self.gate.get_stats(),
+            "sessions": self.sessions.get_stats(),
+        }
+
+
+def _message_text(data: str) -> str:
+    """A WebSocket message: {"text": ...} or plain text."""
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return data.strip()
+    if isinstance(payload, dict):
+        return str(payload.get("text", "")).strip()
+    return str(payload).strip()
+
+
+def _percentile(ordered, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def serve(host: str = GATEWAY_HOST, port: int = GATEWAY_PORT):
+    gateway = Gateway()
+    await gateway.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await gateway.stop()
+
+
+def main():
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n👋 Gateway stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """TTS I/O adapters."""
 
 from .doubao import DoubaoTTS, get_doubao_tts
+from .doubao_stream import DoubaoStreamingTTS, get_doubao_streaming_tts
 
-__all__ = ["DoubaoTTS", "get_doubao_tts"]
+__all__ = ["DoubaoTTS", "get_doubao_tts", "DoubaoStreamingTTS", "get_doubao_streaming_tts"]
@@ -5,7 +5,7 @@ Implements OutputInterface with persistent connection pooling.
 
 import asyncio
 import os
-from typing import AsyncIterator, Optional
+from typing import AsyncIterator, List, Optional
 from jarvis_assistant.interfaces import OutputInterface
 from jarvis_assistant.services.doubao.tts_v3 import DoubaoTTSV1
 
@@ -19,8 +19,12 @@ class DoubaoTTS(OutputInterface):
     - Sentence-level buffering (synthesize on punctuation)
     - Parallel synthesis + playback
     - Cached acknowledgment audio
+    - Speech cache for repeated phrases (see services/doubao/tts_cache.py)
     """
     
+    # Clause boundaries where a cached opener may end
+    OPENER_BOUNDARIES = "。！？!?：:…."
+    
     def __init__(self):
         """Initialize TTS client with persistent connection."""
         self.client = DoubaoTTSV1()
@@ -65,20 +69,47 @@ class DoubaoTTS(OutputInterface):
         """
         Synthesize and speak text (complete, non-streaming).
         
+        A cached opener ("帮您查到了。", "新闻来了：") at the start of the
+        text is played from the speech cache while the rest is synthesized.
+        
         Args:
             text: Text to synthesize
         """
-        await self._ensure_connected()
+        parts = self._split_opener(text)
+        
+        # Cached phrases (openers, fixed replies) need no connection at all
+        if not all(self.client.is_cached(p) for p in parts):
+            await self._ensure_connected()
         
         # Synthesize and collect all audio
         audio_chunks = []
-        async for chunk in self.client.synthesize(text):
-            audio_chunks.append(chunk)
+        for part in parts:
+            async for chunk in self.client.synthesize(part):
+                audio_chunks.append(chunk)
         
         # Play audio (simulated for now, in production use PyAudio)
         total_bytes = sum(len(c) for c in audio_chunks)
         print(f"🔊 [TTS] Playing {total_bytes} bytes of audio")
     
+    def _split_opener(self, text: str) -> List[str]:
+        """
+        Split a cached leading phrase off the text.
+        
+        Tool results are built as "<opener> <data>", e.g. stock comments
+        from CommentCache, so the opener is tried at each clause boundary.
+        
+        Returns:
+            [opener, rest] if a cached opener was found, else [text]
+        """
+        limit = min(len(text) - 1, self.client.cache.max_text_chars)
+        for i in range(limit):
+            if text[i] in self.OPENER_BOUNDARIES or text[i].isspace():
+                head = text[:i + 1].strip()
+                rest = text[i + 1:].strip()
+                if head and rest and self.client.is_cached(head):
+                    return [head, rest]
+        return [text]
+    
     async def speak_stream(self, text_stream: AsyncIterator[str]):
         """
         🚀 STREAMING: Synthesize and play text chunks in real-time.
@@ -0,0 +1,238 @@
+"""
+Doubao bidirectional streaming TTS adapter.
+Streams LLM text deltas into ONE BidirectionalTTS session per answer.
+"""
+
+import asyncio
+import re
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from jarvis_assistant.interfaces import OutputInterface
+from jarvis_assistant.services.doubao.tts_bidirection import BidirectionalTTS
+from jarvis_assistant.utils.tracing import mark
+
+
+class ClauseChunker:
+    """
+    Minimal text buffering for incremental synthesis.
+
+    Releases text as soon as it ends at a clause boundary, or once at least
+    `min_chars` are buffered and the text can be cut at a word boundary
+    (whitespace for Latin text, any character for CJK). Emotion tags such
+    as "[happy]" are held back until complete and removed from the text.
+    """
+
+    CLAUSE_ENDS = "。！？；，、：,.!?;:\n…"
+    TAG_PATTERN = re.compile(r'\[([a-zA-Z_\-]+)\]')
+
+    def __init__(self, min_chars: int = 4):
+        self.min_chars = min_chars
+        self.buffer = ""
+        self.emotion: Optional[str] = None
+
+    def feed(self, delta: str) -> List[str]:
+        """Add a text delta, return the pieces that are ready to send."""
+        self.buffer += delta
+        self._strip_tags()
+
+        # Hold back an unfinished "[tag"
+        hold = ""
+        open_idx = self.buffer.rfind("[")
+        if open_idx != -1 and "]" not in self.buffer[open_idx:]:
+            self.buffer, hold = self.buffer[:open_idx], self.buffer[open_idx:]
+
+        ready = []
+        cut = self._cut_point()
+        if cut:
+            piece = self.buffer[:cut]
+            self.buffer = self.buffer[cut:]
+            if piece.strip():
+                ready.append(piece)
+        self.buffer += hold
+        return ready
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left at the end of the answer."""
+        self._strip_tags()
+        piece, self.buffer = self.buffer, ""
+        return piece if piece.strip() else None
+
+    def _strip_tags(self):
+        match = self.TAG_PATTERN.search(self.buffer)
+        if match and self.emotion is None:
+            self.emotion = match.group(1)
+        self.buffer = self.TAG_PATTERN.sub("", self.buffer)
+
+    def _cut_point(self) -> int:
+        text = self.buffer
+        # 1. Last clause boundary
+        for i in range(len(text) - 1, -1, -1):
+            if text[i] in self.CLAUSE_ENDS:
+                return i + 1
+        if len(text.strip()) < self.min_chars:
+            return 0
+        # 2. CJK text: every character is a word boundary
+        if '\u4e00' <= text[-1] <= '\u9fff':
+            return len(text)
+        # 3. Latin text: cut after the last complete word
+        last_space = max(text.rfind(" "), text.rfind("\t"))
+        return last_space + 1 if last_space > 0 else 0
+
+
+class DoubaoStreamingTTS(OutputInterface):
+    """
+    Streaming TTS over a single bidirectional session per answer.
+
+    Unlike DoubaoTTS.speak_stream (one independent synthesis per sentence,
+    which can finish out of order), text deltas are forwarded as TaskRequests
+    into one session while audio is read back from that session's
+    audio_stream, so audio is always in text order and there is exactly one
+    session setup per answer.
+
+    Usage:
+        tts = get_doubao_streaming_tts()
+        async for pcm in tts.synthesize_stream(llm.generate_stream(query)):
+            play(pcm)
+    """
+
+    def __init__(
+        self,
+        client: Optional[BidirectionalTTS] = None,
+        audio_sink: Optional[Callable[[bytes], Awaitable[None]]] = None,
+        min_chars: int = 4
+    ):
+        """
+        Args:
+            client: Bidirectional TTS client (shared connection)
+            audio_sink: async callable receiving PCM chunks for playback
+            min_chars: Minimum buffered characters before a non-clause cut
+        """
+        self.client = client or BidirectionalTTS()
+        self.audio_sink = audio_sink
+        self.min_chars = min_chars
+        self._lock = asyncio.Lock()  # One answer per session at a time
+        self.last_stats: Dict[str, float] = {}
+
+    async def synthesize_stream(self, text_stream: AsyncIterator[str]) -> AsyncIterator[bytes]:
+        """
+        Forward text deltas into one session and yield its audio in order.
+
+        Args:
+            text_stream: LLM text deltas
+
+        Yields:
+            bytes: PCM audio chunks
+        """
+        async with self._lock:
+            if not self.client.is_connected:
+                await self.client.connect()
+
+            sessions_before = self.client.session_count
+            stats = {"text_requests": 0, "audio_bytes": 0, "first_audio_ms": None, "cancelled": False}
+            self.client.clear_audio()
+            t0 = time.time()
+
+            session_ready = asyncio.Event()
+            sender = asyncio.create_task(self._forward_text(text_stream, stats, session_ready))
+            try:
+                # The session starts with the first piece of text
+                waiter = asyncio.create_task(session_ready.wait())
+                await asyncio.wait({sender, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if session_ready.is_set():
+                    async for chunk in self.client.audio_stream():
+                        if stats["first_audio_ms"] is None:
+                            stats["first_audio_ms"] = (time.time() - t0) * 1000
+                            mark("tts_first_byte", engine="bidirectional")
+                        stats["audio_bytes"] += len(chunk)
+                        yield chunk
+                await sender
+            except (GeneratorExit, asyncio.CancelledError):
+                stats["cancelled"] = True
+                # Answer abandoned: cancel the session, keep the connection warm
+                await self.client.cancel_session()
+                raise
+            finally:
+                if not sender.done():
+                    sender.cancel()
+                stats["session_setups"] = self.client.session_count - sessions_before
+                stats["total_ms"] = (time.time() - t0) * 1000
+                self.last_stats = stats
+
+    async def _forward_text(self, text_stream: AsyncIterator[str], stats: Dict, session_ready: asyncio.Event):
+        """Send clause/word-sized pieces as they become ready, then finish the session."""
+        chunker = ClauseChunker(self.min_chars)
+        started = False
+
+        async def send(piece: str):
+            nonlocal started
+            if not started:
+                await self.client.start_session(emotion=chunker.emotion)
+                if not self.client.awaiting_audio:
+                    raise RuntimeError("TTS session unavailable")
+                started = True
+                session_ready.set()
+            await self.client.send_text(piece)
+            stats["text_requests"] += 1
+
+        try:
+            async for delta in text_stream:
+                for piece in chunker.feed(delta):
+                    await send(piece)
+
+            rest = chunker.flush()
+            if rest:
+                await send(rest)
+        finally:
+            # Always close the session so audio_stream terminates
+            if started:
+                await self.client.finish_session()
+
+    async def speak(self, text: str):
+        """Synthesize and play a complete text."""
+        async def single():
+            yield text
+        await self.speak_stream(single())
+
+    async def speak_stream(self, text_stream: AsyncIterator[str]):
+        """
+        🚀 STREAMING: Play audio for LLM deltas as they arrive (one session).
+
+        Args:
+            text_stream: Stream of text chunks from LLM
+        """
+        total_bytes = 0
+        async for chunk in self.synthesize_stream(text_stream):
+            total_bytes += len(chunk)
+            if self.audio_sink:
+                await self.audio_sink(chunk)
+                if total_bytes == len(chunk):
+                    mark("first_audio_out")
+
+        if not self.audio_sink:
+            # Play audio (simulated for now, in production use PyAudio)
+            print(f"🔊 [TTS] Played {total_bytes} bytes of audio")
+        stats = self.last_stats
+        if stats.get("first_audio_ms") is not None:
+            print(f"⏱️ [TTS] First audio {stats['first_audio_ms']:.0f}ms, "
+                  f"{stats['text_requests']} text requests, {stats['session_setups']} session setup(s)")
+
+    async def close(self):
+        """Close the bidirectional connection."""
+        await self.client.close()
+
+
+# Singleton instance (one warm bidirectional connection)
+_streaming_tts_instance = None
+
+def get_doubao_streaming_tts() -> DoubaoStreamingTTS:
+    """
+    Get singleton streaming TTS instance.
+
+    Returns:
+        Shared DoubaoStreamingTTS instance
+    """
+    global _streaming_tts_instance
+    if _streaming_tts_instance is None:
+        _streaming_tts_instance = DoubaoStreamingTTS()
+    return _streaming_tts_instance
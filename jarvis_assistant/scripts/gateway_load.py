@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Load generator for the network gateway (io/net/gateway.py).
+
+Runs N concurrent clients over HTTP/SSE or WebSocket and reports
+requests/sec, shed/error counts and p50/p95/p99 time to first token as
+seen by the client. Without --url it starts an in-process gateway whose
+agent is a local LLM stand-in (fixed time to first token plus a token
+stream), so the numbers measure the gateway rather than the model.
+
+Usage:
+    python3 gateway_load.py                               # stand-in, SSE, 64 clients
+    python3 gateway_load.py --transport ws --clients 256 --requests 2000
+    python3 gateway_load.py --url http://127.0.0.1:8098   # a running gateway
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(SCRIPT_DIR, "..", "..")))
+
+import aiohttp
+
+QUERIES = ["现在几点了", "北京天气怎么样", "讲个笑话", "帮我查一下今天的新闻", "PID 控制是什么"]
+
+
+class StandInLLM:
+    """Agent stand-in: waits out a time to first token, then streams tokens."""
+
+    def __init__(self, ttft: float, tokens: int, token_interval: float):
+        self.ttft = ttft
+        self.tokens = tokens
+        self.token_interval = token_interval
+
+    async def run(self, user_input: str, stream_callback=None) -> str:
+        await asyncio.sleep(self.ttft * random.uniform(0.8, 1.2))
+        reply = []
+        for i in range(self.tokens):
+            token = f"词{i}"
+            reply.append(token)
+            if stream_callback:
+                await stream_callback(token)
+            await asyncio.sleep(self.token_interval)
+        return "".join(reply)
+
+
+async def sse_turn(http: aiohttp.ClientSession, url: str, session_id: str, text: str):
+    """One HTTP turn: ("ok" | "shed" | "error", ttft seconds or None)."""
+    t0 = time.perf_counter()
+    ttft = None
+    async with http.post(f"{url}/v1/chat", json={"text": text, "session": session_id}) as resp:
+        if resp.status == 503:
+            await resp.read()
+            return "shed", None
+        if resp.status != 200:
+            return "error", None
+        async for line in resp.content:
+            if not line.startswith(b"data: "):
+                continue
+            event = json.loads(line[6:])
+            if event["type"] == "token" and ttft is None:
+                ttft = time.perf_counter() - t0
+            elif event["type"] == "error":
+                return "error", None
+    return "ok", ttft
+
+
+async def ws_turn(ws, text: str):
+    """One WebSocket turn on an open connection."""
+    t0 = time.perf_counter()
+    ttft = None
+    await ws.send_json({"text": text})
+    while True:
+        event = await ws.receive_json()
+        if event["type"] == "token" and ttft is None:
+            ttft = time.perf_counter() - t0
+        elif event["type"] == "done":
+            return "ok", ttft
+        elif event["type"] == "error":
+            return ("shed" if event.get("error") == "overloaded" else "error"), None
+
+
+async def client(url: str, transport: str, budget: dict, results: list, backoff: float):
+    session_id = f"load-{uuid.uuid4().hex[:8]}"
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=60)
+    async with aiohttp.ClientSession(timeout=timeout) as http:
+        ws = None
+        try:
+            if transport == "ws":
+                ws = await http.ws_connect(f"{url}/ws")
+                await ws.receive_json()  # ready
+            while budget["left"] > 0:
+                budget["left"] -= 1
+                text = random.choice(QUERIES)
+                try:
+                    if ws is not None:
+                        results.append(await ws_turn(ws, text))
+                    else:
+                        results.append(await sse_turn(http, url, session_id, text))
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                    results.append(("error", None))
+                if results[-1][0] == "shed":
+                    await asyncio.sleep(backoff)  # What a polite client does with Retry-After
+        finally:
+            if ws is not None:
+                await ws.close()
+
+
+def percentile(ordered, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run_load(args) -> dict:
+    gateway = None
+    url = args.url
+    if not url:
+        from jarvis_assistant.core.session import SessionManager
+        from jarvis_assistant.io.net.gateway import AdmissionGate, Gateway
+
+        standin = StandInLLM(args.ttft, args.tokens, args.token_interval)
+        sessions = SessionManager(agent_factory=lambda: standin, root=tempfile.mkdtemp(prefix="jarvis-load-"),
+                                  max_sessions=max(256, args.clients * 2))
+        gateway = Gateway(sessions=sessions,
+                          gate=AdmissionGate(args.max_inflight, args.max_queue, args.queue_wait))
+        url = await gateway.start("127.0.0.1", 0)
+
+    results = []
+    budget = {"left": args.requests}
+    t0 = time.perf_counter()
+    try:
+        await asyncio.gather(*(client(url, args.transport, budget, results, args.backoff) for _ in range(args.clients)))
+    finally:
+        elapsed = time.perf_counter() - t0
+        if gateway is not None:
+            await gateway.stop()
+
+    ttfts = sorted(t * 1000 for status, t in results if status == "ok" and t is not None)
+    ok = sum(1 for status, _ in results if status == "ok")
+    return {
+        "requests": len(results),
+        "ok": ok,
+        "shed": sum(1 for status, _ in results if status == "shed"),
+        "errors": sum(1 for status, _ in results if status == "error"),
+        "seconds": round(elapsed, 2),
+        "rps": round(ok / elapsed, 1) if elapsed else 0.0,
+        "p50_ttft_ms": round(percentile(ttfts, 0.50), 1),
+        "p95_ttft_ms": round(percentile(ttfts, 0.95), 1),
+        "p99_ttft_ms": round(percentile(ttfts, 0.99), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Jarvis gateway")
+    parser.add_argument("--url", help="gateway base URL (default: in-process gateway with an LLM stand-in)")
+    parser.add_argument("--transport", choices=["sse", "ws"], default="sse")
+    parser.add_argument("--clients", type=int, default=64, help="concurrent connections")
+    parser.add_argument("--requests", type=int, default=1000, help="total turns")
+    parser.add_argument("--ttft", type=float, default=0.3, help="stand-in time to first token (s)")
+    parser.add_argument("--tokens", type=int, default=20, help="stand-in tokens per reply")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="stand-in seconds between tokens")
+    parser.add_argument("--max-inflight", type=int, default=64)
+    parser.add_argument("--max-queue", type=int, default=128)
+    parser.add_argument("--queue-wait", type=float, default=2.0)
+    parser.add_argument("--backoff", type=float, default=0.2, help="client pause after being shed (s)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args))
+    if args.json:
+        print(json.dumps(report))
+        return
+    target = args.url or f"stand-in (ttft {args.ttft * 1000:.0f}ms, {args.tokens} tokens)"
+    print(f"\n📊 {args.transport.upper()} x {args.clients} clients -> {target}")
+    print(f"   {report['requests']} turns in {report['seconds']}s: "
+          f"{report['ok']} ok, {report['shed']} shed, {report['errors']} errors")
+    print(f"   {report['rps']} req/s")
+    print(f"   TTFT p50 {report['p50_ttft_ms']}ms · p95 {report['p95_ttft_ms']}ms · p99 {report['p99_ttft_ms']}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
 Simple realtime panel (SSE) for Jarvis progress/events.
+Turn traces (utils/tracing.py, level TRACE) are drawn as span timelines.
 Run: python3 realtime_panel.py
 Open: http://localhost:8099
 """
@@ -29,6 +30,13 @@ HTML_PAGE = """<!doctype html>
     .ts { color: #7aa2f7; margin-right: 6px; }
     .lvl { color: #f7768e; margin-right: 6px; }
     .msg { color: #c0caf5; }
+    .trace { margin: 4px 0 10px 24px; font-size: 11px; }
+    .row { display: flex; align-items: center; height: 16px; }
+    .label { width: 180px; color: #9aa5ce; overflow: hidden; text-overflow: ellipsis; }
+    .track { position: relative; flex: 1; height: 10px; background: #1d2330; border-radius: 3px; }
+    .bar { position: absolute; height: 10px; background: #7aa2f7; border-radius: 3px; min-width: 2px; }
+    .bar.child { background: #9ece6a; }
+    .tick { position: absolute; top: -2px; width: 2px; height: 14px; background: #e0af68; }
   </style>
 </head>
 <body>
@@ -55,10 +63,51 @@ HTML_PAGE = """<!doctype html>
     div.appendChild(ts);
     div.appendChild(lvl);
     div.appendChild(msg);
+    if (obj.spans) div.appendChild(timeline(obj));
     logEl.appendChild(div);
     logEl.scrollTop = logEl.scrollHeight;
   }
 
+  function row(label, build) {
+    const r = document.createElement('div');
+    r.className = 'row';
+    const l = document.createElement('span');
+    l.className = 'label';
+    l.textContent = label;
+    const t = document.createElement('div');
+    t.className = 'track';
+    build(t);
+    r.appendChild(l);
+    r.appendChild(t);
+    return r;
+  }
+
+  function timeline(obj) {
+    const box = document.createElement('div');
+    box.className = 'trace';
+    const total = Math.max(obj.duration_ms || 1, 1);
+    const pct = (ms) => Math.min(100, 100 * ms / total) + '%';
+    for (const s of obj.spans) {
+      const label = s.name + ' ' + Math.round(s.dur_ms) + 'ms';
+      box.appendChild(row(label, (t) => {
+        const b = document.createElement('div');
+        b.className = s.parent ? 'bar child' : 'bar';
+        b.style.left = pct(s.start_ms);
+        b.style.width = pct(s.dur_ms);
+        t.appendChild(b);
+      }));
+    }
+    for (const [name, ms] of Object.entries(obj.marks || {})) {
+      box.appendChild(row(name + ' @' + Math.round(ms) + 'ms', (t) => {
+        const k = document.createElement('div');
+        k.className = 'tick';
+        k.style.left = pct(ms);
+        t.appendChild(k);
+      }));
+    }
+    return box;
+  }
+
   const es = new EventSource('/events');
   es.onopen = () => statusEl.textContent = 'connected';
   es.onerror = () => statusEl.textContent = 'disconnected (retrying)';
@@ -3,10 +3,13 @@ import base64
 import gzip
 import json
 import logging
+import os
 import uuid
 import websockets
 from typing import Optional, Callable
 
+from jarvis_assistant.utils.tracing import mark
+
 logger = logging.getLogger(__name__)
 
 # Protocol Constants from official demo
@@ -80,7 +83,7 @@ class ASRServiceV2:
         self.appid = appid
         self.token = token
         self.cluster = cluster
-        self.ws_url = "wss://openspeech.bytedance.com/api/v2/asr"
+        self.ws_url = os.getenv("DOUBAO_ASR_WS_URL", "wss://openspeech.bytedance.com/api/v2/asr")
         self.ws = None
         self._running = False
         self.on_transcription = None # Callback(text, is_final)
@@ -148,6 +151,8 @@ class ASRServiceV2:
                     sequence = payload.get('sequence', 0)
                     is_final = sequence < 0  # Negative sequence means final
                     
+                    if is_final and text:
+                        mark("asr_final", chars=len(text))
                     if self.on_transcription and text:
                         await self.on_transcription(text, is_final)
                 
@@ -160,6 +165,8 @@ class ASRServiceV2:
         """Send audio data to ASR service"""
         if not self.ws or not self._running: return
         
+        if is_last:
+            mark("vad_end")  # Client-side endpoint: the utterance is over
         payload = gzip.compress(chunk)
         flags = NEG_SEQUENCE if is_last else NO_SEQUENCE
         header = generate_header(message_type=CLIENT_AUDIO_ONLY_REQUEST, message_type_specific_flags=flags)
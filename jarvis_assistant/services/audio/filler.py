@@ -7,14 +7,33 @@ class FillerPhraseManager:
     """
     Manages playback of 'filler' sounds (e.g. 'Hmm...', 'Let me check') 
     to mask latency while the Brain is thinking.
+    
+    Spoken fillers come from PHRASES and are pre-synthesized into the speech
+    cache at boot (see core/preloader.py), so playing one never waits on the
+    network. A filler that is not cached yet is skipped rather than fetched.
     """
-    def __init__(self, resource_dir=None):
+    
+    # Spoken filler phrases by category
+    PHRASES = {
+        "short": ["嗯。", "好的。", "收到。"],
+        "long": ["让我查一下。", "稍等一下。", "我看看。"],
+    }
+    
+    def __init__(self, resource_dir=None, tts=None, audio_sink=None):
+        """
+        Args:
+            resource_dir: Directory for pre-recorded filler wav files
+            tts: Cache-fronted synthesizer (e.g. DoubaoTTSV1)
+            audio_sink: async callable receiving PCM chunks (speaker write)
+        """
         if not resource_dir:
             # Default to assets folder in package
             base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             resource_dir = os.path.join(base_dir, "assets", "sounds", "fillers")
         
         self.resource_dir = resource_dir
+        self.tts = tts
+        self.audio_sink = audio_sink
         self.active_task = None
         self.should_stop = False
         
@@ -27,37 +46,40 @@ class FillerPhraseManager:
         # Ensure dir exists
         os.makedirs(self.resource_dir, exist_ok=True)
 
-    async def play_filler_delayed(self, delay: float = 0.8):
+    async def play_filler_delayed(self, delay: float = 0.8, category: str = "long"):
         """Wait for `delay` seconds, then play a random filler if not stopped."""
         self.should_stop = False
         try:
             await asyncio.sleep(delay)
             if not self.should_stop:
-                await self._play_random_filler()
+                await self._play_random_filler(category)
         except asyncio.CancelledError:
             pass
 
-    async def _play_random_filler(self):
-        """Play a sound file using local player logic."""
-        # Simple placeholder player using audio_utils
-        # In real app, integration with Output Audio Stream is needed.
-        # But for now we can just play to speaker?
-        # NO, we should ideally inject into the output stream or generic player.
-        # Let's use `pyaudio` or `playsound` or helper.
+    async def _play_random_filler(self, category: str = "long"):
+        """Play a cached filler phrase to the audio sink."""
+        phrase = random.choice(self.PHRASES.get(category, self.PHRASES["long"]))
         
-        # For now, let's assume we print log and simulate 
-        # because we don't have the actual wav files yet.
-        print("🤔 [Filler] Playing 'Hmm...' sound...")
+        if not self.tts or not self.audio_sink:
+            print(f"🤔 [Filler] '{phrase}' (no audio output attached)")
+            return
         
-        # If we had files:
-        # from jarvis_assistant.utils.audio_utils import play_wav
-        # play_wav("hmm.wav") 
-        pass
+        # Only play from cache - a filler that has to go over the network
+        # would arrive after the answer it is meant to cover.
+        if not self.tts.is_cached(phrase):
+            print(f"🤔 [Filler] '{phrase}' not cached yet, skipping")
+            return
+        
+        print(f"🤔 [Filler] Playing '{phrase}'")
+        async for chunk in self.tts.synthesize(phrase):
+            if self.should_stop:
+                break
+            await self.audio_sink(chunk)
 
-    def start(self, delay=0.8):
+    def start(self, delay=0.8, category: str = "long"):
         """Start the timer for filler phrase."""
         self.stop() # Cancel existing
-        self.active_task = asyncio.create_task(self.play_filler_delayed(delay))
+        self.active_task = asyncio.create_task(self.play_filler_delayed(delay, category))
 
     def stop(self):
         """Cancel pending filler or stop playing."""
@@ -6,6 +6,8 @@ import numpy as np
 import os
 import time
 
+from jarvis_assistant.utils.tracing import mark
+
 class WakeWordDetector:
     """Wake word detector using official hey_jarvis model"""
     
@@ -74,6 +76,7 @@ class WakeWordDetector:
             if score > threshold:
                 print(f"\n🎤 Wake Word Detected! (Score: {score:.2f})")
                 self._last_trigger_time = time.time()
+                mark("wake", score=round(float(score), 2))
                 return True
                     
         except Exception:
@@ -7,6 +7,8 @@ import websockets
 import jarvis_assistant.config.doubao_config as config
 import jarvis_assistant.services.doubao.protocol as protocol
 
+HELLO = "你好，先生。我是Jarvis，有什么可以帮助您的？"
+
 
 class RealtimeDialogClient:
     def __init__(self, config: Dict[str, Any], session_id: str, output_audio_format: str = "pcm",
@@ -64,7 +66,7 @@ class RealtimeDialogClient:
     async def say_hello(self) -> None:
         """发送Hello消息"""
         payload = {
-            "content": "你好，先生。我是Jarvis，有什么可以帮助您的？",
+            "content": HELLO,
         }
         hello_request = bytearray(protocol.generate_header())
         hello_request.extend(int(300).to_bytes(4, 'big'))
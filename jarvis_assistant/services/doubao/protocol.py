@@ -44,6 +44,7 @@ class EventType(IntEnum):
     CancelSession = 101
     FinishSession = 102
     SessionStarted = 150
+    SessionCanceled = 151
     SessionFinished = 152
     SessionFailed = 153
     TaskRequest = 200
@@ -0,0 +1,558 @@
+"""
+Local Doubao Stand-in Server
+Speaks the same wire protocols as the Volcengine endpoints Jarvis uses, so
+latency and load can be measured offline:
+
+- TTS v1 binary websocket      /api/v1/tts/ws_binary
+- Bidirectional TTS websocket  /api/v3/tts/bidirection
+- ASR v2 binary websocket      /api/v2/asr
+- Ark SSE                      /api/v3/responses, /api/v3/chat/completions
+- Ark context caching          /api/v3/context/create, /api/v3/context/chat/completions
+
+Timing is shaped by a StandInProfile (first-byte delay, throughput, jitter,
+error/disconnect injection). Clients are pointed at the server through their
+URL environment variables:
+
+    python -m jarvis_assistant.services.doubao.standin_server --port 8765
+    export DOUBAO_TTS_WS_URL=ws://127.0.0.1:8765/api/v1/tts/ws_binary
+    ...
+
+GET /stats returns per-endpoint counters; POST /profile updates the profile
+at runtime (JSON body with any StandInProfile field).
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import math
+import os
+import random
+import struct
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Optional
+
+from aiohttp import WSMsgType, web
+
+from jarvis_assistant.services.doubao.protocol import (
+    CompressionBits, DoubaoMessage, EventType, MsgType, MsgTypeFlagBits, SerializationBits
+)
+
+SAMPLE_RATE = 24000
+ASR_SAMPLE_RATE = 16000
+FRAME_BYTES = 9600  # 200ms of 24kHz 16-bit mono PCM, same as the speech cache
+
+
+@dataclass
+class StandInProfile:
+    """Timing and failure shape of the stand-in server."""
+
+    first_byte_ms: float = 300.0       # Delay before the first audio frame / token / final ASR result
+    jitter_ms: float = 20.0            # Uniform +/- jitter added to every frame and token
+    audio_bytes_per_sec: float = 96000.0  # Audio throughput (48000 B/s is realtime for 24kHz PCM)
+    ms_per_char: float = 200.0         # Synthesized audio duration per input character
+    tokens_per_sec: float = 40.0       # LLM streaming throughput
+    chars_per_token: int = 2
+    error_rate: float = 0.0            # Probability a request is rejected with a server error
+    disconnect_rate: float = 0.0       # Probability a stream is cut off halfway
+    stall_every: int = 0               # Every Nth request (1st, N+1th, ...) waits an extra stall_ms
+    stall_ms: float = 2000.0           # Extra first-byte delay of a stalled request (tail latency)
+    reply: str = "好的先生，这是本地替身服务器的回复，用于离线测试延迟和吞吐。"
+    asr_text: str = "今天北京天气怎么样"
+    tool_call: str = ""                # Tool the LLM "decides" to call when offered (planner JSON / tool calling)
+    tool_args: str = "{}"              # JSON arguments of that call
+
+    @classmethod
+    def from_env(cls) -> "StandInProfile":
+        """Read JARVIS_STANDIN_<FIELD> overrides (e.g. JARVIS_STANDIN_FIRST_BYTE_MS)."""
+        profile = cls()
+        for f in fields(cls):
+            value = os.getenv(f"JARVIS_STANDIN_{f.name.upper()}")
+            if value is not None:
+                setattr(profile, f.name, type(getattr(profile, f.name))(value))
+        return profile
+
+    def update(self, values: Dict) -> None:
+        for f in fields(self):
+            if f.name in values:
+                setattr(self, f.name, type(getattr(self, f.name))(values[f.name]))
+
+
+def tone(n_bytes: int, freq: float = 220.0, volume: float = 0.1) -> bytes:
+    """Quiet sine tone as 24kHz 16-bit mono PCM (so playback is audible but harmless)."""
+    n = n_bytes // 2
+    amp = int(32767 * volume)
+    return struct.pack(f"<{n}h", *(int(amp * math.sin(2 * math.pi * freq * i / SAMPLE_RATE)) for i in range(n)))
+
+
+class DoubaoStandInServer:
+    """
+    aiohttp server implementing the Doubao protocols used by Jarvis.
+
+    Usage (in-process benchmark):
+        server = DoubaoStandInServer(StandInProfile(first_byte_ms=150))
+        await server.start()
+        os.environ.update(server.client_env())
+        ...
+        await server.stop()
+    """
+
+    def __init__(self, profile: Optional[StandInProfile] = None, host: str = "127.0.0.1", port: int = 8765):
+        self.profile = profile or StandInProfile.from_env()
+        self.host = host
+        self.port = port
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._frame_cache: Dict[int, bytes] = {}
+        self._contexts: Dict[str, list] = {}  # context id -> cached prefix messages
+
+        self.app = web.Application()
+        self.app.router.add_get("/api/v1/tts/ws_binary", self.handle_tts_v1)
+        self.app.router.add_get("/api/v3/tts/bidirection", self.handle_tts_bidir)
+        self.app.router.add_get("/api/v2/asr", self.handle_asr_v2)
+        self.app.router.add_post("/api/v3/responses", self.handle_responses)
+        self.app.router.add_post("/api/v3/chat/completions", self.handle_chat_completions)
+        self.app.router.add_post("/api/v3/context/create", self.handle_context_create)
+        self.app.router.add_post("/api/v3/context/chat/completions", self.handle_context_chat)
+        self.app.router.add_get("/stats", self.handle_stats)
+        self.app.router.add_post("/profile", self.handle_profile)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        print(f"🧪 [StandIn] Doubao stand-in listening on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def client_env(self) -> Dict[str, str]:
+        """Environment variables that point every Jarvis client at this server."""
+        ws = f"ws://{self.host}:{self.port}"
+        return {
+            "DOUBAO_TTS_WS_URL": f"{ws}/api/v1/tts/ws_binary",
+            "DOUBAO_TTS_BIDIR_URL": f"{ws}/api/v3/tts/bidirection",
+            "DOUBAO_ASR_WS_URL": f"{ws}/api/v2/asr",
+            "DOUBAO_ARK_BASE_URL": f"http://{self.host}:{self.port}/api/v3",
+        }
+
+    # ------------------------------------------------------------------
+    # Shaping helpers
+    # ------------------------------------------------------------------
+
+    def _count(self, endpoint: str, key: str, n: int = 1):
+        bucket = self.stats.setdefault(endpoint, {"requests": 0, "errors": 0, "disconnects": 0, "bytes": 0})
+        bucket[key] = bucket.get(key, 0) + n
+
+    def _jitter(self) -> float:
+        j = self.profile.jitter_ms / 1000
+        return random.uniform(-j, j) if j > 0 else 0.0
+
+    async def _first_byte_delay(self, endpoint: str):
+        delay = self.profile.first_byte_ms / 1000 + self._jitter()
+        every = self.profile.stall_every
+        if every and self.stats.get(endpoint, {}).get("requests", 0) % every == 1 % every:
+            delay += self.profile.stall_ms / 1000
+            self._count(endpoint, "stalls")
+        await asyncio.sleep(max(0.0, delay))
+
+    async def _pace(self, seconds: float):
+        await asyncio.sleep(max(0.0, seconds + self._jitter()))
+
+    def _should_fail(self) -> bool:
+        return random.random() < self.profile.error_rate
+
+    def _should_disconnect(self) -> bool:
+        return random.random() < self.profile.disconnect_rate
+
+    def _audio_frames(self, text: str):
+        """Split the synthesized audio for text into FRAME_BYTES frames."""
+        total = int(len(text) * self.profile.ms_per_char / 1000 * SAMPLE_RATE) * 2
+        while total > 0:
+            size = min(FRAME_BYTES, total)
+            if size not in self._frame_cache:
+                self._frame_cache[size] = tone(size)
+            yield self._frame_cache[size]
+            total -= size
+
+    def _tokens(self, text: str):
+        step = max(1, self.profile.chars_per_token)
+        for i in range(0, len(text), step):
+            yield text[i:i + step]
+
+    # ------------------------------------------------------------------
+    # TTS v1 binary websocket
+    # ------------------------------------------------------------------
+
+    async def handle_tts_v1(self, request: web.Request):
+        ws = web.WebSocketResponse(max_msg_size=10 * 1024 * 1024)
+        await ws.prepare(request)
+        async for message in ws:
+            if message.type != WSMsgType.BINARY:
+                continue
+            data = message.data
+            header_size = (data[0] & 0x0F) * 4
+            size = int.from_bytes(data[header_size:header_size + 4], "big")
+            body = data[header_size + 4:header_size + 4 + size]
+            if data[2] & 0x0F == CompressionBits.Gzip:
+                body = gzip.decompress(body)
+            req = json.loads(body)
+            self._count("tts_v1", "requests")
+
+            if self._should_fail():
+                self._count("tts_v1", "errors")
+                await ws.send_bytes(self._v1_error(3031, "injected server error"))
+                continue
+
+            text = req.get("request", {}).get("text", "")
+            frames = list(self._audio_frames(text)) or [b""]
+            cut = len(frames) // 2 if self._should_disconnect() else None
+            await self._first_byte_delay("tts_v1")
+            for i, frame in enumerate(frames, start=1):
+                if i - 1 == cut:
+                    self._count("tts_v1", "disconnects")
+                    await ws.close()
+                    return ws
+                last = i == len(frames)
+                await ws.send_bytes(self._v1_audio(-i if last else i, frame))
+                self._count("tts_v1", "bytes", len(frame))
+                if not last:
+                    await self._pace(len(frame) / self.profile.audio_bytes_per_sec)
+        return ws
+
+    @staticmethod
+    def _v1_audio(seq: int, audio: bytes) -> bytes:
+        flag = MsgTypeFlagBits.NegativeSeq if seq < 0 else MsgTypeFlagBits.PositiveSeq
+        header = bytes([0x11, (MsgType.AudioOnlyServer << 4) | flag, 0x00, 0x00])
+        return header + seq.to_bytes(4, "big", signed=True) + len(audio).to_bytes(4, "big") + audio
+
+    @staticmethod
+    def _v1_error(code: int, message: str) -> bytes:
+        payload = gzip.compress(json.dumps({"code": code, "message": message}).encode("utf-8"))
+        header = bytes([0x11, MsgType.Error << 4, (SerializationBits.JSON << 4) | CompressionBits.Gzip, 0x00])
+        return header + code.to_bytes(4, "big") + len(payload).to_bytes(4, "big") + payload
+
+    # ------------------------------------------------------------------
+    # Bidirectional TTS websocket
+    # ------------------------------------------------------------------
+
+    async def handle_tts_bidir(self, request: web.Request):
+        ws = web.WebSocketResponse(max_msg_size=10 * 1024 * 1024)
+        await ws.prepare(request)
+        send_lock = asyncio.Lock()
+        sessions: Dict[str, Dict] = {}
+
+        async def send(msg: DoubaoMessage):
+            async with send_lock:
+                if not ws.closed:
+                    await ws.send_bytes(msg.marshal())
+
+        async def event(event_type, session_id: str = "", payload: Dict = None):
+            await send(DoubaoMessage(
+                type=MsgType.FullServerResponse, event=event_type, session_id=session_id,
+                payload=json.dumps(payload or {}).encode("utf-8"),
+            ))
+
+        async def synthesize(session_id: str, queue: asyncio.Queue, drop: bool):
+            """Turn queued TaskRequest text into audio frames, in order."""
+            first = True
+            sent = 0
+            while True:
+                text = await queue.get()
+                if text is None:
+                    break
+                if first:
+                    await self._first_byte_delay("tts_bidir")
+                    first = False
+                for frame in self._audio_frames(text):
+                    await send(DoubaoMessage(
+                        type=MsgType.AudioOnlyServer, event=EventType.TTSResponse, session_id=session_id,
+                        serialization=SerializationBits.Raw, compression=CompressionBits.None_, payload=frame,
+                    ))
+                    self._count("tts_bidir", "bytes", len(frame))
+                    sent += 1
+                    if drop and sent == 2:
+                        self._count("tts_bidir", "disconnects")
+                        await ws.close()
+                        return
+                    await self._pace(len(frame) / self.profile.audio_bytes_per_sec)
+            await event(EventType.SessionFinished, session_id, {"status_code": 20000000})
+            sessions.pop(session_id, None)
+
+        async for message in ws:
+            if message.type != WSMsgType.BINARY:
+                continue
+            msg = DoubaoMessage.from_bytes(message.data)
+            sid = msg.session_id
+
+            if msg.event == EventType.StartConnection:
+                await event(EventType.ConnectionStarted)
+            elif msg.event == EventType.FinishConnection:
+                await event(EventType.ConnectionFinished)
+                break
+            elif msg.event == EventType.StartSession:
+                self._count("tts_bidir", "requests")
+                if self._should_fail():
+                    self._count("tts_bidir", "errors")
+                    await send(DoubaoMessage(
+                        type=MsgType.Error, flag=MsgTypeFlagBits.NoSeq, error_code=45000001,
+                        payload=json.dumps({"error": "injected server error"}).encode("utf-8"),
+                    ))
+                    continue
+                queue = asyncio.Queue()
+                task = asyncio.create_task(synthesize(sid, queue, self._should_disconnect()))
+                sessions[sid] = {"queue": queue, "task": task}
+                await event(EventType.SessionStarted, sid)
+            elif msg.event == EventType.TaskRequest and sid in sessions:
+                text = json.loads(msg.payload or b"{}").get("req_params", {}).get("text", "")
+                await sessions[sid]["queue"].put(text)
+            elif msg.event == EventType.FinishSession and sid in sessions:
+                await sessions[sid]["queue"].put(None)
+            elif msg.event == EventType.CancelSession and sid in sessions:
+                sessions.pop(sid)["task"].cancel()
+                await event(EventType.SessionCanceled, sid)
+
+        for session in sessions.values():
+            session["task"].cancel()
+        await ws.close()
+        return ws
+
+    # ------------------------------------------------------------------
+    # ASR v2 binary websocket
+    # ------------------------------------------------------------------
+
+    async def handle_asr_v2(self, request: web.Request):
+        ws = web.WebSocketResponse(max_msg_size=10 * 1024 * 1024)
+        await ws.prepare(request)
+        text = self.profile.asr_text
+        received = 0
+        partial_step = ASR_SAMPLE_RATE * 2 // 5  # One partial result per 200ms of audio
+        next_partial = partial_step
+        sequence = 1
+
+        async for message in ws:
+            if message.type != WSMsgType.BINARY:
+                continue
+            data = message.data
+            msg_type = data[1] >> 4
+            flags = data[1] & 0x0F
+
+            if msg_type == MsgType.FullClientRequest:
+                self._count("asr_v2", "requests")
+                if self._should_fail():
+                    self._count("asr_v2", "errors")
+                    await ws.send_bytes(self._asr_response({"code": 1013, "message": "injected server error"}))
+                    break
+                await ws.send_bytes(self._asr_response({"code": 1000, "message": "Success", "sequence": sequence}))
+                continue
+
+            header_size = (data[0] & 0x0F) * 4
+            size = int.from_bytes(data[header_size:header_size + 4], "big")
+            audio = data[header_size + 4:header_size + 4 + size]
+            if data[2] & 0x0F == CompressionBits.Gzip:
+                audio = gzip.decompress(audio)
+            received += len(audio)  # PCM bytes: partial results follow audio time, not compressed size
+            is_last = flags == 0b0010
+
+            if is_last:
+                # Final result latency
+                await self._first_byte_delay("asr_v2")
+                await ws.send_bytes(self._asr_response({
+                    "code": 1000, "sequence": -sequence - 1, "result": [{"text": text}],
+                }))
+                self._count("asr_v2", "bytes", received)
+                break
+
+            if received >= next_partial:
+                if self._should_disconnect():
+                    self._count("asr_v2", "disconnects")
+                    break
+                sequence += 1
+                shown = min(len(text) - 1, sequence - 1)
+                next_partial += partial_step
+                if shown > 0:
+                    await ws.send_bytes(self._asr_response({
+                        "code": 1000, "sequence": sequence, "result": [{"text": text[:shown]}],
+                    }))
+
+        await ws.close()
+        return ws
+
+    @staticmethod
+    def _asr_response(payload: Dict) -> bytes:
+        body = gzip.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        header = bytes([0x11, MsgType.FullServerResponse << 4, (SerializationBits.JSON << 4) | CompressionBits.Gzip, 0x00])
+        return header + len(body).to_bytes(4, "big") + body
+
+    # ------------------------------------------------------------------
+    # Ark HTTP (SSE)
+    # ------------------------------------------------------------------
+
+    async def handle_responses(self, request: web.Request):
+        body = await request.json()
+        return await self._sse(
+            request, "responses", body,
+            delta=lambda token: {"type": "response.output_text.delta", "delta": token},
+            done=lambda usage: {"type": "response.completed", "response": {"status": "completed", "usage": usage}},
+        )
+
+    async def handle_chat_completions(self, request: web.Request):
+        body = await request.json()
+        if not body.get("stream"):
+            return await self._chat_json(body)
+        if self._wants_tool_call(body):
+            # Arguments stream in token-sized fragments after a header chunk with the call id/name
+            header = {"index": 0, "id": "call_standin_1", "type": "function",
+                      "function": {"name": self.profile.tool_call, "arguments": ""}}
+            return await self._sse(
+                request, "chat_completions", body,
+                delta=lambda token: {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"tool_calls": [{"index": 0, "function": {"arguments": token}}]}}]},
+                done=lambda usage: {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {}, "finish_reason": "tool_calls"}], "usage": usage},
+                reply=self.profile.tool_args,
+                preamble={"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"role": "assistant", "tool_calls": [header]}}]},
+            )
+        return await self._sse(
+            request, "chat_completions", body,
+            delta=lambda token: {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": token}}]},
+            done=lambda usage: {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage},
+        )
+
+    async def handle_context_create(self, request: web.Request):
+        body = await request.json()
+        self._count("context", "creates")
+        context_id = f"ctx-{len(self._contexts) + 1:04d}"
+        self._contexts[context_id] = body.get("messages") or []
+        return web.json_response({"id": context_id, "model": body.get("model"), "mode": body.get("mode"), "ttl": body.get("ttl")})
+
+    async def handle_context_chat(self, request: web.Request):
+        body = await request.json()
+        prefix = self._contexts.get(body.get("context_id"))
+        if prefix is None:
+            self._count("context", "misses")
+            return web.json_response({"error": {"code": "InvalidParameter.ContextId", "message": "context not found"}}, status=404)
+        self._count("context", "hits")
+        cached = self._usage({"messages": prefix}, "")["prompt_tokens"]
+        body = {**body, "messages": prefix + (body.get("messages") or [])}
+        return await self._chat_json(body, cached_tokens=cached)
+
+    def _wants_tool_call(self, body: Dict) -> bool:
+        offered = {(t.get("function") or {}).get("name") for t in body.get("tools") or []}
+        answered = any(m.get("role") == "tool" for m in body.get("messages") or [])
+        return bool(self.profile.tool_call) and self.profile.tool_call in offered and not answered
+
+    def _reply_for(self, body: Dict) -> str:
+        if body.get("response_format", {}).get("type") == "json_object":
+            if self.profile.tool_call:
+                step = {"description": f"Execute {self.profile.tool_call}", "tool": self.profile.tool_call,
+                        "args": json.loads(self.profile.tool_args or "{}")}
+                return json.dumps({"steps": [step]}, ensure_ascii=False)
+            return json.dumps({"steps": []})
+        return self.profile.reply
+
+    def _usage(self, body: Dict, reply: str, cached_tokens: int = 0) -> Dict:
+        prompt_chars = len(json.dumps(body.get("input") or body.get("messages") or "", ensure_ascii=False))
+        prompt_tokens = prompt_chars // 2
+        completion_tokens = math.ceil(len(reply) / max(1, self.profile.chars_per_token))
+        return {
+            "input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+            "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+
+    async def _chat_json(self, body: Dict, cached_tokens: int = 0):
+        self._count("chat_completions", "requests")
+        if self._should_fail():
+            self._count("chat_completions", "errors")
+            return web.json_response({"error": {"message": "injected server error"}}, status=500)
+        await self._first_byte_delay("chat_completions")
+        reply = self._reply_for(body)
+        return web.json_response({
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            "usage": self._usage(body, reply, cached_tokens),
+        })
+
+    async def _sse(self, request: web.Request, endpoint: str, body: Dict, delta, done,
+                   reply: Optional[str] = None, preamble: Optional[Dict] = None):
+        self._count(endpoint, "requests")
+        if self._should_fail():
+            self._count(endpoint, "errors")
+            return web.json_response({"error": {"message": "injected server error"}}, status=500)
+
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await resp.prepare(request)
+
+        reply = self._reply_for(body) if reply is None else reply
+        tokens = list(self._tokens(reply))
+        cut = len(tokens) // 2 if self._should_disconnect() else None
+        await self._first_byte_delay(endpoint)
+        if preamble:
+            await resp.write(f"data: {json.dumps(preamble, ensure_ascii=False)}\n\n".encode("utf-8"))
+        for i, token in enumerate(tokens):
+            if i == cut:
+                self._count(endpoint, "disconnects")
+                if request.transport:
+                    request.transport.close()
+                return resp
+            line = f"data: {json.dumps(delta(token), ensure_ascii=False)}\n\n".encode("utf-8")
+            await resp.write(line)
+            self._count(endpoint, "bytes", len(line))
+            await self._pace(1 / self.profile.tokens_per_sec)
+
+        await resp.write(f"data: {json.dumps(done(self._usage(body, reply)))}\n\n".encode("utf-8"))
+        await resp.write(b"data: [DONE]\n\n")
+        await resp.write_eof()
+        return resp
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+
+    async def handle_stats(self, request: web.Request):
+        return web.json_response({"profile": asdict(self.profile), "endpoints": self.stats})
+
+    async def handle_profile(self, request: web.Request):
+        self.profile.update(await request.json())
+        print(f"🧪 [StandIn] Profile updated: {asdict(self.profile)}")
+        return web.json_response(asdict(self.profile))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Doubao protocol stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    defaults = StandInProfile.from_env()
+    for f in fields(StandInProfile):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(getattr(defaults, f.name)),
+                            default=getattr(defaults, f.name))
+    args = parser.parse_args()
+
+    profile = StandInProfile(**{f.name: getattr(args, f.name) for f in fields(StandInProfile)})
+    server = DoubaoStandInServer(profile, args.host, args.port)
+
+    async def run():
+        await server.start()
+        print("🧪 [StandIn] Point Jarvis at this server with:")
+        for key, value in server.client_env().items():
+            print(f"   export {key}={value}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n🧪 [StandIn] Stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,11 @@ import uuid
 import asyncio
 import websockets
 import re
+import time
+from contextlib import aclosing
 from dotenv import load_dotenv
 from jarvis_assistant.services.doubao.protocol import DoubaoMessage, MsgType, EventType, SerializationBits
+from jarvis_assistant.services.doubao.tts_cache import get_tts_cache
 
 # Robustly load .env
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -15,7 +18,7 @@ load_dotenv(env_path, override=True)
 class BidirectionalTTS:
     def __init__(self):
         from jarvis_assistant.config.doubao_config import TTS_2_0_CONFIG
-        self.endpoint = "wss://openspeech.bytedance.com/api/v3/tts/bidirection"
+        self.endpoint = os.getenv("DOUBAO_TTS_BIDIR_URL", "wss://openspeech.bytedance.com/api/v3/tts/bidirection")
         # Load from environment variables for security
         self.appid = os.getenv("DOUBAO_APP_ID")
         self.access_token = os.getenv("DOUBAO_SPEECH_TOKEN")
@@ -32,6 +35,19 @@ class BidirectionalTTS:
         self._active_session = False
         self._event_futures = {} 
         self._current_emotion = "coldness"
+        self._session_error = None
+        self._awaiting_audio = False  # True from StartSession until the session's audio ends
+        self.session_count = 0  # StartSession requests sent on this client
+        self._cancelled_sessions = {}  # session_id -> cancel time, until the server acknowledges
+        self._stale_audio = False  # Queue may hold frames of a cancelled session
+        self.stats = {
+            "connects": 0,
+            "reconnects": 0,
+            "cancels": 0,
+            "discarded_frames": 0,
+            "last_cancel_ack_ms": None,  # cancel_session() until the server confirmed the session ended
+        }
+        self.cache = get_tts_cache()
 
     async def connect(self):
         if self.is_connected: return
@@ -49,6 +65,9 @@ class BidirectionalTTS:
             # Ensure we use a fresh connect with proper headers
             self.ws = await websockets.connect(self.endpoint, additional_headers=headers, max_size=10*1024*1024)
             self.is_connected = True
+            if self.stats["connects"]:
+                self.stats["reconnects"] += 1
+            self.stats["connects"] += 1
             self._receive_task = asyncio.create_task(self._receive_loop())
             
             # Connection phase
@@ -80,27 +99,58 @@ class BidirectionalTTS:
                     if not self._event_futures[msg.event].done():
                         self._event_futures[msg.event].set_result(msg)
                 
+                # Drain frames of cancelled sessions until the server confirms the end
+                if msg.session_id in self._cancelled_sessions:
+                    if msg.serialization == SerializationBits.Raw:
+                        self.stats["discarded_frames"] += 1
+                    elif msg.event in (EventType.SessionCanceled, EventType.SessionFinished, EventType.SessionFailed):
+                        t0 = self._cancelled_sessions.pop(msg.session_id)
+                        self.stats["last_cancel_ack_ms"] = (time.time() - t0) * 1000
+                    continue
+                
                 # Audio flow
                 if msg.serialization == SerializationBits.Raw:
                     await self._audio_queue.put(msg.payload)
                 elif msg.event == EventType.SessionFinished:
                     await self._audio_queue.put(None) 
                     self._active_session = False
+                    self._awaiting_audio = False
                 elif msg.type == MsgType.Error:
                     print(f"[TTS 2.0] ❌ Server Error: {msg.payload.decode('utf-8', 'ignore')}")
                     # Release any waiters on error
                     for f in self._event_futures.values():
                         if not f.done(): f.set_exception(RuntimeError("TTS Error"))
+                    # End the current audio stream instead of leaving consumers hanging
+                    if self._awaiting_audio:
+                        self._session_error = msg.payload.decode('utf-8', 'ignore')
+                        self._active_session = False
+                        self._awaiting_audio = False
+                        await self._audio_queue.put(None)
         except Exception as e:
             # print(f"[TTS 2.0] Receive Loop ended: {e}")
             pass
+        finally:
+            # Connection dropped: let the next request reconnect, end any open stream
+            if self.is_connected:
+                self.is_connected = False
+                if self._awaiting_audio:
+                    self._session_error = "connection lost"
+                    self._active_session = False
+                    self._awaiting_audio = False
+                    self._audio_queue.put_nowait(None)
 
     async def start_session(self, emotion: str = None):
         if not self.is_connected: await self.connect()
         if not self.is_connected: return
         
         if emotion: self._current_emotion = emotion
+        if self._stale_audio:
+            self.clear_audio()
+            self._stale_audio = False
         self.session_id = str(uuid.uuid4())
+        self._session_error = None
+        self._awaiting_audio = True
+        self.session_count += 1
         
         # Follow Demo Payload structure
         req = {
@@ -132,6 +182,7 @@ class BidirectionalTTS:
         except asyncio.TimeoutError:
             print("[TTS 2.0] ❌ Session Start Timeout")
             self._active_session = False
+            self._awaiting_audio = False
             raise
             
     async def send_text(self, text: str):
@@ -168,12 +219,83 @@ class BidirectionalTTS:
             except: pass
             self._active_session = False
 
+    async def cancel_session(self, sid: str = None):
+        """
+        Abandon the current session without closing the connection.
+
+        Sends CancelSession, discards audio already queued for the session and
+        drops its remaining frames as they arrive, so the websocket stays warm
+        for the next turn. `sid` names the session to cancel; a cancel for a
+        session that is no longer current is ignored (the next one has begun).
+        """
+        if not self._awaiting_audio or not self.session_id:
+            return
+        if sid is not None and sid != self.session_id:
+            return
+        t0 = time.time()
+        sid = self.session_id
+        self._cancelled_sessions[sid] = t0
+        self._active_session = False
+        self._awaiting_audio = False
+        self.stats["cancels"] += 1
+
+        # Nothing queued for this session reaches the consumer any more
+        self.stats["discarded_frames"] += self._audio_queue.qsize()
+        self.clear_audio()
+        self._stale_audio = True
+        self._audio_queue.put_nowait(None)  # Wake a consumer blocked in audio_stream
+
+        msg = DoubaoMessage(type=MsgType.FullClientRequest, event=EventType.CancelSession, session_id=sid, payload=b"{}")
+        try: await self.ws.send(msg.marshal())
+        except Exception as e:
+            print(f"[TTS 2.0] ⚠️ CancelSession failed: {e}")
+            self._cancelled_sessions.pop(sid, None)
+
+    @property
+    def awaiting_audio(self) -> bool:
+        """True while the current session may still produce audio."""
+        return self._awaiting_audio
+
+    def clear_audio(self):
+        """Discard audio (and end markers) left over from earlier sessions."""
+        while not self._audio_queue.empty():
+            self._audio_queue.get_nowait()
+
     async def audio_stream(self):
         while True:
             chunk = await self._audio_queue.get()
             if chunk is None: break
             yield chunk
 
+    async def synthesize(self, text: str):
+        """
+        One-shot synthesis: run a whole session for `text` and yield its audio.
+        Short phrases are served from the speech cache without touching the network.
+        """
+        # aclosing: aclose() of this generator cancels the session right away, not at GC
+        async with aclosing(self.cache.stream(text, self.voice_type, 24000, "pcm",
+                                              lambda: self._synthesize_live(text))) as stream:
+            async for chunk in stream:
+                yield chunk
+
+    async def _synthesize_live(self, text: str):
+        if self._active_session: await self.finish_session()
+        await self.start_session()
+        if not self._active_session:
+            raise RuntimeError("TTS session unavailable")
+        sid = self.session_id
+        await self.send_text(text)
+        await self.finish_session()
+        try:
+            async for chunk in self.audio_stream():
+                yield chunk
+        except (GeneratorExit, asyncio.CancelledError):
+            # Consumer abandoned the answer: cancel this session, keep the link
+            await self.cancel_session(sid)
+            raise
+        if self._session_error:
+            raise RuntimeError(f"TTS Error: {self._session_error}")
+
     async def close(self):
         self.is_connected = False
         if self.ws:
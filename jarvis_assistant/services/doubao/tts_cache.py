@@ -0,0 +1,322 @@
+"""
+Synthesized Speech Cache
+Content-addressed cache for TTS audio so fixed phrases (comment openers,
+error strings, greetings) are synthesized once and replayed locally.
+
+Two tiers:
+1. In-memory LRU of raw PCM bytes (byte-capped)
+2. On-disk store of raw PCM files, read back via mmap (byte-capped)
+
+Cache hits are streamed in fixed-size chunks so callers consume them exactly
+like a live synthesis stream. Disk hits are sliced straight out of the map,
+and new entries are written to disk off the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import re
+import unicodedata
+import uuid
+from collections import OrderedDict
+from contextlib import aclosing, closing
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional
+
+CACHE_DIR = os.getenv("JARVIS_TTS_CACHE_DIR", "~/.jarvis/tts_cache")
+MEMORY_LIMIT_BYTES = int(float(os.getenv("JARVIS_TTS_CACHE_MEMORY_MB", "32")) * 1024 * 1024)
+DISK_LIMIT_BYTES = int(float(os.getenv("JARVIS_TTS_CACHE_DISK_MB", "256")) * 1024 * 1024)
+MAX_TEXT_CHARS = int(os.getenv("JARVIS_TTS_CACHE_MAX_TEXT", "120"))
+# 200ms of 24kHz 16-bit mono PCM per chunk
+CHUNK_BYTES = 9600
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different spellings share one entry."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class TTSCache:
+    """
+    Two-tier (memory LRU + mmap'd disk) cache of synthesized PCM audio.
+
+    Keyed by (normalized text, voice, rate, format). Only successfully
+    completed syntheses are stored, so a cancelled or failed stream never
+    leaves a truncated clip behind.
+
+    Usage:
+        cache = get_tts_cache()
+        async for chunk in cache.stream(text, voice, 24000, "pcm",
+                                        lambda: client.synthesize(text)):
+            play(chunk)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        memory_limit: int = MEMORY_LIMIT_BYTES,
+        disk_limit: int = DISK_LIMIT_BYTES,
+        max_text_chars: int = MAX_TEXT_CHARS,
+        chunk_bytes: int = CHUNK_BYTES,
+    ):
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self.max_text_chars = max_text_chars
+        self.chunk_bytes = chunk_bytes
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._disk_bytes = 0
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "uncacheable": 0,
+        }
+
+        self._load_disk_index()
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def make_key(self, text: str, voice: str, rate: int, fmt: str) -> str:
+        """Content address for one (text, voice, rate, format) combination."""
+        ident = json.dumps([normalize_text(text), voice or "", int(rate or 0), fmt or ""], ensure_ascii=False)
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, text: str) -> bool:
+        """Only short, reusable phrases are worth caching (not whole answers)."""
+        text = normalize_text(text)
+        return 0 < len(text) <= self.max_text_chars
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def replay(self, key: str) -> Optional[Iterator[bytes]]:
+        """
+        Chunks of the cached PCM for key, or None on a miss.
+
+        Disk hits are sliced out of the mmap'd file (closed when the iterator
+        finishes or is closed) and promoted to memory once fully replayed.
+        """
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return self.iter_chunks(audio)
+
+        if key in self._disk:
+            chunks = self._read_disk(key)
+            if chunks is not None:
+                self.stats["disk_hits"] += 1
+                return chunks
+
+        self.stats["misses"] += 1
+        return None
+
+    def contains(self, key: str) -> bool:
+        """Check presence without touching hit/miss counters or LRU order."""
+        return key in self._memory or key in self._disk
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Store PCM in both tiers (the disk write blocks: use store() on the event loop)."""
+        if not audio:
+            return
+        self._remember(key, audio)
+        if len(audio) <= self.disk_limit and self._write_file(key, audio):
+            self._index_disk(key, len(audio))
+        self.stats["stores"] += 1
+
+    async def store(self, key: str, audio: bytes) -> None:
+        """Store PCM in both tiers, writing the file in a worker thread."""
+        if not audio:
+            return
+        self._remember(key, audio)
+        if len(audio) <= self.disk_limit and await asyncio.to_thread(self._write_file, key, audio):
+            self._index_disk(key, len(audio))
+        self.stats["stores"] += 1
+
+    def iter_chunks(self, audio: bytes) -> Iterator[bytes]:
+        """Split cached audio into live-synthesis sized chunks."""
+        for i in range(0, len(audio), self.chunk_bytes):
+            yield audio[i:i + self.chunk_bytes]
+
+    async def stream(
+        self,
+        text: str,
+        voice: str,
+        rate: int,
+        fmt: str,
+        synthesize: Callable[[], AsyncIterator[bytes]],
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield audio for text, from cache when possible.
+
+        On a miss the live stream from `synthesize()` is passed through
+        unchanged and stored once it completes.
+        """
+        if not self.is_cacheable(text):
+            self.stats["uncacheable"] += 1
+            async with aclosing(synthesize()) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+            return
+
+        key = self.make_key(text, voice, rate, fmt)
+        cached = self.replay(key)
+        if cached is not None:
+            with closing(cached):  # Releases the disk map even if the consumer stops early
+                for chunk in cached:
+                    yield chunk
+            return
+
+        # aclosing: stopping this stream closes the live one now, not when it is collected
+        async with aclosing(self.record(key, synthesize())) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def record(self, key: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Pass a live stream through and store it if it runs to completion."""
+        collected = []
+        async with aclosing(chunks):  # Closed as soon as the consumer stops: the session is cancelled now
+            async for chunk in chunks:
+                collected.append(chunk)
+                yield chunk
+        await self.store(key, b"".join(collected))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters plus current tier sizes."""
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+        }
+
+    def clear(self) -> None:
+        """Drop all entries from both tiers."""
+        self._memory.clear()
+        self._memory_bytes = 0
+        for key in list(self._disk):
+            self._drop_disk(key)
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.memory_limit:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_limit and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats["memory_evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pcm"
+
+    def _load_disk_index(self) -> None:
+        """Rebuild the disk LRU index from file mtimes."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entries = []
+            for path in self.cache_dir.glob("*.pcm"):
+                st = path.stat()
+                entries.append((st.st_mtime, path.stem, st.st_size))
+            for _, key, size in sorted(entries):
+                self._disk[key] = size
+                self._disk_bytes += size
+        except Exception as e:
+            print(f"⚠️ [TTS Cache] Failed to index {self.cache_dir}: {e}")
+
+    def _read_disk(self, key: str) -> Optional[Iterator[bytes]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # Stays valid after the file closes
+            os.utime(path, None)
+            self._disk.move_to_end(key)
+            return self._disk_chunks(key, mm)
+        except Exception as e:
+            print(f"⚠️ [TTS Cache] Dropping unreadable entry {key[:8]}: {e}")
+            self._drop_disk(key)
+            return None
+
+    def _disk_chunks(self, key: str, mm: mmap.mmap) -> Iterator[bytes]:
+        """Slices of a mapped entry; a complete replay is promoted to memory."""
+        chunks = []
+        with mm:
+            for i in range(0, len(mm), self.chunk_bytes):
+                chunks.append(mm[i:i + self.chunk_bytes])
+                yield chunks[-1]
+        self._remember(key, b"".join(chunks))
+
+    def _write_file(self, key: str, audio: bytes) -> bool:
+        path = self._path(key)
+        tmp = path.with_name(f"{key}.{uuid.uuid4().hex[:8]}.tmp")  # Concurrent writers never share one
+        try:
+            with open(tmp, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)
+            return True
+        except Exception as e:
+            print(f"⚠️ [TTS Cache] Failed to write entry {key[:8]}: {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return False
+
+    def _index_disk(self, key: str, size: int) -> None:
+        self._disk_bytes -= self._disk.pop(key, 0)
+        self._disk[key] = size
+        self._disk_bytes += size
+        while self._disk_bytes > self.disk_limit and self._disk:
+            oldest = next(iter(self._disk))
+            self._drop_disk(oldest)
+            self.stats["disk_evictions"] += 1
+
+    def _drop_disk(self, key: str) -> None:
+        self._disk_bytes -= self._disk.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ [TTS Cache] Failed to remove entry {key[:8]}: {e}")
+
+
+# Global instance
+_tts_cache: Optional[TTSCache] = None
+
+
+def get_tts_cache() -> TTSCache:
+    """Get the shared speech cache instance"""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
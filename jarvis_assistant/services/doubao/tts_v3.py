@@ -5,10 +5,15 @@ import asyncio
 import gzip
 import websockets
 import logging
+import time
+from contextlib import closing
 from dotenv import load_dotenv
 from jarvis_assistant.services.doubao.protocol import (
     MsgType, MsgTypeFlagBits, SerializationBits, CompressionBits
 )
+from jarvis_assistant.services.doubao.tts_cache import get_tts_cache
+from jarvis_assistant.utils.deadline import budget_timeout
+from jarvis_assistant.utils.tracing import mark
 
 # Load env
 load_dotenv(override=True)
@@ -27,6 +32,12 @@ ENCODING = "pcm"
 SAMPLE_RATE = 24000
 SPEED = 1.0
 VOLUME = 1.0
+# Longest wait for the tail of an abandoned synthesis (the whole drain, not
+# per frame); past it closing and reconnecting is the faster way to a clean link
+DRAIN_BUDGET = 0.4
+# First audio waits for the rest of the turn budget, but at least this long
+# (so a degraded "sorry, timed out" answer can still be spoken)
+SPEAK_GRACE = 1.5
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +95,16 @@ class DoubaoTTSV1:
     def __init__(self):
         self.ws = None
         self.lock = asyncio.Lock() # Prevents overlapping requests on same WS
+        self.cache = get_tts_cache()
+        self._abandoned_at = None  # Set when a consumer stops mid-stream; frames still in flight
+        self.stats = {
+            "connects": 0,
+            "reconnects": 0,
+            "cancels": 0,
+            "discarded_frames": 0,
+            "last_drain_ms": None,  # cancel until the abandoned stream's tail was discarded
+            "drain_aborts": 0,  # tails longer than DRAIN_BUDGET: link closed instead
+        }
         self.headers = {
             "X-Api-App-Key": APP_ID,
             "X-Api-Access-Key": ACCESS_TOKEN,
@@ -117,13 +138,42 @@ class DoubaoTTSV1:
         print(f"🔥 [TTS V1] Establishing persistent connection to: {TTS_WS_URL}")
         try:
             self.ws = await websockets.connect(TTS_WS_URL, additional_headers=self.headers)
+            if self.stats["connects"]:
+                self.stats["reconnects"] += 1
+            self.stats["connects"] += 1
+            self._abandoned_at = None
         except Exception as e:
             print(f"❌ [TTS V1] Connection failed: {e}")
             self.ws = None
 
-    async def synthesize(self, text: str):
-        """Synthesize text and yield PCM chunks over the open WebSocket. Thread-safe."""
+    def _cache_key(self, text: str, voice: str) -> str:
+        return self.cache.make_key(text, voice, SAMPLE_RATE, ENCODING)
+
+    def is_cached(self, text: str, voice: str = None) -> bool:
+        """True if text can be served from the speech cache without the network."""
+        return self.cache.is_cacheable(text) and self.cache.contains(self._cache_key(text, voice or VOICE_TYPE))
+
+    async def synthesize(self, text: str, voice: str = None, use_cache: bool = True):
+        """Synthesize text and yield PCM chunks over the open WebSocket. Thread-safe.
+
+        Short phrases are served from the speech cache when possible; a
+        completed live synthesis (final negative-seq packet) is stored.
+        """
+        voice = voice or VOICE_TYPE
+        key = None
+        if use_cache and self.cache.is_cacheable(text):
+            key = self._cache_key(text, voice)
+            cached = self.cache.replay(key)
+            if cached is not None:
+                with closing(cached):
+                    for chunk in cached:
+                        yield chunk
+                return
+        collected = [] if key else None
+
         async with self.lock:
+            if self._abandoned_at is not None:
+                await self._drain_abandoned()
             if self._is_closed():
                 await self.connect()
             
@@ -135,7 +185,7 @@ class DoubaoTTSV1:
                 "app": {"appid": APP_ID, "token": APP_TOKEN, "cluster": CLUSTER},
                 "user": {"uid": "jarvis_user"},
                 "audio": {
-                    "voice_type": VOICE_TYPE,
+                    "voice_type": voice,
                     "encoding": ENCODING,
                     "rate": SAMPLE_RATE,
                     "speed_ratio": SPEED,
@@ -149,6 +199,7 @@ class DoubaoTTSV1:
                 }
             }
 
+            finished = False
             try:
                 payload_bytes = gzip.compress(json.dumps(request_json).encode("utf-8"))
                 packet = bytearray(generate_header())
@@ -156,22 +207,87 @@ class DoubaoTTSV1:
                 packet.extend(payload_bytes)
                 await self.ws.send(packet)
 
+                first_frame = True
                 while True:
-                    response = await self.ws.recv()
+                    if first_frame:
+                        response = await asyncio.wait_for(self.ws.recv(), timeout=budget_timeout(None, floor=SPEAK_GRACE))
+                        first_frame = False
+                        mark("tts_first_byte", engine="v1")
+                    else:
+                        response = await self.ws.recv()
                     parsed = parse_response(response)
                     
                     if 'audio' in parsed:
+                        finished = parsed.get('seq', 0) < 0
+                        if collected is not None:
+                            collected.append(parsed['audio'])
                         yield parsed['audio']
-                        if parsed.get('seq', 0) < 0:
+                        if finished:
+                            if collected is not None:
+                                await self.cache.store(key, b"".join(collected))
                             break
                     elif parsed.get('code', 0) not in [0, 1000, 3000]:
                         logger.error(f"TTS Error: {parsed}")
                         break
+            except (GeneratorExit, asyncio.CancelledError):
+                # Consumer abandoned the answer. V1 has no cancel event, so the
+                # rest of this stream is discarded instead of dropping the link.
+                if not finished:
+                    self._abandon()
+                raise
             except Exception as e:
                 print(f"❌ [TTS V1] Stream error: {e}")
-                self.ws = None # Mark for reconnect
+                self._drop_connection()  # Closed in the background; the next request reconnects
                 raise
 
+    def _abandon(self):
+        self._abandoned_at = time.time()
+        self.stats["cancels"] += 1
+        # Drain in the background so the next turn normally finds the link clean
+        asyncio.get_running_loop().create_task(self._drain_in_background())
+
+    async def _drain_in_background(self):
+        async with self.lock:
+            if self._abandoned_at is not None:
+                await self._drain_abandoned()
+
+    async def _drain_abandoned(self):
+        """
+        Discard frames of an abandoned synthesis up to its final packet, for
+        at most DRAIN_BUDGET after the abandon; a longer tail closes the link
+        (the next request reconnects). Caller holds the lock.
+        """
+        started = self._abandoned_at
+        self._abandoned_at = None
+        if self._is_closed():
+            return
+        deadline = started + DRAIN_BUDGET
+        try:
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                parsed = parse_response(await asyncio.wait_for(self.ws.recv(), timeout=remaining))
+                if 'audio' in parsed:
+                    self.stats["discarded_frames"] += 1
+                    if parsed.get('seq', 0) < 0:
+                        break
+                elif parsed.get('code', 0) not in [0, 1000, 3000]:
+                    break
+            self.stats["last_drain_ms"] = (time.time() - started) * 1000
+        except asyncio.TimeoutError:
+            self.stats["drain_aborts"] += 1
+            self._drop_connection()
+        except Exception as e:
+            print(f"⚠️ [TTS V1] Could not drain abandoned stream ({e}), reconnecting")
+            self._drop_connection()
+
+    def _drop_connection(self):
+        """Forget the link now; its close handshake finishes in the background, not under the lock"""
+        ws, self.ws = self.ws, None
+        if ws is not None:
+            asyncio.get_running_loop().create_task(ws.close())
+
     async def close(self):
         if not self._is_closed():
             await self.ws.close()
@@ -2,12 +2,25 @@
 Base Tool Class
 All JARVIS tools should inherit from this
 """
+import functools
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from .cache import CachePolicy, get_tool_cache
+
 
 class BaseTool(ABC):
     """Base class for all JARVIS tools"""
     
+    # Result caching (see cache.py); None = every call runs
+    cache_policy: Optional[CachePolicy] = None
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        execute = cls.__dict__.get("execute")
+        if execute is not None and not getattr(execute, "__isabstractmethod__", False):
+            cls.execute = _cached_execute(execute)
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -42,3 +55,14 @@ class BaseTool(ABC):
             Tool execution result
         """
         pass
+
+
+def _cached_execute(execute):
+    """Route execute() through the tool result cache when the tool declares a policy."""
+    @functools.wraps(execute)
+    async def wrapper(self, **kwargs):
+        policy = self.cache_policy
+        if policy is None:
+            return await execute(self, **kwargs)
+        return await get_tool_cache().call(self.name, policy, kwargs, lambda: execute(self, **kwargs))
+    return wrapper
@@ -0,0 +1,184 @@
+"""
+Tool Result Cache
+Caching layer around BaseTool.execute for tools that fetch data from the
+network (weather, news, quotes, search, translation). Each tool declares
+its own policy:
+
+    class GetWeatherTool(BaseTool):
+        cache_policy = CachePolicy(ttl=600, key_args={"city": "Beijing"}, stale_ttl=1800)
+
+- ttl:       seconds a result is fresh
+- key_args:  arguments that identify a result (name -> default); other
+             arguments are ignored. None = every argument
+- stale_ttl: seconds after ttl during which the old result is returned at
+             once while a background call refreshes it (0 = never stale)
+
+Concurrent identical calls (follow-up questions, scheduler triggers firing
+together) share one in-flight request. Error replies are never stored.
+Disable with JARVIS_TOOL_CACHE=false.
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+TOOL_CACHE_ENABLED = os.getenv("JARVIS_TOOL_CACHE", "true").lower() == "true"
+MAX_ENTRIES = int(os.getenv("JARVIS_TOOL_CACHE_ENTRIES", "512"))
+
+# Replies that mean the call failed (same test as JarvisAgent.execute_step, plus
+# the polite "抱歉…" errors the tools return instead of raising)
+ERROR_PREFIXES = ("❌", "抱歉")
+
+# Set while the cache itself runs a tool, so a nested execute() goes straight through
+_filling = contextvars.ContextVar("tool_cache_filling", default=False)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Per-tool caching declaration."""
+    ttl: float
+    key_args: Optional[Dict[str, Any]] = None
+    stale_ttl: float = 0.0
+
+
+def is_cacheable(result: Any) -> bool:
+    if result is None:
+        return False
+    text = str(result)
+    return bool(text.strip()) and not text.startswith(ERROR_PREFIXES) and "Error" not in text and "error" not in text
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return value
+
+
+def cache_key(tool: str, policy: CachePolicy, kwargs: Dict[str, Any]) -> Tuple:
+    if policy.key_args is None:
+        return (tool, _normalize(kwargs))
+    values = []
+    for name, default in policy.key_args.items():
+        value = kwargs.get(name)
+        values.append(_normalize(default if value is None or value == "" else value))
+    return (tool,) + tuple(values)
+
+
+class ToolResultCache:
+    """
+    TTL cache with stale-while-revalidate and single-flight coalescing.
+
+    Usage:
+        cache = get_tool_cache()
+        result = await cache.call("get_weather", policy, {"city": "北京"}, lambda: fetch("北京"))
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, enabled: bool = TOOL_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()  # key -> (stored_at, result)
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, tool: str, key: str):
+        counters = self.stats.setdefault(
+            tool, {"hits": 0, "misses": 0, "stale": 0, "coalesced": 0, "refreshes": 0, "uncached": 0, "errors": 0}
+        )
+        counters[key] += 1
+
+    async def call(
+        self,
+        tool: str,
+        policy: CachePolicy,
+        kwargs: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Cached result of fetch() for these arguments."""
+        if not self.enabled or _filling.get():
+            return await fetch()
+
+        key = cache_key(tool, policy, kwargs)
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age <= policy.ttl:
+                self._entries.move_to_end(key)
+                self._count(tool, "hits")
+                return entry[1]
+            if age <= policy.ttl + policy.stale_ttl:
+                self._count(tool, "stale")
+                if key not in self._inflight:
+                    self._count(tool, "refreshes")
+                    self._start(tool, key, fetch)
+                return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count(tool, "coalesced")
+        else:
+            self._count(tool, "misses")
+            task = self._start(tool, key, fetch)
+        # shield: a cancelled caller must not cancel the request others are waiting on
+        return await asyncio.shield(task)
+
+    def _start(self, tool: str, key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        async def run():
+            # Imported here: utils imports the tools package that imports this module
+            from jarvis_assistant.utils.deadline import detached
+            _filling.set(True)
+            try:
+                # The shared call outlives the turn that started it; each caller's
+                # wait is bounded by its own deadline instead
+                result = await detached(fetch())
+            except Exception:
+                self._count(tool, "errors")
+                raise
+            finally:
+                self._inflight.pop(key, None)
+            if is_cacheable(result):
+                self._entries[key] = (time.time(), result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._count(tool, "uncached")
+            return result
+
+        task = asyncio.get_running_loop().create_task(run())
+        # Background refreshes may fail with nobody awaiting them
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return task
+
+    def invalidate(self, tool: Optional[str] = None):
+        """Drop cached results (of one tool, or all)."""
+        for key in [k for k in self._entries if tool is None or k[0] == tool]:
+            del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-tool hit/miss/stale counters."""
+        tools = {}
+        for tool, counters in self.stats.items():
+            lookups = counters["hits"] + counters["stale"] + counters["misses"] + counters["coalesced"]
+            tools[tool] = {**counters, "hit_rate": round((lookups - counters["misses"]) / lookups, 3) if lookups else 0.0}
+        return {"enabled": self.enabled, "entries": len(self._entries), "tools": tools}
+
+
+# Singleton instance
+_tool_cache_instance: Optional[ToolResultCache] = None
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Get the shared tool result cache"""
+    global _tool_cache_instance
+    if _tool_cache_instance is None:
+        _tool_cache_instance = ToolResultCache()
+    return _tool_cache_instance
@@ -9,12 +9,23 @@ import yfinance as yf
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 from .base import BaseTool
+from .cache import CachePolicy
 from jarvis_assistant.utils.validators import DataAuthenticityValidator
 
 # Executor for blocking I/O
 _executor = ThreadPoolExecutor(max_workers=3)
 
+# Replies spoken verbatim (pre-synthesized by the speech cache warm-up)
+NEWS_UNREACHABLE = "抱歉，我暂时无法连接到新闻服务器，请稍后再试。"
+NEWS_FAILED = "抱歉，获取新闻时遇到了点麻烦，我会尽快修复。"
+STOCK_NO_SYMBOL = "请告诉我您想查询的股票名称或代码。"
+STOCK_UNREACHABLE = "抱歉，无法访问行情服务器。"
+STOCK_FAILED = "查询行情时出了一点小状况，请稍后再试。"
+FIXED_REPLIES = (NEWS_UNREACHABLE, NEWS_FAILED, STOCK_NO_SYMBOL, STOCK_UNREACHABLE, STOCK_FAILED)
+
 class NewsBriefingTool(BaseTool):
+    cache_policy = CachePolicy(ttl=600, key_args={"category": "world"}, stale_ttl=1800)
+
     def __init__(self):
         self.validator = DataAuthenticityValidator()
 
@@ -86,11 +97,14 @@ class NewsBriefingTool(BaseTool):
                         response += f"{i}. {title}。\n"
                     response += "\n您对哪条感兴趣吗？"
                     return response
-            return "抱歉，我暂时无法连接到新闻服务器，请稍后再试。"
+            return NEWS_UNREACHABLE
         except Exception:
-            return "抱歉，获取新闻时遇到了点麻烦，我会尽快修复。"
+            return NEWS_FAILED
 
 class StockPriceTool(BaseTool):
+    # Quotes move; only follow-up questions within half a minute share one
+    cache_policy = CachePolicy(ttl=30, key_args={"symbol": None}, stale_ttl=30)
+
     def __init__(self):
         self.validator = DataAuthenticityValidator()
 
@@ -121,11 +135,11 @@ class StockPriceTool(BaseTool):
     async def execute(self, **kwargs) -> str:
         query = kwargs.get("symbol")
         if not query:
-            return "请告诉我您想查询的股票名称或代码。"
+            return STOCK_NO_SYMBOL
             
         # yfinance fetches real market data from Yahoo Finance
         if not self.validator.validate_source("web", "finance.yahoo.com"):
-            return "抱歉，无法访问行情服务器。"
+            return STOCK_UNREACHABLE
 
         # 股票名称映射 (中文名 -> (代码, 显示名))
         mappings = {
@@ -196,7 +210,7 @@ class StockPriceTool(BaseTool):
                 
             return f"{comment} {display_name}（{symbol}）现价 {price:.2f} {currency}，今日{direction}了 {abs(change):.2f}%。"
         except Exception as e:
-            return "查询行情时出了一点小状况，请稍后再试。"
+            return STOCK_FAILED
 
 
 # -------------------------------
@@ -11,6 +11,7 @@ import subprocess
 import platform
 from typing import Dict, Optional
 from .base import BaseTool
+from jarvis_assistant.utils.deadline import budget_timeout
 
 class MiguMusicTool(BaseTool):
     """Play music from Cloud (Netease VIP / YouTube / iTunes)"""
@@ -298,7 +299,8 @@ class MiguMusicTool(BaseTool):
                 "--user-agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
                 "--referer", "http://music.163.com/",
                 "--header", "Range: bytes=0-",
-                "--max-time", "30",
+                # Runs on the event loop thread: bound it by the turn budget too
+                "--max-time", f"{budget_timeout(30, floor=1.0):.1f}",
                 url
             ]
             if cookie:
@@ -5,11 +5,16 @@ Provides weather-related functionality using free APIs
 import aiohttp
 from typing import Dict, Any
 from .base import BaseTool
+from .cache import CachePolicy
+from jarvis_assistant.utils.deadline import budget_timeout
 
 
 class GetWeatherTool(BaseTool):
     """Get current weather for a city"""
     
+    # Conditions change slowly; a stale answer beats a slow one
+    cache_policy = CachePolicy(ttl=600, key_args={"city": "Beijing"}, stale_ttl=1800)
+    
     @property
     def name(self) -> str:
         return "get_weather"
@@ -45,7 +50,7 @@ class GetWeatherTool(BaseTool):
         try:
             url = f"https://wttr.in/{city}?format=j1&lang=zh"
             async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=3) as response:  # 3s timeout
+                async with session.get(url, timeout=budget_timeout(3)) as response:  # 3s, less if the turn is nearly over
                     if response.status == 200:
                         data = await response.json()
                         current = data.get("current_condition", [{}])[0]
@@ -82,7 +87,7 @@ class GetWeatherTool(BaseTool):
                 # If city not in cache, do geocoding
                 if lat is None:
                     geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city}&count=1&language=zh&format=json"
-                    async with session.get(geo_url, timeout=3) as resp:
+                    async with session.get(geo_url, timeout=budget_timeout(3)) as resp:
                         if resp.status == 200:
                             geo = await resp.json()
                             results = geo.get("results") or []
@@ -94,7 +99,7 @@ class GetWeatherTool(BaseTool):
                     return f"抱歉，我没有找到 {city} 的位置。"
                 
                 weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true"
-                async with session.get(weather_url, timeout=3) as resp2:
+                async with session.get(weather_url, timeout=budget_timeout(3)) as resp2:
                     if resp2.status == 200:
                         data = await resp2.json()
                         cw = data.get("current_weather") or {}
@@ -124,6 +129,8 @@ class GetWeatherTool(BaseTool):
 class GetForecastTool(BaseTool):
     """Get weather forecast for a city"""
     
+    cache_policy = CachePolicy(ttl=1800, key_args={"city": "Beijing", "days": 3}, stale_ttl=3600)
+    
     @property
     def name(self) -> str:
         return "get_forecast"
@@ -165,7 +172,7 @@ class GetForecastTool(BaseTool):
         try:
             url = f"https://wttr.in/{city}?format=j1&lang=zh"
             async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=3) as response:
+                async with session.get(url, timeout=budget_timeout(3)) as response:
                     if response.status == 200:
                         data = await response.json()
                         forecasts = data.get("weather", [])[:days]
@@ -199,7 +206,7 @@ class GetForecastTool(BaseTool):
                 if lat is None:
                     # Geocoding
                     geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city}&count=1&language=zh&format=json"
-                    async with session.get(geo_url, timeout=3) as resp:
+                    async with session.get(geo_url, timeout=budget_timeout(3)) as resp:
                         if resp.status == 200:
                             geo = await resp.json()
                             results = geo.get("results") or []
@@ -212,7 +219,7 @@ class GetForecastTool(BaseTool):
 
                 # Forecast API
                 weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&daily=weathercode,temperature_2m_max,temperature_2m_min&timezone=auto"
-                async with session.get(weather_url, timeout=3) as resp2:
+                async with session.get(weather_url, timeout=budget_timeout(3)) as resp2:
                     if resp2.status == 200:
                         data = await resp2.json()
                         daily = data.get("daily", {})
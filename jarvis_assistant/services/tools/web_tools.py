@@ -9,11 +9,23 @@ import re
 from urllib.parse import quote
 from typing import Dict, Any
 from .base import BaseTool
+from .cache import CachePolicy
+from jarvis_assistant.utils.deadline import budget_timeout
+
+# Replies spoken verbatim (pre-synthesized by the speech cache warm-up)
+SEARCH_TIMEOUT = "抱歉，搜索服务响应超时，请稍后再试。"
+SEARCH_UNAVAILABLE = "抱歉，我现在连不上搜索服务，请稍后再试。"
+TRANSLATE_FAILED = "翻译失败，请稍后重试"
+TRANSLATE_TIMEOUT = "抱歉，翻译服务响应超时，请稍后再试。"
+TRANSLATE_UNAVAILABLE = "抱歉，翻译服务暂时不可用，请稍后再试。"
+FIXED_REPLIES = (SEARCH_TIMEOUT, SEARCH_UNAVAILABLE, TRANSLATE_FAILED, TRANSLATE_TIMEOUT, TRANSLATE_UNAVAILABLE)
 
 
 class WebSearchTool(BaseTool):
     """Search the web using DuckDuckGo (no API key needed)"""
     
+    cache_policy = CachePolicy(ttl=3600, key_args={"query": None, "num_results": 3})
+    
     @property
     def name(self) -> str:
         return "web_search"
@@ -59,7 +71,7 @@ class WebSearchTool(BaseTool):
                 if brave_key:
                     url = f"https://api.search.brave.com/res/v1/web/search?q={quote(query)}&count={num_results}"
                     headers = {"Accept": "application/json", "X-Subscription-Token": brave_key}
-                    async with session.get(url, headers=headers, timeout=10) as response:
+                    async with session.get(url, headers=headers, timeout=budget_timeout(10)) as response:
                         if response.status != 200:
                             return f"实时搜索失败，状态码：{response.status}"
 
@@ -80,7 +92,7 @@ class WebSearchTool(BaseTool):
 
                 # DuckDuckGo instant answer API (fallback)
                 url = f"https://api.duckduckgo.com/?q={quote(query)}&format=json&no_html=1"
-                async with session.get(url, timeout=10) as response:
+                async with session.get(url, timeout=budget_timeout(10)) as response:
                     if response.status == 200:
                         data = await response.json()
 
@@ -105,9 +117,9 @@ class WebSearchTool(BaseTool):
                     return f"搜索失败，状态码：{response.status}"
                         
         except asyncio.TimeoutError:
-            return "抱歉，搜索服务响应超时，请稍后再试。"
+            return SEARCH_TIMEOUT
         except Exception:
-            return "抱歉，我现在连不上搜索服务，请稍后再试。"
+            return SEARCH_UNAVAILABLE
 
 
 class FetchUrlTool(BaseTool):
@@ -151,7 +163,7 @@ class FetchUrlTool(BaseTool):
             }
             
             async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=10) as response:
+                async with session.get(url, headers=headers, timeout=budget_timeout(10)) as response:
                     if response.status == 200:
                         html = await response.text()
                         
@@ -183,6 +195,8 @@ class FetchUrlTool(BaseTool):
 class TranslateTool(BaseTool):
     """Translate text between languages"""
     
+    cache_policy = CachePolicy(ttl=86400, key_args={"text": None, "to_lang": "en"})
+    
     @property
     def name(self) -> str:
         return "translate"
@@ -234,7 +248,7 @@ class TranslateTool(BaseTool):
             url = f"https://api.mymemory.translated.net/get?q={quote(text)}&langpair={lang_pair}"
             
             async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
+                async with session.get(url, timeout=budget_timeout(10)) as response:
                     if response.status == 200:
                         data = await response.json()
                         translation = data.get("responseData", {}).get("translatedText", "")
@@ -242,11 +256,11 @@ class TranslateTool(BaseTool):
                         if translation:
                             return f"🌐 翻译结果：\n{text}\n→ {translation}"
                         else:
-                            return "翻译失败，请稍后重试"
+                            return TRANSLATE_FAILED
                     else:
                         return f"翻译服务响应错误：{response.status}"
                         
         except asyncio.TimeoutError:
-            return "抱歉，翻译服务响应超时，请稍后再试。"
+            return TRANSLATE_TIMEOUT
         except Exception:
-            return "抱歉，翻译服务暂时不可用，请稍后再试。"
+            return TRANSLATE_UNAVAILABLE
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Rolling conversation summary tests: the prompt history stays inside its
+token budget as the session grows, the summary is refreshed in the
+background and persisted in MemoryStore, and a backlog is folded in
+bounded batches, oldest first, with the watermark advancing per batch.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.core.memory import MemoryStore
+from jarvis_assistant.core.conversation_summary import FOLD_BATCH, RollingSummarizer, estimate_tokens
+
+NEWS = "\n".join(f"{i}. 今日要闻：某地发布了一条很长的新闻标题，内容涉及经济、科技和社会等多个方面。" for i in range(12))
+
+
+def fill(memory: MemoryStore, turns: int):
+    for i in range(turns):
+        memory.add_conversation("user", f"第{i}个问题：今天有什么新闻？")
+        memory.add_conversation("assistant", NEWS)
+
+
+def test_window_flat_as_session_grows(memory: MemoryStore):
+    summarizer = RollingSummarizer(memory, token_budget=800, turn_cap=150)
+    sizes = []
+    for _ in range(5):
+        fill(memory, 10)
+        sizes.append(estimate_tokens(summarizer.history_string()))
+    raw = estimate_tokens(memory.get_context_string(limit=6))
+    assert max(sizes) <= 800 and len(set(sizes)) == 1, sizes
+    print(f"✅ history stays at {sizes[-1]} tokens over 100 turns (raw window would be {raw})")
+
+
+async def test_background_refresh_and_persistence(memory: MemoryStore):
+    calls = []
+
+    async def slow_llm(system_prompt, content):
+        calls.append(content)
+        await asyncio.sleep(0.3)
+        return "用户每天都在问新闻，偏好简短的要点。"
+
+    summarizer = RollingSummarizer(memory, llm=slow_llm)
+    fill(memory, 5)  # 10 entries: 6 stay raw, 4 to fold
+
+    t0 = time.time()
+    task = summarizer.schedule_refresh()
+    assert task is not None and (time.time() - t0) < 0.05, "refresh must not block the turn"
+    assert summarizer.schedule_refresh() is task, "only one refresh in flight"
+    await task
+
+    summary, turns = summarizer.window()
+    assert summary.startswith("用户每天都在问新闻") and len(turns) == summarizer.keep_turns
+    assert summarizer.pending_turns() == []
+    assert "[EXISTING SUMMARY]" in calls[0]
+
+    reloaded = MemoryStore(path=str(memory.path))
+    assert reloaded.get_conversation_summary()["text"] == summary
+    print(f"✅ background refresh folded {summarizer.stats['folded_turns']} turns, persisted in MemoryStore")
+
+
+async def test_extractive_fallback(memory: MemoryStore):
+    async def broken_llm(system_prompt, content):
+        raise RuntimeError("offline")
+
+    summarizer = RollingSummarizer(memory, llm=broken_llm, summary_budget=120)
+    fill(memory, 6)
+    text = await summarizer.refresh()
+    assert text and estimate_tokens(text) <= 121
+    assert summarizer.stats["llm_failures"] == 1
+    print(f"✅ extractive fallback within budget: {text[:40]}…")
+
+
+async def test_backlog_folded_in_batches(memory: MemoryStore):
+    calls = []
+    release = asyncio.Event()
+
+    async def llm(system_prompt, content):
+        new_turns = content.split("[NEW TURNS]", 1)[1]
+        calls.append(new_turns.count("[USER]:") + new_turns.count("[ASSISTANT]:"))
+        if len(calls) == 2:
+            await release.wait()  # Second batch hangs until the refresh is cancelled
+        return f"summary after {len(calls)} batches"
+
+    summarizer = RollingSummarizer(memory, llm=llm)
+    fill(memory, 15)  # 30 entries: 6 stay raw, 24 waiting
+    pending = summarizer.pending_turns()
+    assert len(pending) == 24
+
+    task = asyncio.create_task(summarizer.refresh())
+    while len(calls) < 2:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    stored = memory.get_conversation_summary()
+    assert calls == [FOLD_BATCH, FOLD_BATCH], calls
+    assert stored["covered_until"] == pending[FOLD_BATCH - 1]["timestamp"] and stored["turns"] == FOLD_BATCH
+    assert summarizer.pending_turns() == pending[FOLD_BATCH:], "cancelled refresh resumes after its last batch"
+
+    release.set()
+    await summarizer.refresh()
+    assert max(calls) <= FOLD_BATCH and summarizer.pending_turns() == []
+    assert memory.get_conversation_summary()["turns"] == 24
+    print(f"✅ backlog of 24 turns folded in batches of {FOLD_BATCH} ({len(calls)} LLM calls), watermark per batch")
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as d:
+        cwd = os.getcwd()
+        os.chdir(d)  # MemoryStore.save() also writes MEMORY.md into the cwd
+        try:
+            test_window_flat_as_session_grows(MemoryStore(path=f"{d}/a.json"))
+            await test_background_refresh_and_persistence(MemoryStore(path=f"{d}/b.json"))
+            await test_extractive_fallback(MemoryStore(path=f"{d}/c.json"))
+            await test_backlog_folded_in_batches(MemoryStore(path=f"{d}/e.json"))
+        finally:
+            os.chdir(cwd)
+    print("\n✅ All conversation summary tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Doubao stand-in server tests: every client talks to the local server through
+its URL environment variable, and the configured timing/failures show up.
+Runs offline - no Volcengine credentials needed.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.services.doubao.standin_server import DoubaoStandInServer, StandInProfile
+
+FIRST_BYTE_MS = 150
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_server(**overrides) -> DoubaoStandInServer:
+    profile = StandInProfile(first_byte_ms=FIRST_BYTE_MS, jitter_ms=0, audio_bytes_per_sec=960000, tokens_per_sec=200)
+    profile.update(overrides)
+    server = DoubaoStandInServer(profile, port=free_port())
+    await server.start()
+    # Clients read these at construction/import time
+    os.environ.update(server.client_env())
+    return server
+
+
+async def test_tts_v1_round_trip():
+    server = await start_server()
+    try:
+        import importlib
+        import jarvis_assistant.services.doubao.tts_v3 as tts_v3
+        importlib.reload(tts_v3)
+
+        client = tts_v3.DoubaoTTSV1()
+        t0 = time.time()
+        first, total = None, 0
+        async for chunk in client.synthesize("离线测试一下", use_cache=False):
+            first = first or (time.time() - t0) * 1000
+            total += len(chunk)
+        await client.close()
+
+        assert total == 6 * 9600  # 200ms of audio per character
+        assert first >= FIRST_BYTE_MS * 0.9
+        assert server.stats["tts_v1"]["requests"] == 1
+        print(f"✅ TTS v1: first audio {first:.0f}ms, {total} bytes")
+    finally:
+        await server.stop()
+
+
+async def test_bidir_session_and_error_injection():
+    server = await start_server()
+    try:
+        from jarvis_assistant.services.doubao.tts_bidirection import BidirectionalTTS
+
+        tts = BidirectionalTTS()
+        await tts.connect()
+        assert tts.is_connected
+        audio = b"".join([chunk async for chunk in tts._synthesize_live("你好先生")])
+        assert len(audio) == 4 * 9600
+
+        server.profile.update({"error_rate": 1.0})
+        try:
+            await tts.start_session()
+            raise AssertionError("injected error not surfaced")
+        except (RuntimeError, asyncio.TimeoutError):
+            pass
+        assert server.stats["tts_bidir"]["errors"] == 1
+        await tts.close()
+        print(f"✅ Bidirectional TTS: {len(audio)} bytes, injected error surfaced")
+    finally:
+        await server.stop()
+
+
+async def test_asr_v2_partial_and_final():
+    server = await start_server(asr_text="打开客厅的灯")
+    try:
+        from jarvis_assistant.services.audio.asr_v2 import ASRServiceV2
+
+        asr = ASRServiceV2("app", "token", "cluster")
+        results = []
+
+        async def on_text(text, is_final):
+            results.append((text, is_final))
+
+        await asr.connect()
+        asr.on_transcription = on_text
+        for _ in range(10):
+            await asr.send_audio(b"\x00" * 6400)  # 200ms at 16kHz
+        await asr.send_audio(b"", is_last=True)
+        await asyncio.sleep(FIRST_BYTE_MS / 1000 + 0.2)
+        await asr.close()
+
+        assert results[-1] == ("打开客厅的灯", True)
+        assert any(not final for _, final in results)
+        print(f"✅ ASR v2: {len(results) - 1} partials then final")
+    finally:
+        await server.stop()
+
+
+async def test_llm_sse_streams():
+    server = await start_server(reply="一二三四五六七八")
+    try:
+        from jarvis_assistant.agent.llm_client import DoubaoLLMClient
+
+        llm = DoubaoLLMClient(endpoint_id="ep-local", api_key="local")
+        t0 = time.time()
+        first, chunks = None, []
+        async for chunk in llm.generate_stream("你好"):
+            first = first or (time.time() - t0) * 1000
+            chunks.append(chunk)
+
+        assert "".join(chunks) == "一二三四五六七八"
+        assert len(chunks) == 4 and first >= FIRST_BYTE_MS * 0.9
+        print(f"✅ Responses SSE: first token {first:.0f}ms, {len(chunks)} deltas")
+    finally:
+        await server.stop()
+
+
+async def main():
+    await test_tts_v1_round_trip()
+    await test_bidir_session_and_error_injection()
+    await test_asr_v2_partial_and_final()
+    await test_llm_sse_streams()
+    print("\n✅ All stand-in server tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Gateway tests: token streaming over WebSocket and HTTP/SSE, one session
+per connection, overload shed with 503 / "overloaded" instead of queued,
+and a client that stops reading slowing then losing only its own turn.
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import aiohttp
+
+from jarvis_assistant.core.memory import get_memory
+from jarvis_assistant.core.session import SessionManager
+from jarvis_assistant.io.net.gateway import AdmissionGate, ConnectionOutput, Gateway, Overloaded
+
+
+class StreamingAgent:
+    """Streams a few tokens per turn; remembers the last city per session."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+
+    async def run(self, user_input: str, stream_callback=None) -> str:
+        memory = get_memory()
+        memory.add_conversation("user", user_input)
+        if user_input.startswith("我在"):
+            memory.set_profile("location", user_input[2:])
+        tokens = ["你好，", "你在", memory.get_profile("location") or "哪里", "。"]
+        for token in tokens:
+            await asyncio.sleep(self.delay)
+            await stream_callback(token)
+        return "".join(tokens)
+
+
+async def start_gateway(root: str, agent=None, **gate_kwargs) -> Tuple[Gateway, str]:
+    agent = agent or StreamingAgent()
+    sessions = SessionManager(agent_factory=lambda: agent, root=root)
+    gateway = Gateway(sessions=sessions, gate=AdmissionGate(**gate_kwargs) if gate_kwargs else None)
+    url = await gateway.start("127.0.0.1", 0)
+    return gateway, url
+
+
+async def read_sse(response) -> list:
+    events = []
+    async for line in response.content:
+        line = line.decode("utf-8").strip()
+        if line.startswith("data: "):
+            events.append(json.loads(line[6:]))
+    return events
+
+
+async def test_sse_stream():
+    with tempfile.TemporaryDirectory() as root:
+        gateway, url = await start_gateway(root)
+        try:
+            async with aiohttp.ClientSession() as http:
+                async with http.post(f"{url}/v1/chat", json={"text": "我在青岛", "session": "alice"}) as resp:
+                    assert resp.status == 200 and resp.headers["X-Jarvis-Session"] == "alice"
+                    events = await read_sse(resp)
+                async with http.post(f"{url}/v1/chat", json={"text": "天气怎么样", "session": "alice"}) as resp:
+                    again = await read_sse(resp)
+                async with http.post(f"{url}/v1/chat", json={}) as resp:
+                    assert resp.status == 400
+        finally:
+            await gateway.stop()
+
+    tokens = [e["text"] for e in events if e["type"] == "token"]
+    assert tokens == ["你好，", "你在", "青岛", "。"], tokens
+    done = events[-1]
+    assert done["type"] == "done" and done["text"] == "你好，你在青岛。" and done["ttft_ms"] < done["turn_ms"]
+    assert again[-1]["text"] == "你好，你在青岛。", "the session continues across requests"
+    print(f"✅ SSE streams tokens (ttft {done['ttft_ms']:.0f}ms of {done['turn_ms']:.0f}ms)")
+
+
+async def test_websocket_sessions():
+    with tempfile.TemporaryDirectory() as root:
+        gateway, url = await start_gateway(root)
+        try:
+            async with aiohttp.ClientSession() as http:
+                async def converse(city):
+                    replies = []
+                    async with http.ws_connect(f"{url}/ws") as ws:
+                        ready = await ws.receive_json()
+                        for text in (f"我在{city}", "天气怎么样"):
+                            await ws.send_json({"text": text})
+                            while True:
+                                event = await ws.receive_json()
+                                if event["type"] == "done":
+                                    replies.append(event["text"])
+                                    break
+                    return ready["session"], replies
+
+                (a, alice), (b, bob) = await asyncio.gather(converse("青岛"), converse("上海"))
+            await asyncio.sleep(0.05)
+            stats = gateway.get_stats()
+        finally:
+            await gateway.stop()
+
+    assert a != b
+    assert alice == ["你好，你在青岛。"] * 2 and bob == ["你好，你在上海。"] * 2
+    assert stats["gateway"]["connections"] == 2 and stats["gateway"]["open_connections"] == 0
+    print("✅ one session per WebSocket, concurrent connections isolated")
+
+
+async def test_shared_session_outlives_one_connection():
+    with tempfile.TemporaryDirectory() as root:
+        gateway, url = await start_gateway(root, StreamingAgent(delay=0.05))
+        sessions = gateway.sessions
+        try:
+            async with aiohttp.ClientSession() as http:
+                async def turn(ws, text):
+                    await ws.send_json({"text": text})
+                    while True:
+                        event = await ws.receive_json()
+                        if event["type"] == "done":
+                            return event["text"]
+
+                # Two connections on one session: the first leaving must not close it under the second
+                async with http.ws_connect(f"{url}/ws?session=shared") as second:
+                    await second.receive_json()
+                    async with http.ws_connect(f"{url}/ws?session=shared") as first:
+                        await first.receive_json()
+                        await turn(first, "我在青岛")
+                    reply = await turn(second, "天气怎么样")
+                    assert sessions.get_stats()["opened"] == 1, "not closed and reopened between the connections"
+                await asyncio.sleep(0.05)
+                assert sessions.get_stats()["open"] == 0, "the last connection closes the session"
+
+                # A connection leaving while an HTTP turn runs on its session leaves it to idle eviction
+                async with http.ws_connect(f"{url}/ws?session=mixed") as ws:
+                    await ws.receive_json()
+                    chat = asyncio.create_task(http.post(f"{url}/v1/chat", json={"text": "我在上海", "session": "mixed"}))
+                    while not sessions.get_stats()["busy"]:
+                        await asyncio.sleep(0.01)
+                await asyncio.sleep(0.05)
+                busy_open = sessions.get_stats()["open"]
+                async with await chat as resp:
+                    events = await read_sse(resp)
+        finally:
+            await gateway.stop()
+
+    assert reply == "你好，你在青岛。", "the second connection kept the session state"
+    assert busy_open == 1 and events[-1]["text"] == "你好，你在上海。"
+    print("✅ a session stays open while another connection or a turn still uses it")
+
+
+async def test_overload_shed():
+    with tempfile.TemporaryDirectory() as root:
+        gateway, url = await start_gateway(root, StreamingAgent(delay=0.1), max_inflight=1, max_queue=0)
+        try:
+            async with aiohttp.ClientSession() as http:
+                async def chat(i):
+                    t0 = time.perf_counter()
+                    async with http.post(f"{url}/v1/chat", json={"text": f"问题{i}"}) as resp:
+                        await resp.read()
+                        return resp.status, resp.headers.get("Retry-After"), time.perf_counter() - t0
+
+                first = asyncio.create_task(chat(0))
+                await asyncio.sleep(0.05)
+                shed = await chat(1)
+                assert (await first)[0] == 200
+
+                async with http.ws_connect(f"{url}/ws") as ws:
+                    await ws.receive_json()
+                    busy = asyncio.create_task(chat(2))
+                    await asyncio.sleep(0.05)
+                    await ws.send_str("现在几点了")
+                    ws_event = await ws.receive_json()
+                    await busy
+        finally:
+            await gateway.stop()
+
+    status, retry_after, elapsed = shed
+    assert status == 503 and retry_after == "1" and elapsed < 0.1, "shed at once, not after the running turn"
+    assert ws_event["type"] == "error" and ws_event["error"] == "overloaded"
+    assert gateway.stats["shed"] == 2 and gateway.gate.stats["shed_queue_full"] == 2
+    print(f"✅ overload shed in {elapsed * 1000:.0f}ms (HTTP 503, WebSocket error event)")
+
+
+async def test_admission_wait_limit():
+    gate = AdmissionGate(max_inflight=1, max_queue=4, queue_wait=0.05)
+    async with gate.admit():
+        t0 = time.perf_counter()
+        try:
+            async with gate.admit():
+                raise AssertionError("no slot should free up")
+        except Overloaded as e:
+            assert e.reason == "queue wait exceeded"
+        assert time.perf_counter() - t0 < 0.1 and gate.waiting == 0
+    async with gate.admit():
+        assert gate.inflight == 1
+    print("✅ queued turns shed after the wait limit")
+
+
+async def test_backpressure_and_slow_consumer():
+    output = ConnectionOutput(buffer=2, send_timeout=0.2)
+    await output.push("a")
+    await output.push("b")
+    blocked = asyncio.create_task(output.push("c"))
+    await asyncio.sleep(0.05)
+    assert not blocked.done(), "a full buffer holds the producer back"
+    events = output.events()
+    assert (await events.__anext__())["text"] == "a"
+    await asyncio.wait_for(blocked, 0.1)
+
+    t0 = time.perf_counter()
+    try:
+        await output.push("d")  # Nobody reads any more
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("expected the slow consumer to be dropped")
+    assert output.closed and 0.15 < time.perf_counter() - t0 < 0.4
+    print("✅ full send buffer slows the turn; a stalled client is dropped")
+
+
+async def main():
+    await test_sse_stream()
+    await test_websocket_sessions()
+    await test_shared_session_outlives_one_connection()
+    await test_overload_shed()
+    await test_admission_wait_limit()
+    await test_backpressure_and_slow_consumer()
+    print("\n✅ All gateway tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
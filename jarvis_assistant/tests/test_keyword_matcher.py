@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Keyword automaton tests and routing benchmark.
+
+Checks the automaton against plain substring search, the IntentMatcher /
+ContextResolver / MemoryAgent call sites that now read its hits, and times
+one scan per query against the per-keyword `in` checks it replaces.
+
+    python jarvis_assistant/tests/test_keyword_matcher.py
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.core.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from jarvis_assistant.core.intent_matcher import IntentMatcher
+from jarvis_assistant.core.context_resolver import ContextResolver
+
+try:
+    import jarvis_assistant.core.agent  # noqa: F401  (registers intent keywords and cues)
+    AGENT_VOCAB = True
+except ImportError:
+    AGENT_VOCAB = False
+
+QUERIES = [
+    "北京天气怎么样", "外面冷不冷", "上海多少度", "明天会下雨吗", "青岛的天气", "今天适合出门吗要不要带伞",
+    "特斯拉和苹果的股价", "NVDA 现在多少钱", "查询英伟达股价", "比特币行情怎么样", "tsla走势", "茅台今天涨了吗",
+    "播放周杰伦的晴天", "来首好听的歌", "停止播放", "换一首", "放一首《彩虹》",
+    "今天有什么新闻", "财经头条", "最近发生了什么大事",
+    "现在几点了", "星期几", "5分钟后提醒我喝水", "3加5等于多少", "12 * 7",
+    "把空调调到26度", "开灯", "卧室的灯亮一点",
+    "搜索量子计算的最新进展", "帮我查一下深度学习教程", "爱因斯坦是谁",
+    "我最近在写一篇关于强化学习的论文", "我想学Python", "我喜欢喝咖啡", "你觉得人工智能会取代人类吗",
+    "给张三发邮件说明天开会", "查看日程", "添加日程明天下午三点开会", "读取文件 notes.txt",
+    "Jarvis, what's the weather in Shanghai?", "play some music", "how is apple stock doing today",
+]
+
+
+def naive(matcher: KeywordMatcher, text: str):
+    """The per-keyword substring checks the automaton replaces."""
+    found = set()
+    lowered = text.lower()
+    for category, (keywords, _, _) in matcher._vocab.items():
+        for keyword in keywords:
+            if keyword.lower() in lowered:
+                found.add((category, keyword))
+    return found
+
+
+def test_matches_substring_search():
+    rng = random.Random(3)
+    alphabet = "天气股价新闻的了吗abAB"
+    words = sorted({"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(300)})
+    matcher = KeywordMatcher()
+    matcher.register("a", words[::2])
+    matcher.register("b", words[1::2])
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+        got = sorted((h.start, h.category, h.keyword) for h in matcher.scan(text))
+        expected = sorted(
+            (i, c, w) for c, ws in (("a", words[::2]), ("b", words[1::2])) for w in ws
+            for i in range(len(text)) if text.lower().startswith(w.lower(), i)
+        )
+        assert got == expected, text
+    print(f"✅ automaton == substring search on 2000 random texts ({matcher.get_stats()['states']} states)")
+
+
+def test_boundaries_case_and_remove():
+    matcher = KeywordMatcher()
+    matcher.register("ticker", ["tsla", "eth"], word_boundary=True)
+    matcher.register("topic", ["PID"], case_sensitive=True)
+    matcher.register("filler", ["的", "的一个", "查询"])
+    hits = matcher.scan("查询TSLA的一个PID, teeth pid")
+    assert [h.keyword for h in hits.of("ticker")] == ["tsla"], "ticker inside a word must not match"
+    assert [h.start for h in hits.of("topic")] == [9]
+    assert hits.remove("filler", ["的", "的一个", "查询"]) == "TSLA一个PID, teeth pid", "words are removed in order"
+    assert matcher.scan("查的询").remove("filler", ["的", "查询"]) == "", "a removal can join a later word"
+    assert matcher.scan("查询TSLA的一个PID, teeth pid") is hits, "repeat scans share one result"
+    print("✅ word boundaries, case sensitivity, ordered removal, per-turn scan cache")
+
+
+def test_call_sites():
+    assert IntentMatcher.match_stock("特斯拉和苹果的股价") == "特斯拉"
+    assert IntentMatcher.match_stock("nvda现在多少钱") == "NVDA"
+    assert IntentMatcher.match_stock("股价怎么样") is None
+    assert IntentMatcher.match_stock("BRK-B股价") == "BRK-B" and IntentMatcher.match_stock("brk-b 多少钱") == "BRK-B"
+    assert IntentMatcher.match_stock("baba-sw和腾讯") == "腾讯" and IntentMatcher.match_stock("看下baba-sw") == "BABA-SW"
+    assert IntentMatcher.match_weather("上海今天天气怎么样") == "上海"
+    assert IntentMatcher.match_weather("外面冷不冷") == "Beijing"
+    # Stop words are removed one after another, as before the automaton: "查一的下" -> "查一下" -> ""
+    assert IntentMatcher.match_weather("查一的下青岛天气") == "青岛"
+    # Noise is whatever is left after the removal, including noise joined by it ("温的度" -> "温度")
+    assert IntentMatcher.match_weather("温的度") == "Beijing"
+    assert IntentMatcher.match_music("放一首《彩虹》") == ("play_specific", "彩虹")
+    assert IntentMatcher.match_music("暂停音乐") == ("stop", None)
+    assert IntentMatcher.match_web_search("帮我搜索量子计算") == "量子计算"
+
+    resolver = ContextResolver()
+    resolver.update_context("特斯拉股价")
+    assert resolver.conversation_state["last_topic"] == "stock"
+    assert resolver.resolve("它涨了吗") == "特斯拉涨了吗"
+    assert [e.value for e in resolver.extract_entities("打开客厅的灯和空调")] == ["客厅的灯", "空调", "灯"]
+
+    # One resolver per session: a new one must not rebuild the shared automaton
+    matcher = get_keyword_matcher()
+    matcher.scan("它")
+    builds = matcher.stats["builds"]
+    for _ in range(3):
+        ContextResolver().resolve("它涨了吗")
+    assert matcher.stats["builds"] == builds, "vocabularies are registered once, at import"
+    print("✅ IntentMatcher / ContextResolver read the shared hits; new resolvers don't rebuild the automaton")
+
+
+def benchmark(rounds: int = 300):
+    matcher = get_keyword_matcher()
+    matcher.scan("warm up")
+    stats = matcher.get_stats()
+    for text in QUERIES:
+        assert {(h.category, h.keyword) for h in matcher.scan(text, use_cache=False)} == naive(matcher, text), text
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for text in QUERIES:
+            naive(matcher, text)
+    old_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for text in QUERIES:
+            matcher.scan(text, use_cache=False)
+    new_s = time.perf_counter() - t0
+
+    n = rounds * len(QUERIES)
+    print(f"\n📊 {len(QUERIES)} queries x {rounds}, {stats['keywords']} keywords in {stats['categories']} categories"
+          f"{'' if AGENT_VOCAB else ' (agent vocabulary not loaded: missing dependencies)'}")
+    print(f"   per-keyword `in` checks: {old_s / n * 1e6:7.1f} µs/query")
+    print(f"   automaton, one pass:     {new_s / n * 1e6:7.1f} µs/query")
+
+
+async def test_memory_agent_gated():
+    import os
+    import tempfile
+    from jarvis_assistant.core.memory_agent import MemoryAgent
+    from jarvis_assistant.core.memory import MemoryStore
+    from jarvis_assistant.core.session import SessionContext
+
+    with tempfile.TemporaryDirectory() as d:
+        cwd = os.getcwd()
+        os.chdir(d)  # MemoryStore.save() also writes MEMORY.md into the cwd
+        store = MemoryStore(path=f"{d}/memory.json")
+        session = SessionContext("test", store, None)
+        token = session.activate()
+        try:
+            agent = MemoryAgent()
+            await agent.analyze_and_extract("我喜欢喝咖啡")
+            await agent.analyze_and_extract("聊聊PID控制", "PID 是一种反馈控制算法")
+            await agent.analyze_and_extract("北京天气怎么样", "北京今天晴，适合优化一下出行计划")
+            profile = agent.memory.user_profile
+            assert profile["interests"] == {"beverage": "喝咖啡"}
+            assert [t["topic"] for t in profile["recent_topics"]] == ["PID"], "tool queries are not topics"
+        finally:
+            await store.flush()  # Background writes must land before the directory is removed
+            store.close()
+            session.release(token)
+            os.chdir(cwd)
+    print("✅ MemoryAgent patterns gated by keyword hits")
+
+
+async def main():
+    test_matches_substring_search()
+    test_boundaries_case_and_remove()
+    test_call_sites()
+    await test_memory_agent_gated()
+    print("\n✅ All keyword matcher tests passed")
+    benchmark()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
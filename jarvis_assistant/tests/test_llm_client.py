@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Streaming LLM client tests: pooled connection, deadline, hedging and
+TTFT telemetry. Runs offline against the local Doubao stand-in server.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.services.doubao.standin_server import DoubaoStandInServer, StandInProfile
+from jarvis_assistant.agent.llm_client import DoubaoLLMClient, percentile
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_server(**overrides) -> DoubaoStandInServer:
+    profile = StandInProfile(first_byte_ms=100, jitter_ms=0, tokens_per_sec=200, reply="一二三四五六")
+    profile.update(overrides)
+    server = DoubaoStandInServer(profile, port=free_port())
+    await server.start()
+    os.environ.update(server.client_env())
+    return server
+
+
+async def timed(llm: DoubaoLLMClient, **kwargs):
+    t0 = time.time()
+    first, text = None, ""
+    async for chunk in llm.generate_stream("你好", **kwargs):
+        first = first or time.time() - t0
+        text += chunk
+    return first, text
+
+
+def test_percentile():
+    assert percentile([], 95) is None
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(list(range(1, 101)), 95) == 95
+    print("✅ percentile")
+
+
+async def test_connection_reused_and_ttft_recorded():
+    server = await start_server()
+    llm = DoubaoLLMClient(endpoint_id="ep-local", api_key="local")
+    try:
+        for _ in range(3):
+            _, text = await timed(llm)
+            assert text == "一二三四五六"
+        stats = llm.get_stats()
+        assert stats["sessions_opened"] == 1 and stats["requests"] == 3
+        assert stats["ttft_p50_ms"] >= 90 and stats["tokens_per_sec"]
+        print(f"✅ pooled connection: {stats}")
+    finally:
+        await llm.close()
+        await server.stop()
+
+
+async def test_hedge_beats_stalled_request():
+    # Request 1 stalls for a second, request 2 (the hedge) is fast
+    server = await start_server(stall_every=2, stall_ms=1000)
+    llm = DoubaoLLMClient(endpoint_id="ep-local", api_key="local", hedge=True, hedge_delay=0.15)
+    try:
+        first, text = await timed(llm)
+        stats = llm.get_stats()
+        assert text == "一二三四五六"
+        assert first < 0.6, f"hedge did not cut the tail: {first:.2f}s"
+        assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+        assert server.stats["responses"]["requests"] == 2
+        print(f"✅ hedged request won: TTFT {first * 1000:.0f}ms (stalled path ~1100ms)")
+    finally:
+        await llm.close()
+        await server.stop()
+
+
+async def test_deadline():
+    server = await start_server(first_byte_ms=500)
+    llm = DoubaoLLMClient(endpoint_id="ep-local", api_key="local")
+    try:
+        try:
+            await timed(llm, deadline=0.2)
+            raise AssertionError("deadline not enforced")
+        except asyncio.TimeoutError:
+            pass
+        assert llm.stats["timeouts"] == 1
+        print("✅ per-request deadline enforced")
+    finally:
+        await llm.close()
+        await server.stop()
+
+
+async def main():
+    test_percentile()
+    await test_connection_reused_and_ttft_recorded()
+    await test_hedge_beats_stalled_request()
+    await test_deadline()
+    print("\n✅ All LLM client tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
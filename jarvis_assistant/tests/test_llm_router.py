@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+LLM provider router tests: latency-aware routing of short turns and
+failover before the first token, cooldown and recovery of a failing
+provider. Two local stand-in servers play Doubao
+(Responses API) and a local OpenAI-compatible model (chat/completions).
+"""
+
+import asyncio
+import socket
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.services.doubao.standin_server import DoubaoStandInServer, StandInProfile
+from jarvis_assistant.agent.llm_client import DoubaoLLMClient
+from jarvis_assistant.agent import llm_router
+from jarvis_assistant.agent.llm_router import LLMRouter, OpenAICompatibleClient
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_server(**overrides) -> DoubaoStandInServer:
+    profile = StandInProfile(first_byte_ms=100, jitter_ms=0, tokens_per_sec=200, reply="一二三四五六")
+    profile.update(overrides)
+    server = DoubaoStandInServer(profile, port=free_port())
+    await server.start()
+    return server
+
+
+def make_router(doubao_server, local_server) -> LLMRouter:
+    doubao = DoubaoLLMClient(endpoint_id="ep-local", api_key="local")
+    doubao.url = doubao_server.client_env()["DOUBAO_ARK_BASE_URL"] + "/responses"
+    local = OpenAICompatibleClient("local", local_server.client_env()["DOUBAO_ARK_BASE_URL"], "local-model")
+    return LLMRouter({"doubao": doubao, "local": local}, primary="doubao")
+
+
+async def timed(router: LLMRouter, text: str = "你好", **kwargs):
+    t0 = time.time()
+    first, reply = None, ""
+    async for chunk in router.generate_stream(text, **kwargs):
+        first = first or time.time() - t0
+        reply += chunk
+    return first, reply
+
+
+async def test_short_turns_go_to_fastest():
+    slow = await start_server(first_byte_ms=400)
+    fast = await start_server(first_byte_ms=50)
+    router = make_router(slow, fast)
+    try:
+        # No samples yet: the primary wins the tie
+        await timed(router)
+        assert router.last_provider == "doubao"
+
+        # The local model gets its TTFT sample from a direct call
+        t0 = time.time()
+        stream = router.providers["local"].generate_stream("ping")
+        await stream.__anext__()
+        router.health["local"].record_success(time.time() - t0)
+        await stream.aclose()
+
+        first, reply = await timed(router, "几点了")
+        assert reply == "一二三四五六" and router.last_provider == "local", router.get_stats()
+
+        # Long turns still prefer the primary
+        await timed(router, "请帮我详细分析一下最近一周的市场走势，并给出下周的投资建议和风险提示，" * 2)
+        assert router.last_provider == "doubao"
+        print(f"✅ short turn routed to local ({first * 1000:.0f}ms), long turn to primary")
+    finally:
+        await router.close()
+        await slow.stop()
+        await fast.stop()
+
+
+async def test_failover_when_primary_stalls():
+    stalled = await start_server(stall_every=1, stall_ms=3000)
+    backup = await start_server()
+    router = make_router(stalled, backup)
+    for _ in range(5):
+        router.health["doubao"].record_success(0.1)  # p95 100ms -> failover after 800ms
+    try:
+        first, reply = await timed(router, "请帮我写一段很长很长的关于人工智能发展历史的介绍文字，要求详细一些", short=False)
+        stats = router.get_stats()
+        assert reply == "一二三四五六" and router.last_provider == "local"
+        assert 0.8 <= first < 1.5, f"failover took {first:.2f}s"
+        assert stats["failovers"] == 1 and stats["providers"]["doubao"]["slow"] == 1
+        print(f"✅ stalled primary: failed over to local, TTFT {first * 1000:.0f}ms (stall 3100ms)")
+    finally:
+        await router.close()
+        await stalled.stop()
+        await backup.stop()
+
+
+async def test_failover_on_errors_and_cooldown():
+    broken = await start_server(error_rate=1.0)
+    backup = await start_server()
+    router = make_router(broken, backup)
+    try:
+        for _ in range(2):
+            _, reply = await timed(router, short=False)
+            assert reply == "一二三四五六" and router.last_provider == "local"
+        stats = router.get_stats()
+        assert stats["providers"]["doubao"]["errors"] == 2
+        assert not stats["providers"]["doubao"]["healthy"]
+        assert router.order(short=False)[0] == "local", "unhealthy primary must go last"
+
+        requests_before = broken.stats["responses"]["requests"]
+        await timed(router, short=False)
+        assert broken.stats["responses"]["requests"] == requests_before, "cooled-down primary was retried"
+        print(f"✅ erroring primary: failover + cooldown, stats {stats['providers']['doubao']}")
+    finally:
+        await router.close()
+        await broken.stop()
+        await backup.stop()
+
+
+async def test_primary_recovers_after_cooldown():
+    broken = await start_server(error_rate=1.0)
+    backup = await start_server()
+    router = make_router(broken, backup)
+    cooldown = llm_router.COOLDOWN
+    llm_router.COOLDOWN = 0.3
+    try:
+        _, reply = await timed(router, short=False)
+        assert router.last_provider == "local" and router.health["doubao"].healthy, "one failure is no verdict"
+        await timed(router, short=False)
+        assert not router.health["doubao"].healthy
+
+        # Still failing after the cooldown: the probe fails and it cools down again
+        await asyncio.sleep(0.35)
+        assert router.order(short=False)[0] == "doubao", "probe the primary once the cooldown is over"
+        await timed(router, short=False)
+        assert router.last_provider == "local" and not router.health["doubao"].healthy
+
+        # Fixed: the next probe succeeds and the primary is back
+        broken.profile.error_rate = 0.0
+        await asyncio.sleep(0.35)
+        await timed(router, short=False)
+        await timed(router, short=False)
+        assert router.last_provider == "doubao" and router.health["doubao"].healthy
+        print(f"✅ primary probed after cooldown and back in use, stats {router.get_stats()['providers']['doubao']}")
+    finally:
+        llm_router.COOLDOWN = cooldown
+        await router.close()
+        await broken.stop()
+        await backup.stop()
+
+
+async def test_all_providers_down():
+    a = await start_server(error_rate=1.0)
+    b = await start_server(error_rate=1.0)
+    router = make_router(a, b)
+    try:
+        try:
+            await timed(router)
+        except RuntimeError as e:
+            print(f"✅ all providers down raises: {e}")
+        else:
+            raise AssertionError("expected an error")
+    finally:
+        await router.close()
+        await a.stop()
+        await b.stop()
+
+
+async def main():
+    await test_short_turns_go_to_fastest()
+    await test_failover_when_primary_stalls()
+    await test_failover_on_errors_and_cooldown()
+    await test_primary_recovers_after_cooldown()
+    await test_all_providers_down()
+    print("\n✅ All LLM router tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
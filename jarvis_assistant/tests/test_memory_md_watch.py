@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+MEMORY.md watch tests: Jarvis's own writes are never re-parsed, an
+external edit is picked up on the next turn, unchanged turns read nothing,
+polling is throttled, and writes leave the event loop.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.core import memory as memory_module
+from jarvis_assistant.core.memory import MemoryStore
+from jarvis_assistant.utils.file_watch import FileWatcher
+
+
+def open_store(d: str) -> MemoryStore:
+    return MemoryStore(f"{d}/memory.json", markdown_path=f"{d}/MEMORY.md")
+
+
+async def wait_for_poll(store: MemoryStore):
+    """Polling only looks once per interval (inotify sees the change at once)."""
+    if store._md_watcher.backend == "poll":
+        await asyncio.sleep(store._md_watcher.poll_interval)
+
+
+def edit_like_an_editor(path: Path, old: str, new: str):
+    """Write a temp file and rename it over the original (vim, VS Code...)."""
+    text = path.read_text(encoding="utf-8").replace(old, new)
+    tmp = path.with_name(f"{path.name}.swp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+async def test_own_writes_and_external_edits():
+    with tempfile.TemporaryDirectory() as d:
+        store = open_store(d)
+        md = Path(d) / "MEMORY.md"
+        store.set_profile("location", "青岛")
+        await store.flush_markdown()
+        assert "青岛" in md.read_text(encoding="utf-8")
+
+        assert not await store.refresh_from_markdown(), "first look at our own file: nothing to apply"
+        for _ in range(50):
+            assert not await store.refresh_from_markdown()
+        assert store.md_stats["reads"] == 1, "unchanged turns do not read the file"
+
+        store.set_profile("location", "青岛")  # Same content: no rewrite
+        assert store.md_stats["writes_skipped"] >= 1
+
+        store.set_profile("location", "上海")
+        await store.flush_markdown()
+        await wait_for_poll(store)
+        assert not await store.refresh_from_markdown(), "own write recognised by hash"
+        assert store.md_stats["own_writes_ignored"] == 2 and store.md_stats["reloads"] == 0
+
+        edit_like_an_editor(md, "上海", "杭州")
+        await wait_for_poll(store)
+        assert await store.refresh_from_markdown(), "external edit applied"
+        assert store.get_profile("location") == "杭州"
+        assert not await store.refresh_from_markdown()
+        backend = store._md_watcher.backend
+    print(f"✅ own writes ignored, external edit reloaded ({backend}), stats {store.md_stats}")
+
+
+async def test_writes_off_loop():
+    threads = []
+    original = memory_module._write_atomic
+
+    def spy(path, text):
+        threads.append(threading.current_thread().name)
+        original(path, text)
+
+    memory_module._write_atomic = spy
+    try:
+        with tempfile.TemporaryDirectory() as d:
+            store = open_store(d)
+            for i in range(5):
+                store.set_profile("location", f"城市{i}")
+            await store.flush_markdown()
+            assert "城市4" in (Path(d) / "MEMORY.md").read_text(encoding="utf-8"), "last write wins"
+    finally:
+        memory_module._write_atomic = original
+    assert threads and all(name.startswith("memory-md") for name in threads), threads
+    print(f"✅ {len(threads)} MEMORY.md writes ran on the writer thread, in order")
+
+
+async def test_poll_throttled():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "MEMORY.md"
+        path.write_text("a", encoding="utf-8")
+        watcher = FileWatcher(path, poll_interval=0.2, backend="poll")
+        assert watcher.backend == "poll"
+        assert await watcher.check(), "first check loads the file"
+        assert not await watcher.check()
+        path.write_text("bb", encoding="utf-8")
+        for _ in range(100):
+            assert not await watcher.check(), "no stat before the interval"
+        await asyncio.sleep(0.21)
+        assert await watcher.check()
+        assert watcher.stats["stats"] == 2, watcher.stats
+    print("✅ polling falls back to one stat per interval")
+
+
+async def test_inotify_backend():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "MEMORY.md"
+        path.write_text("a", encoding="utf-8")
+        watcher = FileWatcher(path)
+        if watcher.backend != "inotify":
+            print("⚠️ inotify unavailable here, polling covered above")
+            return
+        assert watcher.changed() and not watcher.changed()
+        (Path(d) / "other.txt").write_text("x", encoding="utf-8")
+        assert not watcher.changed(), "other files in the directory are ignored"
+        path.write_text("b", encoding="utf-8")
+        assert watcher.changed() and not watcher.changed()
+        watcher.close()
+    print("✅ inotify sees writes to the file only")
+
+
+async def benchmark():
+    with tempfile.TemporaryDirectory() as d:
+        store = open_store(d)
+        store.set_profile("location", "青岛")
+        await store.flush_markdown()
+        await store.refresh_from_markdown()
+        turns = 2000
+
+        t0 = time.perf_counter()
+        for _ in range(turns):
+            store.load_from_markdown()
+        old_us = (time.perf_counter() - t0) / turns * 1e6
+
+        t0 = time.perf_counter()
+        for _ in range(turns):
+            await store.refresh_from_markdown()
+        new_us = (time.perf_counter() - t0) / turns * 1e6
+        backend = store._md_watcher.backend
+
+    print(f"\n📊 MEMORY.md check per turn, file unchanged ({turns} turns)")
+    print(f"   read + regex parse on the loop: {old_us:7.1f} µs")
+    print(f"   watch ({backend}):{' ' * (16 - len(backend))}{new_us:7.1f} µs, no blocking I/O")
+
+
+async def main():
+    await test_own_writes_and_external_edits()
+    await test_writes_off_loop()
+    await test_poll_throttled()
+    await test_inotify_backend()
+    print("\n✅ All MEMORY.md watch tests passed")
+    await benchmark()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+SQLite history backend tests: the MemoryStore API answers the same as the
+JSON store, rows still queued are searchable, writes are batched on the
+writer thread, existing JSON history is imported, and search / patterns
+stay fast on a 100k-turn history.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.core.memory import MemoryStore, MAX_CONVERSATIONS
+from jarvis_assistant.core.semantic_memory import SemanticMemory
+
+BENCH_TURNS = int(os.getenv("JARVIS_BENCH_TURNS", "100000"))
+CITIES = ["北京", "上海", "青岛", "杭州", "深圳"]
+
+
+def open_store(d: str, backend: str) -> MemoryStore:
+    return MemoryStore(f"{d}/memory.json", markdown_path=None, backend=backend)
+
+
+def content(entries):
+    """Entries without timestamps (two stores filled one after the other differ there)"""
+    return [{k: v for k, v in e.items() if k != "timestamp"} for e in entries]
+
+
+def fill(store: MemoryStore, turns: int, start: int = 0):
+    for i in range(start, start + turns):
+        city = CITIES[i % len(CITIES)]
+        store.add_conversation("user", f"{city}天气怎么样 #{i}")
+        store.add_conversation("assistant", f"{city}今天晴，气温{i % 30}度。Weather OK" if i % 3 else f"现在是{i % 24}点，时间不早了")
+        store.add_task(f"任务{i}", ["get_weather"] if i % 3 else ["get_time", ""], "ok", True)
+
+
+async def test_same_answers_as_json():
+    with tempfile.TemporaryDirectory() as d1, tempfile.TemporaryDirectory() as d2:
+        json_store, sql_store = open_store(d1, "json"), open_store(d2, "sqlite")
+        json_store.search_index = None  # Compare with the keyword-overlap scan, not BM25
+        for store in (json_store, sql_store):
+            store.session_id = "s1"
+            fill(store, 60)
+        await sql_store.flush()
+
+        for query in ["天气", "青岛天气怎么样 #7", "weather ok", "#5", "不存在的内容", "%", "_"]:
+            assert content(sql_store.search_history(query, 5)) == content(json_store.search_history(query, 5)), query
+        json_sem, sql_sem = SemanticMemory(json_store), SemanticMemory(sql_store)
+        for query in ["北京天气怎么样", "今天 天气", "时间", "weather"]:
+            assert content(sql_sem.semantic_search(query, 5)) == content(json_sem.semantic_search(query, 5)), query
+        assert sql_sem.find_patterns() == json_sem.find_patterns()
+
+        expected = (sql_store.conversations, sql_store.task_history)
+        sql_store.close()
+        reopened = open_store(d2, "sqlite")
+        assert (reopened.conversations, reopened.task_history) == expected
+        reopened.close()
+    print("✅ search_history, semantic_search and find_patterns match the JSON store")
+
+
+async def test_queued_rows_searchable():
+    with tempfile.TemporaryDirectory() as d:
+        store = open_store(d, "sqlite")
+        store.history.flush_interval = 5.0  # Keep rows queued
+        store.add_conversation("user", "我的猫叫 Tom")
+        assert store.history.count() == (0, 0)
+        assert [c["content"] for c in store.search_history("tom")] == ["我的猫叫 Tom"]
+        assert store.history.candidates(["猫"])
+        store.close()
+        assert open_store(d, "sqlite").history.count() == (1, 0), "close() commits the queue"
+    print("✅ rows still queued for the writer are found by search")
+
+
+async def test_batched_writer():
+    with tempfile.TemporaryDirectory() as d:
+        store = open_store(d, "sqlite")
+        threads = []
+        original = store.history._write_batch
+
+        def spy(conn, batch):
+            threads.append(threading.current_thread().name)
+            original(conn, batch)
+
+        store.history._write_batch = spy
+        fill(store, 500)  # 1500 rows
+        await store.flush()
+        convs, tasks = store.history.count()
+        assert (convs, tasks) == (1000, 500)
+        batches = store.history.stats["batches"]
+        assert batches <= 10 and set(threads) == {"memory-sqlite"}, (batches, threads)
+        assert store.journal_stats["records"] <= 1, "history no longer goes through the journal"
+
+        # The window stays bounded; the database keeps everything
+        fill(store, MAX_CONVERSATIONS, start=500)
+        assert len(store.conversations) <= 2 * MAX_CONVERSATIONS
+        await store.flush()
+        assert store.history.count()[0] == 2 * (500 + MAX_CONVERSATIONS)
+        assert len(store.history.session_conversations(store.session_id)) == store.history.count()[0]
+        store.close()
+    print(f"✅ 1500 rows in {batches} transactions on the writer thread, window bounded")
+
+
+async def test_import_and_clear():
+    with tempfile.TemporaryDirectory() as d:
+        store = open_store(d, "json")
+        store.session_id = "old"
+        fill(store, 10)
+        store.close()
+
+        store = open_store(d, "sqlite")
+        await store.flush()
+        assert store.history.count() == (20, 10), "JSON history imported on first start"
+        store.session_id = "new"
+        fill(store, 5)
+        store.clear_session()
+        await store.flush()
+        assert store.history.count()[0] == 20
+        assert all(c["session_id"] == "old" for c in store.search_history("天气", 50))
+        topics = SemanticMemory(store).find_patterns()["common_topics"]
+        assert topics == {"time": 4}, topics  # The new session's 2 are gone
+        store.close()
+    print("✅ JSON history imported once, clear_session deletes and recounts")
+
+
+async def benchmark():
+    turns = BENCH_TURNS
+    print(f"\n📊 History of {turns:,} turns ({2 * turns:,} conversation entries)")
+    with tempfile.TemporaryDirectory() as d1, tempfile.TemporaryDirectory() as d2:
+        json_store, sql_store = open_store(d1, "json"), open_store(d2, "sqlite")
+        json_store._log = lambda op, value: None  # Only the in-memory lists matter here
+        json_store.search_index = None            # The list scan, as before either index
+        fill(json_store, turns)
+
+        t0 = time.perf_counter()
+        sql_store.history.import_history(json_store.conversations, json_store.task_history)
+        sql_store.history.flush()
+        load_s = time.perf_counter() - t0
+        print(f"   SQLite insert (batched, FTS indexed): {load_s:.2f}s, "
+              f"{sql_store.history.stats['batches']} transactions")
+        json_sem, sql_sem = SemanticMemory(json_store), SemanticMemory(sql_store)
+
+        def timed(fn, runs=5):
+            t0 = time.perf_counter()
+            for _ in range(runs):
+                result = fn()
+            return (time.perf_counter() - t0) / runs * 1000, result
+
+        cases = [
+            ("search_history rare", lambda s: s.search_history(f"#{turns // 2}", 5), "sh"),
+            ("search_history common", lambda s: s.search_history("weather ok", 5), "sh"),
+            ("semantic_search", lambda s: s.semantic_search(f"青岛天气怎么样 #{turns // 2}", 5), "sem"),
+            ("find_patterns", lambda s: s.find_patterns(), "sem"),
+        ]
+        for name, fn, target in cases:
+            old_ms, old = timed(lambda: fn(json_store if target == "sh" else json_sem))
+            new_ms, new = timed(lambda: fn(sql_store if target == "sh" else sql_sem))
+            if name != "semantic_search":
+                assert new == old, name
+            print(f"   {name:24s} list scan {old_ms:8.2f} ms · SQLite {new_ms:7.2f} ms")
+        sql_store.close()
+
+
+async def main():
+    await test_same_answers_as_json()
+    await test_queued_rows_searchable()
+    await test_batched_writer()
+    await test_import_and_clear()
+    print("\n✅ All SQLite history tests passed")
+    await benchmark()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
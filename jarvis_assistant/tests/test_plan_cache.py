@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Planner decision cache tests: normalisation, profile-sensitive keys,
+per-intent TTLs over every step, queries that lean on the conversation,
+batched background saves, persistence and hit/saved-latency reporting.
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.core import plan_cache
+from jarvis_assistant.core.plan_cache import PlanCache, leans_on_history, normalize_query
+
+WEATHER_PLAN = {"steps": [{"description": "weather", "tool": "get_weather", "args": {"city": "青岛"}}]}
+TIMER_PLAN = {"steps": [{"description": "timer", "tool": "set_timer", "args": {"seconds": 300}}]}
+CHAT_PLAN = {"steps": []}
+WEATHER_THEN_REMIND_PLAN = {"steps": [
+    {"description": "weather", "tool": "get_weather", "args": {"city": "青岛"}},
+    {"description": "remind", "tool": "schedule_reminder", "args": {"time": "08:00", "text": "带伞"}, "depends_on": [0]},
+]}
+WEATHER_AND_NEWS_PLAN = {"steps": [
+    {"description": "weather", "tool": "get_weather", "args": {"city": "青岛"}},
+    {"description": "news", "tool": "get_news", "args": {}},
+]}
+QINGDAO = {"location": "青岛", "name": "Lei", "project": "Jarvis"}
+
+
+def test_normalize():
+    assert normalize_query("Jarvis，请帮我看看外面冷不冷吧？") == normalize_query("看看外面冷不冷")
+    assert normalize_query("ＷＨＡＴ is UP!") == "whatisup"
+    assert normalize_query("吧") == "吧"
+    print("✅ normalisation folds wake words, punctuation, width and particles")
+
+
+def test_hit_miss_and_profile_key():
+    with tempfile.TemporaryDirectory() as d:
+        cache = PlanCache(path=f"{d}/plans.json", enabled=True)
+        assert cache.get("外面冷不冷", QINGDAO) is None
+        cache.put("外面冷不冷", QINGDAO, WEATHER_PLAN, latency_ms=1200)
+
+        assert cache.get("外面冷不冷？", QINGDAO) == WEATHER_PLAN
+        # Unrelated profile fields don't matter, location does
+        assert cache.get("外面冷不冷", {**QINGDAO, "project": "other"}) == WEATHER_PLAN
+        assert cache.get("外面冷不冷", {**QINGDAO, "location": "上海"}) is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 2 and stats["misses"] == 2
+        assert stats["hit_rate"] == 0.5 and stats["saved_ms"] == 2400
+        print(f"✅ hit/miss and profile-sensitive key: {stats}")
+
+
+def test_per_intent_ttl():
+    with tempfile.TemporaryDirectory() as d:
+        cache = PlanCache(path=f"{d}/plans.json", ttls={"get_weather": 1}, enabled=True)
+        cache.put("五分钟后叫我", QINGDAO, TIMER_PLAN)
+        cache.put("外面冷不冷", QINGDAO, WEATHER_PLAN)
+        cache.put("讲个笑话", QINGDAO, CHAT_PLAN)
+
+        assert cache.get("五分钟后叫我", QINGDAO) is None, "time-relative intents must not be cached"
+        assert cache.get("讲个笑话", QINGDAO) == CHAT_PLAN
+        time.sleep(1.05)
+        assert cache.get("外面冷不冷", QINGDAO) is None
+        assert cache.stats["expired"] == 1
+        print("✅ per-intent TTLs (timer never cached, weather expired, chat kept)")
+
+
+def test_ttl_covers_every_step():
+    with tempfile.TemporaryDirectory() as d:
+        cache = PlanCache(path=f"{d}/plans.json", ttls={"get_news": 1}, enabled=True)
+        cache.put("看看天气下雨就提醒我带伞", QINGDAO, WEATHER_THEN_REMIND_PLAN)
+        cache.put("天气和新闻", QINGDAO, WEATHER_AND_NEWS_PLAN)
+
+        assert cache.get("看看天气下雨就提醒我带伞", QINGDAO) is None, "a reminder step makes the plan uncacheable"
+        entry = cache.entries[cache.key("天气和新闻", QINGDAO)]
+        assert entry["expires_at"] - entry["created_at"] == 1, "the news step's TTL is the shortest"
+        time.sleep(1.05)
+        assert cache.get("天气和新闻", QINGDAO) is None
+        print("✅ plan TTL is the shortest over its steps, 0 for any step means not cached")
+
+
+def test_history_dependent_queries_skip_cache():
+    assert leans_on_history("那上海呢？") and leans_on_history("它现在多少钱") and leans_on_history("刚才那首歌叫什么")
+    assert not leans_on_history("外面冷不冷") and not leans_on_history("特斯拉股价多少")
+    with tempfile.TemporaryDirectory() as d:
+        cache = PlanCache(path=f"{d}/plans.json", enabled=True)
+        cache.put("那上海呢", QINGDAO, WEATHER_PLAN)
+        assert not cache.entries, "a follow-up's plan depends on the turns before it"
+        assert cache.get("那上海呢", QINGDAO) is None
+        assert cache.stats["context_skips"] == 1 and cache.stats["lookups"] == 0
+        print("✅ follow-ups that lean on the conversation are neither stored nor looked up")
+
+
+async def test_saves_are_batched_off_the_loop():
+    with tempfile.TemporaryDirectory() as d:
+        delay = plan_cache.SAVE_DELAY
+        plan_cache.SAVE_DELAY = 0.1
+        try:
+            path = Path(d) / "plans.json"
+            cache = PlanCache(path=str(path), enabled=True)
+            t0 = time.perf_counter()
+            for i in range(50):
+                cache.put(f"讲个笑话{i}", QINGDAO, CHAT_PLAN)
+            put_ms = (time.perf_counter() - t0) * 1000
+            assert not path.exists(), "put() must not write the store on the event loop"
+
+            await asyncio.sleep(0.3)
+            assert cache.stats["saves"] == 1, cache.stats
+            assert len(json.loads(path.read_text(encoding="utf-8"))["entries"]) == 50
+            print(f"✅ 50 puts -> 1 background save ({put_ms:.2f}ms on the loop)")
+        finally:
+            plan_cache.SAVE_DELAY = delay
+
+
+def test_persistence():
+    with tempfile.TemporaryDirectory() as d:
+        path = f"{d}/plans.json"
+        PlanCache(path=path, enabled=True).put("外面冷不冷", QINGDAO, WEATHER_PLAN, latency_ms=900)
+
+        restarted = PlanCache(path=path, enabled=True)
+        assert restarted.get("外面冷不冷", QINGDAO) == WEATHER_PLAN
+        assert restarted.get_stats()["saved_ms"] == 900
+        print("✅ cached plans and planner latency survive a restart")
+
+
+def main():
+    test_normalize()
+    test_hit_miss_and_profile_key()
+    test_per_intent_ttl()
+    test_ttl_covers_every_step()
+    test_history_dependent_queries_skip_cache()
+    asyncio.run(test_saves_are_batched_off_the_loop())
+    test_persistence()
+    print("\n✅ All plan cache tests passed")
+
+
+if __name__ == "__main__":
+    main()
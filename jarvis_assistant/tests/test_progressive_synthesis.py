@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Progressive synthesis tests: step results are spoken through
+stream_callback as soon as they are next in line, with the same wording as
+JarvisAgent.synthesize(), and time-to-first-audio for multi-tool turns is
+measured against waiting for the slowest tool. A conversational step's
+fallback reply (no LLM provider, or all of them failing) is spoken too.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Panel and daily logs of the agent turns below go to a scratch directory, not the repo's logs/
+LOG_DIR = tempfile.TemporaryDirectory(prefix="jarvis-test-logs-")
+os.environ["JARVIS_PANEL_LOG"] = os.environ["JARVIS_TRACE_LOG"] = os.path.join(LOG_DIR.name, "realtime_panel.log")
+os.environ["JARVIS_DAILY_LOG_DIR"] = LOG_DIR.name
+
+from jarvis_assistant.core.step_executor import StepExecutor
+from jarvis_assistant.core.synthesis import ProgressiveSynthesis
+
+
+class Status(Enum):
+    """Same values as core.agent.StepStatus"""
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+    RETRYING = "retrying"
+
+
+@dataclass
+class Step:
+    """The PlanStep fields executor and synthesis use"""
+    description: str
+    tool_name: Optional[str] = None
+    tool_args: Dict[str, Any] = field(default_factory=dict)
+    status: Status = Status.PENDING
+    result: Optional[str] = None
+    error: Optional[str] = None
+    retry_count: int = 0
+    depends_on: List[int] = field(default_factory=list)
+
+
+# tool -> (latency, result or None for failure)
+TOOLS = {
+    "get_weather": (0.10, "北京今天晴，最高26度。"),
+    "get_news": (0.60, "今日要闻：某地发布新规。"),
+    "TSLA": (0.30, "特斯拉今天表现不错。 特斯拉（TSLA）现价 250 USD，今日上涨了 2%。"),
+    "AAPL": (0.05, "苹果稳中有升。 苹果（AAPL）现价 190 USD，今日上涨了 1%。"),
+    "BROKEN": (0.05, None),
+}
+
+
+async def execute(step):
+    latency, result = TOOLS[step.tool_args.get("symbol", step.tool_name)]
+    await asyncio.sleep(latency)
+    if result is None:
+        step.status, step.error = Status.FAILED, "HTTP 500"
+        return None
+    step.status, step.result = Status.SUCCESS, result
+    return result
+
+
+async def speak(steps, touch=None):
+    """Run steps progressively; returns (final text, [(ms, chunk)], all-done ms)."""
+    spoken, t0 = [], time.time()
+
+    async def callback(chunk):
+        spoken.append(((time.time() - t0) * 1000, chunk))
+
+    synthesis = ProgressiveSynthesis(steps, callback, touch=touch)
+    await StepExecutor(max_retries=0).run(steps, execute, on_done=synthesis.step_done)
+    done_ms = (time.time() - t0) * 1000
+    text = await synthesis.finish()
+    assert text == "".join(chunk for _, chunk in spoken), "final text must be what was spoken"
+    return text, spoken, done_ms, synthesis
+
+
+async def test_first_result_spoken_early():
+    steps = [Step("weather", "get_weather"), Step("news", "get_news")]
+    text, spoken, done_ms, synthesis = await speak(steps)
+    assert text == "北京今天晴，最高26度。\n今日要闻：某地发布新规。"
+    assert spoken[0][0] < 200 and done_ms > 550
+    print(f"✅ weather + news: first audio at {spoken[0][0]:.0f}ms, batch synthesis would wait {done_ms:.0f}ms")
+
+
+async def test_plan_order_kept():
+    # The slow step comes first: nothing may jump ahead of it
+    steps = [Step("news", "get_news"), Step("weather", "get_weather")]
+    text, spoken, _, _ = await speak(steps)
+    assert [chunk for _, chunk in spoken] == ["今日要闻：某地发布新规。", "\n北京今天晴，最高26度。"]
+    print("✅ fragments spoken in plan order")
+
+
+async def test_stocks_merged_incrementally():
+    steps = [Step("TSLA", "get_stock_price", {"symbol": "TSLA"}), Step("weather", "get_weather"),
+             Step("AAPL", "get_stock_price", {"symbol": "AAPL"}), Step("bad", "get_stock_price", {"symbol": "BROKEN"})]
+    text, spoken, _, _ = await speak(steps)
+    assert text == ("特斯拉（TSLA）现价 250 USD，今日上涨了 2%。 苹果（AAPL）现价 190 USD，今日上涨了 1%。"
+                    "\n北京今天晴，最高26度。"), text
+    print(f"✅ stock quotes merged into one sentence as they arrive ({len(spoken)} chunks)")
+
+
+async def test_failures_and_touch():
+    steps = [Step("bad", "web_search", {"symbol": "BROKEN"}), Step("weather", "get_weather")]
+    text, _, _, _ = await speak(steps, touch=lambda said: "\n\n论文写得怎么样了？")
+    assert text == "抱歉，web_search执行失败: HTTP 500\n北京今天晴，最高26度。\n\n论文写得怎么样了？"
+
+    steps = [Step("bad", "web_search", {"symbol": "BROKEN"}), Step("bad2", "fetch_url", {"symbol": "BROKEN"})]
+    text, spoken, _, _ = await speak(steps)
+    assert len(spoken) == 1 and text.startswith("抱歉，我无法完成这个请求。抱歉，web_search执行失败")
+    print("✅ failures reported honestly; all-failed turn is one apology; personal touch appended last")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def test_conversational_fallback_spoken():
+    from jarvis_assistant.agent import llm_router
+    from jarvis_assistant.agent.llm_router import LLMRouter, OpenAICompatibleClient
+    from jarvis_assistant.core.agent import ExecutionPlan, JarvisAgent, PlanStep
+    from jarvis_assistant.core.synthesis import ACKNOWLEDGED, REMEMBERED
+
+    agent = JarvisAgent()
+
+    async def mixed_plan(user_input, allow_tool_calling=True):
+        return ExecutionPlan(task=user_input, steps=[
+            PlanStep(description="Execute get_current_time", tool_name="get_current_time"),
+            PlanStep(description="顺便陪我聊两句", tool_name=None),
+        ])
+
+    agent.plan = mixed_plan
+    dead = OpenAICompatibleClient("local", f"http://127.0.0.1:{free_port()}/v1", "local-model")
+    router = llm_router._llm_router_instance
+    try:
+        for providers, fallback in (({}, REMEMBERED), ({"local": dead}, ACKNOWLEDGED)):
+            llm_router._llm_router_instance = LLMRouter(providers)
+            spoken = []
+            answer = await agent.run("现在几点，顺便聊两句", stream_callback=spoken.append)
+            said = "".join(spoken)
+            assert fallback in said, (providers, spoken)
+            assert said.replace(fallback, "").strip().startswith("20"), "the time is spoken as well"
+            assert fallback in answer
+            await llm_router._llm_router_instance.close()
+    finally:
+        llm_router._llm_router_instance = router
+    print("✅ time + chat with no / a failing provider: the fallback reply is spoken, not only returned")
+
+
+async def main():
+    await test_first_result_spoken_early()
+    await test_plan_order_kept()
+    await test_stocks_merged_incrementally()
+    await test_failures_and_touch()
+    await test_conversational_fallback_spoken()
+    print("\n✅ All progressive synthesis tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
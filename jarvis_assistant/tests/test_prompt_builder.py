@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Planner prompt tests: the stable prefix is byte-identical across turns,
+only the volatile tail changes, and the Ark context cache is reused.
+The context-cache part runs offline against the local Doubao stand-in server.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.core.prompt_builder import PlannerPromptBuilder, ArkContextCache, TurnUsage
+
+TOOLS = {
+    "get_weather": SimpleNamespace(description="Get the weather for a city"),
+    "set_timer": SimpleNamespace(description="Start a countdown timer"),
+}
+PROFILE = {"name": "Lei", "location": "青岛", "favorite_color": "blue"}
+
+
+def test_prefix_stable_across_turns():
+    builder = PlannerPromptBuilder(dict(TOOLS))
+    first = builder.build("今天天气怎么样", "", PROFILE)
+    second = builder.build("What time is it?", "User: 你好\nJarvis: 你好", dict(PROFILE))
+
+    assert first.stable_messages() == second.stable_messages()
+    assert first.stable_fingerprint == second.stable_fingerprint
+    assert first.volatile != second.volatile
+    assert "今天天气怎么样" not in first.static_prefix + first.profile_block
+    assert first.messages()[-1]["content"] == first.volatile
+    print(f"✅ stable prefix {first.stable_fingerprint}, {len(first.static_prefix)} chars")
+
+
+def test_fingerprint_changes_only_with_tools_or_profile():
+    tools = dict(TOOLS)
+    builder = PlannerPromptBuilder(tools)
+    base = builder.build("hi", "", PROFILE)
+
+    # Fields outside the profile block do not affect the prefix
+    same = builder.build("hi", "", {**PROFILE, "favorite_color": "red"})
+    assert same.stable_fingerprint == base.stable_fingerprint
+
+    moved = builder.build("hi", "", {**PROFILE, "location": "上海"})
+    assert moved.prefix_fingerprint == base.prefix_fingerprint
+    assert moved.profile_fingerprint != base.profile_fingerprint
+
+    tools["play_music"] = SimpleNamespace(description="Play a song")
+    extended = builder.build("hi", "", PROFILE)
+    assert extended.prefix_fingerprint != base.prefix_fingerprint
+    print("✅ fingerprint tracks tool set and profile fields only")
+
+
+def test_usage_stats():
+    builder = PlannerPromptBuilder(dict(TOOLS))
+    builder.record(TurnUsage(prompt_tokens=800, cached_tokens=0, completion_tokens=20))
+    builder.record(TurnUsage(prompt_tokens=800, cached_tokens=700, completion_tokens=20, context_cache=True))
+    stats = builder.get_stats()
+    assert stats["cache_hit_rate"] == 0.5
+    assert stats["cached_token_ratio"] == round(700 / 1600, 3)
+    print(f"✅ usage stats: {stats}")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def test_context_cache_reused():
+    import aiohttp
+    from jarvis_assistant.services.doubao.standin_server import DoubaoStandInServer, StandInProfile
+
+    server = DoubaoStandInServer(StandInProfile(first_byte_ms=10, jitter_ms=0), port=free_port())
+    await server.start()
+    try:
+        base_url = server.client_env()["DOUBAO_ARK_BASE_URL"]
+        builder = PlannerPromptBuilder(dict(TOOLS))
+        cache = ArkContextCache(base_url, enabled=True)
+        headers = {"Authorization": "Bearer local"}
+
+        async with aiohttp.ClientSession() as session:
+            ids = [
+                await cache.get_context_id(session, headers, "ep-local", builder.build(text, "", PROFILE))
+                for text in ["你好", "打开灯", "What's the weather?"]
+            ]
+            assert ids[0] and len(set(ids)) == 1
+            assert server.stats["context"]["creates"] == 1
+
+            prompt = builder.build("关灯", "", PROFILE)
+            payload = {"model": "ep-local", "context_id": ids[0],
+                       "messages": [{"role": "user", "content": prompt.volatile}],
+                       "response_format": {"type": "json_object"}}
+            async with session.post(f"{base_url}/context/chat/completions", json=payload) as resp:
+                usage = (await resp.json())["usage"]
+            assert usage["prompt_tokens_details"]["cached_tokens"] > 0
+
+            cache.invalidate(ids[0])
+            new_id = await cache.get_context_id(session, headers, "ep-local", prompt)
+            assert new_id != ids[0] and server.stats["context"]["creates"] == 2
+        print(f"✅ context cache: 1 create for 3 turns, cached {usage['prompt_tokens_details']['cached_tokens']} tokens")
+    finally:
+        await server.stop()
+
+
+async def main():
+    test_prefix_stable_across_turns()
+    test_fingerprint_changes_only_with_tools_or_profile()
+    test_usage_stats()
+    await test_context_cache_reused()
+    print("\n✅ All prompt builder tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
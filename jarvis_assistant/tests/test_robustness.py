@@ -9,12 +9,18 @@ import sys
 import os
 import time
 import random
+import tempfile
 from datetime import datetime
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(PROJECT_ROOT))
 
+# Panel and daily logs of the turns below go to a scratch directory, not the repo's logs/
+LOG_DIR = tempfile.TemporaryDirectory(prefix="jarvis-test-logs-")
+os.environ["JARVIS_PANEL_LOG"] = os.environ["JARVIS_TRACE_LOG"] = os.path.join(LOG_DIR.name, "realtime_panel.log")
+os.environ["JARVIS_DAILY_LOG_DIR"] = LOG_DIR.name
+
 
 class RobustnessTest:
     def __init__(self):
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Search index tests: CJK text is split into bigrams, BM25 ranks Chinese
+queries that word overlap cannot match, newer turns win ties, the index
+follows add_conversation / clear_session, it is restored from the snapshot
+(trimmed to the snapshot window), and queries stay sub-millisecond at 50k
+entries.
+"""
+
+import asyncio
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.core import memory as memory_module
+from jarvis_assistant.core.memory import MemoryStore
+from jarvis_assistant.core.search_index import BM25Index, tokenize
+from jarvis_assistant.core.semantic_memory import SemanticMemory
+
+BENCH_ENTRIES = int(os.getenv("JARVIS_BENCH_ENTRIES", "50000"))
+
+
+def open_store(d: str) -> MemoryStore:
+    return MemoryStore(f"{d}/memory.json", markdown_path=None, backend="json")
+
+
+def overlap_search(conversations, query: str, limit: int = 5):
+    """The previous semantic_search: \\w+ word overlap plus an exact-phrase bonus"""
+    query_lower = query.lower()
+    query_words = set(re.findall(r'\w+', query_lower))
+    scored = []
+    for conv in conversations:
+        content = conv.get('content', '').lower()
+        overlap = len(query_words & set(re.findall(r'\w+', content)))
+        if query_lower in content:
+            overlap += 5
+        if overlap > 0:
+            scored.append((overlap, conv))
+    scored.sort(reverse=True, key=lambda x: x[0])
+    return [conv for _, conv in scored[:limit]]
+
+
+async def test_tokenize():
+    assert tokenize("北京天气怎么样") == ["北京", "京天", "天气", "气怎", "怎么", "么样"]
+    assert tokenize("PID 控制, Kp=2.5") == ["pid", "控制", "kp", "2", "5"]
+    assert tokenize("好") == ["好"] and tokenize("!!!") == []
+    print("✅ CJK runs become bigrams, Latin text words")
+
+
+async def test_chinese_ranking():
+    with tempfile.TemporaryDirectory() as d:
+        store = open_store(d)
+        for text in ["北京今天天气晴朗，最高气温25度", "帮我订一张去上海的机票", "我最近在学习 PID 控制",
+                     "上海明天下雨", "北京烤鸭哪家好吃"]:
+            store.add_conversation("user", text)
+        semantic = SemanticMemory(store)
+        assert overlap_search(store.conversations, "北京天气") == [], "a sentence is one \\w+ token"
+        top = [c["content"] for c in semantic.semantic_search("北京天气", 3)]
+        assert top[0] == "北京今天天气晴朗，最高气温25度" and "北京烤鸭哪家好吃" in top
+        assert semantic.semantic_search("pid", 1)[0]["content"] == "我最近在学习 PID 控制"
+        assert semantic.semantic_search("量子计算", 5) == []
+    print(f"✅ '北京天气' finds {top[:2]} (word overlap found nothing)")
+
+
+async def test_recency_boost():
+    index = BM25Index()
+    for _ in range(3):
+        index.add("提醒我开会")
+        for i in range(300):
+            index.add(f"无关的第{i}条")
+    ranked = [doc for doc, _ in index.search("开会", 3)]
+    assert ranked == sorted(ranked, reverse=True), "same text: newest first"
+    print("✅ equal matches ranked newest first")
+
+
+async def test_incremental_and_clear():
+    with tempfile.TemporaryDirectory() as d:
+        store = open_store(d)
+        semantic = SemanticMemory(store)
+        store.session_id = "a"
+        store.add_conversation("user", "我的猫叫咪咪")
+        assert semantic.semantic_search("猫叫")[0]["content"] == "我的猫叫咪咪"
+        store.session_id = "b"
+        store.add_conversation("user", "我的狗叫旺财")
+        store.clear_session()
+        assert len(store.search_index) == len(store.conversations) == 1
+        assert semantic.semantic_search("狗叫") == []
+
+        store.conversations = store.conversations + [{"role": "user", "content": "外部追加的一条"}]
+        assert semantic.semantic_search("外部追加")[0]["content"] == "外部追加的一条", "resynced"
+    print("✅ index follows add_conversation and clear_session")
+
+
+async def test_restored_from_snapshot():
+    with tempfile.TemporaryDirectory() as d:
+        original = memory_module.MAX_CONVERSATIONS
+        memory_module.MAX_CONVERSATIONS = 50
+        try:
+            store = open_store(d)
+            for i in range(80):
+                store.add_conversation("user", f"第{i}次讨论机器人项目 topic{i}")
+            store.compact()
+            await store.flush()
+            store.add_conversation("user", "快照之后的新话题")  # In the journal only
+            store.close()
+
+            rebuilt = []
+            reindex = MemoryStore.reindex
+            MemoryStore.reindex = lambda self: rebuilt.append(1) or reindex(self)
+            try:
+                reopened = open_store(d)
+            finally:
+                MemoryStore.reindex = reindex
+        finally:
+            memory_module.MAX_CONVERSATIONS = original
+        assert not rebuilt, "index loaded from the snapshot, not rebuilt"
+        assert len(reopened.search_index) == len(reopened.conversations) == 51
+        semantic = SemanticMemory(reopened)
+        assert semantic.semantic_search("topic79", 1)[0]["content"].endswith("topic79")
+        assert semantic.semantic_search("topic10", 1) == [], "trimmed out of the snapshot"
+        assert semantic.semantic_search("新话题", 1)[0]["content"] == "快照之后的新话题"
+    print("✅ snapshot carries the index of its window; journal turns are added on load")
+
+
+def synthetic_turn(rng: random.Random, i: int) -> str:
+    cities = ["北京", "上海", "青岛", "杭州", "深圳", "成都"]
+    templates = [
+        "{c}今天天气怎么样", "帮我查一下{c}明天会不会下雨", "提醒我{n}点开会",
+        "PID 控制器的 Kp 调到 {n} 会怎么样", "我在做 Jarvis 项目的第{n}个模块", "给我讲个关于{c}的笑话",
+        "计算 {n} 乘以 {m}", "今天的新闻有什么", "播放一首周杰伦的歌", "{c}有什么好吃的",
+    ]
+    return rng.choice(templates).format(c=rng.choice(cities), n=rng.randint(1, 99), m=i % 97)
+
+
+async def benchmark():
+    rng = random.Random(7)
+    conversations = [{"role": "user", "content": synthetic_turn(rng, i)} for i in range(BENCH_ENTRIES)]
+    t0 = time.perf_counter()
+    index = BM25Index.build(c["content"] for c in conversations)
+    build_s = time.perf_counter() - t0
+
+    queries = ["北京天气", "Kp 调到 40", "提醒我开会", "Jarvis 项目模块", "成都好吃的", "周杰伦"]
+    lat = []
+    for _ in range(20):
+        for q in queries:
+            t0 = time.perf_counter()
+            index.search(q, 5)
+            lat.append((time.perf_counter() - t0) * 1000)
+    lat.sort()
+    t0 = time.perf_counter()
+    overlap_search(conversations, "北京天气")
+    scan_ms = (time.perf_counter() - t0) * 1000
+
+    print(f"\n📊 semantic_search over {BENCH_ENTRIES:,} entries")
+    print(f"   index build {build_s:.2f}s ({build_s / BENCH_ENTRIES * 1e6:.0f} µs per add_conversation)")
+    print(f"   word-overlap scan: {scan_ms:7.1f} ms per query")
+    print(f"   BM25 index:        p50 {statistics.median(lat):.3f} ms · "
+          f"p95 {lat[int(len(lat) * 0.95)]:.3f} ms · max {lat[-1]:.3f} ms")
+    assert statistics.median(lat) < 1.0, "sub-millisecond queries"
+
+
+async def main():
+    await test_tokenize()
+    await test_chinese_ranking()
+    await test_recency_boost()
+    await test_incremental_and_clear()
+    await test_restored_from_snapshot()
+    print("\n✅ All search index tests passed")
+    await benchmark()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Session tests: many conversations served concurrently by one shared agent.
+Each session keeps its own history, profile and feedback; turns of one
+session run in order; idle sessions are evicted and reopen from disk; and
+N concurrent sessions get close to N times the turns/sec of one.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.core.memory import get_memory
+from jarvis_assistant.core.feedback_manager import get_feedback_manager
+from jarvis_assistant.core.session import SessionManager, current_session
+
+# Simulated I/O per turn (LLM + tool round trips, scaled down)
+TURN_IO = 0.02
+
+
+class FakeAgent:
+    """Shared, stateless agent: everything per-conversation goes through get_memory()."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def run(self, user_input: str, stream_callback=None) -> str:
+        memory = get_memory()
+        memory.add_conversation("user", user_input)
+        if user_input.startswith("我在"):
+            memory.set_profile("location", user_input[2:])
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(TURN_IO)
+        finally:
+            self.active -= 1
+        reply = f"{current_session().session_id}: {memory.get_profile('location') or '?'}"
+        memory.add_conversation("assistant", reply)
+        return reply
+
+
+def make_manager(root: str, **kwargs):
+    agent = FakeAgent()
+    return SessionManager(agent_factory=lambda: agent, root=root, **kwargs), agent
+
+
+async def test_isolation():
+    with tempfile.TemporaryDirectory() as root:
+        manager, _ = make_manager(root)
+        await asyncio.gather(
+            manager.run("alice", "我在青岛"),
+            manager.run("bob", "我在上海"),
+        )
+        replies = await asyncio.gather(manager.run("alice", "天气怎么样"), manager.run("bob", "天气怎么样"))
+        assert replies == ["alice: 青岛", "bob: 上海"], replies
+
+        alice, bob = manager.get("alice"), manager.get("bob")
+        assert len(alice.memory.conversations) == 4 and len(bob.memory.conversations) == 4
+        assert all("bob" not in m["content"] for m in alice.memory.conversations)
+
+        async with alice.turn():
+            assert get_feedback_manager() is alice.feedback
+        assert current_session() is None and get_memory() is not alice.memory, "no session leaks out"
+        await alice.memory.flush_markdown()
+        assert (Path(root) / "alice" / "MEMORY.md").exists(), "each session mirrors its own MEMORY.md"
+        manager.close()
+    print("✅ conversations, profile and feedback are per session")
+
+
+async def test_turns_serialized_per_session():
+    with tempfile.TemporaryDirectory() as root:
+        manager, agent = make_manager(root)
+        await asyncio.gather(*(manager.run("alice", f"第{i}句") for i in range(5)))
+        assert agent.peak == 1, "one conversation never runs two turns at once"
+        contents = [m["content"] for m in manager.get("alice").memory.conversations if m["role"] == "user"]
+        assert contents == [f"第{i}句" for i in range(5)], contents
+        manager.close()
+    print("✅ turns of one session run in arrival order")
+
+
+async def test_eviction_and_reopen():
+    with tempfile.TemporaryDirectory() as root:
+        manager, _ = make_manager(root, max_sessions=2)
+        await manager.run("alice", "我在青岛")
+        await manager.run("bob", "我在上海")
+        await manager.run("carol", "我在广州")
+        stats = manager.get_stats()
+        assert stats["open"] == 2 and stats["evicted"] == 1
+        assert "alice" not in manager._sessions, "least recently used goes first"
+
+        reply = await manager.run("alice", "天气怎么样")
+        assert reply == "alice: 青岛", "reopened from its own store on disk"
+        manager.close()
+    print("✅ idle sessions evicted LRU and reopened from disk")
+
+
+async def benchmark():
+    turns_per_session = 10
+    results = {}
+    for sessions in (1, 32):
+        with tempfile.TemporaryDirectory() as root:
+            manager, agent = make_manager(root)
+            for i in range(sessions):
+                manager.get(f"user{i}")  # Open up front: the benchmark measures turns
+
+            async def converse(session_id):
+                for t in range(turns_per_session):
+                    await manager.run(session_id, f"问题{t}")
+
+            t0 = time.perf_counter()
+            await asyncio.gather(*(converse(f"user{i}") for i in range(sessions)))
+            elapsed = time.perf_counter() - t0
+            results[sessions] = (sessions * turns_per_session / elapsed, agent.peak)
+            manager.close()
+
+    single, _ = results[1]
+    multi, peak = results[32]
+    assert peak == 32, "all sessions in flight at once on one agent"
+    assert multi > single * 8, f"{multi:.0f} vs {single:.0f} turns/s"
+    print(f"\n📊 {TURN_IO * 1000:.0f}ms simulated I/O per turn, {turns_per_session} turns per session")
+    print(f"   1 session:   {single:7.1f} turns/s")
+    print(f"   32 sessions: {multi:7.1f} turns/s ({multi / single:.1f}x, {peak} turns in flight)")
+
+
+async def main():
+    await test_isolation()
+    await test_turns_serialized_per_session()
+    await test_eviction_and_reopen()
+    print("\n✅ All session tests passed")
+    await benchmark()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Speech cache warm-up tests: phrase banks are pre-synthesized in the
+background, refreshed on new comments, and fillers play from cache.
+The fixed replies come from the constants the tools actually return.
+Runs offline - the synthesizer is simulated.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.core.preloader import SpeechCacheWarmer, fixed_replies
+from jarvis_assistant.services.audio.filler import FillerPhraseManager
+from jarvis_assistant.services.doubao.tts_cache import TTSCache
+
+
+class FakeTTS:
+    """Cache-fronted synthesizer with a simulated 100ms network round trip."""
+
+    def __init__(self, cache_dir: str):
+        self.cache = TTSCache(cache_dir=cache_dir)
+        self.lock = asyncio.Lock()
+        self.network_calls = 0
+
+    def is_cached(self, text: str) -> bool:
+        return self.cache.contains(self.cache.make_key(text, "v", 24000, "pcm"))
+
+    async def _live(self, text: str):
+        async with self.lock:
+            self.network_calls += 1
+            await asyncio.sleep(0.1)
+            yield text.encode("utf-8") * 100
+
+    async def synthesize(self, text: str):
+        async for chunk in self.cache.stream(text, "v", 24000, "pcm", lambda: self._live(text)):
+            yield chunk
+
+
+async def test_warmup_covers_bank_and_refreshes():
+    with tempfile.TemporaryDirectory() as d:
+        tts = FakeTTS(d)
+        warmer = SpeechCacheWarmer(tts, pause=0.01)
+        warmer.add_phrases("stock_normal", ["帮您查到了。", "数据已经更新。"])
+        warmer.add_phrases("filler_long", FillerPhraseManager.PHRASES["long"])
+        warmer.start(delay=0)
+
+        while not warmer._queue.empty() or tts.lock.locked():
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.05)
+        coverage = warmer.coverage()
+        assert coverage["overall"]["ratio"] == 1.0, coverage
+
+        # Newly generated comments are picked up
+        warmer.on_comments_added({"stock_up_big": ["涨疯了！"]})
+        for _ in range(50):
+            if tts.is_cached("涨疯了！"):
+                break
+            await asyncio.sleep(0.05)
+        assert tts.is_cached("涨疯了！")
+        warmer.stop()
+        print(f"✅ warm-up coverage: {warmer.coverage()['overall']}")
+
+
+async def test_cached_filler_plays_without_network():
+    with tempfile.TemporaryDirectory() as d:
+        tts = FakeTTS(d)
+        for phrase in FillerPhraseManager.PHRASES["long"]:
+            async for _ in tts.synthesize(phrase):
+                pass
+        calls_before = tts.network_calls
+
+        played = []
+
+        async def sink(chunk):
+            played.append(chunk)
+
+        filler = FillerPhraseManager(resource_dir=d, tts=tts, audio_sink=sink)
+        t0 = time.time()
+        await filler._play_random_filler("long")
+        elapsed_ms = (time.time() - t0) * 1000
+
+        assert played, "filler produced no audio"
+        assert tts.network_calls == calls_before
+        print(f"✅ filler played from cache in {elapsed_ms:.1f}ms")
+
+
+def test_fixed_replies_follow_tools():
+    from jarvis_assistant.core.synthesis import ALL_FAILED
+    from jarvis_assistant.services.tools import info_tools, web_tools
+
+    replies = fixed_replies()
+    assert set(info_tools.FIXED_REPLIES) <= set(replies) and set(web_tools.FIXED_REPLIES) <= set(replies)
+    assert ALL_FAILED in replies and len(replies) == len(set(replies))
+    print(f"✅ {len(replies)} fixed replies read from the tools and the agent")
+
+
+async def main():
+    test_fixed_replies_follow_tools()
+    await test_warmup_covers_bank_and_refreshes()
+    await test_cached_filler_plays_without_network()
+    print("\n✅ All warm-up tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
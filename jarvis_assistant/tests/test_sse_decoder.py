@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Incremental SSE decoder tests and throughput benchmark.
+
+The benchmark replays a recorded Responses API stream (or any file passed
+on the command line, e.g. captured with `curl -N ... > answer.sse`) in
+network-sized chunks and compares the shared decoder with the previous
+line-by-line parser.
+
+    python jarvis_assistant/tests/test_sse_decoder.py [recorded.sse]
+"""
+
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.utils.sse import (
+    SSEDecoder, stream_events, TextDelta, Usage, ToolCallDelta, Finish
+)
+
+REPLY = '好的先生，今天青岛晴，"最高"气温二十六度\\n适合出门散步。🌤️ \n'  # quotes/escapes exercise the delta fast path
+
+
+def record_responses_stream(text: str, chars_per_delta: int = 2) -> bytes:
+    """A Responses API stream shaped like Ark's: lifecycle events around the deltas."""
+    def event(name, payload):
+        return f"event: {name}\ndata: {json.dumps({'type': name, **payload}, ensure_ascii=False)}\n\n"
+
+    item = {"id": "msg_1", "type": "message", "role": "assistant", "status": "in_progress", "content": []}
+    parts = [
+        event("response.created", {"response": {"id": "resp_1", "status": "in_progress", "output": []}}),
+        event("response.in_progress", {"response": {"id": "resp_1", "status": "in_progress"}}),
+        event("response.output_item.added", {"output_index": 0, "item": item}),
+        event("response.content_part.added", {"item_id": "msg_1", "part": {"type": "output_text", "text": ""}}),
+    ]
+    for i in range(0, len(text), chars_per_delta):
+        parts.append(event("response.output_text.delta", {"item_id": "msg_1", "delta": text[i:i + chars_per_delta]}))
+    parts += [
+        event("response.output_text.done", {"item_id": "msg_1", "text": text}),
+        event("response.content_part.done", {"item_id": "msg_1", "part": {"type": "output_text", "text": text}}),
+        event("response.output_item.done", {"output_index": 0, "item": {**item, "status": "completed"}}),
+        event("response.completed", {"response": {"id": "resp_1", "status": "completed",
+                                                  "usage": {"input_tokens": 812, "output_tokens": 40}}}),
+        "data: [DONE]\n\n",
+    ]
+    return "".join(parts).encode("utf-8")
+
+
+def chunked(data: bytes, min_size: int = 1, max_size: int = 1400, seed: int = 7):
+    rng = random.Random(seed)
+    i = 0
+    while i < len(data):
+        size = rng.randint(min_size, max_size)
+        yield data[i:i + size]
+        i += size
+
+
+async def aiter(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def decode(chunks):
+    return [item async for item in stream_events(aiter(chunks))]
+
+
+async def readlines(chunks):
+    """aiohttp's `async for line in resp.content` framing."""
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line + b"\n"
+    if buffer:
+        yield buffer
+
+
+async def legacy_parse(chunks):
+    """The previous per-line parser (decode + strip + json.loads on every event)."""
+    out = []
+    async for line in readlines(chunks):
+        line = line.decode("utf-8").strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+        if event.get("type") == "response.output_text.delta" and event.get("delta"):
+            out.append(event["delta"])
+    return out
+
+
+async def test_byte_by_byte_matches_whole():
+    stream = record_responses_stream(REPLY)
+    whole = await decode([stream])
+    single = await decode(stream[i:i + 1] for i in range(len(stream)))
+    assert whole == single
+    assert "".join(i.text for i in whole if isinstance(i, TextDelta)) == REPLY
+    assert [i for i in whole if isinstance(i, Usage)] == [Usage({"input_tokens": 812, "output_tokens": 40})]
+    assert isinstance(whole[-1], Finish)
+    print(f"✅ byte-by-byte decoding (split UTF-8) matches: {len(whole)} items")
+
+
+def test_multiline_crlf_and_comments():
+    decoder = SSEDecoder()
+    events = decoder.feed(b": keep-alive\r\nevent: x\r\ndata: line one\r")
+    assert events == []
+    events = decoder.feed(b"\ndata: line two\r\n\r\ndata: tail")
+    assert [(e.event, e.data) for e in events] == [("x", "line one\nline two")]
+    assert [e.data for e in decoder.flush()] == ["tail"]
+    print("✅ multi-line data, CRLF split across chunks, comments")
+
+
+async def test_chat_completions_and_tool_calls():
+    lines = [
+        {"choices": [{"index": 0, "delta": {"role": "assistant", "tool_calls": [
+            {"index": 0, "id": "c1", "function": {"name": "get_weather", "arguments": ""}}]}}]},
+        {"choices": [{"index": 0, "delta": {"tool_calls": [{"index": 0, "function": {"arguments": "{}"}}]}}]},
+        {"choices": [{"index": 0, "delta": {}, "finish_reason": "tool_calls"}], "usage": {"prompt_tokens": 5}},
+    ]
+    stream = "".join(f"data: {json.dumps(l)}\n\n" for l in lines).encode() + b"data: [DONE]\n\ndata: {\"x\": 1}\n\n"
+    items = await decode(chunked(stream, 1, 7))
+    kinds = [type(i).__name__ for i in items]
+    assert kinds == ["ToolCallDelta", "ToolCallDelta", "Finish", "Usage"], kinds
+    assert items[2] == Finish("tool_calls")
+    print("✅ chat/completions tool-call deltas, finish and usage; stops at [DONE]")
+
+
+async def benchmark(stream: bytes, rounds: int = 200):
+    chunks = list(chunked(stream, 64, 1400))
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        items = await decode(chunks)
+    new_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        legacy = await legacy_parse(chunks)
+    old_s = time.perf_counter() - t0
+
+    text = "".join(i.text for i in items if isinstance(i, TextDelta))
+    assert text == "".join(legacy), "decoders disagree"
+    mb = len(stream) * rounds / 1e6
+    events = stream.count(b"\n\n") * rounds
+    print(f"\n📊 {len(stream)} bytes x {rounds} rounds, {len(chunks)} chunks/stream")
+    print(f"   shared decoder: {mb / new_s:7.1f} MB/s  {events / new_s:9.0f} events/s")
+    print(f"   line parser:    {mb / old_s:7.1f} MB/s  {events / old_s:9.0f} events/s")
+
+
+async def main():
+    await test_byte_by_byte_matches_whole()
+    test_multiline_crlf_and_comments()
+    await test_chat_completions_and_tool_calls()
+    print("\n✅ All SSE decoder tests passed")
+
+    recorded = Path(sys.argv[1]).read_bytes() if len(sys.argv) > 1 else record_responses_stream(REPLY * 20)
+    await benchmark(recorded)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+DAG step executor tests: independent steps overlap, dependencies and
+serial tools keep their order, limits hold, failures retry per step and
+results come back in plan order.
+"""
+
+import asyncio
+import sys
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.core.step_executor import StepExecutor, dependencies
+
+
+class Status(Enum):
+    """Same values as core.agent.StepStatus"""
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+    RETRYING = "retrying"
+
+
+@dataclass
+class Step:
+    """The PlanStep fields the executor uses"""
+    description: str
+    tool_name: Optional[str] = None
+    tool_args: Dict[str, Any] = field(default_factory=dict)
+    status: Status = Status.PENDING
+    result: Optional[str] = None
+    error: Optional[str] = None
+    retry_count: int = 0
+    depends_on: List[int] = field(default_factory=list)
+
+
+def tool(latency: float, fail_times: int = 0, log: Optional[list] = None):
+    """execute_step stand-in: sleeps, fails the first fail_times calls per step."""
+    calls = {}
+
+    async def execute(step):
+        calls[id(step)] = calls.get(id(step), 0) + 1
+        if log is not None:
+            log.append(("start", step.description))
+        await asyncio.sleep(latency)
+        if log is not None:
+            log.append(("end", step.description))
+        if calls[id(step)] <= fail_times:
+            step.status, step.error = Status.FAILED, "timeout"
+            return None
+        step.status, step.result = Status.SUCCESS, f"{step.description} ok"
+        return step.result
+    return execute
+
+
+async def test_independent_steps_overlap():
+    steps = [Step(f"stock {s}", "get_stock_price", {"symbol": s}) for s in ("TSLA", "AAPL", "NVDA")]
+    steps.append(Step("news", "get_news"))
+    executor = StepExecutor()
+    t0 = time.time()
+    results = await executor.run(steps, tool(0.2))
+    elapsed = time.time() - t0
+    assert results == [f"{s.description} ok" for s in steps], "results must stay in plan order"
+    assert elapsed < 0.35, f"steps ran sequentially: {elapsed:.2f}s"
+    stats = executor.get_stats()
+    assert stats["max_parallel"] == 4 and stats["saved_ms"] > 500
+    print(f"✅ 4 steps x 200ms in {elapsed * 1000:.0f}ms (sequential ~800ms), saved {stats['saved_ms']:.0f}ms")
+
+
+def test_dependency_rules():
+    steps = [
+        Step("remember city", "update_user_info"),
+        Step("weather", "get_weather"),
+        Step("play A", "play_music"),
+        Step("search", "web_search"),
+        Step("play B", "play_music"),
+        Step("summarize", "send_email", depends_on=[3, 9, -1]),
+    ]
+    assert dependencies(steps) == [[], [0], [0], [0], [0, 2], [0, 3]]
+    print("✅ implicit dependencies: profile writer first, serial tools in order, bad indices ignored")
+
+
+async def test_limits_and_order():
+    log = []
+    steps = [Step(f"play {i}", "play_music") for i in range(3)] + [Step(f"q{i}", "get_weather") for i in range(4)]
+    executor = StepExecutor(max_concurrency=3, default_tool_limit=2)
+    await executor.run(steps, tool(0.05, log=log))
+    plays = [d for kind, d in log if kind == "start" and d.startswith("play")]
+    assert plays == ["play 0", "play 1", "play 2"]
+    running = peak = 0
+    for kind, _ in log:
+        running += 1 if kind == "start" else -1
+        peak = max(peak, running)
+    assert peak <= 3 and executor.stats["max_parallel"] <= 3
+    print(f"✅ global limit 3 held (peak {peak}), serial tool kept plan order")
+
+
+async def test_retry_and_skip_dependents():
+    steps = [Step("flaky", "get_weather"), Step("broken", "web_search"), Step("needs broken", "fetch_url", depends_on=[1])]
+    executor = StepExecutor(max_retries=2)
+
+    async def execute(step):
+        if step.description == "broken":
+            step.status, step.error = Status.FAILED, "HTTP 500"
+            return None
+        return await flaky(step)
+    flaky = tool(0.01, fail_times=1)
+
+    results = await executor.run(steps, execute)
+    assert results[0] == "flaky ok" and steps[0].retry_count == 1
+    assert steps[1].status == Status.FAILED and steps[1].retry_count == 2
+    assert steps[2].status == Status.FAILED and steps[2].error.startswith("skipped")
+    assert executor.stats["retries"] == 3 and executor.stats["skipped"] == 1
+    print("✅ per-step retries; dependents of a failed step are skipped")
+
+
+async def main():
+    await test_independent_steps_overlap()
+    test_dependency_rules()
+    await test_limits_and_order()
+    await test_retry_and_skip_dependents()
+    print("\n✅ All step executor tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tool result cache tests: per-tool TTLs, argument keys, stale-while-revalidate,
+single-flight coalescing of concurrent identical calls, and error replies
+never being stored. A counting fake tool stands in for the network.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.services.tools import cache as cache_module
+from jarvis_assistant.services.tools.base import BaseTool
+from jarvis_assistant.services.tools.cache import CachePolicy, ToolResultCache
+
+
+class FakeWeatherTool(BaseTool):
+    cache_policy = CachePolicy(ttl=0.3, key_args={"city": "Beijing"}, stale_ttl=0.5)
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+
+    @property
+    def name(self) -> str:
+        return "fake_weather"
+
+    @property
+    def description(self) -> str:
+        return "Fake weather"
+
+    def get_schema(self) -> Dict:
+        return {}
+
+    async def execute(self, **kwargs) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return "❌ 天气服务暂时不可用"
+        return f"{kwargs.get('city', 'Beijing')} 晴 #{self.calls}"
+
+
+class UncachedTool(FakeWeatherTool):
+    cache_policy = None
+
+
+def fresh_cache() -> ToolResultCache:
+    # Each test gets its own cache behind get_tool_cache()
+    cache_module._tool_cache_instance = ToolResultCache(enabled=True)
+    return cache_module._tool_cache_instance
+
+
+async def test_hits_and_keys():
+    cache = fresh_cache()
+    tool = FakeWeatherTool()
+    first = await tool.execute(city="北京")
+    assert await tool.execute(city="北京") == first
+    assert await tool.execute(city=" 北京 ") == first, "arguments are normalized"
+    assert tool.calls == 1
+
+    await tool.execute()
+    await tool.execute(city="Beijing")
+    assert tool.calls == 2, "missing argument uses the declared default"
+
+    await tool.execute(city="上海")
+    assert tool.calls == 3
+    stats = cache.get_stats()["tools"]["fake_weather"]
+    assert stats["hits"] == 3 and stats["misses"] == 3, stats
+    print(f"✅ hits share one fetch per key: {stats}")
+
+
+async def test_ttl_and_stale_while_revalidate():
+    cache = fresh_cache()
+    tool = FakeWeatherTool(delay=0.1)
+    first = await tool.execute(city="北京")
+    await asyncio.sleep(0.35)  # Past ttl, within stale_ttl
+
+    t0 = time.time()
+    stale = await tool.execute(city="北京")
+    elapsed = time.time() - t0
+    assert stale == first and elapsed < 0.05, f"stale answer took {elapsed:.3f}s"
+
+    await asyncio.sleep(0.15)  # Background refresh finished
+    refreshed = await tool.execute(city="北京")
+    assert refreshed != first and tool.calls == 2
+
+    await asyncio.sleep(0.9)  # Past ttl + stale_ttl: a normal miss
+    t0 = time.time()
+    await tool.execute(city="北京")
+    assert time.time() - t0 >= 0.1 and tool.calls == 3
+    stats = cache.get_stats()["tools"]["fake_weather"]
+    assert stats["stale"] == 1 and stats["refreshes"] == 1, stats
+    print(f"✅ stale result served in {elapsed * 1000:.1f}ms while refreshing")
+
+
+async def test_single_flight():
+    cache = fresh_cache()
+    tool = FakeWeatherTool(delay=0.2)
+    results = await asyncio.gather(*(tool.execute(city="北京") for _ in range(10)))
+    assert len(set(results)) == 1 and tool.calls == 1
+    stats = cache.get_stats()["tools"]["fake_weather"]
+    assert stats["coalesced"] == 9 and stats["hit_rate"] == 0.9, stats
+    print(f"✅ 10 concurrent calls -> 1 fetch ({stats['coalesced']} coalesced)")
+
+
+async def test_cancelled_caller_keeps_shared_fetch():
+    fresh_cache()
+    tool = FakeWeatherTool(delay=0.2)
+    first = asyncio.create_task(tool.execute(city="北京"))
+    await asyncio.sleep(0.05)
+    second = asyncio.create_task(tool.execute(city="北京"))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    assert (await second).startswith("北京") and tool.calls == 1
+    print("✅ cancelling one caller does not cancel the shared request")
+
+
+async def test_errors_not_cached():
+    cache = fresh_cache()
+    tool = FakeWeatherTool(delay=0.01)
+    tool.fail = True
+    assert (await tool.execute(city="北京")).startswith("❌")
+    tool.fail = False
+    assert (await tool.execute(city="北京")).startswith("北京")
+    assert tool.calls == 2
+    assert cache.get_stats()["tools"]["fake_weather"]["uncached"] == 1
+    print("✅ error replies are not cached")
+
+
+async def test_uncached_and_disabled():
+    cache = fresh_cache()
+    tool = UncachedTool(delay=0.01)
+    await tool.execute(city="北京")
+    await tool.execute(city="北京")
+    assert tool.calls == 2 and "fake_weather" not in cache.get_stats()["tools"]
+
+    cache.enabled = False
+    cached = FakeWeatherTool(delay=0.01)
+    await cached.execute(city="北京")
+    await cached.execute(city="北京")
+    assert cached.calls == 2
+    print("✅ tools without a policy (or a disabled cache) always run")
+
+
+async def test_invalidate():
+    cache = fresh_cache()
+    tool = FakeWeatherTool(delay=0.01)
+    await tool.execute(city="北京")
+    cache.invalidate("fake_weather")
+    await tool.execute(city="北京")
+    assert tool.calls == 2 and cache.get_stats()["entries"] == 1
+    print("✅ invalidate drops a tool's results")
+
+
+async def main():
+    await test_hits_and_keys()
+    await test_ttl_and_stale_while_revalidate()
+    await test_single_flight()
+    await test_cancelled_caller_keeps_shared_fetch()
+    await test_errors_not_cached()
+    await test_uncached_and_disabled()
+    await test_invalidate()
+    print("\n✅ All tool cache tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
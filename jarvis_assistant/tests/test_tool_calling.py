@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Single-round-trip tool calling tests: streamed tool-call fragments are
+dispatched as soon as their arguments are complete, tool results reach the
+stream callback (TTS) as they finish, and the LLM round trips
+per turn are benchmarked for the "plan" and "tool_calling" planner modes
+against the local Doubao stand-in server.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Panel and daily logs of the turns below go to a scratch directory, not the repo's logs/
+LOG_DIR = tempfile.TemporaryDirectory(prefix="jarvis-test-logs-")
+os.environ["JARVIS_PANEL_LOG"] = os.environ["JARVIS_TRACE_LOG"] = os.path.join(LOG_DIR.name, "realtime_panel.log")
+os.environ["JARVIS_DAILY_LOG_DIR"] = LOG_DIR.name
+
+from jarvis_assistant.core.tool_calling import ToolCallAssembler, tool_schemas
+
+LLM_ENDPOINTS = ("chat_completions", "responses", "context")
+
+
+def test_assembler_dispatches_complete_calls():
+    asm = ToolCallAssembler()
+    assert asm.feed([{"index": 0, "id": "c1", "function": {"name": "get_weather", "arguments": ""}}]) == []
+    assert asm.feed([{"index": 0, "function": {"arguments": '{"city": "青'}}]) == []
+    ready = asm.feed([{"index": 0, "function": {"arguments": '岛"}'}}])
+    assert [c.name for c in ready] == ["get_weather"] and ready[0].args() == {"city": "青岛"}
+
+    # A later index also completes the previous call, even without a closing brace yet
+    asm.feed([{"index": 1, "id": "c2", "function": {"name": "get_news", "arguments": '{"cat'}}])
+    assert asm.feed([{"index": 1, "function": {"arguments": 'egory": "tech"}'}}])[0].args() == {"category": "tech"}
+    assert asm.finish() == []
+    print("✅ tool calls dispatched as soon as their arguments complete")
+
+
+def test_assembler_finish_flushes_partial():
+    asm = ToolCallAssembler()
+    asm.feed([{"index": 0, "id": "c1", "function": {"name": "get_current_time", "arguments": ""}}])
+    flushed = asm.finish()
+    assert [c.name for c in flushed] == ["get_current_time"] and flushed[0].args() == {}
+    print("✅ finish() flushes calls without arguments")
+
+
+def test_tool_schemas_wraps_bare_functions():
+    class Bare:
+        def get_schema(self):
+            return {"name": "bare", "parameters": {"type": "object", "properties": {}}}
+
+    class Broken:
+        def get_schema(self):
+            raise RuntimeError("boom")
+
+    schemas = tool_schemas({"bare": Bare(), "broken": Broken()})
+    assert schemas == [{"type": "function", "function": Bare().get_schema()}]
+    print("✅ schemas normalised to OpenAI function format")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def llm_requests(server) -> int:
+    return sum(
+        server.stats.get(endpoint, {}).get(key, 0)
+        for endpoint in LLM_ENDPOINTS
+        for key in ("requests", "creates")
+    )
+
+
+async def test_tool_answer_is_streamed(server):
+    from jarvis_assistant.core.agent import JarvisAgent
+
+    agent = JarvisAgent()
+    agent.plan_cache.enabled = False
+    agent.planner_mode = "tool_calling"
+    server.profile.update({"tool_call": "get_current_time", "tool_args": "{}"})
+    plans = []
+    run_with_tool_calls = agent._run_with_tool_calls
+
+    async def capture(user_input, plan, stream_callback=None):
+        plans.append(plan)
+        return await run_with_tool_calls(user_input, plan, stream_callback)
+
+    agent._run_with_tool_calls = capture
+    try:
+        spoken = []
+        answer = await agent.run("今天是几月几号", stream_callback=spoken.append)
+    finally:
+        del agent._run_with_tool_calls
+    step = plans[-1].steps[-1]
+    assert step.tool_name == "get_current_time" and step.status.value == "success", step
+    assert step.result and step.result in "".join(spoken), (spoken, step.result)
+    assert answer.strip() == "".join(spoken).strip()
+    print(f"✅ tool result spoken through the stream callback: {''.join(spoken)[:40]!r}")
+
+
+async def benchmark_round_trips(server):
+    from jarvis_assistant.core.agent import JarvisAgent
+
+    agent = JarvisAgent()
+    agent.plan_cache.enabled = False  # Measure the planner itself, not cache hits
+    turns = [
+        ("说说你最近在忙什么", "", "{}"),
+        ("今天是几月几号", "get_current_time", "{}"),
+    ]
+
+    print(f"\n{'mode':<14}{'query':<16}{'LLM round trips':>16}{'latency':>10}")
+    for mode in ("plan", "tool_calling"):
+        agent.planner_mode = mode
+        for query, tool, args in turns:
+            server.profile.update({"tool_call": tool, "tool_args": args})
+            refresh = agent.summarizer.schedule_refresh()
+            if refresh:
+                await refresh  # A background summary request is not part of the turn
+            before = llm_requests(server)
+            t0 = time.time()
+            await agent.run(query)
+            trips = llm_requests(server) - before
+            print(f"{mode:<14}{query:<16}{trips:>16}{(time.time() - t0) * 1000:>8.0f}ms")
+            if mode == "tool_calling":
+                assert trips == 1, f"expected a single round trip, got {trips}"
+
+
+async def main():
+    from jarvis_assistant.services.doubao.standin_server import DoubaoStandInServer, StandInProfile
+
+    test_assembler_dispatches_complete_calls()
+    test_assembler_finish_flushes_partial()
+    test_tool_schemas_wraps_bare_functions()
+
+    # One stand-in for the whole run: the LLM clients are process-wide singletons
+    server = DoubaoStandInServer(StandInProfile(first_byte_ms=150, jitter_ms=0, tokens_per_sec=200), port=free_port())
+    await server.start()
+    os.environ.update(server.client_env())
+    os.environ.update({"DOUBAO_ARK_API_KEY": "local", "DOUBAO_ENDPOINT_ID": "ep-local"})
+    try:
+        await test_tool_answer_is_streamed(server)
+        await benchmark_round_trips(server)
+    finally:
+        await server.stop()
+    print("\n✅ All tool calling tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
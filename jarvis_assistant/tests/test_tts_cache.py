@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Speech cache tests: LRU/disk tiers, eviction stats, chunked replay.
+Runs offline - the live synthesizer is simulated.
+"""
+
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.services.doubao.tts_cache import TTSCache, normalize_text
+
+
+def fake_synthesizer(audio: bytes, chunk: int = 4000, delay: float = 0.05):
+    calls = {"count": 0}
+
+    async def synthesize():
+        calls["count"] += 1
+        await asyncio.sleep(delay)  # network round trip
+        for i in range(0, len(audio), chunk):
+            yield audio[i:i + chunk]
+
+    return synthesize, calls
+
+
+async def collect(stream):
+    return b"".join([chunk async for chunk in stream])
+
+
+async def test_hit_replays_identical_audio():
+    with tempfile.TemporaryDirectory() as d:
+        cache = TTSCache(cache_dir=d, chunk_bytes=1000)
+        audio = bytes(range(256)) * 40
+        synth, calls = fake_synthesizer(audio)
+
+        first = await collect(cache.stream("帮您查到了。", "voice", 24000, "pcm", synth))
+        t0 = time.time()
+        chunks = [c async for c in cache.stream(" 帮您查到了。 ", "voice", 24000, "pcm", synth)]
+        hit_ms = (time.time() - t0) * 1000
+
+        assert first == audio
+        assert b"".join(chunks) == audio
+        assert all(len(c) <= 1000 for c in chunks)
+        assert calls["count"] == 1, "hit must not call the synthesizer"
+        stats = cache.get_stats()
+        assert stats["memory_hits"] == 1 and stats["misses"] == 1
+        print(f"✅ hit replayed in {hit_ms:.2f}ms ({len(chunks)} chunks)")
+
+
+async def test_key_includes_voice_and_rate():
+    with tempfile.TemporaryDirectory() as d:
+        cache = TTSCache(cache_dir=d)
+        assert cache.make_key("你好", "a", 24000, "pcm") != cache.make_key("你好", "b", 24000, "pcm")
+        assert cache.make_key("你好", "a", 24000, "pcm") != cache.make_key("你好", "a", 16000, "pcm")
+        assert cache.make_key("你好 ", "a", 24000, "pcm") == cache.make_key("你好", "a", 24000, "pcm")
+        assert normalize_text("ＡＢＣ  1") == "ABC 1"
+        print("✅ key normalisation")
+
+
+async def test_disk_tier_survives_restart():
+    with tempfile.TemporaryDirectory() as d:
+        audio = b"\x01\x02" * 5000
+        cache = TTSCache(cache_dir=d)
+        synth, calls = fake_synthesizer(audio)
+        await collect(cache.stream("出门记得带伞。", "v", 24000, "pcm", synth))
+
+        reopened = TTSCache(cache_dir=d)
+        replay = await collect(reopened.stream("出门记得带伞。", "v", 24000, "pcm", synth))
+        assert replay == audio
+        assert calls["count"] == 1
+        assert reopened.get_stats()["disk_hits"] == 1
+        print("✅ disk tier (mmap) survives restart")
+
+
+def mapped(path: Path) -> bool:
+    with open("/proc/self/maps") as f:
+        return str(path) in f.read()
+
+
+async def test_disk_hit_streams_from_the_map():
+    with tempfile.TemporaryDirectory() as d:
+        audio = bytes(range(256)) * 100
+        key = TTSCache(cache_dir=d).make_key("出门记得带伞。", "v", 24000, "pcm")
+        TTSCache(cache_dir=d).put(key, audio)
+        path = Path(d) / f"{key}.pcm"
+
+        cache = TTSCache(cache_dir=d, chunk_bytes=1000)
+        stream = cache.stream("出门记得带伞。", "v", 24000, "pcm", fake_synthesizer(audio)[0])
+        first = await stream.__anext__()
+        assert first == audio[:1000]
+        if Path("/proc/self/maps").exists():
+            assert mapped(path), "a disk hit is served from the map"
+        await stream.aclose()
+        if Path("/proc/self/maps").exists():
+            assert not mapped(path), "stopping the stream releases the map"
+        assert cache.get_stats()["memory_entries"] == 0, "a partial replay is not promoted"
+
+        chunks = [c async for c in cache.stream("出门记得带伞。", "v", 24000, "pcm", fake_synthesizer(audio)[0])]
+        assert b"".join(chunks) == audio and max(map(len, chunks)) == 1000
+        assert cache.get_stats()["disk_hits"] == 2 and cache.get_stats()["memory_entries"] == 1
+        print(f"✅ disk hits stream {len(chunks)} slices of the map, closed after the stream")
+
+
+async def test_store_writes_off_the_loop():
+    with tempfile.TemporaryDirectory() as d:
+        cache = TTSCache(cache_dir=d)
+        writers = []
+        write_file = cache._write_file
+
+        def traced_write(key, audio):
+            writers.append(threading.get_ident())
+            return write_file(key, audio)
+
+        cache._write_file = traced_write
+        synth, _ = fake_synthesizer(b"\x03" * 20_000)
+        await collect(cache.stream("稍等，马上就好。", "v", 24000, "pcm", synth))
+        assert writers and threading.get_ident() not in writers, "the disk write runs in a worker thread"
+        assert cache.get_stats()["disk_entries"] == 1 and not list(Path(d).glob("*.tmp"))
+        print("✅ completed syntheses are written to disk off the event loop")
+
+
+async def test_size_caps_and_evictions():
+    with tempfile.TemporaryDirectory() as d:
+        cache = TTSCache(cache_dir=d, memory_limit=25_000, disk_limit=35_000)
+        for i in range(5):
+            cache.put(cache.make_key(f"phrase {i}", "v", 24000, "pcm"), bytes(10_000))
+        stats = cache.get_stats()
+        assert stats["memory_bytes"] <= 25_000 and stats["memory_evictions"] == 3
+        assert stats["disk_bytes"] <= 35_000 and stats["disk_evictions"] == 2
+        # Oldest entries are the ones evicted
+        assert not cache.contains(cache.make_key("phrase 0", "v", 24000, "pcm"))
+        assert cache.contains(cache.make_key("phrase 4", "v", 24000, "pcm"))
+        print(f"✅ caps enforced: {stats}")
+
+
+async def test_failed_or_long_synthesis_not_cached():
+    with tempfile.TemporaryDirectory() as d:
+        cache = TTSCache(cache_dir=d, max_text_chars=10)
+
+        async def broken():
+            yield b"partial"
+            raise RuntimeError("connection dropped")
+
+        try:
+            await collect(cache.stream("抱歉", "v", 24000, "pcm", broken))
+        except RuntimeError:
+            pass
+        assert not cache.contains(cache.make_key("抱歉", "v", 24000, "pcm"))
+
+        synth, calls = fake_synthesizer(b"\x00" * 100)
+        await collect(cache.stream("这是一个很长很长的完整回答，不应该缓存", "v", 24000, "pcm", synth))
+        await collect(cache.stream("这是一个很长很长的完整回答，不应该缓存", "v", 24000, "pcm", synth))
+        assert calls["count"] == 2
+        assert cache.get_stats()["uncacheable"] == 2
+        print("✅ truncated and long syntheses are not cached")
+
+
+async def main():
+    await test_hit_replays_identical_audio()
+    await test_key_includes_voice_and_rate()
+    await test_disk_tier_survives_restart()
+    await test_disk_hit_streams_from_the_map()
+    await test_store_writes_off_the_loop()
+    await test_size_caps_and_evictions()
+    await test_failed_or_long_synthesis_not_cached()
+    print("\n✅ All speech cache tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
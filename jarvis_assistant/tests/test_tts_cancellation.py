@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+TTS cancellation tests: abandoning an answer mid-stream stops its audio,
+leaks no frames into the next answer and keeps the websocket warm.
+Runs offline against the local Doubao stand-in server.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.services.doubao.standin_server import DoubaoStandInServer, StandInProfile
+from jarvis_assistant.services.doubao.tts_cache import TTSCache
+
+LONG_TEXT = "这是一段很长的回答，用户在播放到一半的时候打断了它，" * 2
+FRAME = 9600  # 200ms per character on the stand-in server
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_server() -> DoubaoStandInServer:
+    profile = StandInProfile(first_byte_ms=100, jitter_ms=0, audio_bytes_per_sec=96000)
+    server = DoubaoStandInServer(profile, port=free_port())
+    await server.start()
+    os.environ.update(server.client_env())
+    return server
+
+
+async def abandon_after(stream, frames: int) -> float:
+    """Read a few frames, then stop; returns cancel-to-silence in ms."""
+    received = 0
+    async for _ in stream:
+        received += 1
+        if received == frames:
+            break
+    t0 = time.time()
+    await stream.aclose()
+    return (time.time() - t0) * 1000
+
+
+async def test_bidir_cancel_keeps_connection():
+    server = await start_server()
+    try:
+        from jarvis_assistant.services.doubao.tts_bidirection import BidirectionalTTS
+
+        with tempfile.TemporaryDirectory() as d:
+            tts = BidirectionalTTS()
+            tts.cache = TTSCache(cache_dir=d)
+            await tts.connect()
+
+            silence_ms = await abandon_after(tts.synthesize(LONG_TEXT), frames=2)
+            audio = b"".join([chunk async for chunk in tts.synthesize("你好先生")])
+            await asyncio.sleep(0.2)  # let the cancel acknowledgement arrive
+
+            assert len(audio) == 4 * FRAME, "frames of the cancelled session leaked"
+            assert tts.stats["cancels"] == 1 and tts.stats["reconnects"] == 0
+            assert tts.stats["last_cancel_ack_ms"] is not None
+            assert server.stats["tts_bidir"]["requests"] == 2
+            await tts.close()
+            print(f"✅ Bidirectional: cancel-to-silence {silence_ms:.1f}ms, "
+                  f"ack {tts.stats['last_cancel_ack_ms']:.0f}ms, {tts.stats}")
+    finally:
+        await server.stop()
+
+
+async def test_streaming_adapter_cancel():
+    server = await start_server()
+    try:
+        from jarvis_assistant.io.tts.doubao_stream import DoubaoStreamingTTS
+
+        async def llm():
+            for piece in ["好的，", LONG_TEXT]:
+                await asyncio.sleep(0.01)
+                yield piece
+
+        async def short():
+            yield "收到。"
+
+        tts = DoubaoStreamingTTS()
+        silence_ms = await abandon_after(tts.synthesize_stream(llm()), frames=2)
+        assert tts.last_stats["cancelled"]
+
+        audio = b"".join([chunk async for chunk in tts.synthesize_stream(short())])
+        assert len(audio) == 3 * FRAME
+        assert tts.client.stats["reconnects"] == 0
+        await tts.close()
+        print(f"✅ Streaming adapter: cancel-to-silence {silence_ms:.1f}ms, no reconnect")
+    finally:
+        await server.stop()
+
+
+async def test_v1_cancel_drains_instead_of_reconnecting():
+    server = await start_server()
+    try:
+        import importlib
+        import jarvis_assistant.services.doubao.tts_v3 as tts_v3
+        importlib.reload(tts_v3)
+
+        # Short tail (2 frames, ~200ms): drained, the link stays up
+        client = tts_v3.DoubaoTTSV1()
+        silence_ms = await abandon_after(client.synthesize("你好先生早上", use_cache=False), frames=4)
+        audio = b"".join([chunk async for chunk in client.synthesize("你好先生", use_cache=False)])
+        assert len(audio) == 4 * FRAME, "tail of the abandoned stream leaked"
+        assert client.stats["cancels"] == 1 and client.stats["reconnects"] == 0
+        assert client.stats["discarded_frames"] == 2 and client.stats["drain_aborts"] == 0
+        drained_ms = client.stats["last_drain_ms"]
+
+        # Long tail (seconds of audio): the drain gives up after DRAIN_BUDGET and reconnects
+        await abandon_after(client.synthesize(LONG_TEXT, use_cache=False), frames=2)
+        t0 = time.time()
+        audio = b"".join([chunk async for chunk in client.synthesize("你好先生", use_cache=False)])
+        waited_ms = (time.time() - t0) * 1000
+        assert len(audio) == 4 * FRAME, "tail of the abandoned stream leaked"
+        assert client.stats["drain_aborts"] == 1 and client.stats["reconnects"] == 1
+        assert waited_ms < tts_v3.DRAIN_BUDGET * 1000 + 1500, waited_ms  # Budget + reconnect + 4 frames
+        await client.close()
+        print(f"✅ TTS v1: cancel-to-silence {silence_ms:.1f}ms, short tail drained in {drained_ms:.0f}ms, "
+              f"long tail dropped after {tts_v3.DRAIN_BUDGET * 1000:.0f}ms (next answer in {waited_ms:.0f}ms)")
+    finally:
+        await server.stop()
+
+
+async def test_v1_stream_error_closes_the_socket():
+    profile = StandInProfile(first_byte_ms=2500, jitter_ms=0, audio_bytes_per_sec=96000)
+    server = DoubaoStandInServer(profile, port=free_port())
+    await server.start()
+    os.environ.update(server.client_env())
+    try:
+        import importlib
+        import jarvis_assistant.services.doubao.tts_v3 as tts_v3
+        from jarvis_assistant.utils.deadline import TurnDeadline
+        importlib.reload(tts_v3)
+
+        client = tts_v3.DoubaoTTSV1()
+        await client.connect()
+        ws = client.ws
+        deadline = TurnDeadline(budget=0.1)
+        token = deadline.activate()  # First frame times out after SPEAK_GRACE
+        try:
+            await anext(client.synthesize("你好先生", use_cache=False))
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("expected the first frame to time out")
+        finally:
+            deadline.release(token)
+        assert client.ws is None, "the next request reconnects"
+        await asyncio.sleep(0.1)
+        assert ws.state.name in ("CLOSING", "CLOSED"), "the timed-out socket is closed, not leaked"
+        print("✅ TTS v1: a stream error closes the old socket before reconnecting")
+    finally:
+        await server.stop()
+
+
+async def main():
+    await test_bidir_cancel_keeps_connection()
+    await test_streaming_adapter_cancel()
+    await test_v1_cancel_drains_instead_of_reconnecting()
+    await test_v1_stream_error_closes_the_socket()
+    print("\n✅ All TTS cancellation tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Turn deadline tests: one budget shared by every stage of a turn, timeouts
+derived from it, slow stages cancelled, no retries once it is spent, the
+degraded answer spoken in time, and per-stage consumption recorded.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from jarvis_assistant.utils.deadline import (
+    MIN_TIMEOUT, BudgetStats, TurnDeadline, budget_exhausted, budget_stage, budget_timeout,
+    current_deadline, detached
+)
+from jarvis_assistant.core.step_executor import StepExecutor
+from jarvis_assistant.core.synthesis import ProgressiveSynthesis
+
+
+def make_step(tool, status="pending"):
+    return SimpleNamespace(description=f"Execute {tool}", tool_name=tool, tool_args={},
+                           status=status, result=None, error=None, retry_count=0, depends_on=[])
+
+
+def make_execute(delays, calls):
+    """Stand-in for JarvisAgent.execute_step: each tool call bounded by the turn budget."""
+    async def execute(step):
+        calls.append(step.tool_name)
+        try:
+            with budget_stage(f"tool:{step.tool_name}"):
+                await asyncio.wait_for(asyncio.sleep(delays[step.tool_name]), budget_timeout())
+        except asyncio.TimeoutError:
+            current_deadline().note_timeout(f"tool:{step.tool_name}")
+            step.status, step.error = "failed", "超时"
+            return None
+        step.status, step.result = "success", f"{step.tool_name} ok"
+        return step.result
+    return execute
+
+
+async def test_timeouts_follow_budget():
+    assert budget_timeout(10) == 10 and budget_timeout() is None, "outside a turn: the tool's own cap"
+    deadline = TurnDeadline(0.5)
+    token = deadline.activate()
+    try:
+        assert current_deadline() is deadline
+        assert 0.4 < budget_timeout(10) <= 0.5
+        assert budget_timeout(0.1) == 0.1
+        await asyncio.sleep(0.55)
+        assert budget_exhausted() and budget_timeout(10) == MIN_TIMEOUT
+        assert budget_timeout(None, floor=1.5) == 1.5, "TTS grace still applies"
+    finally:
+        deadline.release(token)
+    assert current_deadline() is None
+    print("✅ timeouts shrink with the remaining budget")
+
+
+async def test_slow_stage_cancelled():
+    deadline = TurnDeadline(0.3)
+    cancelled = []
+
+    async def slow_planner():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    t0 = time.time()
+    try:
+        await deadline.run("plan", slow_planner())
+    except asyncio.TimeoutError:
+        pass
+    else:
+        raise AssertionError("expected a timeout")
+    elapsed = time.time() - t0
+    assert elapsed < 0.4 and cancelled == [True]
+    assert deadline.timed_out == ["plan"] and 250 <= deadline.stages["plan"] < 400
+
+    # Already spent: the next stage is not even started
+    try:
+        await deadline.run("plan", slow_planner())
+    except asyncio.TimeoutError:
+        pass
+    assert cancelled == [True]
+    print(f"✅ slow planner cancelled after {elapsed * 1000:.0f}ms")
+
+
+async def test_partial_answer_within_budget():
+    spoken = []
+    steps = [make_step("get_weather"), make_step("get_news"), make_step("web_search")]
+    calls = []
+    execute = make_execute({"get_weather": 0.05, "get_news": 0.1, "web_search": 3.0}, calls)
+    synthesis = ProgressiveSynthesis(steps, lambda text: spoken.append((time.time(), text)))
+
+    deadline = TurnDeadline(0.4)
+    token = deadline.activate()
+    t0 = time.time()
+    try:
+        with deadline.stage("execute"):
+            await StepExecutor().run(steps, execute, on_done=synthesis.step_done)
+        final = await synthesis.finish()
+    finally:
+        deadline.release(token)
+    elapsed = time.time() - t0
+
+    assert elapsed < 0.6, f"turn took {elapsed:.2f}s"
+    assert calls.count("web_search") == 1, "no retries once the budget is spent"
+    assert "get_weather ok" in final and "get_news ok" in final and "超时" in final
+    assert deadline.timed_out == ["tool:web_search"]
+    assert spoken[0][0] - t0 < 0.15, "fast results are spoken before the deadline"
+    print(f"✅ slow tool cut at the deadline, partial answer in {elapsed * 1000:.0f}ms: {final!r}")
+
+
+async def test_detached_work_ignores_budget():
+    deadline = TurnDeadline(0.01)
+    token = deadline.activate()
+    try:
+        await asyncio.sleep(0.02)
+        seen = await asyncio.create_task(detached(asyncio.sleep(0, result=None)))
+        inner = await asyncio.create_task(detached(_read_timeout()))
+        assert seen is None and inner == 30, inner
+        assert budget_exhausted(), "the caller's context keeps its deadline"
+    finally:
+        deadline.release(token)
+    print("✅ background work started by a turn is not bound by its budget")
+
+
+async def _read_timeout():
+    return budget_timeout(30)
+
+
+async def test_stats():
+    stats = BudgetStats()
+    for i in range(3):
+        deadline = TurnDeadline(0.05)
+        with deadline.stage("plan"):
+            await asyncio.sleep(0.01)
+        if i == 2:
+            deadline.note_timeout("llm")
+            deadline.degraded = True
+            await asyncio.sleep(0.05)
+        stats.record(deadline)
+    summary = stats.get_stats()
+    assert summary["turns"] == 3 and summary["over_budget"] == 1 and summary["degraded"] == 1
+    assert summary["timeouts"] == {"llm": 1} and summary["avg_stage_ms"]["plan"] >= 10
+    print(f"✅ per-stage budget stats: {summary}")
+
+
+async def main():
+    await test_timeouts_follow_budget()
+    await test_slow_stage_cancelled()
+    await test_partial_answer_within_budget()
+    await test_detached_work_ignores_budget()
+    await test_stats()
+    print("\n✅ All turn deadline tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
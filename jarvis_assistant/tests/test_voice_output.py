@@ -43,7 +43,7 @@ async def get_ai_response(prompt: str) -> str:
     if api_key and endpoint_id:
         try:
             import requests
-            url = "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
+            url = os.getenv("DOUBAO_ARK_BASE_URL", "https://ark.cn-beijing.volces.com/api/v3").rstrip("/") + "/chat/completions"
             headers = {
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {api_key}"
@@ -6,7 +6,7 @@ import asyncio
 import random
 import json
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable
 from datetime import datetime, timedelta
 
 class CommentCache:
@@ -72,6 +72,7 @@ class CommentCache:
         self.cache: Dict[str, List[str]] = {}
         self._load_cache()
         self._generating = False
+        self._listeners: List[Callable[[Dict[str, List[str]]], None]] = []
         
     def _load_cache(self):
         """Load cache from file, fallback to defaults"""
@@ -99,6 +100,19 @@ class CommentCache:
         except Exception:
             pass
     
+    def add_listener(self, callback: Callable[[Dict[str, List[str]]], None]):
+        """Register a callback receiving {category: [new comments]} after each generation run"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+    
+    def get_all_comments(self) -> Dict[str, List[str]]:
+        """All known comments per category (cache merged over defaults)"""
+        merged = {k: list(v) for k, v in self.DEFAULT_COMMENTS.items()}
+        for category, comments in self.cache.items():
+            bucket = merged.setdefault(category, [])
+            bucket.extend(c for c in comments if c not in bucket)
+        return merged
+    
     def get_comment(self, category: str) -> str:
         """Get a random comment from cache"""
         comments = self.cache.get(category, self.DEFAULT_COMMENTS.get(category, ["好的。"]))
@@ -124,6 +138,7 @@ class CommentCache:
             return
             
         self._generating = True
+        added: Dict[str, List[str]] = {}
         try:
             prompts = {
                 "stock_up_big": "生成5个表达股票大涨喜悦的短句，要自然口语化，每句不超过15字，用换行分隔",
@@ -139,12 +154,21 @@ class CommentCache:
                     if response:
                         new_comments = [c.strip() for c in response.split('\n') if c.strip() and len(c.strip()) < 20]
                         for comment in new_comments:
+                            if comment not in self.cache.get(category, []):
+                                added.setdefault(category, []).append(comment)
                             self.add_comment(category, comment)
                 except Exception:
                     pass
                     
         finally:
             self._generating = False
+        
+        if added:
+            for callback in self._listeners:
+                try:
+                    callback(added)
+                except Exception as e:
+                    print(f"⚠️ Comment listener error: {e}")
 
 
 # Global instance
@@ -0,0 +1,203 @@
+"""
+Turn Deadline
+One latency budget per turn, shared by every stage that can be slow:
+
+    run() ─ plan ─ tools ─ LLM ─ TTS first audio
+      └──────── JARVIS_TURN_BUDGET (12s) ────────┘
+
+JarvisAgent.run() starts a TurnDeadline and makes it current (contextvar),
+so the planner, every tool execute(), the LLM router and the TTS client
+take their timeouts from the remaining budget instead of their own fixed
+values (3s, 10s, 30s, 45s...), without a deadline argument on every
+signature. A stage that would outlive the turn is cancelled and the agent
+speaks a short degraded answer instead of going silent.
+
+Usage:
+    deadline = TurnDeadline()
+    token = deadline.activate()
+    try:
+        plan = await deadline.run("plan", agent.plan(text))
+    finally:
+        deadline.release(token)
+
+    # Anywhere below run():
+    async with session.get(url, timeout=budget_timeout(10)) as resp: ...
+    with budget_stage("llm"): ...
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, List, Optional
+
+TURN_BUDGET = float(os.getenv("JARVIS_TURN_BUDGET", "12.0"))
+# Never hand out a zero/negative timeout (aiohttp treats 0 as "no timeout")
+MIN_TIMEOUT = 0.05
+
+_current: contextvars.ContextVar = contextvars.ContextVar("turn_deadline", default=None)
+
+
+class TurnDeadline:
+    """
+    Latency budget of one turn, with per-stage accounting.
+
+    Stages are recorded by name (plan, execute, llm, tool:get_weather...);
+    concurrent stages overlap, so their sum can exceed the turn time.
+    """
+
+    def __init__(self, budget: float = TURN_BUDGET):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.expires = self.started + budget
+        self.stages: Dict[str, float] = {}   # stage -> ms spent
+        self.timed_out: List[str] = []       # Stages cut off by the deadline
+        self.degraded = False                # A degraded answer was given
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.started) * 1000
+
+    def timeout(self, cap: Optional[float] = None, floor: float = MIN_TIMEOUT) -> float:
+        """Seconds a stage may take: the remaining budget, at most cap, at least floor."""
+        remaining = self.remaining()
+        if cap is not None:
+            remaining = min(cap, remaining)
+        return max(floor, remaining)
+
+    def activate(self) -> contextvars.Token:
+        """Make this the current turn's deadline (release() with the returned token)."""
+        return _current.set(self)
+
+    def release(self, token: contextvars.Token):
+        _current.reset(token)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Record the time spent in a stage."""
+        t0 = time.monotonic()
+        try:
+            yield self
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.monotonic() - t0) * 1000
+
+    def note_timeout(self, name: str):
+        if name not in self.timed_out:
+            self.timed_out.append(name)
+
+    async def run(self, name: str, awaitable: Awaitable, cap: Optional[float] = None) -> Any:
+        """
+        Await a stage within the budget.
+
+        Raises:
+            asyncio.TimeoutError: the budget ran out (the stage is cancelled)
+        """
+        with self.stage(name):
+            if self.expired:
+                if asyncio.iscoroutine(awaitable):
+                    awaitable.close()
+                self.note_timeout(name)
+                raise asyncio.TimeoutError(f"turn budget exhausted before {name}")
+            try:
+                return await asyncio.wait_for(awaitable, self.timeout(cap))
+            except asyncio.TimeoutError:
+                self.note_timeout(name)
+                raise
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "budget_ms": round(self.budget * 1000),
+            "used_ms": round(self.elapsed_ms(), 1),
+            "stages": {name: round(ms, 1) for name, ms in self.stages.items()},
+            "timed_out": list(self.timed_out),
+            "degraded": self.degraded,
+        }
+
+
+def current_deadline() -> Optional[TurnDeadline]:
+    """The deadline of the turn being processed, if any."""
+    return _current.get()
+
+
+def budget_timeout(cap: Optional[float] = None, floor: float = MIN_TIMEOUT) -> Optional[float]:
+    """
+    Timeout for one call: min(cap, remaining turn budget), at least floor.
+    Outside a turn (scheduler, tests, background work) this is just cap.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return cap
+    return deadline.timeout(cap, floor)
+
+
+def budget_exhausted() -> bool:
+    deadline = _current.get()
+    return deadline is not None and deadline.expired
+
+
+@contextmanager
+def budget_stage(name: str):
+    """Record a stage on the current deadline (no-op outside a turn)."""
+    deadline = _current.get()
+    if deadline is None:
+        yield None
+    else:
+        with deadline.stage(name):
+            yield deadline
+
+
+async def detached(awaitable: Awaitable) -> Any:
+    """
+    Await outside any turn budget. For work a turn starts but must not cut
+    short (shared cache fills, background refreshes, memory extraction);
+    call it in its own task so the caller's context is untouched.
+    """
+    _current.set(None)
+    return await awaitable
+
+
+class BudgetStats:
+    """Per-stage budget consumption across turns."""
+
+    def __init__(self, window: int = 200):
+        self.turns = 0
+        self.over_budget = 0
+        self.degraded = 0
+        self.timeouts: Dict[str, int] = {}
+        self.stage_ms: Dict[str, float] = {}
+        self.stage_turns: Dict[str, int] = {}
+        self.turn_ms: deque = deque(maxlen=window)
+
+    def record(self, deadline: TurnDeadline):
+        self.turns += 1
+        used = deadline.elapsed_ms()
+        self.turn_ms.append(used)
+        self.over_budget += used > deadline.budget * 1000
+        self.degraded += deadline.degraded
+        for name in deadline.timed_out:
+            self.timeouts[name] = self.timeouts.get(name, 0) + 1
+        for name, ms in deadline.stages.items():
+            self.stage_ms[name] = self.stage_ms.get(name, 0.0) + ms
+            self.stage_turns[name] = self.stage_turns.get(name, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.turn_ms)
+        return {
+            "turns": self.turns,
+            "over_budget": self.over_budget,
+            "degraded": self.degraded,
+            "timeouts": dict(self.timeouts),
+            "p50_turn_ms": round(ordered[len(ordered) // 2], 1) if ordered else 0.0,
+            "p95_turn_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1) if ordered else 0.0,
+            "avg_stage_ms": {
+                name: round(ms / self.stage_turns[name], 1) for name, ms in self.stage_ms.items()
+            },
+        }
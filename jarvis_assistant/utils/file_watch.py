@@ -0,0 +1,154 @@
+"""
+File Watch
+"Has this file changed since I last looked?" without reading it:
+
+    inotify (Linux)   one non-blocking read() of queued events, no disk access
+    polling           os.stat() mtime/size, at most once per JARVIS_FILE_POLL seconds
+
+The directory is watched rather than the file, so editors that save by
+writing a temp file and renaming it over the original are seen too.
+inotify is used through libc (no extra dependency); if it is unavailable
+(macOS, container limits, JARVIS_FILE_WATCH=poll) the watcher polls.
+
+Usage:
+    watcher = FileWatcher("MEMORY.md")
+    if await watcher.check():      # stat (when polling) runs in a thread
+        text = await asyncio.to_thread(path.read_text)
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+FILE_WATCH = os.getenv("JARVIS_FILE_WATCH", "auto").lower()   # auto | poll
+POLL_INTERVAL = float(os.getenv("JARVIS_FILE_POLL", "2.0"))
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")   # wd, mask, cookie, len (name follows)
+
+_libc = None
+
+
+def _inotify_watch(directory: Path) -> Optional[int]:
+    """A non-blocking inotify fd watching directory, or None if unavailable."""
+    global _libc
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        if _libc is None:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None  # e.g. fs.inotify.max_user_instances reached
+        if _libc.inotify_add_watch(fd, str(directory).encode(), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+class FileWatcher:
+    """
+    Change detection for one file. The first check always reports a change,
+    so callers load the file once before relying on the watcher.
+    """
+
+    def __init__(self, path, poll_interval: float = POLL_INTERVAL, backend: str = FILE_WATCH):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self._name = self.path.name.encode()
+        self._fd: Optional[int] = None
+        if backend != "poll" and self.path.parent.is_dir():
+            self._fd = _inotify_watch(self.path.parent)
+        self.backend = "inotify" if self._fd is not None else "poll"
+        self._signature: Optional[Tuple[int, int]] = None
+        self._next_poll = 0.0
+        self._pending = True
+        self.stats = {"checks": 0, "stats": 0, "changes": 0}
+
+    def changed(self) -> bool:
+        """Whether the file changed since the last call (may stat when polling)."""
+        if self._poll_due():
+            return self._record(self._stat_changed())
+        return self._record(self._events_changed())
+
+    async def check(self) -> bool:
+        """changed(), with the polling stat() run off the event loop."""
+        if self._poll_due():
+            return self._record(await asyncio.to_thread(self._stat_changed))
+        return self._record(self._events_changed())
+
+    def _record(self, changed: bool) -> bool:
+        self.stats["checks"] += 1
+        changed = changed or self._pending
+        self._pending = False
+        self.stats["changes"] += changed
+        return changed
+
+    def _poll_due(self) -> bool:
+        if self._fd is not None:
+            return False
+        now = time.monotonic()
+        if now < self._next_poll:
+            return False
+        self._next_poll = now + self.poll_interval
+        return True
+
+    def _stat_changed(self) -> bool:
+        self.stats["stats"] += 1
+        try:
+            st = os.stat(self.path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        changed = signature != self._signature
+        self._signature = signature
+        return changed
+
+    def _events_changed(self) -> bool:
+        if self._fd is None:
+            return False
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            except OSError:
+                self.close()
+                return True  # Lost the watch: assume a change, poll from now on
+            offset = 0
+            while offset + _EVENT.size <= len(data):
+                _, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW or name == self._name:
+                    changed = True
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+            self.backend = "poll"
+
+    def __del__(self):
+        self.close()
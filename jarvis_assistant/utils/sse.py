@@ -0,0 +1,225 @@
+"""
+Incremental SSE Decoder
+One decoder for every streaming LLM endpoint (Ark Responses API, chat
+completions, tool calling).
+
+- Works on raw byte chunks (resp.content.iter_any()), not lines
+- Keeps partial UTF-8 sequences and partial events across chunk boundaries
+- Joins multi-line `data:` fields as the SSE spec requires
+- Only JSON-decodes events that can carry text, tool calls or usage; the
+  many lifecycle events of the Responses API are skipped by a substring check
+
+Usage:
+    async for item in stream_events(resp.content):
+        if isinstance(item, TextDelta):
+            print(item.text, end="")
+        elif isinstance(item, Usage):
+            usage = item.data
+"""
+
+import codecs
+import json
+from json.decoder import scanstring as _scanstring
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+
+@dataclass
+class SSEEvent:
+    """One raw server-sent event."""
+    data: str
+    event: str = ""
+    id: str = ""
+
+
+@dataclass
+class TextDelta:
+    text: str
+
+
+@dataclass
+class Usage:
+    data: Dict[str, Any]
+
+
+@dataclass
+class ToolCallDelta:
+    """chat/completions `delta.tool_calls` fragments (see core.tool_calling)."""
+    calls: List[Dict[str, Any]]
+
+
+@dataclass
+class Finish:
+    reason: str
+
+
+StreamItem = Union[TextDelta, Usage, ToolCallDelta, Finish]
+
+# Lifecycle events of the Responses API that never carry new text or usage
+_SKIP_EVENTS = {"response.created", "response.in_progress", "response.output_item.added",
+                "response.output_item.done", "response.content_part.added",
+                "response.content_part.done", "response.output_text.done"}
+
+
+class SSEDecoder:
+    """
+    Byte-chunk in, complete SSEEvents out.
+
+    Works a whole event (text up to the blank line) at a time; the usual
+    single-line `data: {...}` event takes a fast path with no field parsing.
+    """
+
+    def __init__(self):
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer = ""
+        self._id = ""
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        text = self._utf8.decode(chunk)
+        if not text:
+            return []
+        buffer = self._buffer + text
+        pending_cr = ""
+        if "\r" in buffer:
+            # A trailing \r may be the first half of \r\n - keep it for the next chunk
+            if buffer.endswith("\r"):
+                buffer, pending_cr = buffer[:-1], "\r"
+            buffer = buffer.replace("\r\n", "\n").replace("\r", "\n")
+        blocks = buffer.split("\n\n")
+        self._buffer = blocks.pop() + pending_cr
+        events = []
+        for block in blocks:
+            event = self._block(block)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def flush(self) -> List[SSEEvent]:
+        """End of stream: emit a trailing event that had no blank line after it."""
+        buffer = (self._buffer + self._utf8.decode(b"", final=True)).replace("\r", "")
+        self._buffer = ""
+        event = self._block(buffer.strip("\n"))
+        return [event] if event is not None else []
+
+    def _block(self, block: str) -> Optional[SSEEvent]:
+        if block.startswith("data: "):
+            if "\n" not in block:
+                return SSEEvent(block[6:], "", self._id)
+        elif block.startswith("event: "):
+            # `event: name\ndata: {...}` (Responses API)
+            end = block.find("\n")
+            if end > 0 and block.startswith("data: ", end + 1) and block.find("\n", end + 1) < 0:
+                return SSEEvent(block[end + 7:], block[7:end], self._id)
+
+        data, event_name = [], ""
+        for line in block.split("\n"):
+            if not line or line.startswith(":"):
+                continue  # Comment / keep-alive
+            name, _, value = line.partition(":")
+            if value.startswith(" "):
+                value = value[1:]
+            if name == "data":
+                data.append(value)
+            elif name == "event":
+                event_name = value
+            elif name == "id":
+                self._id = value
+        if not data:
+            return None
+        return SSEEvent(data="\n".join(data), event=event_name, id=self._id)
+
+
+def _delta_string(data: str) -> Optional[str]:
+    """
+    The "delta" string of a Responses delta event, decoded on its own with
+    the C string scanner instead of building the whole event dict. Quotes
+    inside JSON strings are escaped, so the raw key can't appear in a value.
+    """
+    key = data.find('"delta":')
+    if key >= 0:
+        start = key + 8
+        while data[start:start + 1] == " ":
+            start += 1
+        if data[start:start + 1] == '"':
+            try:
+                return _scanstring(data, start + 1)[0]
+            except ValueError:
+                pass
+    try:
+        return json.loads(data).get("delta")
+    except (json.JSONDecodeError, AttributeError):
+        return None
+
+
+def parse_event(event: SSEEvent) -> Iterator[StreamItem]:
+    """Turn one SSE event into stream items, JSON-decoding only when needed."""
+    data = event.data
+    name = event.event
+    if name == "response.output_text.delta":
+        delta = _delta_string(data)
+        if delta:
+            yield TextDelta(delta)
+        return
+    if name in _SKIP_EVENTS or data == "[DONE]":
+        return
+    if not ('delta"' in data or '"usage"' in data or '"output"' in data or 'finish_reason"' in data):
+        return
+    try:
+        payload = json.loads(data)
+    except json.JSONDecodeError:
+        return
+
+    event_type = payload.get("type", "")
+    # Responses API
+    if event_type == "response.output_text.delta":
+        if payload.get("delta"):
+            yield TextDelta(payload["delta"])
+        return
+    if event_type == "response.completed":
+        usage = (payload.get("response") or {}).get("usage")
+        if usage:
+            yield Usage(usage)
+        yield Finish("completed")
+        return
+
+    # Legacy format
+    if "output" in payload and isinstance(payload["output"], list):
+        for item in payload["output"]:
+            if item.get("type") == "output_text" and item.get("text"):
+                yield TextDelta(item["text"])
+        return
+
+    # ChatCompletion format
+    for choice in payload.get("choices") or []:
+        delta = choice.get("delta") or {}
+        if delta.get("content"):
+            yield TextDelta(delta["content"])
+        if delta.get("tool_calls"):
+            yield ToolCallDelta(delta["tool_calls"])
+        if choice.get("finish_reason"):
+            yield Finish(choice["finish_reason"])
+    if payload.get("usage"):
+        yield Usage(payload["usage"])
+
+
+async def stream_events(source) -> AsyncIterator[StreamItem]:
+    """
+    Decode an SSE byte stream into typed items.
+
+    `source` is an aiohttp StreamReader (read with iter_any(), so chunk
+    boundaries are whatever the network delivered) or any async iterable of
+    bytes. Stops at `data: [DONE]`.
+    """
+    chunks = source.iter_any() if hasattr(source, "iter_any") else source
+    decoder = SSEDecoder()
+    async for chunk in chunks:
+        for event in decoder.feed(chunk):
+            if event.data == "[DONE]":
+                return
+            for item in parse_event(event):
+                yield item
+    for event in decoder.flush():
+        if event.data == "[DONE]":
+            return
+        for item in parse_event(event):
+            yield item
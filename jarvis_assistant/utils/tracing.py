@@ -0,0 +1,256 @@
+"""
+Turn Tracing
+Lightweight span timeline for one turn, from wake word to first audio out:
+
+    wake ─ vad_end ─ asr_final ─ [plan] ─ [tool:get_weather] ─ [llm] ─ tts_first_byte ─ first_audio_out
+                                 spans (start + duration)      marks (first occurrence, ms since turn start)
+
+The current turn and span live in contextvars, so tasks created during a
+turn (concurrent tool steps, TTS senders) report into it without passing
+anything around. Marks that fire before a turn exists (wake word, VAD
+endpoint, ASR final - the audio side runs ahead of the agent) are held and
+folded into the next turn, whose clock then starts at the earliest of them.
+
+Every finished turn is appended as one JSONL record to the realtime panel
+log (scripts/realtime_panel.py streams it), with "ts"/"level"/"message" so
+it reads as a normal panel line. Disable with JARVIS_TRACE=false.
+
+Usage:
+    token = begin_turn(text=user_input)
+    try:
+        with span("plan") as s:
+            s.set(path="fast")
+        mark("llm_ttft", provider="doubao")
+    finally:
+        end_turn(token)
+"""
+
+import contextvars
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+TRACE_ENABLED = os.getenv("JARVIS_TRACE", "true").lower() == "true"
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+TRACE_LOG = os.getenv("JARVIS_TRACE_LOG") or os.getenv(
+    "JARVIS_PANEL_LOG", os.path.join(_ROOT, "logs", "realtime_panel.log")
+)
+# Pre-turn marks older than this belong to an abandoned utterance
+PENDING_MAX_AGE = 30.0
+
+_turn: contextvars.ContextVar = contextvars.ContextVar("trace_turn", default=None)
+_span: contextvars.ContextVar = contextvars.ContextVar("trace_span", default=None)
+
+
+class Span:
+    """One timed section of a turn."""
+
+    __slots__ = ("turn", "name", "parent", "start", "end", "attrs", "_token")
+
+    def __init__(self, turn: "TurnTrace", name: str, parent: Optional[str], attrs: Dict[str, Any]):
+        self.turn = turn
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self._token = None
+
+    def set(self, **attrs):
+        """Add attributes (e.g. which planner path was taken)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self._token = _span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        _span.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.turn.spans.append(self)
+        return False
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        record = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "dur_ms": round(((self.end or self.start) - self.start) * 1000, 2),
+        }
+        if self.parent:
+            record["parent"] = self.parent
+        if self.attrs:
+            record["attrs"] = self.attrs
+        return record
+
+
+class _NullSpan:
+    """Stand-in outside a turn (or with tracing off): costs one contextvar read."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class TurnTrace:
+    """Spans and marks of one turn."""
+
+    def __init__(self, origin: Optional[float] = None, **attrs):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.wall = time.time() - (time.perf_counter() - self.origin)
+        self.attrs: Dict[str, Any] = attrs
+        self.spans: List[Span] = []
+        self.marks: Dict[str, float] = {}
+        self.mark_attrs: Dict[str, Dict[str, Any]] = {}
+
+    def mark(self, name: str, at: Optional[float] = None, **attrs):
+        if name in self.marks:
+            return  # First occurrence only (first byte, first token...)
+        self.marks[name] = ((at if at is not None else time.perf_counter()) - self.origin) * 1000
+        if attrs:
+            self.mark_attrs[name] = attrs
+
+    def to_record(self) -> Dict[str, Any]:
+        duration = (time.perf_counter() - self.origin) * 1000
+        spans = sorted((s.to_dict(self.origin) for s in self.spans), key=lambda s: s["start_ms"])
+        marks = {name: round(ms, 2) for name, ms in sorted(self.marks.items(), key=lambda kv: kv[1])}
+        return {
+            "ts": datetime.fromtimestamp(self.wall).strftime("%Y-%m-%d %H:%M:%S"),
+            "level": "TRACE",
+            "message": summarize(duration, spans, marks),
+            "trace_id": self.trace_id,
+            "duration_ms": round(duration, 2),
+            "attrs": self.attrs,
+            "marks": marks,
+            "mark_attrs": self.mark_attrs,
+            "spans": spans,
+        }
+
+
+def summarize(duration: float, spans: List[Dict], marks: Dict[str, float]) -> str:
+    """One readable panel line: turn time, key marks, top-level spans."""
+    parts = [f"turn {duration:.0f}ms"]
+    for name in ("asr_final", "llm_ttft", "tts_first_byte", "first_audio_out"):
+        if name in marks:
+            parts.append(f"{name} {marks[name]:.0f}ms")
+    for s in spans:
+        if "parent" not in s or s["parent"] in ("execute", "agent"):
+            path = (s.get("attrs") or {}).get("path")
+            parts.append(f"{s['name']} {s['dur_ms']:.0f}ms" + (f" ({path})" if path else ""))
+    return " · ".join(parts)
+
+
+class Tracer:
+    """Turn lifecycle, pre-turn marks and the JSONL writer."""
+
+    def __init__(self, path: str = TRACE_LOG, enabled: bool = TRACE_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self._pending: List[tuple] = []   # (name, perf_counter, attrs) before any turn
+        self.stats = {"turns": 0, "spans": 0, "write_errors": 0}
+
+    def begin_turn(self, **attrs) -> Optional[contextvars.Token]:
+        if not self.enabled or _turn.get() is not None:
+            return None  # Off, or the turn belongs to an outer caller (voice loop)
+        now = time.perf_counter()
+        pending = [p for p in self._pending if now - p[1] <= PENDING_MAX_AGE]
+        self._pending = []
+        trace = TurnTrace(origin=min([p[1] for p in pending], default=now), **attrs)
+        for name, at, mark_attrs in pending:
+            trace.mark(name, at, **mark_attrs)
+        return _turn.set(trace)
+
+    def end_turn(self, token: Optional[contextvars.Token], **attrs) -> Optional[Dict[str, Any]]:
+        if token is None:
+            return None
+        trace = _turn.get()
+        _turn.reset(token)
+        if trace is None:
+            return None
+        trace.attrs.update(attrs)
+        record = trace.to_record()
+        self.stats["turns"] += 1
+        self.stats["spans"] += len(trace.spans)
+        self.write(record)
+        return record
+
+    def mark(self, name: str, **attrs):
+        if not self.enabled:
+            return
+        trace = _turn.get()
+        if trace is not None:
+            trace.mark(name, **attrs)
+        else:
+            self._pending.append((name, time.perf_counter(), attrs))
+            if len(self._pending) > 32:
+                del self._pending[0]
+
+    def write(self, record: Dict[str, Any]):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except Exception as e:
+            self.stats["write_errors"] += 1
+            print(f"⚠️ Trace write failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "enabled": self.enabled, "path": self.path}
+
+
+# Singleton instance
+_tracer_instance: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Get the shared turn tracer"""
+    global _tracer_instance
+    if _tracer_instance is None:
+        _tracer_instance = Tracer()
+    return _tracer_instance
+
+
+def begin_turn(**attrs) -> Optional[contextvars.Token]:
+    """Start tracing a turn (no-op if one is already being traced)."""
+    return get_tracer().begin_turn(**attrs)
+
+
+def end_turn(token: Optional[contextvars.Token], **attrs) -> Optional[Dict[str, Any]]:
+    """Finish the turn started with this token and write its record."""
+    return get_tracer().end_turn(token, **attrs)
+
+
+def span(name: str, **attrs):
+    """Time a section of the current turn: `with span("plan") as s: ...`."""
+    trace = _turn.get()
+    if trace is None:
+        return _NULL_SPAN
+    parent = _span.get()
+    return Span(trace, name, parent.name if parent is not None else None, attrs)
+
+
+def current_span():
+    """The innermost open span (a no-op span outside a turn)."""
+    return _span.get() or _NULL_SPAN
+
+
+def mark(name: str, **attrs):
+    """Record a point in time (first occurrence per turn)."""
+    get_tracer().mark(name, **attrs)
@@ -24,6 +24,7 @@ class TTSEngine:
     
     Features:
     - Connection reuse (590ms vs 670ms first call)
+    - Speech cache for repeated phrases (no network on hit)
     - Streaming output
     - Singleton pattern
     - Multiple voice support
@@ -90,6 +91,12 @@ class TTSEngine:
         
         voice = voice or self.config.voice
         
+        # Cached phrases replay locally - no need to queue behind the connection
+        if self.client.is_cached(text, voice):
+            async for chunk in self.client.synthesize(text, voice=voice):
+                yield chunk
+            return
+        
         async with self._synthesis_lock:
             self._synthesis_count += 1
             count = self._synthesis_count
@@ -99,13 +106,17 @@ class TTSEngine:
             else:
                 print(f"🔌 [TTS] Synthesis #{count} (reusing connection)")
             
+            stream = self.client.synthesize(text, voice=voice)
             try:
                 # Use existing TTS client with connection pooling
-                async for chunk in self.client.synthesize(text, voice=voice):
+                async for chunk in stream:
                     yield chunk
                     
             except Exception as e:
                 print(f"❌ TTS synthesis error: {e}")
+            finally:
+                # Stopping early discards the rest of the stream, keeping the connection
+                await stream.aclose()
     
     async def synthesize_quick(self, text: str) -> bytes:
         """
@@ -124,6 +135,18 @@ class TTSEngine:
         
         return b''.join(chunks)
     
+    def link_stats(self) -> dict:
+        """Connection/cancellation counters (reconnects, cancels, discarded frames)"""
+        if not self.client:
+            return {}
+        return dict(self.client.stats)
+    
+    def cache_stats(self) -> dict:
+        """Speech cache hit/miss/eviction counters"""
+        if not self.client:
+            return {}
+        return self.client.cache.get_stats()
+    
     async def close(self):
         """Close TTS connection"""
         if self.client:
@@ -21,6 +21,7 @@ from components.asr import ASREngine
 from components.tts import TTSEngine
 from agent.jarvis_agent import JarvisAgent
 from config import JarvisConfig
+from jarvis_assistant.services.audio.filler import FillerPhraseManager
 
 class SessionState(Enum):
     """Session states"""
@@ -63,6 +64,9 @@ class JarvisSession:
         self.tts = TTSEngine(self.config.tts)
         self.agent = JarvisAgent(self.config.agent)
         
+        # Cached "let me check" fillers mask planning/tool latency
+        self.filler = FillerPhraseManager(tts=self.tts.client, audio_sink=self.audio.write)
+        
         # Session state
         self.state = SessionState.IDLE
         self._is_running = False
@@ -92,6 +96,9 @@ class JarvisSession:
         if self.config.enable_boot_sound:
             self._play_boot_sound()
         
+        # Pre-synthesize openers/fillers into the speech cache (low priority)
+        self._start_speech_warmup()
+        
         print("\n🎙️ Jarvis is ready! Say 'Hey Jarvis' to activate.\n")
         
         # Run main loop
@@ -179,7 +186,9 @@ class JarvisSession:
         
         await self._transition_to_speaking()
         
+        self.filler.start(delay=0.8)
         async for response_chunk in self.agent.respond(text):
+            self.filler.stop()
             print(f"🤖 Jarvis: {response_chunk}")
             
             # Synthesize and play
@@ -220,6 +229,16 @@ class JarvisSession:
             self.wake_word.reset()
             print("[STATE] 🔴 → IDLE")
     
+    def _start_speech_warmup(self):
+        """Start background pre-synthesis of known phrases"""
+        if not self.tts.client:
+            return
+        try:
+            from jarvis_assistant.core.preloader import start_speech_cache_warmup
+            start_speech_cache_warmup(self.tts.client)
+        except Exception as e:
+            print(f"⚠️ Speech cache warm-up unavailable: {e}")
+    
     def _play_boot_sound(self):
         """Play boot sound"""
         try:
@@ -234,6 +253,8 @@ class JarvisSession:
         
         self._is_running = False
         
+        self.filler.stop()
+        
         # Stop audio
         await self.audio.stop()
         
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-session streaming TTS.
+Compares per-fragment synthesis (DoubaoTTS.speak_stream) against one
+bidirectional session per answer (DoubaoStreamingTTS): first-audio latency,
+number of session setups and whether audio comes back in text order.
+"""
+
+import asyncio
+import time
+import os
+import sys
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_ROOT)
+
+from dotenv import load_dotenv
+
+# Load environment from jarvis_assistant/.env
+ENV_PATH = os.path.join(PROJECT_ROOT, "jarvis_assistant", ".env")
+load_dotenv(ENV_PATH, override=True)
+
+ANSWER = "好的，今天北京晴，最高气温二十五度。傍晚有微风，适合出门散步。记得带一件薄外套！"
+TOKEN_DELAY = 0.03  # Simulated LLM inter-token gap
+
+
+async def fake_llm_stream(text: str = ANSWER, step: int = 2):
+    """Yield the answer a couple of characters at a time, like an LLM."""
+    for i in range(0, len(text), step):
+        await asyncio.sleep(TOKEN_DELAY)
+        yield text[i:i + step]
+
+
+async def run_per_fragment():
+    """Current approach: one independent synthesis per punctuation fragment."""
+    from jarvis_assistant.io.tts import get_doubao_tts
+
+    tts = get_doubao_tts()
+    await tts._ensure_connected()
+
+    t0 = time.time()
+    first_audio = None
+    finish_order = []
+    tasks = []
+
+    async def synthesize(index: int, sentence: str):
+        nonlocal first_audio
+        async for _ in tts.client.synthesize(sentence, use_cache=False):
+            if first_audio is None:
+                first_audio = (time.time() - t0) * 1000
+        finish_order.append(index)
+
+    buffer = ""
+    async for delta in fake_llm_stream():
+        buffer += delta
+        if tts._is_sentence_end(buffer):
+            tasks.append(asyncio.create_task(synthesize(len(tasks), buffer.strip())))
+            buffer = ""
+    if buffer.strip():
+        tasks.append(asyncio.create_task(synthesize(len(tasks), buffer.strip())))
+    await asyncio.gather(*tasks)
+
+    return {
+        "first_audio_ms": first_audio,
+        "total_ms": (time.time() - t0) * 1000,
+        "session_setups": len(tasks),
+        "in_order": finish_order == sorted(finish_order),
+    }
+
+
+async def run_single_session():
+    """New approach: every delta goes into one bidirectional session."""
+    from jarvis_assistant.io.tts import get_doubao_streaming_tts
+
+    tts = get_doubao_streaming_tts()
+    await tts.client.connect()
+
+    async for _ in tts.synthesize_stream(fake_llm_stream()):
+        pass
+
+    stats = tts.last_stats
+    return {
+        "first_audio_ms": stats["first_audio_ms"],
+        "total_ms": stats["total_ms"],
+        "session_setups": stats["session_setups"],
+        "text_requests": stats["text_requests"],
+        "in_order": True,  # single ordered audio_stream
+    }
+
+
+async def test_streaming_tts_session(rounds: int = 3):
+    print("🧪 Benchmarking single-session streaming TTS")
+    print("=" * 60)
+
+    if not os.getenv("DOUBAO_APP_ID") or not os.getenv("DOUBAO_SPEECH_TOKEN"):
+        print("⚠️ DOUBAO_APP_ID / DOUBAO_SPEECH_TOKEN not set, skipping")
+        return
+
+    results = {"per_fragment": [], "single_session": []}
+    for i in range(rounds):
+        print(f"\n📍 Round {i + 1}/{rounds}")
+        old = await run_per_fragment()
+        print(f"   Per-fragment:   first audio {old['first_audio_ms']:.0f}ms, "
+              f"{old['session_setups']} setups, in order: {old['in_order']}")
+        new = await run_single_session()
+        print(f"   Single session: first audio {new['first_audio_ms']:.0f}ms, "
+              f"{new['session_setups']} setup(s), {new['text_requests']} text requests")
+        results["per_fragment"].append(old)
+        results["single_session"].append(new)
+
+    def avg(name, key):
+        values = [r[key] for r in results[name] if r[key] is not None]
+        return sum(values) / len(values) if values else 0.0
+
+    print("\n" + "=" * 60)
+    print("📊 Results Summary (averages):")
+    print("-" * 60)
+    print(f"{'':18}{'first audio':>14}{'total':>12}{'setups':>10}")
+    for name in ("per_fragment", "single_session"):
+        print(f"{name:18}{avg(name, 'first_audio_ms'):>12.0f}ms{avg(name, 'total_ms'):>10.0f}ms"
+              f"{avg(name, 'session_setups'):>10.1f}")
+    print("-" * 60)
+    out_of_order = sum(not r["in_order"] for r in results["per_fragment"])
+    print(f"Per-fragment rounds finished out of order: {out_of_order}/{rounds}")
+
+    single_setups = {r["session_setups"] for r in results["single_session"]}
+    if single_setups == {1}:
+        print("\n✅ Exactly one session setup per answer")
+    else:
+        print(f"\n⚠️ Unexpected session setups per answer: {sorted(single_setups)}")
+
+    await close_clients()
+    print("=" * 60)
+
+
+async def close_clients():
+    from jarvis_assistant.io.tts import get_doubao_tts, get_doubao_streaming_tts
+    await get_doubao_tts().close()
+    await get_doubao_streaming_tts().close()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_streaming_tts_session())